@@ -6,20 +6,27 @@ Provides high-performance message history storage using log + index file structu
 Components:
 - FastMessageHistoryService: Main service API for accessing history
 - message_saved: Signal emitted when a message is successfully saved to storage
+- messages_appended: Signal carrying newly available GSN ranges (in-process and cross-process)
+- HistoryChangeNotifier: Publishes messages_appended and watches for other writers
 - MessageLogHistory: Low-level history manager
 - MessageLogStorage: Storage engine with current/data.log + current/index.idx + history_* directories
+- Durability: Write durability modes for MessageLogStorage group commit
 - AgentChatHistoryListener: Auto-saves messages from signals
 """
 
 from .agent_chat_history_service import FastMessageHistoryService, message_saved
-from .agent_chat_storage import MessageLogHistory, MessageLogStorage, MessageLogArchive
+from .agent_chat_storage import MessageLogHistory, MessageLogStorage, MessageLogArchive, Durability
 from .agent_chat_history_listener import AgentChatHistoryListener
+from .history_change_notifier import HistoryChangeNotifier, messages_appended
 
 __all__ = [
     'FastMessageHistoryService',
     'message_saved',
+    'messages_appended',
+    'HistoryChangeNotifier',
     'MessageLogHistory',
     'MessageLogStorage',
     'MessageLogArchive',
+    'Durability',
     'AgentChatHistoryListener',
 ]
@@ -17,6 +17,9 @@ Enhanced Signal:
     - message_id: ID of the saved message
     - gsn: Global sequence number for archive-aware tracking
     - current_gsn: Current (latest) GSN in the system
+
+    Each committed GSN is also published through HistoryChangeNotifier's
+    messages_appended signal, which additionally covers other processes.
 """
 
 import logging
@@ -24,6 +27,7 @@ import blinker
 from typing import Dict, List, Optional, Tuple
 
 from agent.chat.history.agent_chat_storage import MessageLogHistory
+from agent.chat.history.history_change_notifier import HistoryChangeNotifier
 from agent.chat.agent_chat_message import AgentMessage
 
 logger = logging.getLogger(__name__)
@@ -95,6 +99,8 @@ class FastMessageHistoryService:
 
         # Use enhanced history to get GSN support
         enhanced_history = get_enhanced_history(workspace_path, project_name)
+        # Created before the append so the new GSN counts as unpublished
+        notifier = HistoryChangeNotifier.get_notifier(workspace_path, project_name)
         success, gsn = enhanced_history.append_message(message_dict)
 
         # Emit signal after successful storage write
@@ -115,6 +121,11 @@ class FastMessageHistoryService:
             except Exception as e:
                 logger.error(f"Error emitting message_saved signal: {e}")
 
+            try:
+                notifier.publish(gsn)
+            except Exception as e:
+                logger.error(f"Error publishing messages_appended signal: {e}")
+
         return success
 
     @classmethod
@@ -324,5 +335,5 @@ class FastMessageHistoryService:
         """Remove a history instance from the service."""
         key = cls._make_key(workspace_path, project_name)
         if key in cls._instances:
-            del cls._instances[key]
+            cls._instances.pop(key).close()
             logger.debug(f"Removed MessageLogHistory for {project_name}")
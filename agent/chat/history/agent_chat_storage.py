@@ -4,42 +4,149 @@ Message Log Storage - High-performance message history storage.
 Design:
 1. current/data.log - Current active message data
 2. current/index.idx - Fixed 8-byte offsets for fast O(1) access
-3. history_YYYY_MM_DD_HH_MM_SS_mmm/ - Archived message directories
+3. current/gsn.idx - Fixed 8-byte GSN per line (0 = no GSN), parallel to index.idx
+4. history_YYYY_MM_DD_HH_MM_SS_mmm/ - Sealed, immutable segments of
+   MAX_MESSAGES messages each (same data.log + index.idx + gsn.idx layout)
+5. segments.json - Segment manifest: sealed segments in chronological order
+   with their line counts, global base positions and GSN ranges
+
+Rotation:
+- When the active segment reaches MAX_MESSAGES it is sealed by renaming
+  current/ to a history_* directory and opening a fresh current/. Nothing is
+  re-read or re-serialized, so rotation cost does not depend on log size.
+- The manifest is rewritten atomically (temp file + rename) after each seal.
+  On startup any history_* directories missing from the manifest (e.g. after
+  a crash between rename and manifest write) are reconciled back into it.
+- Writers of one history directory (other instances, other processes) are
+  serialized by an flock on write.lock, held around each commit (catch-up,
+  write, seal + manifest update) and around manifest reloads, so two writers
+  reaching MAX_MESSAGES together seal once and no manifest write is lost.
 
 Index file format:
 - Fixed 8-byte unsigned integers (little-endian)
 - Position N (byte N*8) contains the offset of message N in data.log
 - Line N can be read by reading offset at index[N*8] and index[(N+1)*8]
 
+GSN index:
+- GSNs handed out through append_message(gsn_allocator=...) are allocated at
+  commit time under the directory lock, in commit order, so gsn.idx is
+  non-decreasing across all segments and across writer processes
+- find_gsn_position() binary searches the manifest GSN ranges, then the
+  segment's gsn.idx (one pread), giving gsn -> global position in O(log n)
+- gsn.idx is derivable from data.log, so it is not fsynced; missing or short
+  files (legacy data, crash) are rebuilt from the messages' metadata.gsn
+
 Concurrent strategy:
-- Write: threading.Lock protects "write data + write index" critical section
+- Write: group commit - concurrent appends are batched by a leader thread into
+  one data write + one index write (+ one fsync per file, depending on
+  durability) using persistent O_APPEND file descriptors
 - Read: os.pread() for concurrent offset-based reading (no lock needed)
 - Count: O(1) by index file size / 8
 """
 
 import os
 import json
+import fcntl
 import logging
 import struct
 import threading
+import time
+from bisect import bisect_right
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Callable, Union
 
 logger = logging.getLogger(__name__)
 
 
+def _read_uint64s(path: Path, start: int = 0, count: Optional[int] = None) -> List[int]:
+    """Read little-endian uint64 entries from a fixed-width index file in one pread."""
+    byte_start = start * Constants.INDEX_ENTRY_SIZE
+    try:
+        with open(path, 'rb') as f:
+            if count is None:
+                byte_len = max(0, os.fstat(f.fileno()).st_size - byte_start)
+            else:
+                byte_len = count * Constants.INDEX_ENTRY_SIZE
+            data = os.pread(f.fileno(), byte_len, byte_start)
+    except Exception:
+        return []
+
+    n_entries = len(data) // Constants.INDEX_ENTRY_SIZE
+    return list(struct.unpack_from(f'<{n_entries}Q', data)) if n_entries else []
+
+
+def _scan_gsns(index_path: Path, data_log_path: Path, line_count: int) -> List[int]:
+    """Decode every line of a segment and collect metadata.gsn (0 if missing)."""
+    if line_count <= 0:
+        return []
+    offsets = _read_uint64s(index_path, 0, line_count)
+    try:
+        with open(data_log_path, 'rb') as f:
+            block = os.pread(f.fileno(), os.fstat(f.fileno()).st_size, 0)
+    except Exception:
+        return [0] * line_count
+
+    gsns = []
+    bounds = offsets + [len(block)]
+    for i in range(len(offsets)):
+        try:
+            message = json.loads(block[bounds[i]:bounds[i + 1]])
+            gsns.append(int((message.get('metadata') or {}).get('gsn') or 0))
+        except Exception:
+            gsns.append(0)
+    return gsns
+
+
+def _write_gsn_index(path: Path, gsns: List[int]):
+    """Atomically write a gsn.idx file (temp file + rename)."""
+    tmp_path = path.with_suffix(".tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(struct.pack(f'<{len(gsns)}Q', *gsns))
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning(f"Could not write GSN index {path}: {e}")
+
+
 class Constants:
     """Constants for message log storage."""
-    MAX_MESSAGES = 200  # Maximum messages in active log
-    ARCHIVE_THRESHOLD = 100  # Archive oldest N/2 when MAX is reached
+    MAX_MESSAGES = 200  # Messages per segment; active log is sealed at this size
     CURRENT_DIR = "current"
     DATA_LOG = "data.log"
     INDEX_FILE = "index.idx"
+    GSN_INDEX_FILE = "gsn.idx"
     ARCHIVE_PREFIX = "history_"
+    SEGMENT_MANIFEST = "segments.json"
+    WRITE_LOCK = "write.lock"
     INDEX_ENTRY_SIZE = 8  # 8 bytes per offset (uint64)
 
 
+class _GsnEntry:
+    """A queued message whose GSN is allocated (and line encoded) at commit time."""
+
+    __slots__ = ("message", "allocator", "failed")
+
+    def __init__(self, message: Dict[str, Any], allocator: Callable[[], int]):
+        self.message = message
+        self.allocator = allocator
+        self.failed = False
+
+
+# An encoded (line_bytes, gsn) pair, or a message still waiting for its GSN
+_Entry = Union[Tuple[bytes, int], _GsnEntry]
+
+
+class Durability:
+    """Durability modes for MessageLogStorage writes."""
+    PER_MESSAGE = "per_message"  # Write + fsync every message individually
+    PER_WINDOW = "per_window"  # Group commit: one write + fsync per flush window
+    OS_BUFFERED = "os_buffered"  # Group commit without fsync (OS page cache only)
+
+    ALL = (PER_MESSAGE, PER_WINDOW, OS_BUFFERED)
+
+
 class MessageLogStorage:
     """
     High-performance message log storage with separate data and index files.
@@ -51,32 +158,97 @@ class MessageLogStorage:
     Performance optimizations:
     - Separate index file for O(1) position lookup
     - os.pread() for lock-free concurrent reads
-    - threading.Lock for atomic write operations
-    - Directory-based archiving
+    - Persistent O_APPEND descriptors (no open/close per message)
+    - Group commit: concurrent appends share one write + fsync per batch
+    - Segment-based rotation: sealing renames current/, no rewrite
+
+    Durability (see Durability):
+    - PER_MESSAGE: every append is written and fsynced before returning
+    - PER_WINDOW: appends arriving while a flush is in progress (or within
+      flush_window seconds) are committed together; every caller still
+      returns only after its batch has been fsynced
+    - OS_BUFFERED: batched writes handed to the OS without fsync
     """
 
-    def __init__(self, history_root: str):
+    def __init__(
+        self,
+        history_root: str,
+        durability: str = Durability.PER_WINDOW,
+        flush_window: float = 0.0,
+    ):
         """
         Initialize message log storage.
 
         Args:
             history_root: Root path for history storage
+            durability: One of the Durability modes
+            flush_window: Seconds a batch leader waits to gather more appends
+                before flushing (PER_WINDOW / OS_BUFFERED only). 0 means
+                batch only what queued up during the previous flush.
         """
+        if durability not in Durability.ALL:
+            raise ValueError(f"Unknown durability mode: {durability}")
+
         self.history_root = Path(history_root)
         self.history_root.mkdir(parents=True, exist_ok=True)
 
         self.current_dir = self.history_root / Constants.CURRENT_DIR
         self.data_log_path = self.current_dir / Constants.DATA_LOG
         self.index_path = self.current_dir / Constants.INDEX_FILE
+        self.gsn_index_path = self.current_dir / Constants.GSN_INDEX_FILE
+        self.manifest_path = self.history_root / Constants.SEGMENT_MANIFEST
+        self.lock_path = self.history_root / Constants.WRITE_LOCK
+
+        self.durability = durability
+        self.flush_window = max(0.0, flush_window)
 
         # Write lock for atomic "write data + write index" operations
         self._write_lock = threading.Lock()
 
-        # Initialize current directory
-        self._init_current_directory()
-
-        # Cached line count (updated on writes)
-        self._line_count: int = self._load_line_count()
+        # Persistent append descriptors, opened lazily and reopened after archiving
+        self._data_fd: Optional[int] = None
+        self._index_fd: Optional[int] = None
+        self._gsn_fd: Optional[int] = None
+        # Descriptor of write.lock (flock between writers of this directory)
+        self._lock_fd: Optional[int] = None
+
+        # Group commit state (protected by _commit_cond)
+        self._commit_cond = threading.Condition()
+        self._pending: List[Tuple[bytes, int]] = []
+        self._next_ticket = 0
+        self._committed_ticket = 0
+        self._failed_tickets: set = set()
+        self._leader_active = False
+
+        # Write throughput metrics (updated under _write_lock)
+        self._stats: Dict[str, Any] = {
+            "appends": 0,
+            "batches": 0,
+            "fsyncs": 0,
+            "bytes_written": 0,
+            "max_batch_size": 0,
+            "write_seconds": 0.0,
+            "first_append_at": None,
+            "last_append_at": None,
+        }
+
+        # Sealed segment manifest, oldest first: {"name", "base", "count"}
+        self._segments: List[Dict[str, Any]] = []
+        self._sealed_count = 0
+        self._manifest_stamp: Optional[Tuple[int, int]] = None
+        # Readers for sealed segments (immutable, so safe to keep open)
+        self._archive_readers: Dict[str, 'MessageLogArchive'] = {}
+        self._sealed_readers: Optional[List[Tuple['MessageLogArchive', int]]] = None
+
+        with self._directory_lock():
+            # Initialize current directory
+            self._init_current_directory()
+
+            # Cached line count (updated on writes)
+            self._line_count: int = self._load_line_count()
+            self._ensure_gsn_index()
+
+            self._load_manifest()
 
     def _init_current_directory(self):
         """Initialize the current directory if it doesn't exist."""
@@ -91,6 +263,17 @@ class MessageLogStorage:
         if not self.index_path.exists():
             self.index_path.write_bytes(b"")
 
+    def _ensure_gsn_index(self):
+        """Rebuild current/gsn.idx if it doesn't match index.idx (legacy data or crash)."""
+        try:
+            gsn_size = self.gsn_index_path.stat().st_size if self.gsn_index_path.exists() else -1
+        except OSError:
+            gsn_size = -1
+        if gsn_size == self._line_count * Constants.INDEX_ENTRY_SIZE:
+            return
+        gsns = _scan_gsns(self.index_path, self.data_log_path, self._line_count)
+        _write_gsn_index(self.gsn_index_path, gsns)
+
     def _load_line_count(self) -> int:
         """Load line count from index file size (O(1) operation)."""
         try:
@@ -99,19 +282,95 @@ class MessageLogStorage:
         except Exception:
             return 0
 
-    def _append_index(self, offset: int):
+    def _open_handles(self):
+        """Open persistent append descriptors for data.log and index.idx."""
+        flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+        if self._data_fd is None:
+            self._data_fd = os.open(self.data_log_path, flags, 0o644)
+        if self._index_fd is None:
+            self._index_fd = os.open(self.index_path, flags, 0o644)
+        if self._gsn_fd is None:
+            self._gsn_fd = os.open(self.gsn_index_path, flags, 0o644)
+
+    def _handles_current(self) -> bool:
+        """Whether the open descriptors still point at current/ (not a sealed segment)."""
+        try:
+            opened = os.fstat(self._index_fd)
+            on_disk = os.stat(self.index_path)
+        except OSError:
+            return False
+        return (opened.st_dev, opened.st_ino) == (on_disk.st_dev, on_disk.st_ino)
+
+    def _sync_active_segment(self):
         """
-        Append an offset to the index file.
+        Catch up with other writers of this history directory before writing.
 
-        Args:
-            offset: Byte offset in data.log
+        Another instance may have appended to current/ or sealed it since our
+        last write, leaving the cached line count and the open descriptors
+        stale. Reloads the manifest if it changed, reopens descriptors of a
+        renamed segment and re-reads the line count from the index size.
+
+        Note: This method should only be called while holding _write_lock
+        and the directory lock.
         """
-        # Pack offset as 8-byte little-endian unsigned integer
-        packed = struct.pack('<Q', offset)
-        with open(self.index_path, 'ab') as f:
-            f.write(packed)
-            f.flush()
-            os.fsync(f.fileno())
+        if self._manifest_file_stamp() != self._manifest_stamp:
+            self._close_handles()
+            self._load_manifest()
+        elif self._index_fd is not None and not self._handles_current():
+            # Sealed by a writer that died before saving the manifest
+            self._close_handles()
+        self._init_current_directory()
+        self._line_count = self._load_line_count()
+
+    @contextmanager
+    def _directory_lock(self):
+        """
+        Hold the exclusive flock shared by all writers of this history directory.
+
+        Not reentrant: callers must not nest it.
+        """
+        if self._lock_fd is None:
+            self._lock_fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _close_handles(self):
+        """Close persistent append descriptors (reopened lazily on next write)."""
+        for attr in ("_data_fd", "_index_fd", "_gsn_fd"):
+            fd = getattr(self, attr)
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+                setattr(self, attr, None)
+
+    def close(self):
+        """Close open file handles. The storage remains usable afterwards."""
+        with self._write_lock:
+            self._close_handles()
+            if self._lock_fd is not None:
+                os.close(self._lock_fd)
+                self._lock_fd = None
+
+    @staticmethod
+    def _write_all(fd: int, data: bytes):
+        """Write the whole buffer, retrying on short writes."""
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+
+    @staticmethod
+    def _sync(fd: int):
+        """Flush file data to disk (fdatasync where available)."""
+        if hasattr(os, "fdatasync"):
+            os.fdatasync(fd)
+        else:
+            os.fsync(fd)
 
     def _get_offsets(self, start: int, count: int) -> List[int]:
         """Get multiple byte offsets in a single pread call.
@@ -159,50 +418,266 @@ class MessageLogStorage:
             logger.error(f"Failed to parse message line: {e}. Line preview: {line[:100]}")
             return None
 
-    def append_message(self, message: Dict[str, Any]) -> bool:
+    def append_message(
+        self,
+        message: Dict[str, Any],
+        gsn_allocator: Optional[Callable[[], int]] = None,
+    ) -> bool:
         """
         Append a message to the log.
 
-        This method is thread-safe. The write lock ensures atomic
-        "write data + write index" operations.
+        This method is thread-safe. Without a gsn_allocator, serialization
+        happens outside any lock; the encoded line is then committed according
+        to the configured durability mode. In group commit modes the call
+        returns once the batch containing this message has been written (and
+        fsynced for PER_WINDOW).
 
         Args:
             message: Message dictionary to append
+            gsn_allocator: Optional callable returning the next GSN. It is
+                invoked while the commit holds the directory lock, right
+                before the line is written, and the result is stored in
+                message['metadata']['gsn'], so GSNs follow log order (also
+                across processes) and gsn.idx stays sorted.
 
         Returns:
             True if successful
         """
-        with self._write_lock:
-            try:
-                # Escape message to single line
-                line = self._escape_message(message) + '\n'
-                line_bytes = line.encode('utf-8')
-
-                # Get current data.log size (offset for this message)
-                with open(self.data_log_path, 'rb') as f:
-                    offset = f.seek(0, os.SEEK_END)
-
-                # Append to data.log
-                with open(self.data_log_path, 'ab') as f:
-                    f.write(line_bytes)
-                    f.flush()
-                    os.fsync(f.fileno())
+        if gsn_allocator is None:
+            entry = self._encode_entry(message, None)
+            if entry is None:
+                return False
+        else:
+            entry = _GsnEntry(message, gsn_allocator)
+
+        if self.durability == Durability.PER_MESSAGE:
+            with self._write_lock:
+                success = self._commit_batch([entry], sync=True)
+        else:
+            success = self._group_commit(entry)
+        return success and not (isinstance(entry, _GsnEntry) and entry.failed)
+
+    def _encode_entry(
+        self,
+        message: Dict[str, Any],
+        gsn_allocator: Optional[Callable[[], int]],
+    ) -> Optional[Tuple[bytes, int]]:
+        """Allocate a GSN if requested and encode the message as (line_bytes, gsn)."""
+        try:
+            gsn = 0
+            if gsn_allocator is not None:
+                gsn = gsn_allocator()
+                if 'metadata' not in message or message['metadata'] is None:
+                    message['metadata'] = {}
+                message['metadata']['gsn'] = gsn
+            line_bytes = (self._escape_message(message) + '\n').encode('utf-8')
+            return line_bytes, gsn
+        except Exception as e:
+            logger.error(f"Error serializing message: {e}", exc_info=True)
+            return None
 
-                # Append offset to index
-                self._append_index(offset)
+    def _group_commit(self, entry: _Entry) -> bool:
+        """
+        Queue an entry and wait until a batch containing it is committed.
 
-                # Update cached line count
-                self._line_count += 1
+        The first caller to find no active leader becomes the leader: it
+        drains everything queued so far and commits it as one batch while
+        later callers queue up behind it for the next batch.
+        """
+        with self._commit_cond:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            self._pending.append(entry)
+
+            while True:
+                if ticket < self._committed_ticket:
+                    if ticket in self._failed_tickets:
+                        self._failed_tickets.discard(ticket)
+                        return False
+                    return True
+                if not self._leader_active:
+                    break
+                self._commit_cond.wait()
 
-                # Check if we need to archive (only when exceeding MAX_MESSAGES)
-                if self._line_count > Constants.MAX_MESSAGES:
-                    self._archive_old_messages()
+            self._leader_active = True
 
-                return True
+        if self.flush_window > 0:
+            time.sleep(self.flush_window)
 
-            except Exception as e:
-                logger.error(f"Error appending message: {e}", exc_info=True)
-                return False
+        with self._commit_cond:
+            batch = self._pending
+            self._pending = []
+            batch_start = self._committed_ticket
+            batch_end = batch_start + len(batch)
+
+        success = False
+        try:
+            with self._write_lock:
+                success = self._commit_batch(
+                    batch, sync=self.durability == Durability.PER_WINDOW
+                )
+        finally:
+            with self._commit_cond:
+                self._committed_ticket = batch_end
+                if not success:
+                    self._failed_tickets.update(range(batch_start, batch_end))
+                else:
+                    # Messages that could not be encoded were left out
+                    self._failed_tickets.update(
+                        batch_start + i for i, queued in enumerate(batch)
+                        if isinstance(queued, _GsnEntry) and queued.failed
+                    )
+                self._failed_tickets.discard(ticket)
+                self._leader_active = False
+                self._commit_cond.notify_all()
+
+        return success
+
+    def _commit_batch(self, batch: List[_Entry], sync: bool) -> bool:
+        """
+        Write a batch of encoded lines with one data write and one index write.
+
+        Note: This method should only be called while holding _write_lock.
+
+        Args:
+            batch: (encoded line ending with a newline, gsn) entries, or
+                _GsnEntry messages that get their GSN here (a message that
+                cannot be encoded is marked failed and left out)
+            sync: Whether to fsync both files before returning
+
+        Returns:
+            True if successful
+        """
+        if not batch:
+            return True
+
+        started = time.perf_counter()
+        try:
+            with self._directory_lock():
+                encoded = [self._encode_queued(queued) for queued in batch]
+                encoded = [entry for entry in encoded if entry is not None]
+                bytes_written = self._write_batch(encoded, sync)
+            self._record_batch(len(encoded), bytes_written, started)
+            return True
+
+        except Exception as e:
+            logger.error(f"Error appending message: {e}", exc_info=True)
+            return False
+
+    def _encode_queued(self, queued: _Entry) -> Optional[Tuple[bytes, int]]:
+        """
+        Encode a queued entry, allocating its GSN if it needs one.
+
+        Note: This method should only be called while holding the directory lock.
+        """
+        if not isinstance(queued, _GsnEntry):
+            return queued
+        entry = self._encode_entry(queued.message, queued.allocator)
+        queued.failed = entry is None
+        return entry
+
+    def _write_batch(self, batch: List[Tuple[bytes, int]], sync: bool) -> int:
+        """
+        Write a batch to the active segment(s), sealing at segment boundaries.
+
+        Note: This method should only be called while holding _write_lock
+        and the directory lock.
+
+        Returns:
+            Number of bytes written
+        """
+        bytes_written = 0
+        position = 0
+        while position < len(batch):
+            # Count and seal by what is on disk, not what this instance
+            # last wrote: other writers may share the directory.
+            self._sync_active_segment()
+            if self._line_count >= Constants.MAX_MESSAGES:
+                self._seal_segment()
+
+            # Never let a segment grow past MAX_MESSAGES: split the batch
+            # at the segment boundary and seal in between.
+            room = max(1, Constants.MAX_MESSAGES - self._line_count)
+            chunk = batch[position:position + room]
+            position += len(chunk)
+
+            bytes_written += self._write_chunk(chunk, sync)
+
+            if self._line_count >= Constants.MAX_MESSAGES:
+                self._seal_segment()
+        return bytes_written
+
+    def _write_chunk(self, chunk: List[Tuple[bytes, int]], sync: bool) -> int:
+        """
+        Write encoded entries to the active segment with one write per file.
+
+        Note: This method should only be called while holding _write_lock.
+
+        Returns:
+            Number of bytes written (data + index)
+        """
+        self._open_handles()
+
+        # Current data.log size is the offset of the first message in the
+        # chunk (fstat keeps this correct if another writer appended).
+        offset = os.fstat(self._data_fd).st_size
+        index_entries = bytearray()
+        for line_bytes, _ in chunk:
+            index_entries += struct.pack('<Q', offset)
+            offset += len(line_bytes)
+        gsn_entries = struct.pack(f'<{len(chunk)}Q', *(gsn for _, gsn in chunk))
+
+        data = b''.join(line_bytes for line_bytes, _ in chunk)
+        self._write_all(self._data_fd, data)
+        self._write_all(self._index_fd, bytes(index_entries))
+        # gsn.idx is rebuilt from data.log if it falls behind, so no fsync
+        self._write_all(self._gsn_fd, gsn_entries)
+
+        if sync:
+            self._sync(self._data_fd)
+            self._sync(self._index_fd)
+            self._stats["fsyncs"] += 2
+
+        # Update cached line count only after all writes are complete (from
+        # the index size, which includes appends by other writers)
+        self._line_count = os.fstat(self._index_fd).st_size // Constants.INDEX_ENTRY_SIZE
+        return len(data) + len(index_entries) + len(gsn_entries)
+
+    def _record_batch(self, size: int, bytes_written: int, started: float):
+        """Update write throughput metrics for a committed batch."""
+        now = time.perf_counter()
+        stats = self._stats
+        if stats["first_append_at"] is None:
+            stats["first_append_at"] = started
+        stats["last_append_at"] = now
+        stats["appends"] += size
+        stats["batches"] += 1
+        stats["bytes_written"] += bytes_written
+        stats["max_batch_size"] = max(stats["max_batch_size"], size)
+        stats["write_seconds"] += now - started
+
+    def get_write_stats(self) -> Dict[str, Any]:
+        """
+        Get write throughput metrics.
+
+        Returns:
+            Dictionary with appends, batches, fsyncs, bytes_written,
+            avg_batch_size, max_batch_size, write_seconds and
+            appends_per_sec (over the span between first and last commit)
+        """
+        with self._write_lock:
+            stats = dict(self._stats)
+
+        first = stats.pop("first_append_at")
+        last = stats.pop("last_append_at")
+        elapsed = (last - first) if first is not None and last is not None else 0.0
+
+        stats["durability"] = self.durability
+        stats["avg_batch_size"] = (
+            stats["appends"] / stats["batches"] if stats["batches"] else 0.0
+        )
+        stats["appends_per_sec"] = stats["appends"] / elapsed if elapsed > 0 else 0.0
+        return stats
 
     def get_message_count(self) -> int:
         """
@@ -306,122 +781,265 @@ class MessageLogStorage:
         messages = self.get_messages(start, count)
         return list(reversed(messages))
 
-    def _archive_old_messages(self):
+    def get_line_count(self) -> int:
+        """Get line count of the active segment (same as get_message_count)."""
+        return self._line_count
+
+    # ==================== Segment management ====================
+
+    def _seal_segment(self):
         """
-        Archive oldest MAX_MESSAGES messages to keep current directory small.
+        Seal the active segment and open a new, empty one.
 
-        Creates a new history directory with the archived messages and
-        resets the current directory with remaining messages.
+        The current directory is renamed to a history_* directory (O(1), no
+        data is re-read or re-written) and recorded in the segment manifest.
 
-        Note: This method should only be called while holding _write_lock.
+        Note: This method should only be called while holding _write_lock
+        and the directory lock.
         """
         try:
-            # When count exceeds MAX_MESSAGES, archive MAX_MESSAGES oldest messages
-            # This leaves only the newest messages in current
-            messages_to_archive = min(Constants.MAX_MESSAGES, self._line_count)
+            self._close_handles()
 
-            # Read oldest messages to archive
-            old_messages = self.get_messages(0, messages_to_archive)
+            timestamp = datetime.now().strftime("%Y_%m_%d_%H_%M_%S_%f")[:-3]
+            name = f"{Constants.ARCHIVE_PREFIX}{timestamp}"
+            suffix = 1
+            while (self.history_root / name).exists():
+                name = f"{Constants.ARCHIVE_PREFIX}{timestamp}_{suffix}"
+                suffix += 1
+
+            sealed_count = self._load_line_count()
+            gsns = self.get_gsns(0, sealed_count)
+            os.rename(self.current_dir, self.history_root / name)
+
+            self._segments.append({
+                "name": name,
+                "base": self._sealed_count,
+                "count": sealed_count,
+                "first_gsn": gsns[0] if gsns else 0,
+                "last_gsn": max(gsns) if gsns else 0,
+            })
+            self._sealed_count += sealed_count
+            self._sealed_readers = None
+
+            self._init_current_directory()
+            self._line_count = 0
+            self._save_manifest()
+
+            logger.info(f"Sealed segment {name} with {sealed_count} messages")
 
-            if not old_messages:
-                return
+        except Exception as e:
+            logger.error(f"Error sealing segment: {e}", exc_info=True)
 
-            # Create archive directory
-            timestamp = datetime.now().strftime("%Y_%m_%d_%H_%M_%S_%f")[:-3]
-            archive_dir = self.history_root / f"{Constants.ARCHIVE_PREFIX}{timestamp}"
-            archive_dir.mkdir(parents=True, exist_ok=True)
+    def _list_segment_dirs(self) -> List[str]:
+        """List sealed segment directory names on disk (chronological by name)."""
+        try:
+            return sorted(
+                p.name for p in self.history_root.glob(f"{Constants.ARCHIVE_PREFIX}*")
+                if p.is_dir()
+            )
+        except Exception as e:
+            logger.error(f"Error listing segments: {e}")
+            return []
 
-            archive_data_path = archive_dir / Constants.DATA_LOG
-            archive_index_path = archive_dir / Constants.INDEX_FILE
+    def _manifest_file_stamp(self) -> Optional[Tuple[int, int]]:
+        """Get (mtime_ns, size) of the manifest, or None if it doesn't exist."""
+        try:
+            st = self.manifest_path.stat()
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
 
-            # Write archived data.log
-            with open(archive_data_path, 'w', encoding='utf-8') as f:
-                for msg in old_messages:
-                    line = self._escape_message(msg) + '\n'
-                    f.write(line)
-                f.flush()
-                os.fsync(f.fileno())
+    def _load_manifest(self):
+        """
+        Load the segment manifest and reconcile it with the directories on disk.
 
-            # Write archived index.idx
-            with open(archive_index_path, 'wb') as f:
-                offset = 0
-                for msg in old_messages:
-                    line = self._escape_message(msg) + '\n'
-                    packed = struct.pack('<Q', offset)
-                    f.write(packed)
-                    offset += len(line.encode('utf-8'))
+        Segments listed in the manifest whose directory is gone are dropped;
+        history_* directories missing from the manifest (legacy archives or a
+        crash between seal and manifest write) are appended in name order.
+        """
+        entries: List[Dict[str, Any]] = []
+        try:
+            if self.manifest_path.exists():
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    entries = json.load(f).get("segments", [])
+        except Exception as e:
+            logger.warning(f"Segment manifest unreadable, rebuilding: {e}")
+            entries = []
+
+        on_disk = self._list_segment_dirs()
+        on_disk_set = set(on_disk)
+        known = [e for e in entries if e.get("name") in on_disk_set]
+        known_names = {e["name"] for e in known}
+        missing = [name for name in on_disk if name not in known_names]
+
+        segments = []
+        base = 0
+        backfilled = False
+        for entry in known + [{"name": name} for name in missing]:
+            count = entry.get("count")
+            if count is None or "last_gsn" not in entry:
+                # Legacy segment: derive count and GSN range (builds gsn.idx once)
+                archive = self.load_archive(self.history_root / entry["name"])
+                count = archive.get_line_count()
+                gsns = archive.get_gsns()
+                entry = dict(entry, first_gsn=gsns[0] if gsns else 0,
+                             last_gsn=max(gsns) if gsns else 0)
+                backfilled = True
+            segments.append({
+                "name": entry["name"],
+                "base": base,
+                "count": count,
+                "first_gsn": entry["first_gsn"],
+                "last_gsn": entry["last_gsn"],
+            })
+            base += count
+
+        self._segments = segments
+        self._sealed_count = base
+        self._sealed_readers = None
+
+        if missing or backfilled or len(known) != len(entries) or not self.manifest_path.exists():
+            if segments or self.manifest_path.exists():
+                self._save_manifest()
+        self._manifest_stamp = self._manifest_file_stamp()
+
+    def _save_manifest(self):
+        """Atomically write the segment manifest (temp file + rename)."""
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": 1, "segments": self._segments}, f, separators=(',', ':'))
                 f.flush()
                 os.fsync(f.fileno())
+            os.replace(tmp_path, self.manifest_path)
+            self._manifest_stamp = self._manifest_file_stamp()
+        except Exception as e:
+            logger.error(f"Error writing segment manifest: {e}")
 
-            # Calculate remaining messages
-            remaining_start = messages_to_archive
-            remaining_count = self._line_count - remaining_start
+    def _refresh_manifest(self):
+        """Reload the manifest if another instance sealed a segment meanwhile."""
+        if self._manifest_file_stamp() == self._manifest_stamp:
+            return
+        with self._write_lock:
+            if self._manifest_file_stamp() == self._manifest_stamp:
+                return
+            with self._directory_lock():
+                self._sync_active_segment()
 
-            # Create new current directory
-            new_current_dir = self.history_root / f"{Constants.CURRENT_DIR}.new"
-            new_current_dir.mkdir(parents=True, exist_ok=True)
+    def refresh(self):
+        """Pick up appends and sealed segments written by other processes."""
+        self._refresh_manifest()
+        with self._write_lock:
+            self._line_count = self._load_line_count()
 
-            new_data_path = new_current_dir / Constants.DATA_LOG
-            new_index_path = new_current_dir / Constants.INDEX_FILE
+    def get_segments(self) -> List[Tuple[Any, int]]:
+        """
+        Get readers for all segments in chronological order.
 
-            # Write remaining messages to new current
-            remaining_messages = self.get_messages(remaining_start, remaining_count)
+        Returns:
+            List of (reader, base) tuples, oldest first. Sealed segments are
+            MessageLogArchive readers and the last entry is this storage (the
+            active segment). base is the global position of the segment's
+            first message.
+        """
+        self._refresh_manifest()
+        sealed = self._sealed_readers
+        if sealed is None:
+            sealed = [
+                (self.load_archive(self.history_root / seg["name"]), seg["base"])
+                for seg in self._segments
+            ]
+            self._sealed_readers = sealed
+        return sealed + [(self, self._sealed_count)]
 
-            with open(new_data_path, 'w', encoding='utf-8') as f:
-                for msg in remaining_messages:
-                    line = self._escape_message(msg) + '\n'
-                    f.write(line)
-                f.flush()
-                os.fsync(f.fileno())
+    def get_archived_directories(self) -> List[Path]:
+        """Get list of sealed segment directories (newest first)."""
+        self._refresh_manifest()
+        return [self.history_root / seg["name"] for seg in reversed(self._segments)]
 
-            with open(new_index_path, 'wb') as f:
-                offset = 0
-                for msg in remaining_messages:
-                    line = self._escape_message(msg) + '\n'
-                    packed = struct.pack('<Q', offset)
-                    f.write(packed)
-                    offset += len(line.encode('utf-8'))
-                f.flush()
-                os.fsync(f.fileno())
+    def load_archive(self, archive_dir: Path) -> 'MessageLogArchive':
+        """Load an archive directory for reading (readers are cached)."""
+        key = str(archive_dir)
+        archive = self._archive_readers.get(key)
+        if archive is None:
+            archive = MessageLogArchive(archive_dir)
+            self._archive_readers[key] = archive
+        return archive
+
+    def get_gsns(self, start: int = 0, count: Optional[int] = None) -> List[int]:
+        """
+        Get GSNs of lines in the active segment (one pread of gsn.idx).
 
-            # Atomic rename: replace old current with new
-            # First remove old current directory
-            import shutil
-            if self.current_dir.exists():
-                shutil.rmtree(self.current_dir)
-            new_current_dir.replace(self.current_dir)
+        Args:
+            start: Starting line index
+            count: Number of entries (None = up to the current line count)
 
-            # Update cached line count
-            self._line_count = remaining_count
+        Returns:
+            List of GSNs (0 for lines stored without a GSN)
+        """
+        if count is None:
+            count = self._line_count - start
+        if count <= 0:
+            return []
+        return _read_uint64s(self.gsn_index_path, start, count)
 
-            logger.info(f"Archived {len(old_messages)} messages to {archive_dir.name}")
+    def get_last_gsn(self) -> int:
+        """
+        Get the GSN of the newest committed line, as found on disk.
 
-        except Exception as e:
-            logger.error(f"Error archiving messages: {e}", exc_info=True)
+        gsn.idx is written after data.log, so a GSN read from it belongs to
+        a line that is already readable; GSNs that are allocated but not yet
+        written are never returned. Sees appends by other writers.
 
-    def get_archived_directories(self) -> List[Path]:
-        """Get list of archived directories sorted by timestamp (newest first)."""
+        Returns:
+            Last committed GSN (0 if no line carries one)
+        """
+        self._refresh_manifest()
+        last_gsn = self._segments[-1]["last_gsn"] if self._segments else 0
         try:
-            archives = list(self.history_root.glob(f"{Constants.ARCHIVE_PREFIX}*"))
-            archives = [a for a in archives if a.is_dir()]
-            archives.sort(key=lambda p: p.stat().st_mtime, reverse=True)
-            return archives
-        except Exception as e:
-            logger.error(f"Error listing archives: {e}")
-            return []
+            with open(self.gsn_index_path, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                size -= size % Constants.INDEX_ENTRY_SIZE
+                if size:
+                    data = os.pread(f.fileno(), Constants.INDEX_ENTRY_SIZE,
+                                    size - Constants.INDEX_ENTRY_SIZE)
+                    last_gsn = max(last_gsn, struct.unpack('<Q', data)[0])
+        except FileNotFoundError:
+            pass
+        return last_gsn
+
+    def find_gsn_position(self, gsn: int) -> int:
+        """
+        Find the global position of the first message with GSN > gsn.
 
-    def load_archive(self, archive_dir: Path) -> 'MessageLogArchive':
-        """Load an archive directory for reading."""
-        return MessageLogArchive(archive_dir)
+        Binary searches the manifest GSN ranges to pick a segment, then the
+        segment's gsn.idx. Requires GSNs to be allocated via gsn_allocator
+        (non-decreasing in log order).
+
+        Args:
+            gsn: GSN to search after
+
+        Returns:
+            Global position (equal to get_total_count() if nothing is newer)
+        """
+        self._refresh_manifest()
+        segments = self._segments
+        last_gsns = [seg["last_gsn"] for seg in segments]
+        seg_idx = bisect_right(last_gsns, gsn)
+        if seg_idx < len(segments):
+            seg = segments[seg_idx]
+            gsns = self.load_archive(self.history_root / seg["name"]).get_gsns()
+            return seg["base"] + bisect_right(gsns, gsn)
+        return self._sealed_count + bisect_right(self.get_gsns(), gsn)
+
+    def get_sealed_count(self) -> int:
+        """Get number of messages in sealed segments (O(1))."""
+        self._refresh_manifest()
+        return self._sealed_count
 
     def get_total_count(self) -> int:
-        """Get total message count including archives."""
-        active_count = self.get_message_count()
-        archive_count = 0
-        for archive_dir in self.get_archived_directories():
-            archive = self.load_archive(archive_dir)
-            archive_count += archive.get_line_count()
-        return active_count + archive_count
+        """Get total message count including sealed segments (O(1))."""
+        return self.get_sealed_count() + self.get_message_count()
 
 
 class MessageLogArchive:
@@ -441,7 +1059,10 @@ class MessageLogArchive:
         self.archive_dir = archive_dir
         self.data_log_path = archive_dir / Constants.DATA_LOG
         self.index_path = archive_dir / Constants.INDEX_FILE
+        self.gsn_index_path = archive_dir / Constants.GSN_INDEX_FILE
         self._line_count: int = self._load_line_count()
+        # Sealed segments are immutable, so the GSN column is cached once read
+        self._gsns: Optional[List[int]] = None
 
     def _load_line_count(self) -> int:
         """Load line count from index file size (O(1) operation)."""
@@ -455,6 +1076,21 @@ class MessageLogArchive:
         """Get total line count in archive."""
         return self._line_count
 
+    def get_gsns(self) -> List[int]:
+        """
+        Get the GSN of every line in the archive.
+
+        Legacy archives without gsn.idx are scanned once and the index is
+        written next to the data so later lookups are a single pread.
+        """
+        if self._gsns is None:
+            gsns = _read_uint64s(self.gsn_index_path)
+            if len(gsns) != self._line_count:
+                gsns = _scan_gsns(self.index_path, self.data_log_path, self._line_count)
+                _write_gsn_index(self.gsn_index_path, gsns)
+            self._gsns = gsns
+        return self._gsns
+
     def _get_offsets(self, start: int, count: int) -> List[int]:
         """Get multiple byte offsets in a single pread call."""
         if count <= 0:
@@ -543,7 +1179,9 @@ class MessageLogHistory:
     """
     Message log history manager combining active log and archives.
 
-    Manages seamless loading across active log and archive directories.
+    Manages seamless loading across the active segment and sealed segments
+    listed in the segment manifest. Messages can also be addressed by global
+    position (0 = oldest message ever stored) via get_messages_range().
     """
 
     def __init__(self, workspace_path: str, project_name: str):
@@ -599,26 +1237,49 @@ class MessageLogHistory:
             List of messages, most recent first
         """
         messages = []
-        remaining = count
 
-        # First get from active log
-        active_messages = self.storage.get_latest_messages(remaining)
-        messages.extend(active_messages)
-        remaining = count - len(active_messages)
-
-        # If we need more messages, get from archives (newest first)
-        if remaining > 0 and self._archives:
-            for archive_dir in self._archives:
-                if remaining <= 0:
-                    break
+        # Walk segments newest first: active log, then sealed segments
+        for reader, _ in reversed(self.storage.get_segments()):
+            remaining = count - len(messages)
+            if remaining <= 0:
+                break
+            messages.extend(reader.get_latest_messages(remaining))
 
-                archive = self.storage.load_archive(archive_dir)
-                archive_messages = archive.get_latest_messages(remaining)
-                messages.extend(archive_messages)
-                remaining = count - len(messages)
+        return messages
 
-                if remaining <= 0:
-                    break
+    def get_messages_range(self, start: int, count: int) -> List[Dict[str, Any]]:
+        """
+        Get messages by global position across all segments.
+
+        Args:
+            start: Global position of the first message (0 = oldest stored)
+            count: Number of messages to retrieve
+
+        Returns:
+            List of messages in chronological order
+        """
+        if start < 0 or count <= 0:
+            return []
+
+        segments = self.storage.get_segments()
+        bases = [base for _, base in segments]
+        messages: List[Dict[str, Any]] = []
+        position = start
+        end = start + count
+
+        # Binary search for the segment containing `start`, then read forward
+        seg_idx = max(0, bisect_right(bases, position) - 1)
+        while seg_idx < len(segments) and position < end:
+            reader, base = segments[seg_idx]
+            local_start = position - base
+            line_count = reader.get_line_count()
+            if local_start < line_count:
+                take = min(end - position, line_count - local_start)
+                messages.extend(reader.get_messages(local_start, take))
+                position += take
+            else:
+                position = base + line_count
+            seg_idx += 1
 
         return messages
 
@@ -666,10 +1327,9 @@ class MessageLogHistory:
                 messages.extend(from_active)
                 remaining -= len(from_active)
 
-        # If we still need more, get from archives
-        if remaining > 0 and self._archives:
-            for archive_dir in self._archives:
-                archive = self.storage.load_archive(archive_dir)
+        # If we still need more, get from sealed segments (newest first)
+        if remaining > 0:
+            for archive, _ in reversed(self.storage.get_segments()[:-1]):
                 archive_count = archive.get_line_count()
 
                 if archive_count > 0:
@@ -699,9 +1359,14 @@ class MessageLogHistory:
         return self.storage.get_message_count()
 
     def invalidate_cache(self):
-        """Invalidate all caches."""
+        """Invalidate all caches (including writes made by other processes)."""
+        self.storage.refresh()
         self._refresh_archives()
 
+    def close(self):
+        """Close the underlying storage file handles."""
+        self.storage.close()
+
     def recover_from_corruption(self) -> bool:
         """
         Attempt to recover from corrupted data files.
@@ -744,8 +1409,10 @@ class MessageLogHistory:
                     f.flush()
                     os.fsync(f.fileno())
 
-                # Update cached line count
+                # Update cached line count and the derived GSN column
                 self.storage._line_count = len(offsets)
+                self.storage.close()
+                self.storage._ensure_gsn_index()
 
                 logger.info(f"Recovery completed: rebuilt index with {len(offsets)} entries")
                 return True
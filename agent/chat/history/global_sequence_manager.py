@@ -5,11 +5,13 @@ This module provides a global sequence number (GSN) that spans across
 all message archives, allowing UI components to track message positions
 independently of archiving operations.
 
-Optimized Design:
-- No separate GSN index file needed (GSN stored in message metadata)
-- Minimal file locking (only for GSN counter, not for index writes)
-- Atomic GSN allocation with retry-based contention handling
-- Simpler code with better performance
+Design:
+- GSN stored in message metadata and in a per-segment gsn.idx column
+  (maintained by MessageLogStorage in the same commit as index.idx)
+- Segment manifest records each sealed segment's GSN range, so
+  gsn -> global position is a binary search plus one bounded pread
+- GSNs are leased from the counter file in blocks (one flock per block),
+  and the current GSN is read lock-free through an mmap
 
 Usage:
     1. When saving a message, get_next_gsn() to reserve a GSN
@@ -19,6 +21,8 @@ Usage:
 """
 
 import os
+import mmap
+import fcntl
 import struct
 import logging
 import threading
@@ -30,14 +34,22 @@ logger = logging.getLogger(__name__)
 
 class GSNManager:
     """
-    Optimized Global Sequence Number manager.
+    Global Sequence Number manager with block leasing.
+
+    Counter file layout (gsn_counter.lock, two little-endian uint64):
+    - [0:8]  high-water mark: every GSN <= this value has been leased to
+             some process; advanced under flock and fsynced
+    - [8:16] current GSN: the latest GSN handed out, published through an
+             mmap so readers never open the file or take a lock
 
-    Uses atomic file operations with minimal locking overhead.
-    GSN is stored directly in message metadata - no separate index file needed.
+    get_next_gsn() leases LEASE_SIZE GSNs per flock and hands them out from
+    memory. A crash loses at most the rest of the leased block (a gap in the
+    sequence); GSNs are never reused, so cross-process uniqueness holds.
 
     Thread Safety:
-        - Uses file locking for GSN allocation (cross-process safe)
-        - No additional index locking needed
+        - In-process allocation is serialized by a thread lock
+        - Leasing uses file locking (cross-process safe)
+        - get_current_gsn() is lock-free
     """
 
     _instances: Dict[str, 'GSNManager'] = {}
@@ -46,36 +58,56 @@ class GSNManager:
     # File name for sequence number storage
     SEQUENCE_FILE = "gsn_counter.lock"
     ENTRY_SIZE = 8  # 8 bytes for uint64
+    HWM_OFFSET = 0
+    CURRENT_OFFSET = 8
+    FILE_SIZE = 16
+    LEASE_SIZE = 1024  # GSNs reserved per flock
 
-    def __init__(self, history_root: str):
+    def __init__(self, history_root: str, lease_size: int = LEASE_SIZE):
         """
         Initialize the GSN manager.
 
         Args:
             history_root: Root path for history storage
+            lease_size: Number of GSNs reserved per file-locked lease
         """
         self.history_root = Path(history_root)
         self.history_root.mkdir(parents=True, exist_ok=True)
 
         self.sequence_file_path = self.history_root / self.SEQUENCE_FILE
+        self.lease_size = max(1, lease_size)
 
         # Thread-local lock for coordinating within the same process
         self._local_lock = threading.Lock()
 
+        # Leased block: GSNs in (_lease_next - 1, _lease_end] are ours to hand out
+        self._lease_next = 1
+        self._lease_end = 0
+
+        self._fd: Optional[int] = None
+        self._mmap: Optional[mmap.mmap] = None
+
         # Initialize sequence file if it doesn't exist
         self._init_sequence_file()
 
     def _init_sequence_file(self):
-        """Initialize the sequence file if it doesn't exist."""
-        if not self.sequence_file_path.exists():
+        """Create or upgrade the sequence file and map it into memory."""
+        try:
+            self._fd = os.open(self.sequence_file_path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
             try:
-                with open(self.sequence_file_path, 'wb') as f:
-                    f.write(struct.pack('<Q', 0))
-                    f.flush()
-                    os.fsync(f.fileno())
-                logger.debug(f"Initialized GSN counter at {self.sequence_file_path}")
-            except Exception as e:
-                logger.error(f"Failed to initialize GSN counter: {e}")
+                data = os.pread(self._fd, self.FILE_SIZE, 0)
+                if len(data) < self.FILE_SIZE:
+                    # New file, or legacy 8-byte counter holding the last GSN
+                    last = struct.unpack_from('<Q', data)[0] if len(data) >= self.ENTRY_SIZE else 0
+                    os.pwrite(self._fd, struct.pack('<QQ', last, last), 0)
+                    os.fsync(self._fd)
+                    logger.debug(f"Initialized GSN counter at {self.sequence_file_path}")
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            self._mmap = mmap.mmap(self._fd, self.FILE_SIZE)
+        except Exception as e:
+            logger.error(f"Failed to initialize GSN counter: {e}")
 
     @classmethod
     def get_manager(cls, history_root: str) -> 'GSNManager':
@@ -97,45 +129,62 @@ class GSNManager:
         """
         Get and increment the next GSN.
 
-        Uses file locking for atomic read-modify-write operation.
-        This is safe across processes and threads.
+        Served from the in-memory lease; a new block is leased under flock
+        when the current one is used up, or when another process has leased
+        past it (so GSNs keep increasing across processes). MessageLogStorage
+        calls this while holding its directory lock, right before writing the
+        line, so the order GSNs are handed out in is also their log order.
 
         Returns:
             The reserved GSN
+
+        Raises:
+            Exception: If the counter cannot be read or leased; no GSN is
+                handed out rather than one that may duplicate another
         """
         with self._local_lock:
             try:
-                # Read-modify-write with file locking
-                with open(self.sequence_file_path, 'r+b') as f:
-                    # Acquire exclusive lock
-                    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                if (self._lease_next > self._lease_end
+                        or self._read_slot(self.HWM_OFFSET) > self._lease_end):
+                    self._lease_block()
 
-                    # Read current value
-                    f.seek(0)
-                    data = f.read(self.ENTRY_SIZE)
-                    current = struct.unpack('<Q', data)[0] if len(data) == self.ENTRY_SIZE else 0
+                gsn = self._lease_next
+                self._lease_next += 1
 
-                    # Increment
-                    next_gsn = current + 1
+                # Publish for lock-free readers (never move it backwards)
+                if gsn > self._read_slot(self.CURRENT_OFFSET):
+                    struct.pack_into('<Q', self._mmap, self.CURRENT_OFFSET, gsn)
+                return gsn
 
-                    # Write back
-                    f.seek(0)
-                    f.write(struct.pack('<Q', next_gsn))
-                    f.flush()
-                    os.fsync(f.fileno())
+            except Exception as e:
+                logger.error(f"Error allocating GSN: {e}")
+                raise
 
-                    # Release lock (happens automatically on context exit)
+    def _lease_block(self):
+        """
+        Reserve the next lease_size GSNs by advancing the high-water mark.
 
-                return next_gsn
+        Note: This method should only be called while holding _local_lock.
+        """
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            hwm = self._read_slot(self.HWM_OFFSET)
+            new_hwm = hwm + self.lease_size
+            os.pwrite(self._fd, struct.pack('<Q', new_hwm), self.HWM_OFFSET)
+            os.fsync(self._fd)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
 
-            except Exception as e:
-                logger.error(f"Error allocating GSN: {e}")
-                # Fallback: return current + 1 (may cause duplicates in rare cases)
-                return self._read_current_gsn() + 1
+        self._lease_next = hwm + 1
+        self._lease_end = new_hwm
+
+    def _read_slot(self, offset: int) -> int:
+        """Read one uint64 slot of the mapped counter file."""
+        return struct.unpack_from('<Q', self._mmap, offset)[0]
 
     def _read_current_gsn(self) -> int:
         """
-        Read the current GSN without incrementing (no lock for read-only).
+        Read the current GSN from the file without the mapping (no lock).
 
         Returns:
             Current GSN, or 0 if file doesn't exist
@@ -144,46 +193,51 @@ class GSNManager:
             if not self.sequence_file_path.exists():
                 return 0
             with open(self.sequence_file_path, 'rb') as f:
-                data = f.read(self.ENTRY_SIZE)
-                return struct.unpack('<Q', data)[0] if len(data) == self.ENTRY_SIZE else 0
+                data = f.read(self.FILE_SIZE)
+            if len(data) >= self.FILE_SIZE:
+                return struct.unpack_from('<Q', data, self.CURRENT_OFFSET)[0]
+            return struct.unpack_from('<Q', data)[0] if len(data) >= self.ENTRY_SIZE else 0
         except Exception:
             return 0
 
     def get_current_gsn(self) -> int:
         """
-        Get the current (highest) GSN without incrementing.
+        Get the current (highest allocated) GSN without incrementing.
 
-        Uses file locking for consistent read.
+        The line carrying this GSN may not be committed yet. Reads the published value from the shared mapping: no file open,
+        no file lock and no thread lock, so polling is cheap.
 
         Returns:
             Current GSN
         """
-        with self._local_lock:
-            try:
-                with open(self.sequence_file_path, 'rb') as f:
-                    fcntl.flock(f.fileno(), fcntl.LOCK_SH)
-                    f.seek(0)
-                    data = f.read(self.ENTRY_SIZE)
-                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
-                    return struct.unpack('<Q', data)[0] if len(data) == self.ENTRY_SIZE else 0
-            except Exception:
-                return 0
-
+        try:
+            return self._read_slot(self.CURRENT_OFFSET)
+        except Exception:
+            return self._read_current_gsn()
 
-# Import fcntl after defining the class to avoid issues at module level
-import fcntl
+    def close(self):
+        """Unmap and close the counter file (unused leased GSNs are skipped)."""
+        with self._local_lock:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+            self._lease_next, self._lease_end = 1, 0
 
 
 class EnhancedMessageLogHistory:
     """
-    Enhanced message history with GSN support - Optimized Version.
+    Enhanced message history with GSN support.
 
-    Key improvements:
-    - No separate GSN index file (GSN stored in message metadata)
-    - Simpler concurrency model (no GSN index locking)
-    - Better performance (fewer file operations)
+    GSNs are allocated inside the storage commit path (see
+    MessageLogStorage.append_message's gsn_allocator), so they are
+    non-decreasing in log order and every segment carries a gsn.idx column.
+    GSN queries are therefore a binary search to a global position followed
+    by a bounded range read, independent of how many archives exist.
 
-    The GSN is stored in the message's metadata field, making it
+    The GSN is also stored in the message's metadata field, making it
     immediately available when messages are read from storage.
     """
 
@@ -230,12 +284,10 @@ class EnhancedMessageLogHistory:
         """
         Append a message and return its GSN.
 
-        Optimized: No separate GSN index write needed.
-
         Thread Safety:
-            - GSN allocation uses file locking (cross-process safe)
-            - Storage append uses thread locking (in-process safe)
-            - No additional locking needed
+            - GSN allocation is served from a leased block (cross-process safe)
+            - Allocation happens under the storage commit-order lock, so
+              log order matches GSN order (required by the GSN index)
 
         Args:
             message: Message dictionary to append
@@ -243,20 +295,13 @@ class EnhancedMessageLogHistory:
         Returns:
             Tuple of (success, gsn)
         """
-        # Allocate GSN (uses file locking for atomicity)
-        gsn = self._gsn_manager.get_next_gsn()
-
-        # Add GSN to message metadata
-        if 'metadata' not in message:
-            message['metadata'] = {}
-        message['metadata']['gsn'] = gsn
-
-        # Append to storage (has its own locking)
-        # No separate GSN index write needed - GSN is in the message!
-        success = self.storage.append_message(message)
+        success = self.storage.append_message(
+            message, gsn_allocator=self._gsn_manager.get_next_gsn
+        )
+        gsn = (message.get('metadata') or {}).get('gsn', 0)
 
         if success:
-            # Refresh archives in case archiving occurred
+            # Refresh archives in case a segment was sealed
             self._refresh_archives()
             logger.debug(f"Appended message with GSN {gsn}")
         else:
@@ -268,7 +313,9 @@ class EnhancedMessageLogHistory:
         """
         Get messages that were saved after a given GSN.
 
-        Optimized: Filters messages by GSN from metadata.
+        Binary searches the GSN index for the first message newer than
+        last_seen_gsn, then reads up to `count` messages forward from there,
+        across as many segments as needed.
 
         Args:
             last_seen_gsn: The last GSN the UI has seen
@@ -282,48 +329,22 @@ class EnhancedMessageLogHistory:
         if current_gsn <= last_seen_gsn:
             return []
 
-        # Calculate how many messages we might need to fetch
-        # Fetch more than requested because some might have GSN <= last_seen_gsn
-        fetch_count = min(count * 2, current_gsn - last_seen_gsn + 10)
-
-        messages = []
-
-        # Get messages from active log first
-        active_messages = self._history.get_latest_messages(fetch_count)
-
-        # Filter by GSN
-        for msg in active_messages:
-            msg_gsn = msg.get('metadata', {}).get('gsn', 0)
-            if msg_gsn > last_seen_gsn:
-                messages.append(msg)
-
-        # If we need more messages and there are archives, check them
-        if len(messages) < count and self._archives:
-            remaining = count - len(messages)
-
-            # Check archives (newest first)
-            for archive_dir in self._archives[:3]:  # Check last 3 archives
-                if remaining <= 0:
-                    break
-
-                archive = self.storage.load_archive(archive_dir)
-                archive_messages = archive.get_latest_messages(remaining)
-
-                for msg in archive_messages:
-                    msg_gsn = msg.get('metadata', {}).get('gsn', 0)
-                    if msg_gsn > last_seen_gsn:
-                        messages.append(msg)
-                        remaining -= 1
-                        if remaining <= 0:
-                            break
-
-        # Sort by GSN and limit
-        messages.sort(key=lambda m: m.get('metadata', {}).get('gsn', 0))
-        return messages[:count]
+        position = self.storage.find_gsn_position(last_seen_gsn)
+        messages = self._history.get_messages_range(position, count)
+        return [
+            msg for msg in messages
+            if msg.get('metadata', {}).get('gsn', 0) > last_seen_gsn
+        ]
 
     def get_current_gsn(self) -> int:
-        """Get the current (latest) global sequence number."""
-        return self._gsn_manager.get_current_gsn()
+        """
+        Get the latest committed global sequence number.
+
+        Read from the storage's GSN index rather than the GSN counter: a GSN
+        that is allocated but whose line is not yet written is not included,
+        so messages up to the returned GSN can always be read.
+        """
+        return self.storage.get_last_gsn()
 
     def get_messages_before_gsn(self, max_gsn: int, count: int = 100) -> List[Dict[str, Any]]:
         """
@@ -335,10 +356,12 @@ class EnhancedMessageLogHistory:
         tool_call, skill, thinking, etc.), each with its own GSN. We return ALL log entries
         and let the MessageBuilder handle grouping by message_id.
 
-        Optimized Strategy (single-pass with early termination):
-        1. Traverse data sources from newest to oldest (active log -> recent archives)
-        2. Collect ALL entries for message_ids where ANY entry has GSN < max_gsn
-        3. Stop early once we have enough qualified message_ids
+        Strategy:
+        1. Binary search the GSN index for the boundary position (first GSN >= max_gsn)
+        2. Read backwards from the boundary in bounded chunks, collecting entries
+           until `count` distinct message_ids have been seen
+        3. Read a bounded window after the boundary to pick up later entries
+           belonging to the selected message_ids
 
         Args:
             max_gsn: The maximum GSN to fetch (exclusive boundary - messages with GSN < max_gsn)
@@ -353,94 +376,48 @@ class EnhancedMessageLogHistory:
             # No GSN reference, fall back to latest messages
             return self._history.get_latest_messages(count)
 
-        # Fetch multiplier: accounts for entries with GSN >= max_gsn being filtered out
+        # Chunk size multiplier: a message_id typically spans several entries
         FETCH_MULTIPLIER = 3
+        chunk_size = max(count * FETCH_MULTIPLIER, 1)
 
-        # Data structures for single-pass collection
-        # message_entries: maps message_id -> list of all its entries
-        # qualified_ids: message_ids that have at least one entry with GSN < max_gsn
         message_entries: Dict[str, List[Dict[str, Any]]] = {}
-        qualified_ids: set[str] = set()
         seen_gsns: set[int] = set()
 
-        def process_message(msg: Dict[str, Any]) -> None:
-            """Process a single message entry."""
-            msg_gsn = msg.get('metadata', {}).get('gsn', 0)
-            msg_id = msg.get('message_id', '')
-
-            if not msg_id or msg_gsn <= 0:
-                return
-
-            # Skip duplicates
-            if msg_gsn in seen_gsns:
-                return
+        def add_entry(msg: Dict[str, Any], msg_id: str, msg_gsn: int) -> None:
             seen_gsns.add(msg_gsn)
-
-            # Collect entry (we need all entries for each message_id)
-            if msg_id not in message_entries:
-                message_entries[msg_id] = []
-            message_entries[msg_id].append(msg)
-
-            # Mark as qualified if GSN < max_gsn
-            if msg_gsn < max_gsn:
-                qualified_ids.add(msg_id)
-
-        # Process active log first (newest messages)
-        active_messages = self._history.get_latest_messages(count * FETCH_MULTIPLIER)
-        for msg in active_messages:
-            process_message(msg)
-
-        # Early termination: check if we have enough qualified IDs from active log
-        if len(qualified_ids) < count and self._archives:
-            # Process archives from newest to oldest (recent archives first)
-            # Note: self._archives is ordered [oldest, ..., newest], so reversed() gives [newest, ..., oldest]
-            for archive_dir in reversed(self._archives):
-                if len(qualified_ids) >= count:
-                    # Early termination: we have enough qualified IDs
-                    break
-
-                archive = self._history.storage.load_archive(archive_dir)
-                if not archive:
-                    continue
-
-                archive_count = archive.get_line_count()
-                if archive_count == 0:
+            message_entries.setdefault(msg_id, []).append(msg)
+
+        boundary = self.storage.find_gsn_position(max_gsn - 1)
+
+        # Walk backwards from the boundary until enough message_ids are found
+        end = boundary
+        done = False
+        while end > 0 and not done:
+            start = max(0, end - chunk_size)
+            chunk = self._history.get_messages_range(start, end - start)
+            for msg in reversed(chunk):
+                msg_gsn = msg.get('metadata', {}).get('gsn', 0)
+                msg_id = msg.get('message_id', '')
+                if not msg_id or msg_gsn <= 0 or msg_gsn >= max_gsn or msg_gsn in seen_gsns:
                     continue
-
-                # Fetch in chunks from the END of archive (newest entries first)
-                # This is more efficient because we want messages with GSN close to max_gsn
-                CHUNK_SIZE = 500
-                for end_pos in range(archive_count - 1, -1, -CHUNK_SIZE):
-                    if len(qualified_ids) >= count:
-                        break
-
-                    start_pos = max(0, end_pos - CHUNK_SIZE + 1)
-                    chunk_size = end_pos - start_pos + 1
-                    archive_messages = archive.get_messages(start_pos, chunk_size)
-
-                    # Process in reverse order (newest first within chunk)
-                    for msg in reversed(archive_messages):
-                        process_message(msg)
-                        if len(qualified_ids) >= count:
-                            break
+                if msg_id not in message_entries and len(message_entries) >= count:
+                    done = True
+                    break
+                add_entry(msg, msg_id, msg_gsn)
+            end = start
 
         # If no qualified messages found, return empty
-        if not qualified_ids:
+        if not message_entries:
             return []
 
-        # Select message_ids to return (limit by count)
-        # Sort qualified_ids by their minimum GSN to get oldest first
-        id_min_gsn = {
-            msg_id: min(e.get('metadata', {}).get('gsn', 0) for e in entries)
-            for msg_id, entries in message_entries.items()
-            if msg_id in qualified_ids
-        }
-        selected_ids = sorted(qualified_ids, key=lambda mid: id_min_gsn.get(mid, 0))[:count]
+        # Later entries of the selected message_ids (GSN >= max_gsn)
+        for msg in self._history.get_messages_range(boundary, chunk_size):
+            msg_gsn = msg.get('metadata', {}).get('gsn', 0)
+            msg_id = msg.get('message_id', '')
+            if msg_id in message_entries and msg_gsn > 0 and msg_gsn not in seen_gsns:
+                add_entry(msg, msg_id, msg_gsn)
 
-        # Collect all entries for selected message_ids
-        all_entries = []
-        for msg_id in selected_ids:
-            all_entries.extend(message_entries.get(msg_id, []))
+        all_entries = [entry for entries in message_entries.values() for entry in entries]
 
         # Sort by GSN for final chronological order
         all_entries.sort(key=lambda m: m.get('metadata', {}).get('gsn', 0))
@@ -466,29 +443,7 @@ class EnhancedMessageLogHistory:
         Returns:
             List of messages, most recent first
         """
-        messages = []
-        remaining = count
-
-        # First get from active log
-        active_messages = self._history.get_latest_messages(remaining)
-        messages.extend(active_messages)
-        remaining = count - len(active_messages)
-
-        # If we need more messages, get from archives (newest first)
-        if remaining > 0 and self._archives:
-            for archive_dir in self._archives:
-                if remaining <= 0:
-                    break
-
-                archive = self._history.storage.load_archive(archive_dir)
-                archive_messages = archive.get_latest_messages(remaining)
-                messages.extend(archive_messages)
-                remaining = count - len(messages)
-
-                if remaining <= 0:
-                    break
-
-        return messages
+        return self._history.get_latest_messages(count)
 
     def get_messages_after(self, line_offset: int, count: int) -> list:
         """Get messages after a line offset in active log."""
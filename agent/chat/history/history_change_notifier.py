@@ -0,0 +1,202 @@
+"""
+History Change Notifier - push-based append notification for chat history.
+
+Instead of UI components polling storage for new data, the storage layer
+publishes a messages_appended signal carrying the newly available GSN range:
+
+- In-process writers: FastMessageHistoryService.add_message publishes the
+  GSN of every message it commits
+- Cross-process writers: a watchdog observer on the history directory fires
+  when a segment's gsn.idx or the segment manifest changes; the notifier
+  then reads the last committed GSN (see MessageLogStorage.get_last_gsn)
+  and publishes anything not yet announced
+
+Only committed GSNs are ever published. The GSN counter runs ahead of the
+log while a line is being written; publishing from it would announce a
+message that cannot be read yet and drop the writer's own publish for it.
+
+Both paths go through HistoryChangeNotifier.publish(), which only emits for
+GSNs beyond the last published one, so a write is announced exactly once
+no matter which path sees it first. An idle project costs no disk reads.
+
+Signal:
+    messages_appended(sender, workspace_path, project_name, first_gsn, last_gsn)
+
+    Receivers are called on the writer's thread or on the watchdog observer
+    thread; UI receivers must marshal to the GUI thread themselves.
+"""
+
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+import blinker
+from watchdog.observers import Observer
+from watchdog.events import FileSystemEventHandler
+
+from agent.chat.history.agent_chat_storage import Constants
+
+logger = logging.getLogger(__name__)
+
+
+# Signal emitted when messages become available in storage
+# Args: sender, workspace_path (str), project_name (str), first_gsn (int), last_gsn (int)
+messages_appended = blinker.Signal()
+
+
+class _GsnIndexWatcher(FileSystemEventHandler):
+    """Forwards writes to any segment's gsn.idx or the manifest to the notifier."""
+
+    # gsn.idx is written after data.log, so it marks committed lines
+    WATCHED_FILES = (Constants.GSN_INDEX_FILE, Constants.SEGMENT_MANIFEST)
+
+    def __init__(self, notifier: 'HistoryChangeNotifier'):
+        super().__init__()
+        self._notifier = notifier
+
+    # -- watchdog callbacks (called on observer thread) ---------------------
+
+    def on_modified(self, event):
+        self._check(event.src_path, event.is_directory)
+
+    def on_created(self, event):
+        self._check(event.src_path, event.is_directory)
+
+    def on_moved(self, event):
+        # The manifest is replaced atomically via rename
+        self._check(event.dest_path, event.is_directory)
+
+    # -- internal ----------------------------------------------------------
+
+    def _check(self, path: str, is_directory: bool):
+        if is_directory or Path(path).name not in self.WATCHED_FILES:
+            return
+        try:
+            self._notifier.check_for_changes()
+        except Exception as e:
+            logger.error(f"Error handling history change: {e}")
+
+
+class HistoryChangeNotifier:
+    """
+    Publishes messages_appended for one workspace/project history.
+
+    One instance per history (see get_notifier). Watching is reference
+    counted, so several UI components can share a single observer.
+    """
+
+    _instances: Dict[str, 'HistoryChangeNotifier'] = {}
+    _class_lock = threading.Lock()
+
+    def __init__(self, workspace_path: str, project_name: str):
+        """
+        Initialize the notifier.
+
+        Args:
+            workspace_path: Path to workspace
+            project_name: Name of project
+        """
+        from agent.chat.history.global_sequence_manager import get_enhanced_history
+
+        self.workspace_path = workspace_path
+        self.project_name = project_name
+        self._history = get_enhanced_history(workspace_path, project_name)
+        self.history_root = self._history.history_root
+
+        self._lock = threading.Lock()
+        # Everything committed at creation is considered known
+        self._published_gsn = self._history.get_current_gsn()
+
+        self._observer: Optional[Observer] = None
+        self._watch_count = 0
+
+    @classmethod
+    def get_notifier(cls, workspace_path: str, project_name: str) -> 'HistoryChangeNotifier':
+        """
+        Get or create the notifier for a workspace/project history.
+
+        Args:
+            workspace_path: Path to workspace
+            project_name: Name of project
+
+        Returns:
+            HistoryChangeNotifier instance
+        """
+        key = f"{workspace_path}||{project_name}"
+        with cls._class_lock:
+            if key not in cls._instances:
+                cls._instances[key] = HistoryChangeNotifier(workspace_path, project_name)
+            return cls._instances[key]
+
+    def publish(self, last_gsn: int) -> bool:
+        """
+        Announce that messages up to last_gsn are available.
+
+        Args:
+            last_gsn: Highest GSN known to be written
+
+        Returns:
+            True if a signal was emitted (i.e. the range was new)
+        """
+        with self._lock:
+            if last_gsn <= self._published_gsn:
+                return False
+            first_gsn = self._published_gsn + 1
+            self._published_gsn = last_gsn
+
+        messages_appended.send(
+            self,
+            workspace_path=self.workspace_path,
+            project_name=self.project_name,
+            first_gsn=first_gsn,
+            last_gsn=last_gsn,
+        )
+        logger.debug(f"Published appended GSN range {first_gsn}..{last_gsn} for {self.project_name}")
+        return True
+
+    def check_for_changes(self) -> bool:
+        """
+        Publish anything written since the last notification.
+
+        Called from the watcher for cross-process writes; reloads the
+        storage's cached line count and segment list before publishing.
+
+        Returns:
+            True if a signal was emitted
+        """
+        committed_gsn = self._history.get_current_gsn()
+        if committed_gsn <= self._published_gsn:
+            return False
+        self._history.invalidate_cache()
+        return self.publish(committed_gsn)
+
+    def start_watching(self):
+        """Start watching the history directory for writes by other processes."""
+        with self._lock:
+            self._watch_count += 1
+            if self._observer is not None:
+                return
+            try:
+                self.history_root.mkdir(parents=True, exist_ok=True)
+                observer = Observer()
+                observer.schedule(_GsnIndexWatcher(self), str(self.history_root), recursive=True)
+                observer.daemon = True
+                observer.start()
+                self._observer = observer
+                logger.debug(f"Watching chat history at {self.history_root}")
+            except Exception as e:
+                logger.warning(f"Could not watch chat history at {self.history_root}: {e}")
+
+    def stop_watching(self):
+        """Release one watch reference; the observer stops with the last one."""
+        with self._lock:
+            if self._watch_count == 0:
+                return
+            self._watch_count -= 1
+            if self._watch_count > 0 or self._observer is None:
+                return
+            observer, self._observer = self._observer, None
+
+        observer.stop()
+        observer.join(timeout=2.0)
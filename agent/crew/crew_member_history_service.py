@@ -264,7 +264,7 @@ class CrewMemberHistoryService:
 
         # Remove from cache
         if key in self._storages:
-            del self._storages[key]
+            self._storages.pop(key).close()
 
         # Remove directory
         history_root = self._get_history_root(workspace_path, project_name, member_id)
@@ -283,7 +283,7 @@ class CrewMemberHistoryService:
         """Remove a storage instance from the cache."""
         key = self._make_key(workspace_path, project_name, member_id)
         if key in self._storages:
-            del self._storages[key]
+            self._storages.pop(key).close()
             logger.debug(f"Removed storage for crew member: {member_id}")
 
 
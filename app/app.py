@@ -347,7 +347,7 @@ class App():
         for i in range(1, item_count + 1):  # Timeline items start from index 1
             try:
                 item = timeline.get_item(i)
-                task_manager = item.get_task_manager()  # This will load tasks automatically
+                task_manager = item.get_task_manager()  # Reads only the task index
                 task_count = task_manager.get_task_count()
                 loaded_task_count += task_count
                 logger.info(f"⏱️  [BackgroundInit] Loaded {task_count} tasks for timeline item {i}")
@@ -0,0 +1,259 @@
+"""
+Decoded-frame cache for scrubbing through a video.
+
+A background decoder thread keeps the frames around the playhead decoded,
+downscaled to the display box, in memory:
+
+    get(index) --> playhead --> decoder thread (cv2.VideoCapture) --> frames {index: RGB array}
+
+- Frames ahead of the playhead are prefetched first, then the ones behind it
+- Random jumps seek to the nearest keyframe at or before the target (keyframe
+  index from the shared media probe) and decode forward, caching the frames
+  on the way; without a keyframe index OpenCV seeks by frame number
+- Memory is bounded by a byte budget; when it is exceeded the frames
+  farthest from the playhead are dropped first
+- Hit/miss counters are kept so the budget can be tuned (see stats())
+
+The cache holds numpy arrays only and never touches Qt, so on_frame is
+called from the decoder thread; forward it through a Signal.
+"""
+import bisect
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from utils.media_probe import get_media_probe
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_SIZE = (640, 360)
+DEFAULT_AHEAD = 48
+DEFAULT_BEHIND = 12
+# Without a keyframe index, read forward instead of seeking for gaps up to this many frames
+SEEK_DISTANCE = 12
+
+
+@dataclass
+class ScrubStats:
+    """Counters of a ScrubFrameCache."""
+    hits: int = 0
+    misses: int = 0
+    decoded: int = 0
+    seeks: int = 0
+    frames: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ScrubFrameCache:
+    """
+    Frames of one video around a moving playhead, decoded in the background.
+
+    Usage:
+        cache = ScrubFrameCache(video_path, on_frame=callback)
+        cache.start()
+        frame = cache.get(index)   # RGB array, or None while it is being decoded
+        cache.stop()
+    """
+
+    def __init__(self, video_path: str, max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_size: Tuple[int, int] = DEFAULT_MAX_SIZE,
+                 ahead: int = DEFAULT_AHEAD, behind: int = DEFAULT_BEHIND,
+                 on_frame: Optional[Callable[[int, np.ndarray], None]] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            video_path: Video file
+            max_bytes: Memory budget for decoded frames
+            max_size: Box (width, height) frames are downscaled to fit in
+            ahead: Frames after the playhead to prefetch
+            behind: Frames before the playhead to keep
+            on_frame: Called with (index, frame) from the decoder thread for
+                every frame added to the cache
+        """
+        self.video_path = video_path
+        self.max_bytes = max(1, int(max_bytes))
+        self.max_size = max_size
+        self.ahead = max(0, ahead)
+        self.behind = max(0, behind)
+        self.on_frame = on_frame
+
+        self._frames: Dict[int, np.ndarray] = {}
+        self._stats = ScrubStats()
+        self._cond = threading.Condition()
+        self._playhead = 0
+        self._frame_count = 0
+        self._frame_bytes = 0
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the decoder thread (prefetching from frame 0)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="scrub-decoder", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        """Stop the decoder thread and drop the cached frames."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        with self._cond:
+            self._frames.clear()
+            self._stats.frames = self._stats.bytes = 0
+
+    def get(self, index: int) -> Optional[np.ndarray]:
+        """
+        Frame at an index, moving the playhead there.
+
+        Returns:
+            RGB frame (height x width x 3, uint8), or None on a miss; the
+            frame is then decoded next and passed to on_frame
+        """
+        with self._cond:
+            self._playhead = max(0, index)
+            frame = self._frames.get(index)
+            if frame is None:
+                self._stats.misses += 1
+            else:
+                self._stats.hits += 1
+            self._cond.notify_all()
+            return frame
+
+    def set_playhead(self, index: int):
+        """Move the prefetch window without a lookup."""
+        with self._cond:
+            self._playhead = max(0, index)
+            self._cond.notify_all()
+
+    def __contains__(self, index: int) -> bool:
+        with self._cond:
+            return index in self._frames
+
+    def stats(self) -> ScrubStats:
+        with self._cond:
+            return ScrubStats(**vars(self._stats))
+
+    # ------------------------------------------------------------------
+    # Decoder thread
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        cap = cv2.VideoCapture(self.video_path)
+        try:
+            if not cap.isOpened():
+                logger.warning(f"Scrub cache cannot open {self.video_path}")
+                return
+            keyframes = self._keyframe_indices(cap)
+            pos = 0  # Index of the frame the next read returns
+            while True:
+                with self._cond:
+                    target = self._next_missing()
+                    while target is None and not self._stopped:
+                        self._cond.wait()
+                        target = self._next_missing()
+                    if self._stopped:
+                        return
+
+                start = self._decode_start(target, pos, keyframes)
+                if start != pos:
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+                    pos = start
+                    with self._cond:
+                        self._stats.seeks += 1
+
+                with self._cond:
+                    wanted = self._is_wanted(pos)
+                if wanted:
+                    ok, frame = cap.read()
+                else:
+                    ok, frame = cap.grab(), None
+                if not ok:
+                    # Past the real end (frame count was an estimate)
+                    with self._cond:
+                        self._frame_count = min(self._frame_count, pos)
+                    continue
+                if frame is not None:
+                    self._store(pos, self._prepare(frame))
+                pos += 1
+        except Exception as e:
+            logger.error(f"Scrub decoder failed for {self.video_path}: {e}")
+        finally:
+            cap.release()
+
+    def _keyframe_indices(self, cap) -> List[int]:
+        """Frame count and keyframe frame indices (empty when unknown)."""
+        probe = get_media_probe(self.video_path, keyframes=True)
+        fps = probe.fps if probe else cap.get(cv2.CAP_PROP_FPS)
+        count = probe.frame_count if probe else int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        with self._cond:
+            self._frame_count = max(0, count)
+        if not probe or not probe.keyframes or fps <= 0:
+            return []
+        return sorted({int(round(t * fps)) for t in probe.keyframes})
+
+    @staticmethod
+    def _decode_start(target: int, pos: int, keyframes: List[int]) -> int:
+        """Where decoding must start for the target frame, given the current position."""
+        if keyframes:
+            i = bisect.bisect_right(keyframes, target) - 1
+            keyframe = keyframes[i] if i >= 0 else 0
+            # Reading on from the current position is cheaper than seeking back
+            return pos if keyframe <= pos <= target else keyframe
+        return pos if pos <= target <= pos + SEEK_DISTANCE else target
+
+    def _window(self) -> List[int]:
+        """Frames to keep, in prefetch order (lock held)."""
+        capacity = self.max_bytes // self._frame_bytes if self._frame_bytes else self.ahead + self.behind + 1
+        playhead = self._playhead
+        order = [playhead]
+        order.extend(range(playhead + 1, playhead + self.ahead + 1))
+        order.extend(range(playhead - 1, playhead - self.behind - 1, -1))
+        return [i for i in order if 0 <= i < self._frame_count][:max(1, capacity)]
+
+    def _next_missing(self) -> Optional[int]:
+        for index in self._window():
+            if index not in self._frames:
+                return index
+        return None
+
+    def _is_wanted(self, index: int) -> bool:
+        return index not in self._frames and index in self._window()
+
+    def _prepare(self, frame: np.ndarray) -> np.ndarray:
+        """Downscale a decoded BGR frame to the display box and convert it to RGB."""
+        height, width = frame.shape[:2]
+        scale = min(1.0, self.max_size[0] / width, self.max_size[1] / height)
+        if scale < 1.0:
+            frame = cv2.resize(frame, (max(1, round(width * scale)), max(1, round(height * scale))),
+                               interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    def _store(self, index: int, frame: np.ndarray):
+        with self._cond:
+            if self._stopped:
+                return
+            self._frame_bytes = frame.nbytes
+            self._frames[index] = frame
+            self._stats.decoded += 1
+            self._stats.bytes += frame.nbytes
+            playhead = self._playhead
+            while self._stats.bytes > self.max_bytes and len(self._frames) > 1:
+                farthest = max(self._frames, key=lambda i: abs(i - playhead))
+                self._stats.bytes -= self._frames.pop(farthest).nbytes
+            self._stats.frames = len(self._frames)
+            stored = index in self._frames
+        if stored and self.on_frame is not None:
+            self.on_frame(index, frame)
@@ -0,0 +1,240 @@
+"""
+Streaming frame pipeline for video + image layer composition.
+
+Overlays image layers on every frame of a video and encodes the result in
+a single pass:
+
+    decode thread --(bounded queue)--> composite workers --> ffmpeg stdin
+    (cv2.VideoCapture)                 (thread pool)         (rawvideo bgr24 -> libx264)
+
+- The static overlays are flattened once into tiles (see
+  LayerCompositor.to_tiles), so per frame only visible tiles are blended
+- Frames are composited in parallel (numpy/cv2 release the GIL) and
+  written to the encoder in order; at most queue_size frames are waiting
+  at each stage, so memory stays bounded for long videos
+- The encoder muxes the base video's audio track, replacing the previous
+  mp4v intermediate + second ffmpeg re-encode
+"""
+
+import os
+import queue
+import logging
+import tempfile
+import threading
+import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.data.layer_compositor import LayerCompositor, PreparedLayer, composite_over
+
+logger = logging.getLogger(__name__)
+
+# Frames buffered between stages
+DEFAULT_QUEUE_SIZE = 8
+
+_END = object()
+
+
+def default_workers() -> int:
+    """Composite workers to use: the cores left after decoder and encoder."""
+    return max(1, min(8, (os.cpu_count() or 2) - 2))
+
+
+class FramePipeline:
+    """
+    Composites static image overlays onto every frame of a video.
+
+    Usage:
+        pipeline = FramePipeline(video_path, output_path, width, height, fps)
+        pipeline.add_overlay(image, x, y)
+        frames = pipeline.run()          # blocking; use to_thread from async code
+    """
+
+    def __init__(self, video_path: str, output_path: str, width: int, height: int, fps: float,
+                 workers: Optional[int] = None, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 encoder_cmd: Optional[List[str]] = None):
+        """
+        Initialize the pipeline.
+
+        Args:
+            video_path: Base video
+            output_path: Output video (H.264 mp4)
+            width: Frame width
+            height: Frame height
+            fps: Frame rate of the base video
+            workers: Composite threads (default: default_workers())
+            queue_size: Frames buffered between stages
+            encoder_cmd: Command reading raw bgr24 frames from stdin
+                (default: ffmpeg, see build_encoder_command)
+        """
+        self.video_path = video_path
+        self.output_path = output_path
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.workers = workers or default_workers()
+        self.queue_size = max(1, queue_size)
+        self.encoder_cmd = encoder_cmd or self.build_encoder_command()
+
+        self._compositor = LayerCompositor(width, height)
+        self._tiles: Optional[List[PreparedLayer]] = None
+        self._decode_error: Optional[BaseException] = None
+
+    def build_encoder_command(self) -> List[str]:
+        """ffmpeg command encoding raw frames from stdin, with the base video's audio."""
+        return [
+            'ffmpeg',
+            '-loglevel', 'error',
+            '-f', 'rawvideo',
+            '-pix_fmt', 'bgr24',
+            '-s', f'{self.width}x{self.height}',
+            '-r', str(self.fps),
+            '-i', '-',
+            '-i', self.video_path,
+            '-map', '0:v',
+            '-map', '1:a?',  # Copy audio if present
+            '-c:v', 'libx264',
+            '-pix_fmt', 'yuv420p',
+            '-c:a', 'copy',
+            '-shortest',
+            '-y',
+            self.output_path
+        ]
+
+    def add_overlay(self, image: np.ndarray, x: int, y: int):
+        """
+        Add a static overlay, drawn above the ones added before it.
+
+        Args:
+            image: Grayscale, BGR or BGRA image
+            x: Left edge on the frame
+            y: Top edge on the frame
+        """
+        self._compositor.add(image, x, y)
+        self._tiles = None
+
+    def composite_frame(self, frame: np.ndarray) -> np.ndarray:
+        """Draw the overlays onto a BGR frame in place and return it."""
+        if frame.shape[0] != self.height or frame.shape[1] != self.width:
+            frame = cv2.resize(frame, (self.width, self.height))
+        for tile in self._get_tiles():
+            composite_over(frame, tile)
+        return frame
+
+    def run(self) -> int:
+        """
+        Decode, composite and encode the whole video.
+
+        Returns:
+            Number of frames written
+
+        Raises:
+            RuntimeError: If decoding or encoding fails
+        """
+        self._get_tiles()
+        frames: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        decoder = threading.Thread(
+            target=self._decode, args=(frames, stop), name="frame-decode", daemon=True
+        )
+        encoder, stderr = self._start_encoder()
+        written = 0
+
+        try:
+            decoder.start()
+            pending: deque = deque()
+            with ThreadPoolExecutor(max_workers=self.workers,
+                                    thread_name_prefix="frame-composite") as pool:
+                while True:
+                    frame = frames.get()
+                    if frame is _END:
+                        break
+                    pending.append(pool.submit(self.composite_frame, frame))
+                    # Write in order once enough frames are in flight
+                    if len(pending) > self.workers + self.queue_size:
+                        self._write(encoder, pending.popleft().result())
+                        written += 1
+                while pending:
+                    self._write(encoder, pending.popleft().result())
+                    written += 1
+
+            encoder.stdin.close()
+            returncode = encoder.wait()
+            if self._decode_error is not None:
+                raise RuntimeError(f"Failed to decode {self.video_path}: {self._decode_error}")
+            if returncode != 0:
+                raise RuntimeError(
+                    f"Encoder failed (returncode={returncode}): {self._read_stderr(stderr)}"
+                )
+            logger.info(f"Frame pipeline wrote {written} frames to {self.output_path}")
+            return written
+        except BrokenPipeError:
+            encoder.wait()
+            raise RuntimeError(f"Encoder exited early: {self._read_stderr(stderr)}")
+        finally:
+            stop.set()
+            if encoder.poll() is None:
+                encoder.kill()
+                encoder.wait()
+            decoder.join()
+            stderr.close()
+
+    # -- internal ----------------------------------------------------------
+
+    def _get_tiles(self) -> List[PreparedLayer]:
+        if self._tiles is None:
+            self._tiles = self._compositor.to_tiles()
+        return self._tiles
+
+    def _decode(self, frames: queue.Queue, stop: threading.Event):
+        """Decoder thread: read frames into the bounded queue."""
+        cap = cv2.VideoCapture(self.video_path)
+        try:
+            if not cap.isOpened():
+                raise RuntimeError("cannot open video")
+            while not stop.is_set():
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                self._put(frames, frame, stop)
+        except BaseException as e:
+            self._decode_error = e
+        finally:
+            cap.release()
+            self._put(frames, _END, stop)
+
+    @staticmethod
+    def _put(frames: queue.Queue, item, stop: threading.Event):
+        while not stop.is_set():
+            try:
+                frames.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _start_encoder(self) -> Tuple[subprocess.Popen, IO[bytes]]:
+        stderr = tempfile.TemporaryFile()
+        try:
+            encoder = subprocess.Popen(
+                self.encoder_cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=stderr,
+            )
+        except Exception:
+            stderr.close()
+            raise
+        return encoder, stderr
+
+    @staticmethod
+    def _write(encoder: subprocess.Popen, frame: np.ndarray):
+        encoder.stdin.write(np.ascontiguousarray(frame).data)
+
+    @staticmethod
+    def _read_stderr(stderr: IO[bytes]) -> str:
+        stderr.seek(0)
+        return stderr.read().decode(errors="replace")[-2000:] or "No error output"
@@ -11,8 +11,15 @@ import cv2
 import numpy as np
 import shutil
 
+from app.data.layer_compositor import LayerCompositor
+from app.data.frame_pipeline import FramePipeline
+from utils.media_probe import get_media_probe, probe_media
+
 logger = logging.getLogger(__name__)
 
+# Layer changes within this many seconds of each other are composed once
+COMPOSE_DEBOUNCE_SECONDS = 0.4
+
 class LayerType(Enum):
     IMAGE = ("image", "\uE6BC")  # 图片生成图标
     VIDEO = ("video", "\uE6BD")  # 视频图标
@@ -100,6 +107,7 @@ class LayerManager:
         self.timeline_item = None
         self.layer_changed = layer_changed_signal or signal('layer_changed')
         self._auto_compose_enabled = True
+        self._compose_handle: Optional[asyncio.TimerHandle] = None
         
         # Connect to layer_changed signal to trigger auto-composition
         self.layer_changed.connect(self._on_layer_changed, sender=self)
@@ -201,18 +209,36 @@ class LayerManager:
         
         # Only trigger composition for changes that affect visual output
         if change_type in ['added', 'removed', 'modified']:
-            logger.info(f"Layer {change_type}: {layer.id}, triggering composition")
-            # Schedule composition asynchronously
-            try:
-                import asyncio
-                loop = asyncio.get_event_loop()
-                if loop.is_running():
-                    asyncio.create_task(self.compose_layers())
-                else:
-                    # If no event loop is running, log a warning
-                    logger.warning("No event loop running, cannot trigger auto-composition")
-            except RuntimeError as e:
-                logger.warning(f"Could not trigger auto-composition: {e}")
+            logger.info(f"Layer {change_type}: {layer.id}, scheduling composition")
+            self.schedule_compose()
+
+    def schedule_compose(self, delay: Optional[float] = None):
+        """
+        Compose the layers once no further change arrives for ``delay`` seconds.
+
+        Every call restarts the delay, so a burst of strokes or layer edits
+        produces a single compose job.
+
+        Args:
+            delay: Seconds to wait (default: COMPOSE_DEBOUNCE_SECONDS)
+        """
+        try:
+            loop = asyncio.get_event_loop()
+        except RuntimeError as e:
+            logger.warning(f"Could not trigger auto-composition: {e}")
+            return
+        if not loop.is_running():
+            # If no event loop is running, log a warning
+            logger.warning("No event loop running, cannot trigger auto-composition")
+            return
+        if self._compose_handle is not None:
+            self._compose_handle.cancel()
+        self._compose_handle = loop.call_later(
+            COMPOSE_DEBOUNCE_SECONDS if delay is None else delay, self._start_scheduled_compose)
+
+    def _start_scheduled_compose(self):
+        self._compose_handle = None
+        asyncio.ensure_future(self.compose_layers())
 
     def _save_layers(self):
         # 按图层ID排序，确保保存顺序一致
@@ -344,13 +370,10 @@ class LayerManager:
         elif layer_type == LayerType.VIDEO:
             # 获取视频尺寸
             try:
-                cap = cv2.VideoCapture(source_path)
-                if cap.isOpened():
-                    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                    layer.width = width
-                    layer.height = height
-                    cap.release()
+                probe = get_media_probe(source_path)
+                if probe is not None:
+                    layer.width = probe.width
+                    layer.height = probe.height
                 else:
                     layer.width, layer.height = 720, 1280  # 默认尺寸
             except Exception as e:
@@ -513,9 +536,7 @@ class LayerManager:
             canvas_size: 画布尺寸 (width, height)
         """
         # 创建一个透明背景的画布 (RGBA)
-        canvas = np.zeros((canvas_size[1], canvas_size[0], 4), dtype=np.uint8)
-        # Set alpha channel to 0 (fully transparent)
-        canvas[:, :, 3] = 0
+        compositor = LayerCompositor(canvas_size[0], canvas_size[1])
 
         # 按照图层顺序从下到上绘制图层
         for layer, image_path in layer_image_paths:
@@ -531,20 +552,6 @@ class LayerManager:
             if layer_image is None:
                 continue
 
-            # Ensure image has 4 channels (RGBA)
-            if len(layer_image.shape) == 2:
-                # Grayscale - convert to RGBA
-                layer_image = cv2.cvtColor(layer_image, cv2.COLOR_GRAY2BGR)
-                alpha = np.ones((layer_image.shape[0], layer_image.shape[1], 1), dtype=np.uint8) * 255
-                layer_image = np.concatenate([layer_image, alpha], axis=2)
-            elif layer_image.shape[2] == 3:
-                # RGB - add alpha channel (fully opaque)
-                alpha = np.ones((layer_image.shape[0], layer_image.shape[1], 1), dtype=np.uint8) * 255
-                layer_image = np.concatenate([layer_image, alpha], axis=2)
-            elif layer_image.shape[2] == 4:
-                # Already RGBA
-                pass
-
             # 调整图层图像大小以匹配图层指定的尺寸
             if layer.width > 0 and layer.height > 0:
                 layer_image = cv2.resize(layer_image, (layer.width, layer.height))
@@ -555,48 +562,10 @@ class LayerManager:
             if (0 <= layer.x < canvas_size[0] and 0 <= layer.y < canvas_size[1] and
                     layer.x + layer.width <= canvas_size[0] and layer.y + layer.height <= canvas_size[1] and
                     layer.width > 0 and layer.height > 0):
-
-                # 提取RGBA通道
-                b, g, r, a = cv2.split(layer_image)
-                layer_rgb = cv2.merge([b, g, r])
-                alpha = a.astype(float) / 255.0
-
-                # 提取画布上对应区域
-                canvas_region = canvas[layer.y:layer.y + layer.height, layer.x:layer.x + layer.width]
-                canvas_b, canvas_g, canvas_r, canvas_a = cv2.split(canvas_region)
-                canvas_rgb = cv2.merge([canvas_b, canvas_g, canvas_r])
-                canvas_alpha = canvas_a.astype(float) / 255.0
-
-                # Alpha compositing: result = foreground * alpha_fg + background * alpha_bg * (1 - alpha_fg)
-                # New alpha: alpha_out = alpha_fg + alpha_bg * (1 - alpha_fg)
-                alpha_out = alpha + canvas_alpha * (1 - alpha)
-                
-                # Avoid division by zero
-                alpha_out_safe = np.where(alpha_out > 0, alpha_out, 1)
-                
-                # Composite RGB channels
-                for c in range(3):
-                    if c == 0:
-                        fg = layer_rgb[:, :, c].astype(float)
-                        bg = canvas_rgb[:, :, c].astype(float)
-                    elif c == 1:
-                        fg = layer_rgb[:, :, c].astype(float)
-                        bg = canvas_rgb[:, :, c].astype(float)
-                    else:
-                        fg = layer_rgb[:, :, c].astype(float)
-                        bg = canvas_rgb[:, :, c].astype(float)
-                    
-                    # Composite: (fg * alpha_fg + bg * alpha_bg * (1 - alpha_fg)) / alpha_out
-                    composite = (fg * alpha + bg * canvas_alpha * (1 - alpha)) / alpha_out_safe
-                    canvas_region[:, :, c] = composite.astype(np.uint8)
-                
-                # Set output alpha
-                canvas_region[:, :, 3] = (alpha_out * 255).astype(np.uint8)
-                
-                canvas[layer.y:layer.y + layer.height, layer.x:layer.x + layer.width] = canvas_region
+                compositor.add(layer_image, layer.x, layer.y)
 
         # 保存最终合成的图像 (with alpha channel)
-        cv2.imwrite(output_path, canvas, [cv2.IMWRITE_PNG_COMPRESSION, 9])
+        cv2.imwrite(output_path, compositor.to_bgra(), [cv2.IMWRITE_PNG_COMPRESSION, 9])
 
     async def compose_layers(self) -> str:
         """
@@ -817,19 +786,16 @@ class LayerComposeTask:
             return
         
         # Get video properties - validate video file
-        import cv2
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
+        probe = await probe_media(video_path)
+        if probe is None:
             logger.warning(f"Failed to open video: {video_path}, falling back to image composition")
-            cap.release()
             await self._compose_images_only([l for l in layers if l.type == LayerType.IMAGE])
             return
         
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        cap.release()
+        fps = probe.fps
+        width = probe.width
+        height = probe.height
+        frame_count = probe.frame_count
         
         # Validate video properties
         if fps <= 0 or width <= 0 or height <= 0 or frame_count <= 0:
@@ -847,7 +813,7 @@ class LayerComposeTask:
             return
         
         # Prepare overlay images with alpha channel
-        overlay_data = []
+        pipeline = FramePipeline(video_path, self.output_mp4, width, height, fps)
         for img_layer in image_layers:
             img_path = img_layer.get_layer_path()
             if not img_path or not os.path.exists(img_path):
@@ -858,105 +824,31 @@ class LayerComposeTask:
             if img is None:
                 continue
             
-            # Ensure image has alpha channel
-            if img.shape[2] == 3:
-                # Add alpha channel (fully opaque)
-                alpha = np.ones((img.shape[0], img.shape[1], 1), dtype=img.dtype) * 255
-                img = np.concatenate([img, alpha], axis=2)
-            
             # Resize if needed
             if img_layer.width > 0 and img_layer.height > 0:
                 img = cv2.resize(img, (img_layer.width, img_layer.height))
             
-            overlay_data.append({
-                'image': img,
-                'x': img_layer.x,
-                'y': img_layer.y,
-                'width': img_layer.width if img_layer.width > 0 else img.shape[1],
-                'height': img_layer.height if img_layer.height > 0 else img.shape[0]
-            })
-        
-        # Process video frame by frame
-        temp_output = os.path.join(self.output_dir, "_temp_output.mp4")
-        
-        # Open video for reading
-        cap = cv2.VideoCapture(video_path)
-        
-        # Create video writer
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        out = cv2.VideoWriter(temp_output, fourcc, fps, (width, height))
-        
-        if not out.isOpened():
-            logger.warning("VideoWriter failed to open, using ffmpeg overlay instead")
-            cap.release()
-            out.release()
+            # Ensure overlay is within frame bounds
+            x, y = img_layer.x, img_layer.y
+            h, w = img.shape[:2]
+            if x < 0 or y < 0 or x + w > width or y + h > height:
+                continue
+            
+            pipeline.add_overlay(img, x, y)
+        
+        # Decode -> composite -> encode in one pass (see FramePipeline)
+        try:
+            frame_count = await asyncio.to_thread(pipeline.run)
+        except Exception as e:
+            logger.warning(f"Frame pipeline failed ({e}), using ffmpeg overlay instead")
             # Fall back to ffmpeg-based composition
             await self._compose_with_video_ffmpeg(video_path, image_layers, width, height)
             return
         
-        frame_idx = 0
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            # Overlay each image layer on the frame
-            for overlay in overlay_data:
-                img = overlay['image']
-                x, y = overlay['x'], overlay['y']
-                w, h = overlay['width'], overlay['height']
-                
-                # Ensure overlay is within frame bounds
-                if x < 0 or y < 0 or x + w > width or y + h > height:
-                    continue
-                
-                # Extract alpha channel
-                if img.shape[2] == 4:
-                    b, g, r, a = cv2.split(img)
-                    overlay_rgb = cv2.merge([b, g, r])
-                    alpha = a.astype(float) / 255.0
-                    
-                    # Get region of interest
-                    roi = frame[y:y+h, x:x+w]
-                    
-                    # Blend with alpha
-                    for c in range(3):
-                        roi[:, :, c] = (1 - alpha) * roi[:, :, c] + alpha * overlay_rgb[:, :, c]
-                    
-                    frame[y:y+h, x:x+w] = roi
-                else:
-                    # No alpha, direct copy
-                    frame[y:y+h, x:x+w] = img
-            
-            out.write(frame)
-            frame_idx += 1
-        
-        cap.release()
-        out.release()
-        
-        # Convert to proper H.264 format
-        from utils.ffmpeg_utils import run_command
-        
-        cmd = [
-            'ffmpeg',
-            '-i', temp_output,
-            '-c:v', 'libx264',
-            '-pix_fmt', 'yuv420p',
-            '-y',
-            self.output_mp4
-        ]
-        
-        result = await run_command(cmd)
-        if result.returncode != 0:
-            logger.error(f"Failed to convert video: {result.stderr.decode()}")
-            raise RuntimeError("Failed to convert video")
+        logger.info(f"Composed {frame_count} frames into {self.output_mp4}")
         
         # Extract first frame as output.png
         await self._extract_first_frame()
-        
-        # Clean up temp file
-        if os.path.exists(temp_output):
-            os.remove(temp_output)
     
     async def _compose_with_video_ffmpeg(self, video_path: str, image_layers: List['Layer'], width: int, height: int):
         """Compose video with image overlays using FFmpeg directly"""
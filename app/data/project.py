@@ -26,10 +26,11 @@ from app.data.story_board import StoryBoardManager
 from utils.yaml_utils import (
     AsyncFileNotFoundError,
     load_yaml,
-    load_yaml_async,
     path_exists,
+    read_yaml_cached,
     run_coroutine_blocking,
     save_yaml,
+    to_thread,
 )
 
 logger = logging.getLogger(__name__)
@@ -115,20 +116,27 @@ class Project:
     def _ensure_project_config_loaded(self) -> None:
         if self._project_config_loaded:
             return
-        run_coroutine_blocking(self.ensure_project_config_loaded_async())
+        self._project_config = self._read_project_config()
+        self._project_config_loaded = True
 
     async def ensure_project_config_loaded_async(self) -> None:
         if self._project_config_loaded:
             return
+        data = await to_thread(self._read_project_config)
+        if not self._project_config_loaded:
+            self._project_config = data
+            self._project_config_loaded = True
+
+    def _read_project_config(self) -> Dict[str, Any]:
+        """Read project.yml on the calling thread (empty config when missing or invalid)."""
         try:
-            data = await load_yaml_async(self._config_path)
-            self._project_config = data if isinstance(data, dict) else {}
+            data = read_yaml_cached(self._config_path)
         except AsyncFileNotFoundError:
-            self._project_config = {}
+            return {}
         except Exception as e:
             logger.warning("project.yml load failed (%s), using empty config", e)
-            self._project_config = {}
-        self._project_config_loaded = True
+            return {}
+        return data if isinstance(data, dict) else {}
 
     @property
     def config(self) -> Dict[str, Any]:
@@ -267,6 +275,9 @@ class Project:
 
             save_yaml(task.config_path, task_config)
             task.options.update(task_config)
+            task.status = 'success'
+            if hasattr(task.task_storage_manager, 'record_task'):
+                task.task_storage_manager.record_task(task)
 
             logger.info(f"✅ Updated task config.yml with resource paths for task {task.task_id}")
         except Exception as e:
@@ -341,26 +352,20 @@ class Project:
         self.update_config('timeline_duration', duration)
 
     def get_item_duration(self, item_index: int) -> float:
-        """Get duration for a specific timeline item"""
-        item_durations = self.config.get('timeline_item_durations', {})
-        return item_durations.get(str(item_index), 1.0)
+        """Get duration for a specific timeline item (kept in the timeline manifest)"""
+        return self.timeline.get_item_duration(item_index)
 
     def set_item_duration(self, item_index: int, duration: float):
         """Set duration for a specific timeline item"""
-        if 'timeline_item_durations' not in self.config:
-            self.config['timeline_item_durations'] = {}
-        self.config['timeline_item_durations'][str(item_index)] = duration
-        save_yaml(os.path.join(self.project_path, "project.yml"), self.config)
+        self.timeline.set_item_duration(item_index, duration)
 
     def has_item_duration(self, item_index: int) -> bool:
         """Check if duration is set for a specific timeline item"""
-        item_durations = self.config.get('timeline_item_durations', {})
-        return str(item_index) in item_durations
+        return self.timeline.has_item_duration(item_index)
 
     def calculate_timeline_duration(self) -> float:
         """Calculate total timeline duration by summing all item durations"""
-        item_durations = self.config.get('timeline_item_durations', {})
-        return sum(item_durations.values())
+        return self.timeline.sum_item_durations()
 
     # ==================== Resolution management ====================
 
@@ -646,7 +651,6 @@ class ProjectManager:
             "timeline_index": 0,
             "timeline_position": 0.0,
             "timeline_duration": 0.0,
-            "timeline_item_durations": {}
         }
         save_yaml(os.path.join(project_path, "project.yml"), project_config)
 
@@ -3,35 +3,38 @@ import uuid
 import shutil
 import logging
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Set
 from pathlib import Path
 from blinker import signal
 
+from app.data.resource_journal import OP_ADD, OP_DELETE, OP_UPDATE, ResourceJournal
 from utils.lazy_load import AsyncLazyLoadMixin
+from utils.media_probe import get_media_probe
 from utils.yaml_utils import (
     AsyncFileIoError,
     load_yaml_async,
     path_exists,
     run_coroutine_blocking,
-    save_yaml,
     save_yaml_async,
-    shutil_copy2,
     to_thread,
+    write_yaml,
 )
 
 logger = logging.getLogger(__name__)
 
+# The snapshot is rewritten once the journal holds this many records (or as
+# many records as there are resources, whichever is more)
+COMPACT_MIN_RECORDS = 1000
+# Files copied at once by add_resources
+BULK_COPY_WORKERS = 4
+
 try:
     from PIL import Image
 except ImportError:
     Image = None
 
-try:
-    import cv2
-except ImportError:
-    cv2 = None
-
 
 class Resource:
     """Represents a single resource in the project"""
@@ -100,6 +103,7 @@ class ResourceManager(AsyncLazyLoadMixin):
         self.project_path = project_path
         self.resources_dir = os.path.join(project_path, 'resources')
         self.index_file = os.path.join(self.resources_dir, 'resource_index.yml')
+        self.journal = ResourceJournal(os.path.join(self.resources_dir, 'resource_journal.jsonl'))
         
         # In-memory indexes
         self._resources_by_name: Dict[str, Resource] = {}
@@ -115,16 +119,14 @@ class ResourceManager(AsyncLazyLoadMixin):
 
     async def _do_load_async(self) -> None:
         await to_thread(self._migrate_index_if_needed)
+        loaded = False
         if await path_exists(self.index_file):
             try:
                 data = await load_yaml_async(self.index_file)
                 if data and "resources" in data:
                     for resource_data in data["resources"]:
-                        resource = Resource(resource_data)
-                        self._resources_by_name[resource.name] = resource
-                        self._resources_by_id[resource.resource_id] = resource
-                    logger.info("✅ Loaded %s resources from index", len(self._resources_by_name))
-                    self.index_loaded.send(len(self._resources_by_name))
+                        self._put(Resource(resource_data))
+                    loaded = True
                 else:
                     logger.warning("⚠️ Empty or invalid index file, starting fresh")
             except AsyncFileIoError as e:
@@ -137,6 +139,39 @@ class ResourceManager(AsyncLazyLoadMixin):
             logger.info("📝 No existing index found, creating new one")
             await save_yaml_async(self.index_file, {"resources": []})
 
+        records = await to_thread(self.journal.replay)
+        for record in records:
+            self._apply_journal_record(record)
+        if records:
+            logger.info("📝 Replayed %s resource journal records", len(records))
+        if loaded or records:
+            logger.info("✅ Loaded %s resources from index", len(self._resources_by_name))
+            self.index_loaded.send(len(self._resources_by_name))
+        if self._needs_compaction():
+            await to_thread(self._save_index)
+
+    def _put(self, resource: Resource) -> None:
+        old = self._resources_by_name.get(resource.name)
+        if old is not None and old.resource_id != resource.resource_id:
+            self._resources_by_id.pop(old.resource_id, None)
+        self._resources_by_name[resource.name] = resource
+        self._resources_by_id[resource.resource_id] = resource
+
+    def _apply_journal_record(self, record: Dict[str, Any]) -> None:
+        """Apply one journal record (idempotent, so replaying over the snapshot is safe)."""
+        try:
+            op = record.get("op")
+            if op in (OP_ADD, OP_UPDATE):
+                self._put(Resource(record["resource"]))
+            elif op == OP_DELETE:
+                resource = self._resources_by_name.pop(record["name"], None)
+                if resource is not None:
+                    self._resources_by_id.pop(resource.resource_id, None)
+            else:
+                logger.warning(f"⚠️ Unknown resource journal record: {op}")
+        except (KeyError, TypeError) as e:
+            logger.warning(f"⚠️ Skipping invalid resource journal record: {e}")
+
     def _clear_internal_state(self) -> None:
         self._resources_by_name.clear()
         self._resources_by_id.clear()
@@ -176,15 +211,32 @@ class ResourceManager(AsyncLazyLoadMixin):
                 logger.warning(f"⚠️ Warning: Could not remove old resource_index.yml: {e}")
     
     def _save_index(self):
-        """Persist resource index to YAML file"""
+        """Write the full index snapshot and empty the journal (compaction)"""
         try:
             data = {
                 'resources': [resource.to_dict() for resource in self._resources_by_name.values()]
             }
-            save_yaml(self.index_file, data)
+            write_yaml(self.index_file, data)
+            self.journal.reset()
         except Exception as e:
             logger.error(f"❌ Error saving resource index: {e}")
             raise
+
+    def _commit(self, records: List[Dict[str, Any]]):
+        """Append changes to the journal; compact it once it has grown past the snapshot"""
+        try:
+            self.journal.append(records)
+        except Exception as e:
+            logger.error(f"❌ Error writing resource journal: {e}")
+            raise
+        if self._needs_compaction():
+            try:
+                self._save_index()
+            except Exception:
+                pass  # Logged; the changes are safe in the journal
+
+    def _needs_compaction(self) -> bool:
+        return self.journal.records >= max(COMPACT_MIN_RECORDS, len(self._resources_by_name))
     
     def _get_media_type(self, filename: str) -> str:
         """Determine media type from file extension"""
@@ -204,16 +256,18 @@ class ResourceManager(AsyncLazyLoadMixin):
             return 'audio'
         return 'others'
     
-    def _generate_unique_name(self, desired_name: str) -> str:
+    def _generate_unique_name(self, desired_name: str, reserved: Optional[Set[str]] = None) -> str:
         """Generate unique resource name by appending counter if needed
         
         Args:
             desired_name: The desired filename (with extension)
+            reserved: Names already taken by a batch that is not indexed yet
             
         Returns:
             Unique filename that doesn't conflict with existing resources
         """
-        if desired_name not in self._resources_by_name:
+        reserved = reserved or set()
+        if desired_name not in self._resources_by_name and desired_name not in reserved:
             return desired_name
         
         # Extract base name and extension
@@ -222,7 +276,7 @@ class ResourceManager(AsyncLazyLoadMixin):
         
         while True:
             new_name = f"{base}_{counter}{ext}"
-            if new_name not in self._resources_by_name:
+            if new_name not in self._resources_by_name and new_name not in reserved:
                 return new_name
             counter += 1
     
@@ -246,17 +300,18 @@ class ResourceManager(AsyncLazyLoadMixin):
                     metadata['height'] = img.height
                     metadata['format'] = img.format
             
-            elif media_type == 'video' and cv2 is not None:
-                # Extract video metadata using OpenCV
-                cap = cv2.VideoCapture(file_path)
-                if cap.isOpened():
-                    metadata['width'] = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                    metadata['height'] = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                    metadata['fps'] = cap.get(cv2.CAP_PROP_FPS)
-                    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-                    if metadata['fps'] > 0:
-                        metadata['duration'] = frame_count / metadata['fps']
-                    cap.release()
+            elif media_type == 'video':
+                # Extract video metadata through the shared probe cache
+                probe = get_media_probe(file_path)
+                if probe is not None:
+                    metadata['width'] = probe.width
+                    metadata['height'] = probe.height
+                    metadata['fps'] = probe.fps
+                    metadata['frame_count'] = probe.frame_count
+                    if probe.video_codec:
+                        metadata['codec'] = probe.video_codec
+                    if probe.fps > 0:
+                        metadata['duration'] = probe.duration
         
         except Exception as e:
             logger.warning(f"⚠️ Warning: Could not extract metadata from {file_path}: {e}")
@@ -287,36 +342,112 @@ class ResourceManager(AsyncLazyLoadMixin):
             logger.error(f"❌ Source file does not exist: {source_file_path}")
             return None
         
+        filename = original_name or os.path.basename(source_file_path)
+        unique_name = self._generate_unique_name(filename)
+        # Copy and extract metadata off the event-loop thread when invoked from Qt async loop
+        resource = run_coroutine_blocking(
+            to_thread(self._import_file, source_file_path, filename, unique_name,
+                      source_type, source_id, additional_metadata)
+        )
+        if resource is None:
+            return None
+
+        self._put(resource)
         try:
-            # Determine filename and media type
-            filename = original_name or os.path.basename(source_file_path)
-            media_type = self._get_media_type(filename)
-            
-            # Generate unique resource name
-            unique_name = self._generate_unique_name(filename)
+            self._commit([{'op': OP_ADD, 'resource': resource.to_dict()}])
+        except Exception:
+            self._discard(resource)
+            return None
+
+        self.resource_added.send(resource)
+        logger.info(f"✅ Added resource: {resource.name} (type: {resource.media_type})")
+        return resource
+
+    def add_resources(self,
+                      source_file_paths: List[str],
+                      source_type: str = 'imported',
+                      source_id: str = '',
+                      additional_metadata: Optional[Dict[str, Any]] = None,
+                      max_workers: int = BULK_COPY_WORKERS) -> List[Optional[Resource]]:
+        """Add many resources at once
+        
+        Files are copied and probed in parallel and the index is updated with
+        a single journal write, instead of one index write per file.
+        
+        Args:
+            source_file_paths: Paths to the source files
+            source_type: Origin type of all files
+            source_id: Optional reference to the source entity of all files
+            additional_metadata: Optional metadata merged into every resource
+            max_workers: Files copied at once
             
-            # Determine destination path
+        Returns:
+            One entry per source path: the Resource, or None if that file failed
+        """
+        self._ensure_loaded()
+        jobs = []
+        reserved: Set[str] = set()
+        for source_file_path in source_file_paths:
+            if not os.path.exists(source_file_path):
+                logger.error(f"❌ Source file does not exist: {source_file_path}")
+                jobs.append(None)
+                continue
+            filename = os.path.basename(source_file_path)
+            unique_name = self._generate_unique_name(filename, reserved)
+            reserved.add(unique_name)
+            jobs.append((source_file_path, filename, unique_name))
+
+        def run(job):
+            if job is None:
+                return None
+            return self._import_file(*job, source_type, source_id, additional_metadata)
+
+        def import_all():
+            with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="resource-import") as pool:
+                return list(pool.map(run, jobs))
+
+        results: List[Optional[Resource]] = run_coroutine_blocking(to_thread(import_all))
+        added = [resource for resource in results if resource is not None]
+        if not added:
+            return results
+
+        for resource in added:
+            self._put(resource)
+        try:
+            self._commit([{'op': OP_ADD, 'resource': resource.to_dict()} for resource in added])
+        except Exception:
+            for resource in added:
+                self._discard(resource)
+            return [None] * len(results)
+        for resource in added:
+            self.resource_added.send(resource)
+        logger.info(f"✅ Added {len(added)} of {len(source_file_paths)} resources")
+        return results
+
+    def _import_file(self,
+                     source_file_path: str,
+                     filename: str,
+                     unique_name: str,
+                     source_type: str,
+                     source_id: str,
+                     additional_metadata: Optional[Dict[str, Any]]) -> Optional[Resource]:
+        """Copy a file into the resources directory and build its record (thread-safe, not indexed)"""
+        destination_path = None
+        try:
+            media_type = self._get_media_type(filename)
             subdirectory = self._get_media_subdirectory(media_type)
             relative_path = os.path.join('resources', subdirectory, unique_name)
             destination_path = os.path.join(self.project_path, relative_path)
-            
-            # Copy file to resources directory (async-backed I/O)
-            shutil_copy2(source_file_path, destination_path)
 
-            # Get file size
+            shutil.copy2(source_file_path, destination_path)
             file_size = os.path.getsize(destination_path)
 
-            # Extract metadata off the event-loop thread when invoked from Qt async loop
-            extracted_metadata = run_coroutine_blocking(
-                to_thread(self._extract_file_metadata, destination_path, media_type)
-            )
-            
-            # Merge with additional metadata
+            metadata = self._extract_file_metadata(destination_path, media_type)
             if additional_metadata:
-                extracted_metadata.update(additional_metadata)
-            
-            # Create resource record
-            resource_data = {
+                metadata.update(additional_metadata)
+
+            now = datetime.now().isoformat()
+            return Resource({
                 'resource_id': str(uuid.uuid4()),
                 'name': unique_name,
                 'original_name': filename,
@@ -325,35 +456,28 @@ class ResourceManager(AsyncLazyLoadMixin):
                 'source_type': source_type,
                 'source_id': source_id,
                 'file_size': file_size,
-                'created_at': datetime.now().isoformat(),
-                'updated_at': datetime.now().isoformat(),
-                'metadata': extracted_metadata
-            }
-            
-            resource = Resource(resource_data)
-            
-            # Update indexes
-            self._resources_by_name[resource.name] = resource
-            self._resources_by_id[resource.resource_id] = resource
-            
-            # Persist index
-            self._save_index()
-            
-            # Send signal
-            self.resource_added.send(resource)
-            
-            logger.info(f"✅ Added resource: {unique_name} (type: {media_type})")
-            return resource
-        
+                'created_at': now,
+                'updated_at': now,
+                'metadata': metadata
+            })
         except Exception as e:
             logger.error(f"❌ Error adding resource: {e}")
             # Cleanup if file was copied but registration failed
-            if 'destination_path' in locals() and os.path.exists(destination_path):
+            if destination_path and os.path.exists(destination_path):
                 try:
                     os.remove(destination_path)
-                except:
+                except OSError:
                     pass
             return None
+
+    def _discard(self, resource: Resource):
+        """Undo an add whose journal write failed"""
+        self._resources_by_name.pop(resource.name, None)
+        self._resources_by_id.pop(resource.resource_id, None)
+        try:
+            os.remove(resource.get_absolute_path(self.project_path))
+        except OSError:
+            pass
     
     def get_by_name(self, name: str) -> Optional[Resource]:
         """Retrieve resource by filename"""
@@ -450,7 +574,7 @@ class ResourceManager(AsyncLazyLoadMixin):
             resource.updated_at = datetime.now().isoformat()
 
             # Persist changes
-            self._save_index()
+            self._commit([{'op': OP_UPDATE, 'resource': resource.to_dict()}])
 
             # Send signal
             self.resource_updated.send(resource)
@@ -490,7 +614,7 @@ class ResourceManager(AsyncLazyLoadMixin):
             del self._resources_by_id[resource.resource_id]
 
             # Persist changes
-            self._save_index()
+            self._commit([{'op': OP_DELETE, 'name': resource.name}])
 
             # Send signal
             self.resource_deleted.send(resource_name)
@@ -0,0 +1,31 @@
+"""
+Append-only change journal for the resource index.
+
+resource_index.yml is a snapshot; every change after it is appended to
+resource_journal.jsonl as one JSON line instead of rewriting the snapshot:
+
+    {"op": "add" | "update", "resource": {...full record...}}
+    {"op": "delete", "name": "..."}
+
+Records carry the full resource, so replaying a record that the snapshot
+already contains is harmless; this makes compaction (write snapshot, then
+truncate the journal) safe to interrupt at any point. A torn last line from
+a crash mid-append is dropped on replay.
+"""
+from utils.jsonl_journal import JsonlJournal
+
+OP_ADD = "add"
+OP_UPDATE = "update"
+OP_DELETE = "delete"
+
+
+class ResourceJournal(JsonlJournal):
+    """
+    JSON-lines journal of resource index changes.
+
+    Usage:
+        journal = ResourceJournal(path)
+        for record in journal.replay(): ...
+        journal.append([{"op": OP_ADD, "resource": resource.to_dict()}])
+        journal.reset()   # after the snapshot was written
+    """
@@ -15,6 +15,7 @@ from typing import Any, Dict, List, Optional, Union
 from utils.yaml_utils import to_thread
 from utils.md_with_meta_utils import (
     read_md_with_meta,
+    read_md_with_meta_cached,
     write_md_with_meta,
     update_md_with_meta,
     get_metadata,
@@ -155,7 +156,7 @@ class ScreenPlayManager:
             return None
 
         try:
-            metadata, content = read_md_with_meta(scene_file_path)
+            metadata, content = read_md_with_meta_cached(scene_file_path)
             title = metadata.get("title", scene_id)
 
             return ScreenPlayScene(
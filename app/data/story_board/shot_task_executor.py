@@ -255,6 +255,7 @@ class ShotTaskExecutor:
 
         # Step 1: Register resources in project ResourceManager (Option B)
         self._register_task_resources(result)
+        self._on_task_succeeded(result.task)
 
         # Step 2: Write to shot's key_moment_image BEFORE emitting signal
         try:
@@ -344,11 +345,23 @@ class ShotTaskExecutor:
             except Exception as e:
                 logger.error(f"Failed to register shot video resource: {e}", exc_info=True)
 
+    def _on_task_succeeded(self, task: Task):
+        """Persist the success status to the task config and the shot's task index."""
+        task.status = "success"
+        task.options["status"] = "success"
+        try:
+            from utils.yaml_utils import save_yaml
+            save_yaml(task.config_path, task.options)
+        except Exception as e:
+            logger.warning(f"Failed to save shot task status: {e}")
+        task.task_storage_manager.record_task(task)
+
     def _on_task_failed(self, task: Task, error: str):
         """Handle task failure."""
         logger.error(f"Shot task {task.task_id} failed: {error}")
         task.status = "failed"
         task.log = error
+        task.options.update(status="failed", log=error)
 
         # Save failed status to config
         try:
@@ -356,3 +369,4 @@ class ShotTaskExecutor:
             save_yaml(task.config_path, {"status": "failed", "log": error, **task.options})
         except Exception:
             pass
+        task.task_storage_manager.record_task(task)
@@ -10,9 +10,11 @@ from __future__ import annotations
 import os
 import asyncio
 import logging
+import time
 from typing import Any, Dict, List, Optional, TYPE_CHECKING
 
 from app.data.task import Task
+from app.data.task_index import TaskIndex, read_task_options, task_index_entry
 from utils.yaml_utils import save_yaml_async, load_yaml_async, path_exists, to_thread
 
 logger = logging.getLogger(__name__)
@@ -51,7 +53,8 @@ class ShotTaskManager:
 
         # Task storage path: shot_dir/keyframes/
         self.tasks_path = os.path.join(shot_dir, "keyframes")
-        self.tasks: Dict[str, Task] = {}
+        self.tasks: Dict[str, Task] = {}  # Tasks loaded so far, by ID
+        self.task_index = TaskIndex(self.tasks_path)
 
         # Task index file for tracking next task number
         self._index_path = os.path.join(self.tasks_path, "_index.yml")
@@ -109,6 +112,7 @@ class ShotTaskManager:
             options["scene_id"] = self.shot.scene_id
             options["shot_path"] = self.shot_dir
             options["is_shot_task"] = True
+            options.setdefault("created_at", time.time())
 
             # Save config
             config_path = os.path.join(task_fold_path, "config.yml")
@@ -124,6 +128,7 @@ class ShotTaskManager:
             )
 
             self.tasks[str(num)] = task
+            self.record_task(task)
             logger.info(f"Created shot task {num} for {self.shot.scene_id}/{self.shot.shot_id}")
 
             return task
@@ -198,17 +203,34 @@ class ShotTaskManager:
             logger.error(f"Failed to load shot tasks: {e}", exc_info=True)
             return []
 
+    def record_task(self, task: Task):
+        """Write the task's current status and results to the task index."""
+        try:
+            self.task_index.record(task_index_entry(task.task_id, task.options))
+        except OSError as e:
+            logger.warning(f"Failed to write shot task index: {e}")
+
+    def _read_task(self, task_id: str) -> Optional[Task]:
+        task = self.tasks.get(task_id)
+        if task is None:
+            task_path = os.path.join(self.tasks_path, task_id)
+            if os.path.isdir(task_path):
+                task = Task(self, self.executor, task_path, read_task_options(task_path))
+                self.tasks[task_id] = task
+        return task
+
     def get_task_by_id(self, task_id: str) -> Optional[Task]:
-        """Get a task by ID."""
-        if not self.tasks:
-            self.load_all_tasks()
-        return self.tasks.get(task_id)
-
-    def get_all_tasks(self) -> List[Task]:
-        """Get all tasks for this shot."""
-        if not self.tasks:
-            self.load_all_tasks()
-        return list(self.tasks.values())
+        """Get a task by ID (its config is read on first access)."""
+        return self._read_task(str(task_id))
+
+    def get_all_tasks(self, start_index: int = 0, count: Optional[int] = None) -> List[Task]:
+        """Get tasks for this shot, newest first (only the requested page is read)."""
+        tasks = [self._read_task(entry["id"]) for entry in self.task_index.page(start_index, count)]
+        return [task for task in tasks if task is not None]
+
+    def get_task_count(self) -> int:
+        """Get the number of tasks for this shot."""
+        return self.task_index.count()
 
     def get_shot_id(self) -> str:
         """Get the shot ID this manager belongs to."""
@@ -17,19 +17,21 @@ This module provides a two-tier task management architecture:
 import asyncio
 import os
 import logging
+import time
 from typing import Any, Optional, Dict, List, Union, TYPE_CHECKING
 
 from blinker import signal
 
+from app.data.task_index import TaskIndex, read_task_options, task_index_entry
 from app.spi.model import BaseModelResult
 from utils import dict_utils
 from utils.async_queue_utils import AsyncQueue
 from utils.progress_utils import Progress
 from utils.yaml_utils import (
     AsyncFileIoError,
-    load_yaml,
-    load_yaml_async,
+    load_yaml_cached,
     path_exists,
+    read_yaml_cached,
     run_coroutine_blocking,
     save_yaml,
     save_yaml_async,
@@ -104,7 +106,7 @@ class Task:
     def update_from_config(self):
         """Update task properties from config file"""
         if os.path.exists(self.config_path):
-            config = load_yaml(self.config_path) or {}
+            config = load_yaml_cached(self.config_path) or {}
             self.options.update(config)
 
             self.title = f'Task {self.task_id}'
@@ -207,6 +209,7 @@ class ProjectTaskManager:
     - Handle task execution queue
     - Coordinate task submission across timeline items
     - Provide signal connection methods for UI components
+    - Mark tasks that end without a result as failed
     """
 
     # Project-level signals
@@ -227,6 +230,8 @@ class ProjectTaskManager:
         self.create_consumer = AsyncQueue()
         self.create_consumer.connect("create", self._on_create_task)
         self.execute_consumer = AsyncQueue()
+        self._execute_handlers: List[Any] = []
+        self.execute_consumer.connect("execute", self._on_execute_task)
 
     # Signal connection methods
     def connect_task_create(self, func):
@@ -235,7 +240,7 @@ class ProjectTaskManager:
 
     def connect_task_execute(self, func):
         """Connect a handler to task execution events"""
-        self.execute_consumer.connect("execute", func)
+        self._execute_handlers.append(func)
 
     def connect_task_progress(self, func):
         """Connect a handler to task progress events"""
@@ -295,10 +300,39 @@ class ProjectTaskManager:
             # Add to execution queue
             self.execute_consumer.add("execute", task)
 
+    async def _on_execute_task(self, task: Task):
+        """
+        Run the execute handlers for a task, then settle its status.
+
+        Tools report success through on_task_finished while they run; a
+        task still running once every handler returned (or one raised)
+        ended without a result and is marked failed.
+        """
+        try:
+            for handler in self._execute_handlers:
+                await handler(task)
+        except Exception as e:
+            logger.error(f"❌ Task {task.task_id} execution failed: {e}", exc_info=True)
+            self.on_task_failed(task, str(e))
+            return
+        if task.status == "running":
+            self.on_task_failed(task, task.options.get("logs") or "Task finished without a result")
+
     def on_task_progress(self, task_progress: TaskProgress):
         """Handle task progress update"""
         self.task_progress.send(task_progress)
 
+    def on_task_failed(self, task: Task, error: str):
+        """Persist the failed status to the task config and the task index."""
+        task.status = "failed"
+        task.log = error
+        task.options.update(status="failed", log=error)
+        try:
+            save_yaml(task.config_path, task.options)
+        except Exception as e:
+            logger.warning(f"Failed to save task status: {e}")
+        task.task_storage_manager.record_task(task)
+
     def on_task_finished(self, result: TaskResult):
         """Handle task completion"""
         self.task_finished.send(result)
@@ -324,7 +358,8 @@ class TimelineItemTaskManager:
         """
         self.timeline_item = timeline_item
         self.tasks_path = tasks_path
-        self.tasks: Dict[str, Task] = {}
+        self.tasks: Dict[str, Task] = {}  # Tasks loaded so far, by ID
+        self.task_index = TaskIndex(tasks_path)
 
         # Create tasks directory if it doesn't exist
         os.makedirs(self.tasks_path, exist_ok=True)
@@ -366,10 +401,12 @@ class TimelineItemTaskManager:
 
             task_fold_path = os.path.join(self.tasks_path, str(num))
             os.makedirs(task_fold_path, exist_ok=True)
+            options.setdefault("created_at", time.time())
             await save_yaml_async(os.path.join(task_fold_path, "config.yml"), options)
 
             task = Task(self, project_task_manager, task_fold_path, options)
             self.tasks[str(num)] = task
+            self.record_task(task)
 
             return task
         except Exception as e:
@@ -435,7 +472,7 @@ class TimelineItemTaskManager:
                 options: Dict[str, Any] = {}
                 if await path_exists(config_path):
                     try:
-                        options = await load_yaml_async(config_path) or {}
+                        options = await to_thread(read_yaml_cached, config_path) or {}
                     except AsyncFileIoError as e:
                         logger.error("Task config invalid %s: %s", config_path, e)
                         options = {}
@@ -453,44 +490,72 @@ class TimelineItemTaskManager:
             logger.error(f"❌ Error loading tasks: {e}", exc_info=True)
             return []
 
+    def record_task(self, task: Task):
+        """Write the task's current status and results to the task index."""
+        try:
+            self.task_index.record(task_index_entry(task.task_id, task.options))
+        except OSError as e:
+            logger.error(f"❌ Error writing task index: {e}")
+
+    def _read_task(self, task_id: str, reload: bool = False) -> Optional[Task]:
+        task = None if reload else self.tasks.get(task_id)
+        if task is None:
+            task_path = os.path.join(self.tasks_path, task_id)
+            if os.path.isdir(task_path):
+                task = Task(self, self.project_task_manager, task_path, read_task_options(task_path))
+        return task
+
+    def read_task_page(self, start_index: int = 0, count: int = None, reload: bool = False) -> List[Task]:
+        """
+        Read one page of tasks, newest first, without changing ``self.tasks``.
+
+        Only the configs of the tasks on the page are read, so this is cheap
+        and safe to call from background workers; pass the result to
+        adopt_tasks on the GUI thread.
+
+        Args:
+            start_index: Starting index for pagination
+            count: Number of tasks to return (None for all)
+            reload: Read configs again even for tasks already loaded
+        """
+        tasks = [self._read_task(entry["id"], reload) for entry in self.task_index.page(start_index, count)]
+        return [task for task in tasks if task is not None]
+
+    def adopt_tasks(self, tasks: List[Task]) -> List[Task]:
+        """Register tasks from read_task_page as the loaded instances."""
+        for task in tasks:
+            self.tasks[task.task_id] = task
+        return tasks
+
     def get_task_by_id(self, task_id: str) -> Optional[Task]:
-        """Get a task by its ID"""
-        if not self.tasks:
-            self.load_all_tasks()
-        return self.tasks.get(task_id)
+        """Get a task by its ID (its config is read on first access)"""
+        task = self._read_task(str(task_id))
+        if task is not None:
+            self.tasks.setdefault(task.task_id, task)
+        return task
 
     def get_all_tasks(self, start_index: int = 0, count: int = None) -> List[Task]:
         """
         Get all tasks with optional pagination.
 
+        Only the configs of the requested page are read.
+
         Args:
             start_index: Starting index for pagination
             count: Number of tasks to return (None for all)
 
         Returns:
-            List of Task objects
+            List of Task objects, newest first
         """
-        # Load tasks if not already loaded
-        if not self.tasks:
-            self.load_all_tasks()
-
-        all_task_ids = sorted(
-            [task_id for task_id in self.tasks.keys() if task_id.isdigit()],
-            key=lambda x: int(x),
-            reverse=True
-        )
-
-        if count is None:
-            task_ids_to_load = all_task_ids[start_index:]
-        else:
-            end_index = min(start_index + count, len(all_task_ids))
-            task_ids_to_load = all_task_ids[start_index:end_index]
+        return self.adopt_tasks(self.read_task_page(start_index, count))
 
-        return [self.tasks[task_id] for task_id in task_ids_to_load if task_id in self.tasks]
+    def get_task_ids(self) -> List[str]:
+        """IDs of all tasks, newest first (from the task index)"""
+        return self.task_index.ids()
 
     def get_task_count(self) -> int:
         """Get the total number of tasks"""
-        return len(self.tasks)
+        return self.task_index.count()
 
     def get_timeline_item_id(self) -> int:
         """Get the timeline item ID this manager belongs to"""
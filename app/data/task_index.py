@@ -0,0 +1,140 @@
+"""
+Compact index of the tasks stored in one directory.
+
+Listing tasks used to open every task's config.yml. Each task directory
+(a timeline item's tasks/, a shot's keyframes/) now keeps _tasks.jsonl with
+one small JSON line per task change:
+
+    {"id": "12", "status": "success", "created": 1760000000.0, "tool": "text2image",
+     "image": "resources/...png", "video": null}
+
+- Later lines replace earlier lines of the same id; the file is rewritten
+  once stale lines outnumber COMPACT_SLACK
+- The task list pages through the index and loads full configs only for the
+  tasks it shows
+- A missing index is rebuilt from the task directories once (migration)
+"""
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from utils.jsonl_journal import JsonlJournal
+from utils.yaml_utils import AsyncFileIoError, read_yaml_cached
+
+logger = logging.getLogger(__name__)
+
+TASK_INDEX_NAME = "_tasks.jsonl"
+# Stale lines tolerated before the index is rewritten
+COMPACT_SLACK = 256
+
+
+def task_index_entry(task_id: str, options: Dict[str, Any], created: Optional[float] = None) -> Dict[str, Any]:
+    """Index line of a task from its config (same field fallbacks as Task.update_from_config)."""
+    return {
+        "id": str(task_id),
+        "status": options.get("status", "running"),
+        "created": options.get("created_at", created),
+        "tool": options.get("task_type", options.get("tool", "txt2img")),
+        "image": options.get("image_resource_path"),
+        "video": options.get("video_resource_path"),
+    }
+
+
+def read_task_options(task_path: str) -> Dict[str, Any]:
+    """config.yml of a task directory ({} if missing or invalid)."""
+    config_path = os.path.join(task_path, "config.yml")
+    if not os.path.exists(config_path):
+        return {}
+    try:
+        return read_yaml_cached(config_path) or {}
+    except AsyncFileIoError as e:
+        logger.error(f"Task config invalid {config_path}: {e}")
+        return {}
+
+
+class TaskIndex:
+    """
+    Task index of one task directory. Thread-safe; loaded on first use.
+
+    Usage:
+        index = TaskIndex(tasks_path)
+        index.record(task_index_entry(task_id, options))
+        index.page(0, 10)   # newest first
+    """
+
+    def __init__(self, tasks_path: str):
+        self.tasks_path = tasks_path
+        self._journal = JsonlJournal(os.path.join(tasks_path, TASK_INDEX_NAME))
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._ids: Optional[List[str]] = None  # Newest first; None when stale
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    def record(self, entry: Dict[str, Any]):
+        """Add or replace the entry of a task (raises OSError if the index cannot be written)."""
+        with self._lock:
+            self._ensure_loaded()
+            task_id = entry["id"]
+            if task_id not in self._entries:
+                self._ids = None
+            self._entries[task_id] = dict(entry)
+            self._journal.append([entry])
+            if self._journal.records > len(self._entries) + COMPACT_SLACK:
+                self._journal.rewrite(self._sorted_entries())
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._entries.get(str(task_id))
+            return dict(entry) if entry is not None else None
+
+    def ids(self) -> List[str]:
+        """Task ids, newest first."""
+        with self._lock:
+            self._ensure_loaded()
+            if self._ids is None:
+                self._ids = sorted(self._entries, key=int, reverse=True)
+            return list(self._ids)
+
+    def page(self, start_index: int = 0, count: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Entries of one page, newest first (count None for the rest)."""
+        ids = self.ids()
+        end_index = len(ids) if count is None else start_index + count
+        with self._lock:
+            return [dict(self._entries[task_id]) for task_id in ids[start_index:end_index]]
+
+    def count(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._entries)
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        if self._journal.exists():
+            for record in self._journal.replay():
+                task_id = str(record.get("id", ""))
+                if task_id.isdigit():
+                    self._entries[task_id] = record
+        else:
+            self._rebuild()
+        self._loaded = True
+
+    def _rebuild(self):
+        """Index the task directories (one-time scan of every config)."""
+        if os.path.isdir(self.tasks_path):
+            for name in os.listdir(self.tasks_path):
+                task_path = os.path.join(self.tasks_path, name)
+                if name.isdigit() and os.path.isdir(task_path):
+                    self._entries[name] = task_index_entry(
+                        name, read_task_options(task_path), os.path.getmtime(task_path))
+        try:
+            self._journal.rewrite(self._sorted_entries())
+        except OSError as e:
+            logger.error(f"Failed to write task index {self._journal.path}: {e}")
+        if self._entries:
+            logger.info(f"Indexed {len(self._entries)} tasks in {self.tasks_path}")
+
+    def _sorted_entries(self) -> List[Dict[str, Any]]:
+        return [self._entries[task_id] for task_id in sorted(self._entries, key=int)]
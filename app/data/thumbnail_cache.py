@@ -0,0 +1,167 @@
+"""
+Persistent multi-resolution thumbnail cache.
+
+Thumbnails of project images live under ``<project>/cache/thumbnails``::
+
+    thumbnails/<size name>/<source key>-<stamp>.webp
+
+- ``source key`` is a hash of the source's absolute path and ``stamp``
+  encodes its size and mtime, so an edited image gets a new thumbnail and
+  the stale one is removed when the new one is written
+- Misses decode the source with ``QImageReader.setScaledSize``, so the
+  full-size image is never materialised
+- WebP is used when the Qt build can write it, JPEG otherwise
+
+Everything here works on QImage and is safe to call from worker threads
+(e.g. an AsyncDataLoader loader_func); convert to QPixmap on the GUI thread.
+"""
+import glob
+import hashlib
+import logging
+import os
+import shutil
+import threading
+from typing import Dict, NamedTuple, Optional
+
+from PySide6.QtCore import QSize
+from PySide6.QtGui import QImage, QImageReader, QImageWriter
+
+logger = logging.getLogger(__name__)
+
+CACHE_SUBDIR = os.path.join("cache", "thumbnails")
+JPEG_QUALITY = 85
+
+
+class ThumbnailSize(NamedTuple):
+    """A thumbnail variant: bounding box and whether the image must cover it."""
+    name: str
+    width: int
+    height: int
+    cover: bool = False  # True: fill the box (KeepAspectRatioByExpanding); False: fit inside
+
+
+# Sizes are 2x the widget box so thumbnails stay sharp on HiDPI screens
+CARD = ThumbnailSize("card", 180, 320, cover=True)  # Timeline / storyboard cards (90x160)
+PANEL = ThumbnailSize("panel", 360, 360)  # Resource and media selector previews (180x180)
+SIZES = (CARD, PANEL)
+
+
+def _thumbnail_format() -> str:
+    formats = {bytes(f).decode() for f in QImageWriter.supportedImageFormats()}
+    return "webp" if "webp" in formats else "jpg"
+
+
+def read_scaled_image(path: str, width: int, height: int, cover: bool = False) -> QImage:
+    """
+    Decode an image already scaled down to a bounding box.
+
+    Args:
+        path: Image file
+        width: Box width
+        height: Box height
+        cover: Fill the box instead of fitting inside it
+
+    Returns:
+        QImage (null if the file cannot be read); never upscaled
+    """
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    source = reader.size()
+    if source.isValid() and source.width() > 0 and source.height() > 0:
+        ratios = (width / source.width(), height / source.height())
+        scale = min(1.0, max(ratios) if cover else min(ratios))
+        if scale < 1.0:
+            reader.setScaledSize(QSize(max(1, round(source.width() * scale)),
+                                       max(1, round(source.height() * scale))))
+    image = reader.read()
+    if image.isNull():
+        logger.debug(f"Cannot read image {path}: {reader.errorString()}")
+    return image
+
+
+class ThumbnailCache:
+    """Thumbnails of one project's images, persisted on disk."""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self._format = _thumbnail_format()
+
+    @staticmethod
+    def source_key(source_path: str) -> str:
+        return hashlib.sha1(os.path.abspath(source_path).encode("utf-8")).hexdigest()[:20]
+
+    def thumbnail_path(self, source_path: str, size: ThumbnailSize = CARD) -> Optional[str]:
+        """Where the current thumbnail of a source is stored (None if the source is missing)."""
+        try:
+            st = os.stat(source_path)
+        except OSError:
+            return None
+        stamp = f"{st.st_size:x}_{st.st_mtime_ns:x}"
+        return os.path.join(self.cache_dir, size.name,
+                            f"{self.source_key(source_path)}-{stamp}.{self._format}")
+
+    def load(self, source_path: str, size: ThumbnailSize = CARD) -> QImage:
+        """
+        Thumbnail of an image, generated on a miss.
+
+        Returns:
+            QImage (null if the source is missing or unreadable)
+        """
+        thumb_path = self.thumbnail_path(source_path, size)
+        if thumb_path is None:
+            return QImage()
+        if os.path.exists(thumb_path):
+            image = QImage(thumb_path)
+            if not image.isNull():
+                return image
+
+        image = read_scaled_image(source_path, size.width, size.height, size.cover)
+        if not image.isNull():
+            self._store(image, thumb_path)
+        return image
+
+    def invalidate(self, source_path: str):
+        """Delete every thumbnail of a source."""
+        key = self.source_key(source_path)
+        for size in SIZES:
+            self._remove_matching(os.path.join(self.cache_dir, size.name), key)
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def _store(self, image: QImage, thumb_path: str):
+        directory, name = os.path.split(thumb_path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            # Drop thumbnails of earlier versions of the source
+            self._remove_matching(directory, name.split("-", 1)[0])
+            if self._format == "jpg" and image.hasAlphaChannel():
+                image = image.convertToFormat(QImage.Format.Format_RGB32)
+            tmp_path = f"{thumb_path}.{threading.get_ident()}.tmp"
+            if not image.save(tmp_path, self._format.upper(), JPEG_QUALITY):
+                raise OSError("image encoder failed")
+            os.replace(tmp_path, thumb_path)
+        except OSError as e:
+            logger.warning(f"Failed to store thumbnail {thumb_path}: {e}")
+
+    @staticmethod
+    def _remove_matching(directory: str, key: str):
+        for path in glob.glob(os.path.join(glob.escape(directory), f"{key}-*")):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+_caches: Dict[str, ThumbnailCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_thumbnail_cache(project_path: str) -> ThumbnailCache:
+    """Shared thumbnail cache of a project."""
+    cache_dir = os.path.join(os.path.abspath(project_path), CACHE_SUBDIR)
+    with _caches_lock:
+        cache = _caches.get(cache_dir)
+        if cache is None:
+            cache = _caches[cache_dir] = ThumbnailCache(cache_dir)
+        return cache
@@ -1,13 +1,15 @@
 import os.path
 import shutil
 import logging
+import uuid
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Dict
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 from PySide6.QtGui import QImage, QPixmap, Qt
 
 from app.data.task import TaskResult, TimelineItemTaskManager
 from app.data.layer import LayerManager, LayerType
+from app.data.thumbnail_cache import CARD, ThumbnailSize, get_thumbnail_cache
 
 from blinker import signal
 
@@ -16,12 +18,14 @@ from utils.opencv_utils import get_video_duration_async
 from utils.yaml_utils import (
     AsyncFileNotFoundError,
     AsyncFileParseError,
+    AsyncFileIoError,
     load_yaml,
-    load_yaml_async,
+    read_yaml_cached,
     run_coroutine_blocking,
     save_yaml,
     shutil_copy2,
     to_thread,
+    write_yaml,
 )
 
 
@@ -42,6 +46,10 @@ class TimelineItem:
     """
     Represents a single item in the timeline.
     
+    The item lives in a directory named after its stable ID; its index
+    (1-based position) comes from the timeline manifest and changes when
+    items are inserted, moved or deleted.
+    
     Each timeline item has its own:
     - Image/video content
     - Layer manager
@@ -49,11 +57,13 @@ class TimelineItem:
     - Configuration
     """
 
-    def __init__(self, timeline: 'Timeline', timelinePath: str, index: int, layer_changed_signal=None):
+    def __init__(self, timeline: 'Timeline', timelinePath: str, index: int, layer_changed_signal=None,
+                 item_id: Optional[str] = None):
         self.timeline = timeline
         self.time_line_path = timelinePath
         self.index = index
-        self.item_path = os.path.join(self.time_line_path, str(self.index))
+        self.item_id = item_id or timeline.get_item_id(index) or str(index)
+        self.item_path = os.path.join(self.time_line_path, self.item_id)
         self.image_path = os.path.join(self.item_path, "image.png")
         self.video_path = os.path.join(self.item_path, "video.mp4")
         self.config_path = os.path.join(self.item_path, "config.yml")
@@ -72,25 +82,36 @@ class TimelineItem:
     def _ensure_item_config_loaded(self) -> None:
         if self._item_config_loaded:
             return
-        run_coroutine_blocking(self.ensure_item_config_loaded_async())
+        self._item_config = self._read_item_config()
+        self._item_config_loaded = True
+        self._migrate_duration_if_needed()
+        if not self.timeline.project.has_item_duration(self.index):
+            self._initialize_duration()
 
     async def ensure_item_config_loaded_async(self) -> None:
         if self._item_config_loaded:
             return
-        try:
-            data = await load_yaml_async(self.config_path)
-            self._item_config = data if isinstance(data, dict) else {}
-        except (AsyncFileNotFoundError, AsyncFileParseError):
-            self._item_config = {}
-        except Exception as e:
-            logger.warning("timeline item config load failed (%s): %s", self.config_path, e)
-            self._item_config = {}
+        data = await to_thread(self._read_item_config)
+        if self._item_config_loaded:
+            return
+        self._item_config = data
         self._item_config_loaded = True
         await self.timeline.project.ensure_project_config_loaded_async()
         self._migrate_duration_if_needed()
         if not self.timeline.project.has_item_duration(self.index):
             await self._initialize_duration_async()
 
+    def _read_item_config(self) -> Dict[str, Any]:
+        """Read config.yml on the calling thread (empty config when missing or invalid)."""
+        try:
+            data = read_yaml_cached(self.config_path)
+        except (AsyncFileNotFoundError, AsyncFileParseError):
+            return {}
+        except Exception as e:
+            logger.warning("timeline item config load failed (%s): %s", self.config_path, e)
+            return {}
+        return data if isinstance(data, dict) else {}
+
     @property
     def config(self) -> Dict[str, Any]:
         self._ensure_item_config_loaded()
@@ -108,6 +129,16 @@ class TimelineItem:
         if image.isNull():
             return QPixmap()
         return QPixmap.fromImage(image)
+
+    def get_thumbnail(self, size: ThumbnailSize = CARD) -> QImage:
+        """Cached downscaled image.png (safe off the GUI thread; null if there is no image)."""
+        return self.get_thumbnail_cache().load(self.image_path, size)
+
+    def get_thumbnail_cache(self):
+        return get_thumbnail_cache(self.timeline.project.project_path)
+
+    def _invalidate_thumbnails(self):
+        self.get_thumbnail_cache().invalidate(self.image_path)
     
     def _migrate_duration_if_needed(self):
         """Migrate legacy duration from item config to project config"""
@@ -137,6 +168,8 @@ class TimelineItem:
     def update_image(self, image_path:str):
         if image_path is None:
             return
+        self._invalidate_thumbnails()
+        self.timeline.invalidate_item_content(self.item_id)
         # Always use the TimelineItem's own LayerManager (lazy-loaded)
         layer_manager = self.get_layer_manager()
         # Add the source file as a new IMAGE layer
@@ -154,9 +187,11 @@ class TimelineItem:
     def update_video(self, video_path:str):
         if video_path is None:
             return
+        self._invalidate_thumbnails()
         
         # Copy the video file directly to the timeline item's video path
         shutil_copy2(video_path, self.video_path)
+        self.timeline.invalidate_item_content(self.item_id)
         
         # Get the layer manager and register the video as a new layer
         layer_manager = self.get_layer_manager()
@@ -232,6 +267,10 @@ class TimelineItem:
     def get_index(self):
         return self.index
 
+    def get_item_id(self) -> str:
+        """Stable ID of the item (its directory name; does not change when the item moves)"""
+        return self.item_id
+
     def get_config(self):
         return self.config
 
@@ -252,8 +291,8 @@ class TimelineItem:
     def get_task_manager(self) -> TimelineItemTaskManager:
         """Get the TimelineItemTaskManager for this timeline item (lazy-loaded)"""
         if self._task_manager is None:
+            # Tasks load page by page through the task index
             self._task_manager = TimelineItemTaskManager(self, self.tasks_path)
-            self._task_manager.load_all_tasks()
         return self._task_manager
 
     def get_tasks_path(self) -> str:
@@ -286,18 +325,42 @@ class TimelineItem:
 
 
 class Timeline:
+    """
+    Ordered timeline items of a project.
+
+    Items are stored under immutable IDs (timeline/<id>/) and their order and
+    durations are kept in one manifest, timeline/timeline.yml:
+
+        version: 1
+        items:
+        - {id: '1', duration: 2.5}
+        - {id: 9f3c2a1b7d4e, duration: 1.0}
+
+    Inserting, moving or deleting an item rewrites the manifest only; no item
+    directory is renamed and cached TimelineItems keep their paths and configs.
+    Timelines from before the manifest (directories named 1..N) are migrated
+    by listing the numeric directories in order: they keep their names as IDs.
+    """
 
     timeline_switch = signal("timeline_switch")
     layer_changed = signal("layer_changed")
     timeline_changed = signal("timeline_changed")
 
+    MANIFEST_NAME = "timeline.yml"
+    MANIFEST_VERSION = 1
+
     def __init__(self, workspace, project, timelinePath:str):
         self.workspace = workspace
         self.project = project
         self.time_line_path = timelinePath
+        self.manifest_path = os.path.join(self.time_line_path, self.MANIFEST_NAME)
         # Always initialize item_count so get_item_count() is safe even when path checks fail.
         self.item_count = 0
-        self._item_cache = {}  # Cache for TimelineItem instances to prevent duplicate signal connections
+        self._order: List[str] = []  # Item IDs by position (index - 1)
+        self._durations: Dict[str, float] = {}
+        self._item_cache: Dict[str, TimelineItem] = {}  # By item ID, to prevent duplicate signal connections
+        self._content: Dict[str, Tuple[bool, bool]] = {}  # Item ID -> (has image, has video)
+        self.timeline_changed.connect(self._on_timeline_changed, sender=self)
         try:
             p = Path(self.time_line_path)
             if not p.exists():
@@ -306,14 +369,126 @@ class Timeline:
             if not p.is_dir():
                 logger.warning(f"路径 '{self.time_line_path}' 不是一个目录。")
                 return
-            directories = [item.name for item in p.iterdir() if item.is_dir()]
-            self.item_count = len(directories)
+            self._load_manifest()
         except PermissionError:
             logger.error(f"没有权限访问路径 '{self.time_line_path}'。")
             return
         except Exception as e:
             logger.error(f"发生错误: {e}")
             return
+
+    # ==================== Manifest ====================
+
+    def _load_manifest(self):
+        """Read the item order and durations, migrating a numeric-directory timeline"""
+        data = None
+        if os.path.exists(self.manifest_path):
+            try:
+                data = read_yaml_cached(self.manifest_path)
+            except AsyncFileIoError as e:
+                logger.error(f"Unreadable timeline manifest {self.manifest_path}, rebuilding: {e}")
+        if isinstance(data, dict) and isinstance(data.get("items"), list):
+            self._order = []
+            self._durations = {}
+            for entry in data["items"]:
+                if not isinstance(entry, dict) or "id" not in entry:
+                    continue
+                item_id = str(entry["id"])
+                self._order.append(item_id)
+                if entry.get("duration") is not None:
+                    self._durations[item_id] = entry["duration"]
+        else:
+            self._migrate_numeric_layout()
+        self.item_count = len(self._order)
+
+    def _migrate_numeric_layout(self):
+        """Adopt directories 1..N (the pre-manifest layout) as items with those IDs"""
+        names = [entry.name for entry in os.scandir(self.time_line_path)
+                 if entry.is_dir() and entry.name.isdigit()]
+        self._order = sorted(names, key=int)
+        legacy_durations = {}
+        config = getattr(self.project, "config", None)
+        if isinstance(config, dict):
+            legacy_durations = config.get("timeline_item_durations") or {}
+        self._durations = {item_id: legacy_durations[item_id]
+                           for item_id in self._order if item_id in legacy_durations}
+        self._save_manifest()
+        if self._order:
+            logger.info(f"Migrated {len(self._order)} timeline items to {self.manifest_path}")
+
+    def _save_manifest(self):
+        items = []
+        for item_id in self._order:
+            entry: Dict[str, Any] = {"id": item_id}
+            if item_id in self._durations:
+                entry["duration"] = self._durations[item_id]
+            items.append(entry)
+        write_yaml(self.manifest_path, {"version": self.MANIFEST_VERSION, "items": items})
+        self.item_count = len(self._order)
+
+    def _reindex_cached_items(self):
+        """Give cached items their new positions (no disk access)"""
+        positions = {item_id: i for i, item_id in enumerate(self._order, start=1)}
+        for item_id, item in self._item_cache.items():
+            item.index = positions.get(item_id, 0)
+
+    def get_item_id(self, index: int) -> Optional[str]:
+        """Stable ID of the item at an index (1-indexed), or None if out of range"""
+        if 1 <= index <= len(self._order):
+            return self._order[index - 1]
+        return None
+
+    def get_index_of(self, item_id: str) -> Optional[int]:
+        """Current index (1-indexed) of an item ID, or None if it is not in the timeline"""
+        try:
+            return self._order.index(item_id) + 1
+        except ValueError:
+            return None
+
+    # ==================== Durations ====================
+
+    def get_item_duration(self, index: int) -> float:
+        item_id = self.get_item_id(index)
+        return self._durations.get(item_id, 1.0) if item_id else 1.0
+
+    def has_item_duration(self, index: int) -> bool:
+        item_id = self.get_item_id(index)
+        return item_id is not None and item_id in self._durations
+
+    def set_item_duration(self, index: int, duration: float):
+        item_id = self.get_item_id(index)
+        if item_id is None:
+            logger.warning(f"Cannot set duration of timeline item {index}: out of range")
+            return
+        self._durations[item_id] = duration
+        self._save_manifest()
+
+    def sum_item_durations(self) -> float:
+        return float(sum(self._durations.get(item_id, 1.0) for item_id in self._order))
+
+    # ==================== Content table ====================
+
+    def _content_flags(self, item_id: str) -> Tuple[bool, bool]:
+        flags = self._content.get(item_id)
+        if flags is None:
+            item_path = os.path.join(self.time_line_path, item_id)
+            flags = (os.path.exists(os.path.join(item_path, "image.png")),
+                     os.path.exists(os.path.join(item_path, "video.mp4")))
+            self._content[item_id] = flags
+        return flags
+
+    def invalidate_item_content(self, item_id: Optional[str] = None):
+        """Forget whether an item (or every item) has an image / video; checked again on next listing"""
+        if item_id is None:
+            self._content.clear()
+        else:
+            self._content.pop(item_id, None)
+
+    def _on_timeline_changed(self, sender, timeline_item=None, **kwargs):
+        # Composition wrote the item's image / video
+        self.invalidate_item_content(getattr(timeline_item, "item_id", None))
+
+    # ==================== Queries ====================
     
     def _on_item_duration_changed(self):
         """Called when any timeline item's duration changes - updates total timeline duration"""
@@ -346,10 +521,14 @@ class Timeline:
         return self.item_count
 
     def get_item(self, index:int):
+        item_id = self.get_item_id(index)
+        if item_id is None:
+            logger.warning(f"Timeline item {index} does not exist. Valid range: 1-{self.item_count}")
+            return None
         # Use cached TimelineItem to prevent duplicate LayerManager/signal connections
-        if index not in self._item_cache:
-            self._item_cache[index] = TimelineItem(self, self.time_line_path, index, self.layer_changed)
-        return self._item_cache[index]
+        if item_id not in self._item_cache:
+            self._item_cache[item_id] = TimelineItem(self, self.time_line_path, index, self.layer_changed, item_id)
+        return self._item_cache[item_id]
 
     def get_current_item(self):
         """Get the current timeline item (returns None if no valid item exists)"""
@@ -361,11 +540,10 @@ class Timeline:
     def get_items(self):
         """Get all timeline items as a list"""
         items = []
-        for i in range(1, self.item_count + 1):  # Timeline items start from index 1
-            item = self.get_item(i)
+        for i, item_id in enumerate(self._order, start=1):  # Timeline items start from index 1
             # Only add items that actually exist (have content)
-            if os.path.exists(item.get_image_path()) or os.path.exists(item.get_video_path()):
-                items.append(item)
+            if any(self._content_flags(item_id)):
+                items.append(self.get_item(i))
         return items
 
     def list_items(self) -> dict:
@@ -379,6 +557,7 @@ class Timeline:
             - current_index: Currently selected item index (may be 0 if none selected)
             - items: List of item details, each containing:
                 - index: Item index (1-indexed)
+                - item_id: Stable item ID
                 - has_image: Whether the item has an image
                 - has_video: Whether the item has a video
                 - duration: Item duration in seconds
@@ -388,17 +567,17 @@ class Timeline:
         """
         items_info = []
 
-        for i in range(1, self.item_count + 1):
+        for i, item_id in enumerate(self._order, start=1):
             item = self.get_item(i)
-            has_image = os.path.exists(item.image_path)
-            has_video = os.path.exists(item.video_path)
+            has_image, has_video = self._content_flags(item_id)
 
             item_info = {
                 "index": i,
+                "item_id": item_id,
                 "has_image": has_image,
                 "has_video": has_video,
                 "duration": self.project.get_item_duration(i) if hasattr(self.project, 'get_item_duration') else None,
-                "preview_path": item.get_preview_path(),
+                "preview_path": item.video_path if has_video else item.image_path,
                 "config": item.get_config() if has_image or has_video else {},
                 "item_path": item.get_item_path(),
                 "layers_path": item.get_layers_path(),
@@ -423,41 +602,64 @@ class Timeline:
 
     def on_task_finished(self,result:TaskResult):
         item = self.get_item(result.get_timeline_index())
+        if item is None:
+            return
         item.update_by_task_result(result)
         # Update total timeline duration after task completion
         self._update_timeline_duration()
     
     def refresh_count(self):
-        """Refresh the item count by recounting directories"""
+        """Reload the item order from the manifest and forget cached content flags"""
         try:
             p = Path(self.time_line_path)
             if not p.exists() or not p.is_dir():
                 self.item_count = 0
                 return
-            directories = [item.name for item in p.iterdir() if item.is_dir()]
-            self.item_count = len(directories)
+            self._load_manifest()
+            self._content.clear()
+            self._reindex_cached_items()
         except Exception as e:
             logger.error(f"Error refreshing timeline count: {e}")
+
+    # ==================== Mutations ====================
     
     def add_item(self):
-        """Add a new timeline item and return its index"""
-        self.refresh_count()
-        new_index = self.item_count + 1
-        new_item_path = os.path.join(self.time_line_path, str(new_index))
-        os.makedirs(new_item_path, exist_ok=True)
-        self.add_image(new_index)
-        self.refresh_count()  # Update the count
+        """Add a new timeline item at the end and return its index"""
+        return self.insert_item(self.item_count + 1)
+
+    def insert_item(self, index: int) -> int:
+        """
+        Insert a new timeline item.
+
+        Args:
+            index: Position of the new item (1-indexed); later items shift by one
+
+        Returns:
+            The index of the new item
+        """
+        index = max(1, min(index, self.item_count + 1))
+        item_id = uuid.uuid4().hex[:12]
+        os.makedirs(os.path.join(self.time_line_path, item_id), exist_ok=True)
+        self._order.insert(index - 1, item_id)
+        self._save_manifest()
+        self._reindex_cached_items()
+        self.add_image(index)
         # 修复：使用get方法提供默认值，避免KeyError
         num = self.project.config.get('timeline_size', 0)
         self.project.update_config('timeline_size',num+1)
         # 注意：我们不自动更新 timeline_index，它应该保持为用户当前选择的索引
+        # (but it follows the selected item when the new one is inserted before it)
+        current_index = self.project.get_timeline_index()
+        if current_index and current_index >= index:
+            self.project.update_config('timeline_index', current_index + 1)
         # Update total timeline duration after adding new item
         self._update_timeline_duration()
-        return new_index
+        return index
 
     def add_image(self, new_index):
         # Create a default snapshot image file if it doesn't exist
-        new_item_path = os.path.join(self.time_line_path, str(new_index))
+        item_id = self.get_item_id(new_index) or str(new_index)
+        new_item_path = os.path.join(self.time_line_path, item_id)
         default_snapshot_path = os.path.join(new_item_path, "image.png")
         if not os.path.exists(default_snapshot_path):
             # For now, create a blank image - we'll create a simple placeholder
@@ -470,10 +672,13 @@ class Timeline:
             painter.drawText(pixmap.rect(), Qt.AlignCenter, f"Card {new_index}")
             painter.end()
             pixmap.save(default_snapshot_path)
+            self.invalidate_item_content(item_id)
 
     def set_item_index(self, index):
         self.project.update_config('timeline_index', index)
         item = self.get_item(index)
+        if item is None:
+            return
         # Ensure the item's own LayerManager is loaded (lazy-load will handle first-time creation)
         item.get_layer_manager()
         self.timeline_switch.send(item)
@@ -492,47 +697,25 @@ class Timeline:
             logger.warning(f"Invalid index {index} for deletion. Valid range: 1-{self.item_count}")
             return False
 
-        item_path = os.path.join(self.time_line_path, str(index))
         try:
-            # Remove the item directory
+            # The manifest is written first: a crash before the directory is
+            # removed leaves an unlisted directory, never a listed missing item
+            item_id = self._order.pop(index - 1)
+            self._durations.pop(item_id, None)
+            self._save_manifest()
+            self._item_cache.pop(item_id, None)
+            self._content.pop(item_id, None)
+            self._reindex_cached_items()
+
+            item_path = os.path.join(self.time_line_path, item_id)
             if os.path.exists(item_path):
-                shutil.rmtree(item_path)
-
-            # Remove from cache
-            if index in self._item_cache:
-                del self._item_cache[index]
-
-            # Renumber subsequent items to fill the gap
-            for i in range(index + 1, self.item_count + 1):
-                old_path = os.path.join(self.time_line_path, str(i))
-                new_path = os.path.join(self.time_line_path, str(i - 1))
-                if os.path.exists(old_path):
-                    os.rename(old_path, new_path)
-
-            # Update cache indices for moved items
-            new_cache = {}
-            for cached_idx, cached_item in self._item_cache.items():
-                if cached_idx < index:
-                    new_cache[cached_idx] = cached_item
-                elif cached_idx > index:
-                    # Shift index down by 1
-                    cached_item.index = cached_idx - 1
-                    cached_item.item_path = os.path.join(self.time_line_path, str(cached_item.index))
-                    cached_item.image_path = os.path.join(cached_item.item_path, "image.png")
-                    cached_item.video_path = os.path.join(cached_item.item_path, "video.mp4")
-                    cached_item.config_path = os.path.join(cached_item.item_path, "config.yml")
-                    cached_item.layers_path = os.path.join(cached_item.item_path, "layers")
-                    cached_item.tasks_path = os.path.join(cached_item.item_path, "tasks")
-                    cached_item._item_config_loaded = False
-                    cached_item._item_config = {}
-                    new_cache[cached_idx - 1] = cached_item
-            self._item_cache = new_cache
+                shutil.rmtree(item_path, ignore_errors=True)
 
             # Update the current timeline index if needed
             current_index = self.project.get_timeline_index()
             if current_index == index:
                 # If we deleted the current item, switch to the first item or clear selection
-                if self.item_count > 1:
+                if self.item_count > 0:
                     self.project.update_config('timeline_index', 1)
                 else:
                     self.project.update_config('timeline_index', 0)
@@ -540,8 +723,6 @@ class Timeline:
                 # Shift current index down
                 self.project.update_config('timeline_index', current_index - 1)
 
-            # Refresh count and update config
-            self.refresh_count()
             num = self.project.config.get('timeline_size', 0)
             self.project.update_config('timeline_size', max(0, num - 1))
 
@@ -576,33 +757,15 @@ class Timeline:
             return True  # No move needed
 
         try:
-            # Create a temporary directory for the item being moved
-            temp_path = os.path.join(self.time_line_path, "_temp_move")
-            from_path = os.path.join(self.time_line_path, str(from_index))
-            os.rename(from_path, temp_path)
-
-            # Shift items to fill the gap or make space
-            if from_index < to_index:
-                # Moving forward: shift items from (from_index+1) to to_index down by 1
-                for i in range(from_index + 1, to_index + 1):
-                    old_path = os.path.join(self.time_line_path, str(i))
-                    new_path = os.path.join(self.time_line_path, str(i - 1))
-                    if os.path.exists(old_path):
-                        os.rename(old_path, new_path)
-            else:
-                # Moving backward: shift items from to_index to (from_index-1) up by 1
-                for i in range(from_index - 1, to_index - 1, -1):
-                    old_path = os.path.join(self.time_line_path, str(i))
-                    new_path = os.path.join(self.time_line_path, str(i + 1))
-                    if os.path.exists(old_path):
-                        os.rename(old_path, new_path)
-
-            # Move the item from temp to its final position
-            final_path = os.path.join(self.time_line_path, str(to_index))
-            os.rename(temp_path, final_path)
-
-            # Clear and rebuild cache
-            self._item_cache.clear()
+            order = list(self._order)
+            order.insert(to_index - 1, order.pop(from_index - 1))
+            previous, self._order = self._order, order
+            try:
+                self._save_manifest()
+            except Exception:
+                self._order = previous
+                raise
+            self._reindex_cached_items()
 
             # Update the current timeline index if needed
             current_index = self.project.get_timeline_index()
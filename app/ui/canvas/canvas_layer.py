@@ -1,6 +1,7 @@
 """
 Canvas layer component that provides drawing functionality for a single layer.
 """
+import logging
 from typing import Optional
 from PySide6.QtWidgets import QWidget, QApplication
 from PySide6.QtCore import QPoint, QRect, Qt, Signal
@@ -11,10 +12,11 @@ from PySide6.QtGui import QImage, QPixmap
 from app.ui.canvas.canvas_pixmap import CanvasPixMap
 from app.ui.drawing_tools import DrawingToolsWidget
 from app.ui.drawing_tools.drawing_tool import DrawingTool
+from app.ui.canvas.video_layer_decoder import VideoLayerDecoder
+from app.ui.workers.background_worker import run_in_background
+from utils.img_utils import save_png_atomic
 
-from PySide6.QtCore import QTimer
-from PySide6.QtGui import QImage
-import cv2
+logger = logging.getLogger(__name__)
 
 
 class CanvasLayerWidget(QWidget):
@@ -110,6 +112,10 @@ class CanvasImageLayerWidget(CanvasLayerWidget):
         # Drawing state
         self.current_path = QPainterPath()
 
+        # Background layer file writes: one in flight, the latest image waits behind it
+        self._save_worker = None
+        self._pending_save_image: Optional[QImage] = None
+
         # Enable mouse tracking for better responsiveness
         self.setMouseTracking(True)
 
@@ -125,14 +131,38 @@ class CanvasImageLayerWidget(CanvasLayerWidget):
         self.show()
 
     def save_level_image(self):
-        image_path = self.layer.get_layer_path()
-        # Get the original pixmap from CanvasPixMap
-        original_pixmap = self.canvas_pixmap.get_original_pixmap()
-        original_pixmap.save(image_path)
+        """Write the layer file in the background if it was drawn on since the last save."""
+        if self.canvas_pixmap.take_dirty_rect().isEmpty():
+            return
+        # toImage() copies the pixels, so drawing can go on while the copy is encoded
+        self._pending_save_image = self.canvas_pixmap.get_original_pixmap().toImage()
+        if self._save_worker is None:
+            self._write_pending_image()
+
+    def _write_pending_image(self):
+        image, self._pending_save_image = self._pending_save_image, None
+        self._save_worker = run_in_background(
+            task=save_png_atomic,
+            args=(image, self.layer.get_layer_path()),
+            on_finished=self._on_level_image_saved,
+            on_error=self._on_level_image_save_error,
+            task_type="layer_image_save",
+        )
+
+    def _on_level_image_saved(self, _result):
+        self._save_worker = None
+        if self._pending_save_image is not None:
+            # Strokes finished during the write: write once more, notify at the end
+            self._write_pending_image()
+            return
         # Trigger layer change event through layer manager
         if self.layer.layer_manager:
             self.layer.layer_manager.save_layer(self.layer)
 
+    def _on_level_image_save_error(self, error_msg, _exception):
+        logger.error(f"Failed to save layer {self.layer_id}: {error_msg}")
+        self._on_level_image_saved(None)
+
     def set_mode(self, mode):
         """Set the current drawing mode and update cursor"""
         self.current_tool_id = mode  # mode is now the tool ID
@@ -223,23 +253,23 @@ class CanvasImageLayerWidget(CanvasLayerWidget):
         """Draw on this layer's pixmap using DrawingTool"""
         # Get the current drawing tool from project configuration
         drawing_tool = self.get_drawing_tool()
+        if not drawing_tool:
+            return
 
-        if drawing_tool:
-            # Use the drawing tool to paint on the original pixmap
-            drawing_tool.paint(
-                self.canvas_pixmap.original_pixmap,
-                start_point,
-                end_point,
-                self.scale_factor
-            )
-            # Update the scaled pixmap after drawing
-            self.canvas_pixmap.update_scaled_pixmap()
-
-        # Update the region that changed
-        update_rect = QRect(start_point, end_point).normalized()
-        brush_size = getattr(self, 'brush_size', 20)
-        update_rect.adjust(-brush_size, -brush_size, brush_size, brush_size)
-        self.update(update_rect)
+        # Area the stroke can touch, in original coordinates (None: unknown, whole layer)
+        dirty_rect = drawing_tool.paint_bounds(start_point, end_point, self.scale_factor)
+        if dirty_rect is not None and dirty_rect.isEmpty():
+            return
+        # Use the drawing tool to paint on the original pixmap
+        drawing_tool.paint(
+            self.canvas_pixmap.original_pixmap,
+            start_point,
+            end_point,
+            self.scale_factor
+        )
+        self.canvas_pixmap.mark_dirty(dirty_rect)
+        # Rescale and repaint only the region that changed
+        self.update(self.canvas_pixmap.update_scaled_pixmap(dirty_rect))
 
     def clear_draw(self):
         """Clear the drawing using CanvasPixMap"""
@@ -249,56 +279,60 @@ class CanvasImageLayerWidget(CanvasLayerWidget):
 
 class CanvasVideoLayerWidget(CanvasLayerWidget):
     """
-    Video layer implementation that previews and plays video via OpenCV frames
-    rendered into the widget.
+    Video layer implementation that plays video frames rendered into the widget.
+    Frames are decoded and scaled by the shared VideoLayerDecoder on worker
+    threads; the widget only paints the frame it is handed.
     """
     def __init__(self, canvas_widget, layer_id: int, layer: Layer, width: int, height: int, layer_x: int = 0,
                  layer_y: int = 0):
         super().__init__(canvas_widget, layer_id, layer, width, height, layer_x, layer_y)
+        self._stream = None
         self.video_path = layer.get_layer_path()
-        self.cap = cv2.VideoCapture(self.video_path) if self.video_path else None
-        self.fps = 30
-        if self.cap and self.cap.isOpened():
-            fps_val = self.cap.get(cv2.CAP_PROP_FPS)
-            if fps_val and fps_val > 0:
-                self.fps = int(fps_val)
-        self.timer = QTimer(self)
-        self.timer.setInterval(int(1000 / max(1, self.fps)))
-        self.timer.timeout.connect(self._update_frame)
         self.current_frame_pixmap = None
+        self._playing = False
+        self._decoder = VideoLayerDecoder.instance()
+        if self.video_path:
+            self._stream = self._decoder.register(self.video_path, self.width(), self.height(),
+                                                  self._on_frame, active=False)
+            # Stop decoding when the widget goes away (deleteLater from the canvas)
+            decoder, stream = self._decoder, self._stream
+            self.destroyed.connect(lambda *_: decoder.unregister(stream))
         self.play()
 
     def play(self):
-        if self.cap and self.cap.isOpened():
-            self.timer.start()
+        self._playing = True
+        self._update_stream_state()
 
     def pause(self):
-        self.timer.stop()
+        self._playing = False
+        self._update_stream_state()
 
     def stop(self):
-        self.timer.stop()
-        if self.cap:
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        self.pause()
         self.current_frame_pixmap = None
         self.update()
 
-    def _update_frame(self):
-        if not self.cap:
-            return
-        ret, frame = self.cap.read()
-        if not ret:
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-            ret, frame = self.cap.read()
-            if not ret:
-                return
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h, w, _ = frame_rgb.shape
-        bytes_per_line = 3 * w
-        qimg = QImage(frame_rgb.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
-        target_w = int(self.layer_width * self.scale_factor)
-        target_h = int(self.layer_height * self.scale_factor)
-        scaled_img = qimg.scaled(target_w, target_h, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-        self.current_frame_pixmap = QPixmap.fromImage(scaled_img)
+    def set_scale_factor(self, scale: float):
+        super().set_scale_factor(scale)
+        # Also called from the base __init__, before the stream exists
+        if getattr(self, '_stream', None) is not None:
+            self._stream.set_target_size(self.width(), self.height())
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._update_stream_state()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._update_stream_state()
+
+    def _update_stream_state(self):
+        """Decode only while playing and visible."""
+        if getattr(self, '_stream', None) is not None:
+            self._decoder.set_active(self._stream, self._playing and self.isVisible())
+
+    def _on_frame(self, image: QImage):
+        self.current_frame_pixmap = QPixmap.fromImage(image)
         self.update()
 
     def paintEvent(self, event):
@@ -2,9 +2,13 @@
 CanvasPixMap component that manages dual pixmaps:
 One at original size and one scaled for display.
 Drawing logic is delegated to DrawingTool implementations.
+
+Changed areas are tracked as a dirty rectangle, so only the stroked region
+is rescaled for display and unchanged layers are not written back.
 """
+from typing import Optional
 
-from PySide6.QtCore import QPoint, Qt
+from PySide6.QtCore import QPoint, QRect, QRectF, Qt
 from PySide6.QtGui import QPixmap, QPainter
 
 
@@ -29,6 +33,8 @@ class CanvasPixMap:
         self.scaled_pixmap = QPixmap(original_pixmap.size())
         self.scaled_pixmap.fill(Qt.GlobalColor.transparent)
         self.scale_factor = 1.0
+        # Area of the original pixmap changed since the last take_dirty_rect()
+        self.dirty_rect = QRect()
 
     def set_scale_factor(self, scale_factor: float):
         """
@@ -87,28 +93,75 @@ class CanvasPixMap:
             int(point.y() * self.scale_factor)
         )
 
-    def update_scaled_pixmap(self):
+    def update_scaled_pixmap(self, dirty_rect: Optional[QRect] = None) -> QRect:
         """
         Update the scaled pixmap from the original pixmap.
         This should be called after drawing operations on the original pixmap.
+
+        Args:
+            dirty_rect: Changed area in original coordinates (None: everything)
+
+        Returns:
+            The updated area in scaled coordinates
         """
         scaled_width = int(self.original_pixmap.width() * self.scale_factor)
         scaled_height = int(self.original_pixmap.height() * self.scale_factor)
-        
-        if scaled_width > 0 and scaled_height > 0:
-            self.scaled_pixmap = QPixmap(scaled_width, scaled_height)
-            self.scaled_pixmap.fill(Qt.GlobalColor.transparent)
-            
-            painter = QPainter(self.scaled_pixmap)
-            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
-            painter.drawPixmap(0, 0, scaled_width, scaled_height, self.original_pixmap)
-            painter.end()
+        if scaled_width <= 0 or scaled_height <= 0:
+            return QRect()
+
+        same_size = self.scaled_pixmap.width() == scaled_width and self.scaled_pixmap.height() == scaled_height
+        if dirty_rect is not None and same_size:
+            return self._update_scaled_region(dirty_rect)
+
+        self.scaled_pixmap = QPixmap(scaled_width, scaled_height)
+        self.scaled_pixmap.fill(Qt.GlobalColor.transparent)
+
+        painter = QPainter(self.scaled_pixmap)
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        painter.drawPixmap(0, 0, scaled_width, scaled_height, self.original_pixmap)
+        painter.end()
+        return self.scaled_pixmap.rect()
+
+    def _update_scaled_region(self, dirty_rect: QRect) -> QRect:
+        """Rescale only the part of the scaled pixmap covering dirty_rect."""
+        scale = self.scale_factor
+        # Pad by 2 pixels so smoothing at the region edge blends with the untouched pixels
+        target = QRectF(dirty_rect.x() * scale, dirty_rect.y() * scale,
+                        dirty_rect.width() * scale, dirty_rect.height() * scale).toAlignedRect()
+        target = target.adjusted(-2, -2, 2, 2).intersected(self.scaled_pixmap.rect())
+        if target.isEmpty():
+            return QRect()
+        source = QRectF(target.x() / scale, target.y() / scale, target.width() / scale, target.height() / scale)
+
+        painter = QPainter(self.scaled_pixmap)
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+        painter.drawPixmap(QRectF(target), self.original_pixmap, source)
+        painter.end()
+        return target
+
+    def mark_dirty(self, rect: Optional[QRect] = None):
+        """
+        Record a change of the original pixmap.
+
+        Args:
+            rect: Changed area in original coordinates (None: everything)
+        """
+        bounds = self.original_pixmap.rect()
+        rect = bounds if rect is None else rect.intersected(bounds)
+        self.dirty_rect = self.dirty_rect.united(rect)
+
+    def take_dirty_rect(self) -> QRect:
+        """Return the area changed since the last call (empty if none) and reset it."""
+        rect, self.dirty_rect = self.dirty_rect, QRect()
+        return rect
 
     def clear(self):
         """Clear both pixmaps."""
         self.original_pixmap.fill(Qt.GlobalColor.transparent)
         if self.scaled_pixmap:
             self.scaled_pixmap.fill(Qt.GlobalColor.transparent)
+        self.mark_dirty()
 
     def get_original_pixmap(self) -> QPixmap:
         """
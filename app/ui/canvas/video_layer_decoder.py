@@ -0,0 +1,310 @@
+"""
+Shared decoding service for canvas video layers.
+
+Video layers do not decode on the GUI thread. Each layer registers a stream
+with the process-wide VideoLayerDecoder:
+
+    worker threads: read -> resize to the widget -> RGB QImage -> per-stream queue
+    GUI timer tick: playback clock -> due frame of every active stream -> on_frame(QImage)
+
+- All streams follow one playback clock, so layers stay in step (each
+  loops over its own length)
+- A stream buffers at most queue_size frames; frames that are late by the
+  time the GUI takes them are dropped, and the decoder skips ahead when it
+  falls behind the clock
+- Inactive streams (hidden or paused layers) are neither decoded nor ticked
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, List, Optional, Tuple
+
+import cv2
+from PySide6.QtCore import QObject, QTimer
+from PySide6.QtGui import QImage
+
+from utils.media_probe import get_media_probe
+
+logger = logging.getLogger(__name__)
+
+# Decoded frames buffered per stream
+DEFAULT_QUEUE_SIZE = 3
+# Read through gaps up to this many frames instead of seeking
+SKIP_GRAB_FRAMES = 8
+UNKNOWN_FRAME_COUNT = 1 << 31
+
+
+def default_workers() -> int:
+    return max(1, min(4, (os.cpu_count() or 2) - 1))
+
+
+class VideoLayerStream:
+    """Decoding state of one video layer (create with VideoLayerDecoder.register)."""
+
+    def __init__(self, video_path: str, width: int, height: int,
+                 on_frame: Callable[[QImage], None], queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.video_path = video_path
+        self.on_frame = on_frame
+        self.queue_size = max(1, queue_size)
+        self.active = True
+        self.fps = 0.0  # Known once the decoder has opened the video
+        self.frame_count = 0
+        self.decoded = 0
+        self.dropped = 0
+        self.shown_index = -1  # Clock frame of the last image passed to on_frame
+
+        self._size = (max(1, width), max(1, height))
+        self._frames: Deque[Tuple[int, QImage]] = deque()
+        self._next = 0  # Clock frame to decode next
+        self._pos = 0  # File frame the next read returns
+        self._cap = None
+        self._busy = False
+        self._released = False
+        self._lock = threading.Lock()
+
+    def set_target_size(self, width: int, height: int):
+        """Size frames are scaled to fit; buffered frames of the old size are dropped."""
+        with self._lock:
+            size = (max(1, width), max(1, height))
+            if size != self._size:
+                self._size = size
+                self._frames.clear()
+
+    def buffered(self) -> int:
+        with self._lock:
+            return len(self._frames)
+
+    # Worker thread ------------------------------------------------------
+
+    def _open(self) -> bool:
+        self._cap = cv2.VideoCapture(self.video_path)
+        if not self._cap.isOpened():
+            logger.warning(f"Cannot open video layer {self.video_path}")
+            return False
+        probe = get_media_probe(self.video_path)
+        self.fps = probe.fps if probe else self._cap.get(cv2.CAP_PROP_FPS) or 30.0
+        # Unknown length: decode until a read fails, then loop there
+        self.frame_count = ((probe.frame_count if probe else 0)
+                            or int(self._cap.get(cv2.CAP_PROP_FRAME_COUNT)) or UNKNOWN_FRAME_COUNT)
+        return self.fps > 0
+
+    def _decode_ahead(self, position: Callable[[], float]):
+        """Fill the frame queue from the playback position on."""
+        if self._cap is None and not self._open():
+            self.active = False
+            return
+        while True:
+            with self._lock:
+                if self._released or not self.active or len(self._frames) >= self.queue_size:
+                    return
+                # Frames the clock has already passed are not worth decoding
+                due = int(position() * self.fps)
+                if due > self._next:
+                    self.dropped += due - self._next
+                    self._next = due
+                target = self._next
+                size = self._size
+
+            index = target % self.frame_count
+            if index != self._pos:
+                if self._pos < index <= self._pos + SKIP_GRAB_FRAMES:
+                    for _ in range(index - self._pos):
+                        self._cap.grab()
+                else:
+                    self._cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+                self._pos = index
+            ok, frame = self._cap.read()
+            if not ok:
+                if self._pos == 0:
+                    return
+                # Reported frame count was too high: loop at the real end
+                self.frame_count = self._pos
+                continue
+            self._pos += 1
+            image = self._to_image(frame, size)
+
+            with self._lock:
+                if size == self._size and self.active:
+                    self._frames.append((target, image))
+                    self.decoded += 1
+                self._next = target + 1
+
+    @staticmethod
+    def _to_image(frame, size: Tuple[int, int]) -> QImage:
+        """Scale a BGR frame to fit the box and convert it to an RGB QImage."""
+        height, width = frame.shape[:2]
+        scale = min(size[0] / width, size[1] / height)
+        target = (max(1, int(width * scale)), max(1, int(height * scale)))
+        if target != (width, height):
+            interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
+            frame = cv2.resize(frame, target, interpolation=interpolation)
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        # copy(): the QImage must own its pixels once rgb is freed
+        return QImage(rgb.data, rgb.shape[1], rgb.shape[0], rgb.strides[0], QImage.Format.Format_RGB888).copy()
+
+    def _release(self):
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+    # GUI thread ---------------------------------------------------------
+
+    def _take(self, due: int) -> Optional[QImage]:
+        """Newest buffered frame at or before the due frame; older ones are dropped."""
+        with self._lock:
+            image = None
+            while self._frames and self._frames[0][0] <= due:
+                if image is not None:
+                    self.dropped += 1
+                self.shown_index, image = self._frames.popleft()
+            return image
+
+
+class VideoLayerDecoder(QObject):
+    """
+    Decodes the frames of all canvas video layers on a thread pool.
+
+    Usage:
+        stream = VideoLayerDecoder.instance().register(path, width, height, on_frame)
+        decoder.set_active(stream, False)   # hidden / paused layer
+        decoder.unregister(stream)
+    """
+
+    _instance: Optional["VideoLayerDecoder"] = None
+    _lock = threading.Lock()
+
+    def __init__(self, workers: Optional[int] = None, clock: Callable[[], float] = time.monotonic,
+                 parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.setObjectName("VideoLayerDecoder")
+        self._executor = ThreadPoolExecutor(max_workers=workers or default_workers(),
+                                            thread_name_prefix="video-layer")
+        self._clock = clock
+        self._start = clock()
+        self._streams: List[VideoLayerStream] = []
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.tick)
+
+    @classmethod
+    def instance(cls) -> "VideoLayerDecoder":
+        """Return the global decoder (created on first use)."""
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @classmethod
+    def reset(cls) -> None:
+        """Shut down the global decoder (for testing only)."""
+        with cls._lock:
+            if cls._instance is not None:
+                cls._instance.shutdown()
+                cls._instance = None
+
+    def position(self) -> float:
+        """Seconds on the shared playback clock."""
+        return self._clock() - self._start
+
+    def register(self, video_path: str, width: int, height: int, on_frame: Callable[[QImage], None],
+                 queue_size: int = DEFAULT_QUEUE_SIZE, active: bool = True) -> VideoLayerStream:
+        """
+        Start decoding a video layer.
+
+        Args:
+            video_path: Video file
+            width: Box the frames are scaled to fit
+            height: Box the frames are scaled to fit
+            on_frame: Called on the GUI thread with each frame to show
+            queue_size: Frames decoded ahead
+            active: Decode and tick right away
+
+        Returns:
+            The stream, for set_active / unregister
+        """
+        stream = VideoLayerStream(video_path, width, height, on_frame, queue_size)
+        stream.active = active
+        self._streams.append(stream)
+        self._schedule(stream)
+        self._update_timer()
+        return stream
+
+    def unregister(self, stream: VideoLayerStream):
+        if stream in self._streams:
+            self._streams.remove(stream)
+        with stream._lock:
+            stream._released = True
+            stream._frames.clear()
+            busy = stream._busy
+        if not busy:
+            stream._release()
+        self._update_timer()
+
+    def set_active(self, stream: VideoLayerStream, active: bool):
+        """Resume or pause decoding of a stream (it rejoins the shared clock on resume)."""
+        if stream.active == active:
+            return
+        stream.active = active
+        if not active:
+            with stream._lock:
+                stream._frames.clear()
+        self._schedule(stream)
+        self._update_timer()
+
+    def tick(self):
+        """Pass the due frame of every active stream to its on_frame and top up the queues."""
+        now = self.position()
+        for stream in list(self._streams):
+            if not stream.active:
+                continue
+            if stream.fps > 0:
+                image = stream._take(int(now * stream.fps))
+                if image is not None:
+                    try:
+                        stream.on_frame(image)
+                    except RuntimeError:
+                        # The layer widget was deleted without unregistering
+                        self.unregister(stream)
+                        continue
+            self._schedule(stream)
+        self._update_timer()
+
+    def shutdown(self):
+        self._timer.stop()
+        for stream in list(self._streams):
+            self.unregister(stream)
+        self._executor.shutdown(wait=False)
+
+    def _schedule(self, stream: VideoLayerStream):
+        with stream._lock:
+            if stream._busy or stream._released or not stream.active or len(stream._frames) >= stream.queue_size:
+                return
+            stream._busy = True
+        self._executor.submit(self._decode, stream)
+
+    def _decode(self, stream: VideoLayerStream):
+        try:
+            stream._decode_ahead(self.position)
+        except Exception as e:
+            logger.error(f"Video layer decoding failed for {stream.video_path}: {e}")
+            stream.active = False
+        finally:
+            with stream._lock:
+                stream._busy = False
+                released = stream._released
+            if released:
+                stream._release()
+
+    def _update_timer(self):
+        """Tick at twice the fastest active frame rate; stop when nothing plays."""
+        rates = [s.fps or 30.0 for s in self._streams if s.active]
+        if not rates:
+            self._timer.stop()
+            return
+        interval = max(5, int(500 / max(rates)))
+        if self._timer.interval() != interval:
+            self._timer.setInterval(interval)
+        if not self._timer.isActive():
+            self._timer.start()
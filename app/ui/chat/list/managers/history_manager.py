@@ -13,7 +13,7 @@ import copy
 import logging
 from typing import Dict, List, Any, Optional, TYPE_CHECKING, Callable
 
-from PySide6.QtCore import QTimer
+from PySide6.QtCore import QObject, QTimer, Signal
 
 from app.ui.chat.list.agent_chat_list_items import LoadState
 from app.ui.workers.background_worker import BackgroundWorker, run_in_background
@@ -26,6 +26,12 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
+class _AppendBridge(QObject):
+    """Carries messages_appended notifications onto the GUI thread."""
+
+    appended = Signal(int, int)  # first_gsn, last_gsn
+
+
 class HistoryManager:
     """Manages history loading and caching for the chat list.
 
@@ -33,7 +39,7 @@ class HistoryManager:
     - History service management and caching
     - Loading recent conversation on startup
     - Loading older messages (pagination)
-    - Loading new messages (via signal/timer)
+    - Loading new messages (pushed via messages_appended)
     - GSN-based message fetching
     - Message pruning (top/bottom)
     - Storage signal handling
@@ -50,7 +56,7 @@ class HistoryManager:
     # Configuration constants
     PAGE_SIZE = 200
     MAX_MODEL_ITEMS = 300
-    NEW_DATA_CHECK_INTERVAL_MS = 500
+    NEW_MESSAGES_FETCH_COUNT = 100
 
     def __init__(
         self,
@@ -74,9 +80,11 @@ class HistoryManager:
         self._load_state = LoadState()
         self._loading_older = False
 
-        # New data check timer
-        self._new_data_check_timer = QTimer()
-        self._new_data_check_timer.timeout.connect(self._check_for_new_data)
+        # Storage notifications arrive on writer/watcher threads; the bridge
+        # queues them onto the thread that owns this manager (GUI thread)
+        self._append_bridge = _AppendBridge()
+        self._append_bridge.appended.connect(self._on_gsn_range_appended)
+        self._watched_notifier = None
 
         # Guard flags for async loads
         self._loading_recent = False
@@ -450,7 +458,8 @@ class HistoryManager:
     def on_project_switched(self) -> None:
         """Handle project switch."""
         self._cancel_background_loads()
-        self._stop_new_data_check_timer()
+        if self._watched_notifier is not None:
+            self._watch_current_project()
         self._load_state = LoadState()
         self._loading_older = False
         self._history = None
@@ -458,97 +467,81 @@ class HistoryManager:
         self.load_recent_conversation()
 
     def connect_to_storage_signals(self) -> None:
-        """Connect to storage signals for storage-driven refresh."""
+        """Subscribe to storage append notifications for push-driven refresh."""
         try:
-            from agent.chat.history.agent_chat_history_service import message_saved
-            message_saved.connect(self._on_message_saved, weak=False)
-            logger.debug("Connected to message_saved signal")
+            from agent.chat.history.history_change_notifier import messages_appended
+            messages_appended.connect(self._on_messages_appended, weak=False)
+            self._watch_current_project()
+            logger.debug("Connected to messages_appended signal")
         except Exception as e:
-            logger.error(f"Error connecting to message_saved signal: {e}")
+            logger.error(f"Error connecting to messages_appended signal: {e}")
 
     def disconnect_from_storage_signals(self) -> None:
-        """Disconnect from storage signals."""
+        """Unsubscribe from storage append notifications."""
         try:
-            from agent.chat.history.agent_chat_history_service import message_saved
-            message_saved.disconnect(self._on_message_saved)
-            logger.debug("Disconnected from message_saved signal")
+            from agent.chat.history.history_change_notifier import messages_appended
+            messages_appended.disconnect(self._on_messages_appended)
+            logger.debug("Disconnected from messages_appended signal")
         except Exception:
             pass  # Signal might not be connected
+        self._unwatch_project()
+
+    def _watch_current_project(self) -> None:
+        """Watch the current project's history for writes from other processes."""
+        self._unwatch_project()
+        try:
+            from agent.chat.history.history_change_notifier import HistoryChangeNotifier
+            notifier = HistoryChangeNotifier.get_notifier(
+                self._workspace.workspace_path,
+                self._workspace.project_name
+            )
+            notifier.start_watching()
+            self._watched_notifier = notifier
+        except Exception as e:
+            logger.warning(f"Could not watch history for changes: {e}")
+
+    def _unwatch_project(self) -> None:
+        """Stop watching the previously watched project's history."""
+        if self._watched_notifier is not None:
+            self._watched_notifier.stop_watching()
+            self._watched_notifier = None
 
-    def _on_message_saved(
+    def _on_messages_appended(
         self,
         sender,
         workspace_path: str,
         project_name: str,
-        message_id: str,
-        gsn: int = 0,
-        current_gsn: int = 0
+        first_gsn: int,
+        last_gsn: int
     ) -> None:
-        """Handle message_saved signal from storage.
+        """Handle messages_appended signal from storage (any thread).
 
         Args:
             sender: Signal sender
             workspace_path: Path to workspace
             project_name: Name of project
-            message_id: ID of the saved message
-            gsn: Global sequence number of the saved message
-            current_gsn: Current (latest) GSN in the system
+            first_gsn: First newly available GSN
+            last_gsn: Last newly available GSN
         """
-        # Only refresh if this message belongs to our current project
+        # Only refresh if the messages belong to our current project
         if (workspace_path == self._workspace.workspace_path and
             project_name == self._workspace.project_name):
-            # Update current GSN tracking
-            if current_gsn > 0:
-                self._load_state.current_gsn = current_gsn
-
-            # Load new messages from storage using GSN-based fetching
-            self._load_new_messages_from_history(gsn, current_gsn)
-
-    def _start_new_data_check_timer(self) -> None:
-        """Start the timer to check for new data."""
-        self._new_data_check_timer.start(self.NEW_DATA_CHECK_INTERVAL_MS)
+            self._append_bridge.appended.emit(first_gsn, last_gsn)
 
-    def _stop_new_data_check_timer(self) -> None:
-        """Stop the new data check timer."""
-        self._new_data_check_timer.stop()
+    def _on_gsn_range_appended(self, first_gsn: int, last_gsn: int) -> None:
+        """Load newly appended messages (GUI thread).
 
-    def _check_for_new_data(self) -> None:
-        """Check for new data by comparing active log count.
-
-        This method is called both by the timer (backup) and by message_saved signal.
-
-        Enhanced with GSN support for archive-aware checking.
+        Args:
+            first_gsn: First newly available GSN
+            last_gsn: Last newly available GSN
         """
-        try:
-            # Try to use GSN-based checking first
-            from agent.chat.history.agent_chat_history_service import FastMessageHistoryService
-
-            current_gsn = FastMessageHistoryService.get_current_gsn(
-                self._workspace.workspace_path,
-                self._workspace.project_name
-            )
-
-            # Check if we have new messages via GSN
-            if current_gsn > self._load_state.current_gsn:
-                self._load_state.current_gsn = current_gsn
-                self._load_new_messages_from_history(current_gsn, current_gsn)
-                return
-
-            # Fallback to legacy line-based checking
-            history = self.get_history()
-            if not history:
-                return
-
-            # Use active log count for fast checking (O(1) cached value)
-            current_count = history.storage.get_message_count()
+        if last_gsn <= self._load_state.last_seen_gsn:
+            return
+        if last_gsn > self._load_state.current_gsn:
+            self._load_state.current_gsn = last_gsn
 
-            # Check if new messages were added to active log
-            if current_count > self._load_state.active_log_count:
-                self._load_state.active_log_count = current_count
-                self._load_new_messages_from_history()
-
-        except Exception as e:
-            logger.error(f"Error checking for new data: {e}")
+        # Load new messages from storage using GSN-based fetching
+        self._load_new_messages_from_history(first_gsn, last_gsn)
 
     def _load_new_messages_from_history(self, trigger_gsn: int = 0, current_gsn: int = 0) -> None:
         """Load new messages from history that aren't in the model yet.
@@ -638,8 +631,19 @@ class HistoryManager:
                     current_offset = self._load_state.current_line_offset
                     self._load_state.current_line_offset = current_offset + len(new_messages)
             else:
-                # GSN tracking
-                self._load_state.last_seen_gsn = current_gsn
+                # GSN tracking: advance to what was actually read, so entries
+                # allocated but not yet written are picked up next time
+                fetched_gsn = max(
+                    (msg.get("metadata", {}).get("gsn", 0) for msg in new_messages),
+                    default=0
+                )
+                self._load_state.last_seen_gsn = max(self._load_state.last_seen_gsn, fetched_gsn)
+                if (len(new_messages) >= self.NEW_MESSAGES_FETCH_COUNT and
+                        self._load_state.last_seen_gsn < current_gsn):
+                    # More than one page arrived; continue after this batch
+                    QTimer.singleShot(
+                        0, lambda: self._load_new_messages_from_history(trigger_gsn, current_gsn)
+                    )
 
             # Update unique message count
             if new_messages:
@@ -679,7 +683,7 @@ class HistoryManager:
                 self._workspace.workspace_path,
                 self._workspace.project_name,
                 last_seen_gsn=last_seen,
-                count=100
+                count=self.NEW_MESSAGES_FETCH_COUNT
             )
 
             logger.debug(f"GSN fetch: last_seen={last_seen}, current={current_gsn}, found={len(new_messages)} messages")
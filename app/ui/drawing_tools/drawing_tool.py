@@ -5,7 +5,7 @@ DrawingTool interface definition
 from abc import ABC, abstractmethod
 from typing import Dict, Any, List, Optional
 from PySide6.QtWidgets import QWidget
-from PySide6.QtCore import QPoint, Qt
+from PySide6.QtCore import QPoint, QRect, Qt
 from PySide6.QtGui import QPixmap, QCursor
 
 from .settings import DrawingSetting
@@ -89,6 +89,32 @@ class DrawingTool(ABC):
         """
         pass
 
+    def paint_bounds(self, start_point: QPoint, end_point: QPoint,
+                     scale_factor: float = 1.0) -> Optional[QRect]:
+        """
+        Area of the original pixmap that paint() with the same arguments may change.
+        Lets the canvas refresh and save only the dirty region of a layer.
+
+        Args:
+            start_point: Starting point of the paint operation (in scaled coordinates)
+            end_point: Ending point of the paint operation (in scaled coordinates)
+            scale_factor: The scale factor for coordinate conversion (default: 1.0)
+
+        Returns:
+            QRect in original coordinates, an empty QRect if paint() draws nothing,
+            or None if unknown (the whole pixmap is treated as changed)
+        """
+        return None
+
+    @staticmethod
+    def stroke_bounds(start_point: QPoint, end_point: QPoint, scale_factor: float,
+                      pen_width: int) -> QRect:
+        """Bounds of a line or shape between two scaled points stroked with pen_width, in original coordinates."""
+        original_start = QPoint(int(start_point.x() / scale_factor), int(start_point.y() / scale_factor))
+        original_end = QPoint(int(end_point.x() / scale_factor), int(end_point.y() / scale_factor))
+        margin = pen_width // 2 + 2  # Half the pen plus antialiasing
+        return QRect(original_start, original_end).normalized().adjusted(-margin, -margin, margin, margin)
+
     @abstractmethod
     def get_cursor(self)->QCursor:
         return Qt.CursorShape.PointingHandCursor
\ No newline at end of file
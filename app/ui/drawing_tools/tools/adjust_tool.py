@@ -4,7 +4,7 @@ Adjust tool implementation
 
 from typing import Dict, Any, List
 from PySide6.QtWidgets import QWidget
-from PySide6.QtCore import QPoint, Qt
+from PySide6.QtCore import QPoint, QRect, Qt
 from PySide6.QtGui import QPixmap, QCursor
 from app.ui.drawing_tools.drawing_tool import DrawingTool
 from app.ui.drawing_tools.settings import DrawingSetting
@@ -47,5 +47,9 @@ class AdjustTool(DrawingTool):
         """
         pass
 
+    def paint_bounds(self, start_point: QPoint, end_point: QPoint,
+                     scale_factor: float = 1.0) -> QRect:
+        return QRect()  # Does not paint
+
     def get_cursor(self) -> QCursor:
         return Qt.CursorShape.CrossCursor
\ No newline at end of file
@@ -115,6 +115,11 @@ class BrushTool(DrawingTool):
         painter.drawLine(original_start, original_end)
         painter.end()
 
+    def paint_bounds(self, start_point: QPoint, end_point: QPoint,
+                     scale_factor: float = 1.0) -> QRect:
+        return self.stroke_bounds(start_point, end_point, scale_factor,
+                                  int(self.config.get('size', 5)))
+
     def get_cursor(self) -> QCursor:
         return self.brush_cursor
 
@@ -4,7 +4,7 @@ Pen tool implementation
 
 from typing import Dict, Any, List
 from PySide6.QtWidgets import QWidget
-from PySide6.QtCore import QPoint, Qt
+from PySide6.QtCore import QPoint, QRect, Qt
 from PySide6.QtGui import QPixmap, QPainter, QPen, QColor, QCursor
 from app.ui.drawing_tools.drawing_tool import DrawingTool
 from app.ui.drawing_tools.settings import DrawingSetting, ColorSetting, SizeSetting
@@ -88,5 +88,10 @@ class PenTool(DrawingTool):
         painter.drawLine(original_start, original_end)
         painter.end()
 
+    def paint_bounds(self, start_point: QPoint, end_point: QPoint,
+                     scale_factor: float = 1.0) -> QRect:
+        return self.stroke_bounds(start_point, end_point, scale_factor,
+                                  int(self.config.get('size', 2)))
+
     def get_cursor(self) -> QCursor:
         return Qt.CursorShape.ArrowCursor
\ No newline at end of file
@@ -3,7 +3,7 @@ Select tool implementation
 """
 
 from typing import Dict, Any, List
-from PySide6.QtCore import QPoint, Qt
+from PySide6.QtCore import QPoint, QRect, Qt
 from PySide6.QtGui import QPixmap, QCursor
 from app.ui.drawing_tools.drawing_tool import DrawingTool
 from app.ui.drawing_tools.settings import DrawingSetting
@@ -46,5 +46,9 @@ class SelectTool(DrawingTool):
         """
         pass
 
+    def paint_bounds(self, start_point: QPoint, end_point: QPoint,
+                     scale_factor: float = 1.0) -> QRect:
+        return QRect()  # Does not paint
+
     def get_cursor(self) -> QCursor:
         return Qt.CursorShape.OpenHandCursor
\ No newline at end of file
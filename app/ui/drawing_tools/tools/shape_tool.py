@@ -117,5 +117,10 @@ class ShapeTool(DrawingTool):
         
         painter.end()
 
+    def paint_bounds(self, start_point: QPoint, end_point: QPoint,
+                     scale_factor: float = 1.0) -> QRect:
+        return self.stroke_bounds(start_point, end_point, scale_factor,
+                                  int(self.config.get('stroke_size', 2)))
+
     def get_cursor(self) -> QCursor:
         return Qt.CursorShape.PointingHandCursor
\ No newline at end of file
@@ -4,7 +4,7 @@ Zoom tool implementation
 
 from typing import Dict, Any, List
 from PySide6.QtWidgets import QWidget
-from PySide6.QtCore import QPoint, Qt
+from PySide6.QtCore import QPoint, QRect, Qt
 from PySide6.QtGui import QPixmap, QCursor, QPainter, QPen
 from app.ui.drawing_tools.drawing_tool import DrawingTool
 from app.ui.drawing_tools.settings import DrawingSetting
@@ -47,6 +47,10 @@ class ZoomTool(DrawingTool):
         """
         pass
 
+    def paint_bounds(self, start_point: QPoint, end_point: QPoint,
+                     scale_factor: float = 1.0) -> QRect:
+        return QRect()  # Does not paint
+
     def get_cursor(self) -> QCursor:
         # Create a custom zoom cursor using a pixmap
         zoom_pixmap = QPixmap(16, 16)
@@ -10,6 +10,7 @@ class FrameBlock(QFrame):
         super().__init__(parent)
         self.frame_index = frame_index
         self._is_selected = False
+        self._drag_index = -1
 
         # 设置固定大小为小方块
         self.setFixedSize(8, 8)
@@ -55,9 +56,20 @@ class FrameBlock(QFrame):
     def mousePressEvent(self, event):
         """处理鼠标点击事件"""
         if event.button() == Qt.MouseButton.LeftButton:
+            self._drag_index = self.frame_index
             self.clicked.emit(self.frame_index)
         super().mousePressEvent(event)
 
+    def mouseMoveEvent(self, event):
+        """按住左键拖动时，依次选中经过的帧块（拖动浏览）"""
+        if event.buttons() & Qt.MouseButton.LeftButton and self.parentWidget():
+            # 鼠标被按下的帧块捕获，需要在容器中查找光标下的帧块
+            target = self.parentWidget().childAt(self.mapToParent(event.position().toPoint()))
+            if isinstance(target, FrameBlock) and target.frame_index != self._drag_index:
+                self._drag_index = target.frame_index
+                target.clicked.emit(target.frame_index)
+        super().mouseMoveEvent(event)
+
 
 class FrameSelectorWidget(QWidget):
     """视频帧选择器组件，显示所有帧的小方块，支持换行"""
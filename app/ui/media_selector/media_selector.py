@@ -4,6 +4,8 @@ from PySide6.QtGui import QPixmap, QDragEnterEvent, QDropEvent, QPainter, QPen,
 import os
 from typing import List, Optional
 
+from app.data.thumbnail_cache import read_scaled_image
+
 
 class MediaSelector(QWidget):
     """
@@ -237,7 +239,10 @@ class MediaPreviewWidget(QWidget):
             self._pixmap = None
             return
             
-        pixmap = QPixmap(self._file_path)
+        # Decode at preview size instead of materialising the full image
+        pixmap = QPixmap.fromImage(read_scaled_image(
+            self._file_path, 2 * (self._base_width - 4), 2 * (self._base_height - 4)
+        ))
         if pixmap.isNull():
             self._pixmap = None
         else:
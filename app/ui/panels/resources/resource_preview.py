@@ -10,6 +10,7 @@ from PySide6.QtCore import Qt, QSize
 from PySide6.QtGui import QPixmap
 
 from app.data.resource import Resource
+from app.data.thumbnail_cache import PANEL, get_thumbnail_cache
 
 logger = logging.getLogger(__name__)
 
@@ -148,7 +149,8 @@ class ResourcePreview(QWidget):
         # Try to load image preview
         if self.current_resource.media_type == 'image' and os.path.exists(resource_path):
             try:
-                pixmap = QPixmap(resource_path)
+                thumbnail = get_thumbnail_cache(self.project_path).load(resource_path, PANEL)
+                pixmap = QPixmap.fromImage(thumbnail)
                 if not pixmap.isNull():
                     # Scale to fit preview area
                     scaled_pixmap = pixmap.scaled(
@@ -1,6 +1,5 @@
 import logging
 import os
-import cv2
 import asyncio
 import threading
 from PySide6.QtWidgets import (
@@ -9,15 +8,17 @@ from PySide6.QtWidgets import (
     QSizePolicy
 )
 from PySide6.QtCore import Qt, QUrl, QTimer, QSize, Signal
-from PySide6.QtGui import QPixmap, QImageReader, QMovie, QKeyEvent
+from PySide6.QtGui import QPixmap, QImage, QImageReader, QMovie, QKeyEvent
 from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
 from PySide6.QtMultimediaWidgets import QVideoWidget
 
+from app.data.frame_cache import DEFAULT_MAX_BYTES, ScrubFrameCache
 from app.data.task import TaskResult
 from app.data.timeline import TimelineItem
 from app.ui.base_widget import BaseTaskWidget
 from app.ui.frame_selector.frame_selector import FrameSelectorWidget
 from app.ui.layers.layers_widget import LayersWidget
+from utils.media_probe import get_media_probe
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +28,7 @@ class MediaPreviewWidget(BaseTaskWidget):
     """
     # 添加信号用于异步加载完成时更新UI
     load_finished = Signal(str, str)  # file_path, load_type
+    scrub_frame_ready = Signal(int, object)  # frame_index, RGB frame (from the scrub decoder thread)
     
     IMAGE_FORMATS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.webm')  # 注意：.webm 可能是视频或动画图片
     VIDEO_FORMATS = ('.mp4', '.avi', '.mov', '.wmv', '.mkv', '.webm')
@@ -48,6 +50,9 @@ class MediaPreviewWidget(BaseTaskWidget):
     # 默认预览分辨率
     DEFAULT_PREVIEW_SIZE = (800, 450)
 
+    # 拖动浏览停止多久后再让播放器跳转到该帧（毫秒）
+    SCRUB_SEEK_DELAY_MS = 150
+
     def __init__(self, workspace):
         super().__init__(workspace)
         self.current_file = None
@@ -56,7 +61,6 @@ class MediaPreviewWidget(BaseTaskWidget):
         self.auto_play_on_load = True  # Flag to control auto-play behavior
         self.video_duration = 0  # Store the video duration for seamless looping
         self.timeline_index = None  # Track current timeline index
-        self.video_capture = None  # OpenCV video capture for frame extraction
         self.total_frames = 0  # Total number of frames in video
         self.video_fps = 0.0  # Video FPS
         self.preview_size = self.DEFAULT_PREVIEW_SIZE  # 当前预览分辨率
@@ -64,6 +68,11 @@ class MediaPreviewWidget(BaseTaskWidget):
         # 异步加载相关变量
         self.load_task = None  # 当前加载任务
         self.load_task_lock = threading.Lock()  # 保护加载任务的锁
+
+        # 拖动浏览（scrub）：帧选择时从内存中的解码帧显示，播放器稍后再跳转
+        self.scrub_cache = None  # ScrubFrameCache of the current video
+        self.scrub_frame_index = -1  # Frame the user is scrubbing to
+        self.is_scrubbing = False  # image_label shows a cached frame instead of video_widget
         
         # ------------------- 创建内部控件 -------------------
         # 用于显示图片的 QLabel
@@ -169,6 +178,13 @@ class MediaPreviewWidget(BaseTaskWidget):
         # GIF 定时器
         self.gif_timer = QTimer(self)
         self.gif_timer.timeout.connect(self._update_gif)
+
+        # 拖动浏览停止后再跳转播放器，避免每次帧选择都 seek
+        self.scrub_seek_timer = QTimer(self)
+        self.scrub_seek_timer.setSingleShot(True)
+        self.scrub_seek_timer.setInterval(self.SCRUB_SEEK_DELAY_MS)
+        self.scrub_seek_timer.timeout.connect(self._seek_to_scrub_frame)
+        self.scrub_frame_ready.connect(self._on_scrub_frame_ready)
         
         
 
@@ -518,23 +534,17 @@ class MediaPreviewWidget(BaseTaskWidget):
         QTimer.singleShot(0, lambda: self.updateGeometry())
     
     def _load_video_frames(self, video_path):
-        """使用OpenCV加载视频帧信息（优化版本以减少闪烁）"""
-        # 释放之前的视频捕获
-        if self.video_capture:
-            self.video_capture.release()
-            self.video_capture = None
+        """加载视频帧信息（通过共享的媒体探测缓存，优化版本以减少闪烁）"""
+        probe = get_media_probe(video_path)
         
-        # 打开视频文件
-        self.video_capture = cv2.VideoCapture(video_path)
-        
-        if not self.video_capture.isOpened():
+        if probe is None:
             logger.error(f"无法打开视频文件: {video_path}")
             # 不隐藏帧选择器，只是不更新
             return
         
         # 获取视频信息
-        self.total_frames = int(self.video_capture.get(cv2.CAP_PROP_FRAME_COUNT))
-        self.video_fps = self.video_capture.get(cv2.CAP_PROP_FPS)
+        self.total_frames = probe.frame_count
+        self.video_fps = probe.fps
         
         if self.total_frames <= 0 or self.video_fps <= 0:
             logger.error(f"无法获取视频帧信息: 总帧数={self.total_frames}, FPS={self.video_fps}")
@@ -544,18 +554,80 @@ class MediaPreviewWidget(BaseTaskWidget):
         # 更新帧选择器（重用现有的帧块以减少闪烁）
         self.frame_selector.load_frames(self.total_frames)
         self.frame_selector.show()
-    
+
+        self._start_scrub_cache(video_path)
+
+    def _start_scrub_cache(self, video_path):
+        """为当前视频启动后台解码的拖动浏览帧缓存"""
+        self._stop_scrub_cache()
+        budget_mb = self.workspace.get_settings().get("rendering.scrub_cache_mb",
+                                                     DEFAULT_MAX_BYTES // (1024 * 1024))
+        self.scrub_cache = ScrubFrameCache(
+            video_path,
+            max_bytes=int(budget_mb) * 1024 * 1024,
+            max_size=self.preview_size,
+            on_frame=self.scrub_frame_ready.emit,
+        )
+        self.scrub_cache.start()
+
+    def _stop_scrub_cache(self):
+        """停止拖动浏览帧缓存并恢复视频显示"""
+        self.scrub_seek_timer.stop()
+        self._leave_scrub_mode()
+        self.scrub_frame_index = -1
+        if self.scrub_cache is not None:
+            stats = self.scrub_cache.stats()
+            logger.debug(f"Scrub cache for {self.scrub_cache.video_path}: hits={stats.hits}, "
+                         f"misses={stats.misses}, hit_rate={stats.hit_rate:.0%}, seeks={stats.seeks}")
+            self.scrub_cache.stop()
+            self.scrub_cache = None
+
+    def _show_scrub_frame(self, frame):
+        """在图片控件中显示缓存的解码帧（RGB numpy 数组）"""
+        height, width = frame.shape[:2]
+        image = QImage(frame.data, width, height, frame.strides[0], QImage.Format.Format_RGB888)
+        pixmap = QPixmap.fromImage(image)  # Copies the pixels; the array may be evicted later
+        if not self.is_scrubbing:
+            self._set_preview_widget_size(self.image_label)
+            self.video_widget.hide()
+            self.image_label.show()
+            self.is_scrubbing = True
+        self.image_label.setPixmap(pixmap.scaled(self.image_label.size(), Qt.AspectRatioMode.KeepAspectRatio,
+                                                 Qt.TransformationMode.FastTransformation))
+
+    def _leave_scrub_mode(self):
+        """切回视频控件显示"""
+        if self.is_scrubbing:
+            self.is_scrubbing = False
+            self.image_label.hide()
+            self.video_widget.show()
+
+    def _on_scrub_frame_ready(self, frame_index, frame):
+        """后台解码出用户正在浏览的帧时显示它"""
+        if frame_index == self.scrub_frame_index and not self.is_playing and self.scrub_cache is not None:
+            self._show_scrub_frame(frame)
+
+    def _seek_to_scrub_frame(self):
+        """拖动浏览停止后让播放器跳转到所选帧"""
+        if self.scrub_frame_index >= 0 and self.video_fps > 0:
+            self.media_player.setPosition(int(round((self.scrub_frame_index / self.video_fps) * 1000)))
+
     def _on_frame_selected(self, frame_index):
         """处理帧选择事件"""
         if self.total_frames <= 0:
             return
         
-        # For videos, handle frame selection with video capture
-        if self.video_capture and self.video_fps > 0 and self.video_widget.isVisible():
-            # For videos, calculate time position and set it
-            position_ms = int(round((frame_index / self.video_fps) * 1000))
-            # 跳转到指定位置 - this ensures more precise timing
-            self.media_player.setPosition(position_ms)
+        # For videos, show the frame from the scrub cache; the player seeks once scrubbing pauses
+        if self.video_fps > 0 and (self.video_widget.isVisible() or self.is_scrubbing):
+            self.scrub_frame_index = frame_index
+            frame = self.scrub_cache.get(frame_index) if self.scrub_cache is not None else None
+            if frame is not None:
+                self._show_scrub_frame(frame)
+            if self.scrub_cache is not None:
+                self.scrub_seek_timer.start()
+            else:
+                # 跳转到指定位置 - this ensures more precise timing
+                self._seek_to_scrub_frame()
         elif self.image_label.isVisible():
             # For images, just ensure the state is paused (no frame jumping needed)
             # The image is always at "frame 0"
@@ -636,6 +708,12 @@ class MediaPreviewWidget(BaseTaskWidget):
 
     def toggle_playback(self):
         """切换播放/暂停"""
+        # Resume from the scrubbed frame in the video widget
+        if self.is_scrubbing:
+            if self.scrub_seek_timer.isActive():
+                self.scrub_seek_timer.stop()
+                self._seek_to_scrub_frame()
+            self._leave_scrub_mode()
         # For videos: toggle actual playback
         if self.video_widget.isVisible() and self.media_player.source().isValid():
             # 使用 is_playing 状态而不是 playbackState，更可靠
@@ -705,6 +783,8 @@ class MediaPreviewWidget(BaseTaskWidget):
 
     def _stop_video(self):
         """停止视频并重置播放器状态"""
+        self._stop_scrub_cache()
+
         # 停止播放
         if self.media_player.isPlaying():
             self.media_player.stop()
@@ -719,11 +799,6 @@ class MediaPreviewWidget(BaseTaskWidget):
         # Reset position to 0
         self.media_player.setPosition(0)
         
-        # 释放视频捕获资源
-        if self.video_capture:
-            self.video_capture.release()
-            self.video_capture = None
-        
         # 清除帧选择器 (only for videos, not for images which have 1 frame)
         self.frame_selector.clear_frames()
         self.frame_selector.hide()
@@ -738,6 +813,8 @@ class MediaPreviewWidget(BaseTaskWidget):
 
     def _stop_video_without_clearing_frames(self):
         """停止视频但不清除帧选择器"""
+        self._stop_scrub_cache()
+
         # 停止播放
         if self.media_player.isPlaying():
             self.media_player.stop()
@@ -752,11 +829,6 @@ class MediaPreviewWidget(BaseTaskWidget):
         # Reset position to 0
         self.media_player.setPosition(0)
         
-        # 释放视频捕获资源
-        if self.video_capture:
-            self.video_capture.release()
-            self.video_capture = None
-        
         # Disable controls since there's no active media
         self.play_pause_btn.setEnabled(False)
         if self.play_pause_btn.text() != "▶":
@@ -827,15 +899,13 @@ class MediaPreviewWidget(BaseTaskWidget):
 
     def _switch_to_image(self, image_path):
         """切换到静态图片（优化版本以防止闪烁）"""
+        self._stop_scrub_cache()
         # 先停止视频播放（如果正在播放）
         if self.video_widget.isVisible():
             # 完全停止视频并清理资源
             if self.media_player.isPlaying():
                 self.media_player.stop()
             self.media_player.setSource(QUrl())  # 清除视频源
-            if self.video_capture:
-                self.video_capture.release()
-                self.video_capture = None
             self.is_playing = False
             self.play_pause_btn.setText("▶")
         
@@ -876,15 +946,13 @@ class MediaPreviewWidget(BaseTaskWidget):
 
     def _switch_to_gif(self, gif_path):
         """切换到GIF动画（优化版本以防止闪烁）"""
+        self._stop_scrub_cache()
         # 先停止视频播放（如果正在播放）
         if self.video_widget.isVisible():
             # 完全停止视频并清理资源
             if self.media_player.isPlaying():
                 self.media_player.stop()
             self.media_player.setSource(QUrl())  # 清除视频源
-            if self.video_capture:
-                self.video_capture.release()
-                self.video_capture = None
             self.is_playing = False
             self.play_pause_btn.setText("▶")
         
@@ -927,9 +995,6 @@ class MediaPreviewWidget(BaseTaskWidget):
         
         # 清除旧视频源
         self.media_player.setSource(QUrl())
-        if self.video_capture:
-            self.video_capture.release()
-            self.video_capture = None
         
         # 加载新视频的帧信息
         self._load_video_frames(video_path)
@@ -143,14 +143,12 @@ class TaskListWidget(BaseTaskWidget):
         self.refresh_tasks()
 
     def load_all_task_dirs(self):
-        # Get all task directories from TaskManager
+        # Get all task IDs (newest first) from the task index
         try:
             if self.task_manager is None:
                 self.all_task_dirs = []
                 return
-            all_task_ids = sorted([task_id for task_id in self.task_manager.tasks.keys() if task_id.isdigit()], 
-                                 key=lambda x: int(x), reverse=True)
-            self.all_task_dirs = all_task_ids
+            self.all_task_dirs = self.task_manager.get_task_ids()
         except Exception as e:
             logger.error(f"读取任务目录失败: {e}")
             self.all_task_dirs = []
@@ -261,52 +259,40 @@ class TaskListWidget(BaseTaskWidget):
         self._tasks_refresh_worker = None
         self._load_more_worker = None
 
-    def _apply_loaded_task_page(self, _loaded: list):
-        """After disk load, ``task_manager.tasks`` is filled on the GUI thread; append one UI page."""
-        all_task_ids = sorted(
-            [task_id for task_id in self.task_manager.tasks.keys() if task_id.isdigit()],
-            key=lambda x: int(x),
-            reverse=True,
-        )
-        self.all_task_dirs = all_task_ids
-        page = self.task_manager.get_all_tasks(self.current_index, self.page_size)
+    def _apply_loaded_task_page(self, task_ids: list, tasks: list):
+        """After a page was read in the background, register its tasks on the GUI thread and show them."""
+        self.all_task_dirs = task_ids
+        page = self.task_manager.adopt_tasks(tasks)
         self.on_tasks_loaded(page)
 
+    def _fetch_task_page(self, reload: bool = False):
+        """Worker function reading the task IDs and the configs of the next page only."""
+        tm = self.task_manager
+        start_index, count = self.current_index, self.page_size
+
+        def fetch():
+            return tm, tm.get_task_ids(), tm.read_task_page(start_index, count, reload=reload)
+
+        return fetch
+
     def load_more_tasks(self):
         if self.loading:
             return
         if self.task_manager is None:
             return
-
-        if self.task_manager.tasks:
-            self.loading = True
-            try:
-                tasks = self.task_manager.get_all_tasks(self.current_index, self.page_size)
-                all_task_ids = sorted(
-                    [task_id for task_id in self.task_manager.tasks.keys() if task_id.isdigit()],
-                    key=lambda x: int(x),
-                    reverse=True,
-                )
-                self.all_task_dirs = all_task_ids
-                self.on_tasks_loaded(tasks)
-            except Exception as e:
-                logger.error(f"加载任务失败: {e}")
-                self.loading = False
-            return
+        if self.current_index and self.current_index >= len(self.all_task_dirs):
+            return  # Every task is listed
 
         self.loading = True
-        tm = self.task_manager
 
-        def fetch():
-            return tm.load_all_tasks_thread_worker()
-
-        def on_finished(loaded):
+        def on_finished(result):
             self._load_more_worker = None
+            tm, task_ids, tasks = result
             try:
-                tm.tasks.clear()
-                for t in loaded:
-                    tm.tasks[t.task_id] = t
-                self._apply_loaded_task_page(loaded)
+                if tm is self.task_manager:
+                    self._apply_loaded_task_page(task_ids, tasks)
+                else:
+                    self.loading = False
             except Exception as e:
                 logger.error(f"加载任务失败: {e}")
                 self.loading = False
@@ -317,7 +303,7 @@ class TaskListWidget(BaseTaskWidget):
             self.loading = False
 
         self._load_more_worker = run_in_background(
-            fetch,
+            self._fetch_task_page(),
             on_finished=on_finished,
             on_error=on_error,
             auto_cleanup=False,
@@ -353,31 +339,17 @@ class TaskListWidget(BaseTaskWidget):
             pass
     
     def populate_initial_tasks(self):
-        """使用已经加载到task_manager中的任务来初始化UI"""
+        """加载第一页任务（只读取任务索引和该页任务的配置）"""
         if self.task_manager is None:
             return
-            
-        # 获取已经加载的任务
-        tasks = list(self.task_manager.tasks.values())
-        # 按ID降序排列（最新的在前）
-        tasks.sort(key=lambda t: int(t.task_id), reverse=True)
-        
-        # 只加载第一页的任务
-        initial_tasks = tasks[:self.page_size]
-        for task in initial_tasks:
-            widget = EnhancedTaskItemWidget(task, self.workspace)
-            widget.clicked.connect(self.on_task_item_clicked)
-            self.scroll_layout.addWidget(widget)
-            self.loaded_tasks[task.task_id] = widget
-
-        self.current_index = len(initial_tasks)
-        self.load_all_task_dirs()
+        self.current_index = 0
+        self.load_more_tasks()
 
     # ========== 新增功能 ==========
 
     @Slot()
     def refresh_tasks(self):
-        """手动刷新：重新加载所有任务"""
+        """手动刷新：重新读取第一页任务"""
         logger.info("手动刷新任务...")
         # Update task manager reference first
         self._update_task_manager_for_current_item()
@@ -388,21 +360,18 @@ class TaskListWidget(BaseTaskWidget):
             return
 
         self._cancel_task_list_workers()
-        tm = self.task_manager
-
-        def fetch():
-            return tm.load_all_tasks_thread_worker()
+        self.loading = True
+        self.current_index = 0
 
-        def on_finished(loaded):
+        def on_finished(result):
             self._tasks_refresh_worker = None
+            tm, task_ids, tasks = result
             try:
-                tm.tasks.clear()
-                for t in loaded:
-                    tm.tasks[t.task_id] = t
+                if tm is not self.task_manager:
+                    self.loading = False
+                    return
                 self.clear_tasks()
-                self.current_index = 0
-                self.load_all_task_dirs()
-                self.load_more_tasks()
+                self._apply_loaded_task_page(task_ids, tasks)
             except Exception as e:
                 logger.error(f"刷新任务失败: {e}")
                 self.loading = False
@@ -413,7 +382,7 @@ class TaskListWidget(BaseTaskWidget):
             self.loading = False
 
         self._tasks_refresh_worker = run_in_background(
-            fetch,
+            self._fetch_task_page(reload=True),
             on_finished=on_finished,
             on_error=on_error,
             auto_cleanup=False,
@@ -9,6 +9,7 @@ from PySide6.QtWidgets import QHBoxLayout, QLabel, QSizePolicy, QVBoxLayout, QWi
 
 from app.data.screen_play import ScreenPlayManager, ScreenPlayScene
 from app.data.story_board import StoryBoardManager
+from app.data.thumbnail_cache import CARD, get_thumbnail_cache, read_scaled_image
 from app.data.workspace import Workspace
 from app.ui.base_widget import BaseWidget
 from app.ui.signals import Signals
@@ -243,11 +244,15 @@ class StoryBoardTimeline(BaseWidget, AsyncDataLoaderMixin):
                     pass
 
     def _load_shot_thumbnail(self, key):
-        """Background thread: disk + QImage only (no QPixmap here)."""
+        """Background thread: cached card thumbnail as QImage (no QPixmap here)."""
         _scene_id, _shot_id, image_path = key
         if not image_path or not os.path.isfile(image_path):
             return None
-        img = QImage(image_path)
+        project = self.workspace.get_project()
+        if project is not None:
+            img = get_thumbnail_cache(project.project_path).load(image_path, CARD)
+        else:
+            img = read_scaled_image(image_path, CARD.width, CARD.height, CARD.cover)
         if img.isNull():
             return None
         return img
@@ -9,6 +9,7 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import QKeyEvent, QPixmap, QImage
 
+from app.data.thumbnail_cache import CARD, get_thumbnail_cache
 from app.data.timeline import TimelineItem
 from app.data.workspace import Workspace
 from app.ui.base_widget import BaseWidget, BaseTaskWidget
@@ -188,11 +189,11 @@ class VideoTimeline(BaseTaskWidget, AsyncDataLoaderMixin):
         return (card_index, path)
 
     def _load_timeline_card_thumbnail(self, key):
-        """Background thread: disk + QImage only (no QPixmap here)."""
+        """Background thread: cached card thumbnail as QImage (no QPixmap here)."""
         _card_index, image_path = key
         if not image_path or not os.path.isfile(image_path):
             return None
-        img = QImage(image_path)
+        img = get_thumbnail_cache(self._timeline.project.project_path).load(image_path, CARD)
         if img.isNull():
             return None
         return img
@@ -300,8 +301,8 @@ class VideoTimeline(BaseTaskWidget, AsyncDataLoaderMixin):
         card = self.cards[timeline_index-1]
         image_path = result.get_image_path()
         if image_path is not None:
-            original_pixmap= QPixmap(image_path)
-            card.setImage(original_pixmap)
+            thumbnail = get_thumbnail_cache(self._timeline.project.project_path).load(image_path, CARD)
+            card.setImage(QPixmap.fromImage(thumbnail))
         return
     
     def add_new_card(self):
@@ -4,17 +4,29 @@ from __future__ import annotations
 
 import asyncio
 import os
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
 from app.ui.core.base_worker import BaseWorker
 
+if TYPE_CHECKING:
+    from utils.export_cache import ExportCache
+    from utils.export_utils import ExportClip
+
 
 class TimelineExportWorker(BaseWorker):
-    """Runs FFmpeg-based export off the UI thread via ``TaskManager``."""
+    """Runs FFmpeg-based export off the UI thread via ``TaskManager``.
+
+    Each output is produced by ``utils.export_utils.export_clips`` (probe,
+    parallel normalise / stream-copy, single concat); item durations come
+    from ``Project.get_item_duration``. Progress messages carry stage timings.
+    Normalised segments are kept in the project's export cache
+    (``utils.export_cache``), so re-exports only encode items that changed.
+    """
 
     def __init__(self, export_params: Dict[str, Any], task_id: Optional[str] = None):
         super().__init__(task_id=task_id, task_type="timeline_export")
         self.export_params = export_params
+        self._cache: Optional["ExportCache"] = None
 
     def execute(self) -> None:
         loop = asyncio.new_event_loop()
@@ -25,7 +37,7 @@ class TimelineExportWorker(BaseWorker):
             loop.close()
 
     async def _async_run(self) -> None:
-        from utils.ffmpeg_utils import images_to_video, merge_videos, ensure_ffmpeg
+        from utils.ffmpeg_utils import ensure_ffmpeg
 
         if not await ensure_ffmpeg():
             raise RuntimeError("FFmpeg is required but could not be installed.")
@@ -35,6 +47,7 @@ class TimelineExportWorker(BaseWorker):
         items_per_video = self.export_params["items_per_video"]
         output_dir = self.export_params["output_dir"]
         fps = self.export_params["fps"]
+        self._cache = self._open_cache(timeline_items)
 
         if export_mode == "all_as_one":
             await self._export_all_as_one(timeline_items, output_dir, fps)
@@ -43,6 +56,49 @@ class TimelineExportWorker(BaseWorker):
         elif export_mode == "individual":
             await self._export_individual(timeline_items, output_dir, fps)
 
+    @staticmethod
+    def _open_cache(timeline_items) -> Optional["ExportCache"]:
+        """Export cache of the project the items belong to."""
+        from utils.export_cache import ExportCache
+
+        if not timeline_items:
+            return None
+        project = getattr(timeline_items[0].timeline, "project", None)
+        project_path = getattr(project, "project_path", None)
+        if not project_path:
+            return None
+        return ExportCache.for_project(project_path)
+
+    @staticmethod
+    def _clip_for_item(item) -> Optional["ExportClip"]:
+        """Media of a timeline item with its duration from the project."""
+        from utils.export_utils import ExportClip
+
+        video_path = item.get_video_path()
+        image_path = item.get_image_path()
+        if video_path and os.path.exists(video_path):
+            media_path = video_path
+        elif image_path and os.path.exists(image_path):
+            media_path = image_path
+        else:
+            return None
+        duration = item.timeline.project.get_item_duration(item.get_index())
+        return ExportClip(media_path, duration)
+
+    async def _export(self, clips, output_path: str, fps: int,
+                      start: int = 0, end: int = 100) -> bool:
+        """Export clips to one file, mapping engine progress into [start, end]."""
+        from utils.export_utils import export_clips
+
+        def progress(percent: int, message: str) -> None:
+            self.report_progress(start + (end - start) * percent // 100, message)
+
+        return await export_clips(
+            clips, output_path, fps=fps,
+            progress=progress, check_cancelled=self.check_cancelled,
+            cache=self._cache,
+        )
+
     def _get_unique_filename(self, base_path: str) -> str:
         if not os.path.exists(base_path):
             return base_path
@@ -60,53 +116,25 @@ class TimelineExportWorker(BaseWorker):
             counter += 1
 
     async def _export_all_as_one(self, timeline_items, output_dir: str, fps: int) -> None:
-        from utils.ffmpeg_utils import images_to_video, merge_videos
-
-        all_media_paths: List[str] = []
+        clips = []
         for item in timeline_items:
             self.check_cancelled()
-            video_path = item.get_video_path()
-            image_path = item.get_image_path()
+            clip = self._clip_for_item(item)
+            if clip:
+                clips.append(clip)
 
-            if video_path and os.path.exists(video_path):
-                all_media_paths.append(video_path)
-            elif image_path and os.path.exists(image_path):
-                all_media_paths.append(image_path)
-
-        if not all_media_paths:
+        if not clips:
             raise RuntimeError("No media items found to export.")
 
         base_output_path = os.path.join(output_dir, "timeline_export_all.mp4")
         output_path = self._get_unique_filename(base_output_path)
 
-        image_extensions = (".png", ".jpg", ".jpeg", ".gif", ".bmp")
-        all_images = all(
-            path.lower().endswith(image_extensions) for path in all_media_paths
-        )
-
-        if all_images:
-            success = await images_to_video(
-                all_media_paths, output_path, duration_per_image=1.0, fps=fps
-            )
-        else:
-            video_paths = [
-                p for p in all_media_paths if not p.lower().endswith(image_extensions)
-            ]
-            if video_paths:
-                success = await merge_videos(video_paths, output_path)
-            else:
-                success = await images_to_video(
-                    all_media_paths, output_path, duration_per_image=1.0, fps=fps
-                )
-
-        if not success:
+        if not await self._export(clips, output_path, fps):
             raise RuntimeError("Failed to create video from timeline items.")
 
     async def _export_grouped(
         self, timeline_items, items_per_video: int, output_dir: str, fps: int
     ) -> None:
-        from utils.ffmpeg_utils import images_to_video, merge_videos
-
         groups = [
             timeline_items[i : i + items_per_video]
             for i in range(0, len(timeline_items), items_per_video)
@@ -115,17 +143,8 @@ class TimelineExportWorker(BaseWorker):
 
         for idx, group in enumerate(groups):
             self.check_cancelled()
-            group_media_paths: List[str] = []
-            for item in group:
-                video_path = item.get_video_path()
-                image_path = item.get_image_path()
-
-                if video_path and os.path.exists(video_path):
-                    group_media_paths.append(video_path)
-                elif image_path and os.path.exists(image_path):
-                    group_media_paths.append(image_path)
-
-            if not group_media_paths:
+            clips = [clip for clip in map(self._clip_for_item, group) if clip]
+            if not clips:
                 continue
 
             base_output_path = os.path.join(
@@ -133,76 +152,33 @@ class TimelineExportWorker(BaseWorker):
             )
             output_path = self._get_unique_filename(base_output_path)
 
-            image_extensions = (".png", ".jpg", ".jpeg", ".gif", ".bmp")
-            all_images = all(
-                path.lower().endswith(image_extensions) for path in group_media_paths
+            success = await self._export(
+                clips, output_path, fps,
+                start=idx * 100 // total_groups,
+                end=(idx + 1) * 100 // total_groups,
             )
-
-            if all_images:
-                success = await images_to_video(
-                    group_media_paths,
-                    output_path,
-                    duration_per_image=1.0,
-                    fps=fps,
-                )
-            else:
-                video_paths = [
-                    p
-                    for p in group_media_paths
-                    if not p.lower().endswith(image_extensions)
-                ]
-                if video_paths:
-                    success = await merge_videos(video_paths, output_path)
-                else:
-                    success = await images_to_video(
-                        group_media_paths,
-                        output_path,
-                        duration_per_image=1.0,
-                        fps=fps,
-                    )
-
             if not success:
                 raise RuntimeError(f"Failed to create video for group {idx + 1}")
 
-            progress = int((idx + 1) / total_groups * 100)
-            self.report_progress(progress)
-
     async def _export_individual(self, timeline_items, output_dir: str, fps: int) -> None:
-        from utils.ffmpeg_utils import images_to_video, merge_videos
-
         total_items = len(timeline_items)
 
         for idx, item in enumerate(timeline_items):
             self.check_cancelled()
-            video_path = item.get_video_path()
-            image_path = item.get_image_path()
-
-            if video_path and os.path.exists(video_path):
-                media_path = video_path
-            elif image_path and os.path.exists(image_path):
-                media_path = image_path
-            else:
+            clip = self._clip_for_item(item)
+            if clip is None:
                 continue
 
-            if media_path.lower().endswith(
-                (".png", ".jpg", ".jpeg", ".gif", ".bmp")
-            ):
-                base_output_path = os.path.join(
-                    output_dir, f"item_{item.get_timeline_index():03d}.mp4"
-                )
-                output_path = self._get_unique_filename(base_output_path)
-                success = await images_to_video(
-                    [media_path], output_path, duration_per_image=2.0, fps=fps
-                )
-            else:
-                base_output_path = os.path.join(
-                    output_dir, f"item_{item.get_timeline_index():03d}_video.mp4"
-                )
-                output_path = self._get_unique_filename(base_output_path)
-                success = await merge_videos([media_path], output_path, codec="copy")
+            suffix = "" if clip.is_image else "_video"
+            base_output_path = os.path.join(
+                output_dir, f"item_{item.get_index():03d}{suffix}.mp4"
+            )
+            output_path = self._get_unique_filename(base_output_path)
 
+            success = await self._export(
+                [clip], output_path, fps,
+                start=idx * 100 // total_items,
+                end=(idx + 1) * 100 // total_items,
+            )
             if not success:
                 raise RuntimeError(f"Failed to process item {idx + 1}")
-
-            progress = int((idx + 1) / total_items * 100)
-            self.report_progress(progress)
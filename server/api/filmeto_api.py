@@ -46,7 +46,8 @@ class FilmetoApi:
 
     async def execute_task_stream(
         self,
-        task: FilmetoTask
+        task: FilmetoTask,
+        priority: int = 0
     ) -> AsyncIterator[Union[TaskProgress, TaskResult]]:
         """
         Execute a task and stream progress updates.
@@ -57,6 +58,7 @@ class FilmetoApi:
 
         Args:
             task: Task to execute
+            priority: Lower values get an execution slot first
 
         Yields:
             TaskProgress: Progress updates during execution
@@ -84,7 +86,7 @@ class FilmetoApi:
                     print(f"Result: {update.status}, files: {update.output_files}")
             ```
         """
-        async for update in self.service.execute_task_stream(task):
+        async for update in self.service.execute_task_stream(task, priority):
             yield update
 
     def validate_task(self, task: FilmetoTask) -> tuple[bool, Optional[str]]:
@@ -112,8 +114,20 @@ class FilmetoApi:
         """
         return await self.service.enqueue_task(task, priority)
 
+    def cancel_task(self, task_id: str) -> bool:
+        """
+        Cancel a task that is still queued.
+
+        Args:
+            task_id: Task identifier
+
+        Returns:
+            True if the task was queued and is now cancelled
+        """
+        return self.service.cancel_task(task_id)
+
     def get_queue_info(self) -> dict:
-        """Return current queue and concurrency status."""
+        """Return current queue (with waiting tasks in order) and concurrency status."""
         return self.service.get_queue_info()
 
     async def get_task_status(self, task_id: str) -> dict:
@@ -5,6 +5,14 @@ Handles processing of different resource input types:
 - Local file paths
 - Remote URLs (download)
 - Base64 encoded data (decode)
+
+Downloads share one connection-pooled session and run at most
+max_parallel_downloads at a time. Concurrent requests for the same URL
+share one download. Data goes to a .part file that is renamed into place
+when complete, so readers never see partial files; an interrupted download
+resumes from the .part file with a Range request when the server's
+validator (ETag / Last-Modified) is known. The cache is kept under
+max_cache_bytes by dropping the least recently used files.
 """
 
 import os
@@ -49,6 +57,13 @@ DEFAULT_MIME_MAP: Dict[str, str] = {
     'audio/x-m4a': '.m4a',
 }
 
+DEFAULT_MAX_CACHE_BYTES = 5 * 1024 * 1024 * 1024  # 5GB
+DEFAULT_MAX_PARALLEL_DOWNLOADS = 4
+DOWNLOAD_CONNECTIONS_PER_HOST = 4
+DOWNLOAD_WRITE_BUFFER = 1024 * 1024  # Bytes collected before a (threaded) file write
+PART_SUFFIX = ".part"
+VALIDATOR_SUFFIX = ".validator"
+
 
 class ResourceProcessor:
     """
@@ -65,6 +80,9 @@ class ResourceProcessor:
                 - max_file_sizes: dict mapping media category ('image', 'video', 'audio')
                   to max bytes
                 - mime_type_map: dict mapping MIME type strings to file extensions
+                - max_cache_bytes: total size of cached files before the least
+                  recently used are deleted
+                - max_parallel_downloads: downloads running at the same time
         """
         if cache_dir:
             self.cache_dir = Path(cache_dir)
@@ -82,6 +100,14 @@ class ResourceProcessor:
             **DEFAULT_MIME_MAP,
             **config.get('mime_type_map', {}),
         }
+        self.max_cache_bytes: int = config.get('max_cache_bytes', DEFAULT_MAX_CACHE_BYTES)
+        self.max_parallel_downloads: int = config.get('max_parallel_downloads', DEFAULT_MAX_PARALLEL_DOWNLOADS)
+
+        # Created on first download, in the loop that runs it
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._download_slots: Optional[asyncio.Semaphore] = None
+        self._downloads: Dict[str, asyncio.Future] = {}
     
     async def process_resource(self, resource: ResourceInput) -> str:
         """
@@ -141,7 +167,8 @@ class ResourceProcessor:
         """
         Download file from remote URL.
         
-        Caches downloaded files to avoid re-downloading.
+        Caches downloaded files to avoid re-downloading; concurrent requests
+        for the same URL share one download.
         """
         url = resource.data
         
@@ -155,55 +182,177 @@ class ResourceProcessor:
         # Return cached file if exists
         if cache_file.exists():
             logger.debug(f"Using cached file for URL: {url}")
+            self._touch(cache_file)
             return str(cache_file)
-        
-        # Download file
-        logger.info(f"Downloading from URL: {url}")
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=300)) as response:
-                    if response.status != 200:
+
+        # Downloads of a closed event loop never finish
+        for path, running in list(self._downloads.items()):
+            if running.get_loop().is_closed():
+                del self._downloads[path]
+
+        download = self._downloads.get(str(cache_file))
+        if download is None:
+            session, slots = await self._get_session()
+            # Another request may have started it while the old session closed
+            download = self._downloads.get(str(cache_file))
+        if download is None:
+            download = asyncio.ensure_future(
+                self._download(url, cache_file, resource.mime_type, session, slots))
+            self._downloads[str(cache_file)] = download
+            download.add_done_callback(lambda _: self._downloads.pop(str(cache_file), None))
+        else:
+            logger.debug(f"Joining running download of URL: {url}")
+        # shield: one caller giving up does not abort the download for the others
+        return await asyncio.shield(download)
+
+    async def _download(self, url: str, cache_file: Path, mime_type: str,
+                        session: aiohttp.ClientSession, slots: asyncio.Semaphore) -> str:
+        """Download a URL into the cache (resuming a previous partial download)."""
+        part_file = cache_file.with_name(cache_file.name + PART_SUFFIX)
+        validator_file = cache_file.with_name(part_file.name + VALIDATOR_SUFFIX)
+
+        async with slots:
+            offset = part_file.stat().st_size if part_file.exists() else 0
+            validator = validator_file.read_text() if offset and validator_file.exists() else None
+            headers = {}
+            if offset and validator:
+                headers = {"Range": f"bytes={offset}-", "If-Range": validator}
+            else:
+                offset = 0
+
+            logger.info(f"Downloading from URL: {url}" + (f" (resuming at {offset} bytes)" if offset else ""))
+            try:
+                async with session.get(url, headers=headers,
+                                       timeout=aiohttp.ClientTimeout(total=300)) as response:
+                    if response.status == 206 and offset:
+                        mode = 'ab'
+                    elif response.status == 200:
+                        mode, offset = 'wb', 0
+                    else:
+                        self._discard_partial(part_file, validator_file)
                         raise ResourceProcessingError(
                             f"Failed to download file: HTTP {response.status}",
                             {"url": url, "status": response.status}
                         )
-                    
+
                     # Check content length
                     content_length = response.headers.get('Content-Length')
                     if content_length:
-                        self._validate_file_size(int(content_length), resource.mime_type)
-                    
-                    # Download to cache file
-                    total_size = 0
-                    with open(cache_file, 'wb') as f:
-                        async for chunk in response.content.iter_chunked(8192):
-                            f.write(chunk)
-                            total_size += len(chunk)
-                            
-                            # Check size during download
-                            self._validate_file_size(total_size, resource.mime_type)
-            
-            logger.info(f"Downloaded {total_size} bytes to {cache_file}")
-            return str(cache_file)
-            
-        except asyncio.TimeoutError:
-            raise ResourceProcessingError(
-                f"Download timeout for URL: {url}",
-                {"url": url}
-            )
-        except aiohttp.ClientError as e:
-            raise ResourceProcessingError(
-                f"Network error downloading file: {str(e)}",
-                {"url": url, "error": str(e)}
-            )
+                        self._validate_file_size(offset + int(content_length), mime_type)
+
+                    new_validator = response.headers.get('ETag') or response.headers.get('Last-Modified')
+                    if new_validator:
+                        validator_file.write_text(new_validator)
+                    elif validator_file.exists():
+                        validator_file.unlink()
+
+                    # Download to the part file; writes go to a worker thread in large blocks
+                    total_size = offset
+                    with open(part_file, mode) as f:
+                        buffer = bytearray()
+                        try:
+                            async for chunk in response.content.iter_chunked(64 * 1024):
+                                buffer += chunk
+                                total_size += len(chunk)
+
+                                # Check size during download
+                                self._validate_file_size(total_size, mime_type)
+                                if len(buffer) >= DOWNLOAD_WRITE_BUFFER:
+                                    await asyncio.to_thread(f.write, bytes(buffer))
+                                    buffer.clear()
+                        finally:
+                            # Also on a dropped connection: a resume continues after these bytes
+                            if buffer:
+                                await asyncio.to_thread(f.write, bytes(buffer))
+
+                os.replace(part_file, cache_file)
+                if validator_file.exists():
+                    validator_file.unlink()
+                logger.info(f"Downloaded {total_size} bytes to {cache_file}")
+                await asyncio.to_thread(self.evict_to_size)
+                return str(cache_file)
+
+            except ResourceProcessingError:
+                # Too large: a resume would fail the same way
+                self._discard_partial(part_file, validator_file)
+                raise
+            except asyncio.TimeoutError:
+                # The part file is kept for a resume
+                raise ResourceProcessingError(
+                    f"Download timeout for URL: {url}",
+                    {"url": url}
+                )
+            except aiohttp.ClientError as e:
+                raise ResourceProcessingError(
+                    f"Network error downloading file: {str(e)}",
+                    {"url": url, "error": str(e)}
+                )
+            except Exception as e:
+                # Clean up partial download
+                self._discard_partial(part_file, validator_file)
+                raise ResourceProcessingError(
+                    f"Failed to download file: {str(e)}",
+                    {"url": url, "error": str(e)}
+                )
+
+    async def _get_session(self):
+        """
+        Shared session and download slots for the running event loop.
+
+        A session belongs to the loop it was created on; on another loop the
+        old session is closed and replaced. The download slots are only
+        replaced while no download is running, so the limit holds.
+        """
+        loop = asyncio.get_running_loop()
+        if self._download_slots is None or not self._downloads:
+            self._download_slots = asyncio.Semaphore(self.max_parallel_downloads)
+
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            stale, stale_loop = self._session, self._session_loop
+            connector = aiohttp.TCPConnector(limit=self.max_parallel_downloads,
+                                             limit_per_host=DOWNLOAD_CONNECTIONS_PER_HOST)
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._session_loop = loop
+            if stale is not None:
+                await self._close_session(stale, stale_loop)
+        return self._session, self._download_slots
+
+    async def close(self):
+        """Close the download session."""
+        session, loop = self._session, self._session_loop
+        self._session = None
+        self._session_loop = None
+        if session is not None:
+            await self._close_session(session, loop)
+
+    @staticmethod
+    async def _close_session(session: aiohttp.ClientSession, loop: Optional[asyncio.AbstractEventLoop]):
+        if session.closed:
+            return
+        if loop is not None and loop.is_running() and loop is not asyncio.get_running_loop():
+            # Still running in another thread: close it there
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+            return
+        try:
+            await session.close()
         except Exception as e:
-            # Clean up partial download
-            if cache_file.exists():
-                cache_file.unlink()
-            raise ResourceProcessingError(
-                f"Failed to download file: {str(e)}",
-                {"url": url, "error": str(e)}
-            )
+            logger.warning(f"Failed to close download session: {e}")
+
+    @staticmethod
+    def _discard_partial(part_file: Path, validator_file: Path):
+        for path in (part_file, validator_file):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def _touch(path: Path):
+        """Mark a cached file as recently used (eviction goes by mtime)."""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
     
     async def _process_base64(self, resource: ResourceInput) -> str:
         """
@@ -235,17 +384,23 @@ class ResourceProcessor:
         # Return cached file if exists
         if cache_file.exists():
             logger.debug("Using cached base64 data")
+            self._touch(cache_file)
             return str(cache_file)
         
-        # Save to file
+        # Save to file (renamed into place once complete)
+        part_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}{PART_SUFFIX}")
         try:
-            with open(cache_file, 'wb') as f:
+            with open(part_file, 'wb') as f:
                 f.write(decoded_data)
+            os.replace(part_file, cache_file)
+            await asyncio.to_thread(self.evict_to_size)
             
             logger.info(f"Decoded {len(decoded_data)} bytes to {cache_file}")
             return str(cache_file)
             
         except Exception as e:
+            if part_file.exists():
+                part_file.unlink()
             raise ResourceProcessingError(
                 f"Failed to save decoded data: {str(e)}",
                 {"error": str(e)}
@@ -298,6 +453,55 @@ class ResourceProcessor:
         
         logger.info(f"Cleaned up {deleted_count} cached files")
     
+    def evict_to_size(self, max_bytes: Optional[int] = None) -> int:
+        """
+        Delete the least recently used cached files until the cache fits.
+
+        Partial downloads count towards the size but are only deleted last.
+
+        Args:
+            max_bytes: Size limit (defaults to max_cache_bytes)
+
+        Returns:
+            Number of deleted files
+        """
+        max_bytes = self.max_cache_bytes if max_bytes is None else max_bytes
+        files = []
+        total_size = 0
+        for cache_file in self.cache_dir.iterdir():
+            try:
+                if cache_file.is_file():
+                    st = cache_file.stat()
+                    partial = PART_SUFFIX in cache_file.name
+                    files.append((partial, st.st_mtime, st.st_size, cache_file))
+                    total_size += st.st_size
+            except OSError:
+                continue
+        if total_size <= max_bytes:
+            return 0
+
+        # Files of running downloads are kept
+        busy = set()
+        for path in list(self._downloads):
+            name = Path(path).name
+            busy.update((name, name + PART_SUFFIX, name + PART_SUFFIX + VALIDATOR_SUFFIX))
+
+        deleted_count = 0
+        for partial, _, size, cache_file in sorted(files):
+            if total_size <= max_bytes:
+                break
+            if cache_file.name in busy:
+                continue
+            try:
+                cache_file.unlink()
+                total_size -= size
+                deleted_count += 1
+            except OSError as e:
+                logger.warning(f"Failed to delete cache file {cache_file}: {e}")
+
+        logger.info(f"Evicted {deleted_count} cached files to fit {max_bytes} bytes")
+        return deleted_count
+
     def get_cache_size(self) -> int:
         """
         Get total size of cached files in bytes.
@@ -138,6 +138,7 @@ class FilmetoTask:
         timeout: Timeout in seconds
         metadata: Additional metadata
         selection: Selection configuration for auto server/model selection
+        use_cache: Reuse the stored result of an identical seeded task
     """
     ability: Ability
     parameters: Dict[str, Any]
@@ -149,6 +150,7 @@ class FilmetoTask:
     timeout: int = 300
     metadata: Dict[str, Any] = field(default_factory=dict)
     selection: Optional[SelectionConfig] = None
+    use_cache: bool = True
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
@@ -159,7 +161,8 @@ class FilmetoTask:
             "resources": [r.to_dict() for r in self.resources],
             "created_at": self.created_at.isoformat(),
             "timeout": self.timeout,
-            "metadata": self.metadata
+            "metadata": self.metadata,
+            "use_cache": self.use_cache,
         }
         if self.server_name:
             result["server_name"] = self.server_name
@@ -196,6 +199,7 @@ class FilmetoTask:
             timeout=data.get("timeout", 300),
             metadata=data.get("metadata", {}),
             selection=selection,
+            use_cache=data.get("use_cache", True),
         )
 
     def get_selection_config(self) -> SelectionConfig:
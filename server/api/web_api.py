@@ -40,6 +40,8 @@ class TaskRequest(BaseModel):
     resources: list = Field(default_factory=list, description="Input resources")
     timeout: int = Field(default=300, description="Timeout in seconds")
     metadata: dict = Field(default_factory=dict, description="Additional metadata")
+    priority: int = Field(default=0, description="Queue priority; lower values run first")
+    use_cache: bool = Field(default=True, description="Reuse the result of an identical seeded task")
 
 
 class TaskResponse(BaseModel):
@@ -373,10 +375,11 @@ async def create_task(task_request: TaskRequest):
             parameters=task_request.parameters,
             resources=[ResourceInput.from_dict(r) for r in task_request.resources],
             timeout=task_request.timeout,
-            metadata=task_request.metadata
+            metadata=task_request.metadata,
+            use_cache=task_request.use_cache
         )
 
-        task_id = await filmeto_api.enqueue_task(task)
+        task_id = await filmeto_api.enqueue_task(task, task_request.priority)
 
         return TaskResponse(
             task_id=task_id,
@@ -412,13 +415,14 @@ async def execute_task_stream(task_request: TaskRequest):
             parameters=task_request.parameters,
             resources=[ResourceInput.from_dict(r) for r in task_request.resources],
             timeout=task_request.timeout,
-            metadata=task_request.metadata
+            metadata=task_request.metadata,
+            use_cache=task_request.use_cache
         )
 
         # Create event generator
         async def event_generator():
             try:
-                async for update in filmeto_api.execute_task_stream(task):
+                async for update in filmeto_api.execute_task_stream(task, task_request.priority):
                     if isinstance(update, TaskProgress):
                         # Send progress update
                         data = update.to_dict()
@@ -490,7 +494,8 @@ async def queue_status():
     Get current task queue and concurrency status.
 
     Returns:
-        Queue info including active/queued counts and capacity
+        Queue info including active/queued counts, capacity and the waiting
+        tasks in the order they will run
     """
     return filmeto_api.get_queue_info()
 
@@ -517,6 +522,22 @@ async def get_task_status(task_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/v1/tasks/{task_id}/cancel")
+async def cancel_task(task_id: str):
+    """
+    Cancel a queued task.
+
+    Args:
+        task_id: Task identifier
+
+    Returns:
+        Cancellation result (409 if the task is not queued)
+    """
+    if not filmeto_api.cancel_task(task_id):
+        raise HTTPException(status_code=409, detail=f"Task {task_id} is not queued")
+    return {"task_id": task_id, "status": "cancelled"}
+
+
 # ---------------------------------------------------------------------------
 # OpenAI-compatible Chat Completion endpoints
 # ---------------------------------------------------------------------------
@@ -5,6 +5,7 @@ Base class for all server-side plugins.
 Handles JSON-RPC communication via stdin/stdout.
 """
 
+import os
 import sys
 import json
 import asyncio
@@ -13,6 +14,19 @@ from abc import ABC, abstractmethod
 from typing import Any, Dict, Callable, Optional, List
 from datetime import datetime
 
+try:
+    from server.plugins import rpc_framing
+except ImportError:
+    # Some plugins load this module by file path (see comfy_ui_server/main.py)
+    import importlib.util
+    from pathlib import Path
+
+    _spec = importlib.util.spec_from_file_location(
+        "rpc_framing", str(Path(__file__).with_name("rpc_framing.py"))
+    )
+    rpc_framing = importlib.util.module_from_spec(_spec)
+    _spec.loader.exec_module(rpc_framing)
+
 logger = logging.getLogger(__name__)
 
 # Default heartbeat interval in seconds
@@ -85,6 +99,9 @@ class BaseServerPlugin(ABC):
         # Async I/O components (initialized in run())
         self._stdin_reader: Optional[asyncio.StreamReader] = None
         self._stdout_writer: Optional[asyncio.StreamWriter] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Wire format; switched to binary after the ready message if offered
+        self._framing = rpc_framing.FRAMING_NDJSON
         self._running = False
         self._active_tasks: Dict[str, asyncio.Task] = {}
 
@@ -271,6 +288,12 @@ class BaseServerPlugin(ABC):
         }
         self._write_message(heartbeat_message)
     
+    def _encode_message(self, message: Dict[str, Any]) -> List[bytes]:
+        """Encode a message for the negotiated wire format."""
+        if self._framing == rpc_framing.FRAMING_BINARY:
+            return rpc_framing.encode_frame(message)
+        return [rpc_framing.encode_ndjson(message)]
+
     def _write_message(self, message: Dict[str, Any]):
         """
         Write JSON message to stdout (synchronous, for backward compatibility).
@@ -278,12 +301,26 @@ class BaseServerPlugin(ABC):
         This method is kept for synchronous contexts like progress callbacks.
         For async contexts, prefer _async_write_message.
 
+        Once async I/O is set up, the line is queued on the shared stdout
+        writer (from any thread) so frames of concurrent tasks never
+        interleave with a partially written one.
+
         Args:
             message: Message dictionary
         """
         try:
-            json_str = json.dumps(message)
-            sys.stdout.write(json_str + '\n')
+            if self._stdout_writer is not None and self._loop is not None:
+                buffers = self._encode_message(message)
+                try:
+                    running_loop = asyncio.get_running_loop()
+                except RuntimeError:
+                    running_loop = None
+                if running_loop is self._loop:
+                    self._stdout_writer.writelines(buffers)
+                else:
+                    self._loop.call_soon_threadsafe(self._stdout_writer.writelines, buffers)
+                return
+            sys.stdout.write(json.dumps(message) + '\n')
             sys.stdout.flush()
         except Exception as e:
             sys.stderr.write(f"Error writing message: {e}\n")
@@ -297,9 +334,8 @@ class BaseServerPlugin(ABC):
             message: Message dictionary
         """
         try:
-            json_str = json.dumps(message)
             if self._stdout_writer:
-                self._stdout_writer.write((json_str + '\n').encode())
+                self._stdout_writer.writelines(self._encode_message(message))
                 await self._stdout_writer.drain()
             else:
                 # Fallback to sync write if writer not initialized
@@ -340,10 +376,12 @@ class BaseServerPlugin(ABC):
         """
         try:
             if self._stdin_reader:
+                if self._framing == rpc_framing.FRAMING_BINARY:
+                    return await rpc_framing.read_frame(self._stdin_reader)
                 line = await self._stdin_reader.readline()
                 if not line:
                     return None
-                return json.loads(line.decode().strip())
+                return rpc_framing.decode_ndjson(line)
             else:
                 # Fallback to sync read if reader not initialized
                 return self._read_message()
@@ -497,9 +535,10 @@ class BaseServerPlugin(ABC):
         async def setup_async_io():
             """Setup async stdin/stdout streams."""
             loop = asyncio.get_event_loop()
+            self._loop = loop
 
             # Setup stdin reader
-            self._stdin_reader = asyncio.StreamReader()
+            self._stdin_reader = asyncio.StreamReader(limit=rpc_framing.NDJSON_LINE_LIMIT)
             stdin_protocol = asyncio.StreamReaderProtocol(self._stdin_reader)
             await loop.connect_read_pipe(lambda: stdin_protocol, sys.stdin)
 
@@ -519,8 +558,14 @@ class BaseServerPlugin(ABC):
                 "method": "ready",
                 "params": self.get_plugin_info()
             }
+            binary = os.environ.get(rpc_framing.FRAMING_ENV) == rpc_framing.FRAMING_BINARY
+            if binary:
+                ready_message["framing"] = rpc_framing.FRAMING_BINARY
+            # The ready message itself always goes out as NDJSON
             await self._async_write_message(ready_message)
-            logger.info(f"Plugin {self.__class__.__name__} ready")
+            if binary:
+                self._framing = rpc_framing.FRAMING_BINARY
+            logger.info(f"Plugin {self.__class__.__name__} ready (framing: {self._framing})")
 
         async def read_loop():
             """Read and process requests from stdin."""
@@ -565,9 +610,9 @@ class BaseServerPlugin(ABC):
                 try:
                     await asyncio.sleep(self.heartbeat_interval)
 
-                    # Only send heartbeat when not executing a task
+                    # Only send heartbeat when not executing any task
                     # (task execution sends its own progress/heartbeats)
-                    if self.current_task_id is None:
+                    if not self._active_tasks:
                         heartbeat_message = {
                             "jsonrpc": "2.0",
                             "method": "heartbeat",
@@ -11,10 +11,11 @@ import json
 import time
 import yaml
 import asyncio
+import itertools
 import subprocess
 import logging
 from pathlib import Path
-from typing import Dict, Optional, Any, AsyncIterator, List
+from typing import Dict, Optional, Any, AsyncIterator, List, Set
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
@@ -22,9 +23,17 @@ logger = logging.getLogger(__name__)
 _DEFAULT_HEALTH_CHECK_INTERVAL = 30   # seconds between checks
 _DEFAULT_HEARTBEAT_TIMEOUT = 90       # seconds before declaring unhealthy
 _DEFAULT_MAX_RESTARTS = 3
+_DEFAULT_MAX_CONCURRENT_TASKS = 4     # in-flight execute_task requests per process
+_PING_TIMEOUT = 5.0
+_DEFAULT_POOL_SIZE = 1                # worker processes per plugin
+_DEFAULT_WARM_SPARES = 0              # pre-started idle processes per plugin
 
 from server.api.types import FilmetoTask, TaskProgress, TaskResult, ProgressType
 from server.api.types import ServerNotFoundError, ServerExecutionError
+from server.plugins.rpc_framing import (
+    FRAMING_ENV, FRAMING_NDJSON, FRAMING_BINARY, NDJSON_LINE_LIMIT,
+    encode_frame, read_frame, encode_ndjson, decode_ndjson,
+)
 
 
 class PluginExecutionError(Exception):
@@ -99,6 +108,16 @@ def abilities_from_plugin_yml(
 class PluginProcess:
     """
     Manages a single plugin process and communication.
+
+    Several tasks can be in flight on one process: every request gets its
+    own JSON-RPC id, and a single demultiplexer task reads plugin stdout and
+    routes each frame to the queue of the request it belongs to (responses by
+    ``id``, progress/heartbeat frames by ``params.task_id``). The number of
+    concurrent ``execute_task`` requests is capped by
+    ``execution.max_concurrent_tasks`` in plugin.yml.
+
+    Frames are NDJSON until the plugin accepts binary framing in its ready
+    message (see rpc_framing); ``startup.framing: ndjson`` opts out.
     """
     
     def __init__(self, plugin_info: ServerInfo):
@@ -107,6 +126,22 @@ class PluginProcess:
         self.is_ready = False
         self._read_lock = asyncio.Lock()
 
+        # Request multiplexing state
+        exec_cfg = plugin_info.config.get("execution", {})
+        if not isinstance(exec_cfg, dict):
+            exec_cfg = {}
+        self.max_concurrent_tasks: int = max(1, int(exec_cfg.get(
+            "max_concurrent_tasks", _DEFAULT_MAX_CONCURRENT_TASKS
+        )))
+        self._task_slots = asyncio.Semaphore(self.max_concurrent_tasks)
+        self._request_ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Queue] = {}
+        # Requests holding a task slot; task_id -> request id only routes notifications
+        self._slot_requests: Set[int] = set()
+        self._task_requests: Dict[str, int] = {}
+        self._waiting_for_slot: int = 0
+        self._reader_task: Optional[asyncio.Task] = None
+
         # Health check state
         startup_cfg = plugin_info.config.get("startup", {})
         self._health_check_interval: int = startup_cfg.get(
@@ -121,7 +156,10 @@ class PluginProcess:
 
         self._last_heartbeat: float = 0.0
         self._restart_count: int = 0
-        self._is_executing: bool = False
+        # Wire format: offered via env at spawn, confirmed by the ready message
+        self._framing_offer: str = startup_cfg.get("framing", FRAMING_BINARY) \
+            if isinstance(startup_cfg, dict) else FRAMING_BINARY
+        self.framing: str = FRAMING_NDJSON
         self._health_check_task: Optional[asyncio.Task] = None
         self._on_restart_callback = None
     
@@ -133,6 +171,21 @@ class PluginProcess:
             and self.process.returncode is None
         )
 
+    @property
+    def in_flight(self) -> int:
+        """Number of execute_task requests awaiting their result."""
+        return len(self._slot_requests)
+
+    @property
+    def load(self) -> int:
+        """Outstanding tasks: in flight plus waiting for a concurrency slot."""
+        return len(self._slot_requests) + self._waiting_for_slot
+
+    @property
+    def pid(self) -> Optional[int]:
+        """OS process id, or None if not running."""
+        return self.process.pid if self.process is not None else None
+
     @property
     def is_healthy(self) -> bool:
         """True if alive and heartbeat is recent enough."""
@@ -161,6 +214,9 @@ class PluginProcess:
         
         try:
             python_exe = sys.executable
+            env = dict(os.environ)
+            env[FRAMING_ENV] = self._framing_offer
+            self.framing = FRAMING_NDJSON
             
             self.process = await asyncio.create_subprocess_exec(
                 python_exe,
@@ -168,7 +224,9 @@ class PluginProcess:
                 stdin=asyncio.subprocess.PIPE,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
-                cwd=str(self.plugin_info.plugin_path)
+                cwd=str(self.plugin_info.plugin_path),
+                env=env,
+                limit=NDJSON_LINE_LIMIT
             )
             
             ready_timeout = self.plugin_info.config.get("startup", {}).get("timeout", 60)
@@ -179,9 +237,15 @@ class PluginProcess:
                 )
                 
                 if ready_msg and ready_msg.get("method") == "ready":
+                    if (self._framing_offer == FRAMING_BINARY
+                            and ready_msg.get("framing") == FRAMING_BINARY):
+                        self.framing = FRAMING_BINARY
                     self.is_ready = True
                     self.record_heartbeat()
-                    logger.info(f"Plugin {self.plugin_info.name} is ready")
+                    self._reader_task = asyncio.create_task(self._demux_loop())
+                    logger.info(
+                        f"Plugin {self.plugin_info.name} is ready (framing: {self.framing})"
+                    )
                 else:
                     raise PluginExecutionError(
                         f"Plugin {self.plugin_info.name} did not send ready message",
@@ -213,58 +277,135 @@ class PluginProcess:
                 {"plugin": self.plugin_info.name, "error": str(e)}
             )
     
-    async def send_task(self, task: FilmetoTask):
+    async def send_task(self, task: FilmetoTask) -> int:
         """
         Send task to plugin.
-        
+
+        Waits for a free concurrency slot first. The slot is released when
+        ``receive_messages`` for the returned request id finishes, so every
+        call must be paired with one ``receive_messages(request_id)``.
+
         Args:
             task: Task to execute
+
+        Returns:
+            JSON-RPC request id to pass to ``receive_messages``
         """
         if not self.is_ready:
             raise PluginExecutionError(
                 f"Plugin {self.plugin_info.name} is not ready",
                 {"plugin": self.plugin_info.name}
             )
-        
-        self._is_executing = True
+
+        self._waiting_for_slot += 1
+        try:
+            await self._task_slots.acquire()
+        finally:
+            self._waiting_for_slot -= 1
+        request_id = self._open_request()
+        self._slot_requests.add(request_id)
+        self._task_requests[task.task_id] = request_id
 
         request = {
             "jsonrpc": "2.0",
             "method": "execute_task",
             "params": task.to_dict(),
-            "id": 1
+            "id": request_id
         }
-        
-        await self._write_message(request)
-    
-    async def receive_messages(self) -> AsyncIterator[Dict[str, Any]]:
+
+        try:
+            await self._write_message(request)
+        except Exception:
+            self._close_request(request_id)
+            raise
+
+        if self._reader_task is None or self._reader_task.done():
+            # Nothing will ever answer; end the stream immediately
+            self._pending[request_id].put_nowait(None)
+        return request_id
+
+    async def receive_messages(self, request_id: int) -> AsyncIterator[Dict[str, Any]]:
         """
-        Receive messages from plugin.
-        
+        Receive messages from plugin for one request.
+
+        Args:
+            request_id: Id returned by ``send_task``
+
         Yields:
-            Message dictionaries (progress, result, heartbeat)
+            Message dictionaries (progress, heartbeat, then the result)
         """
+        queue = self._pending.get(request_id)
+        try:
+            while queue is not None:
+                message = await queue.get()
+                if message is None:
+                    # Process exited or was stopped
+                    break
+
+                yield message
+
+                if message.get("id") == request_id:
+                    break
+        finally:
+            self._close_request(request_id)
+
+    def _open_request(self) -> int:
+        """Allocate a request id and its message queue."""
+        request_id = next(self._request_ids)
+        self._pending[request_id] = asyncio.Queue()
+        return request_id
+
+    def _close_request(self, request_id: int):
+        """Drop a request's routing state and release its task slot, if any."""
+        self._pending.pop(request_id, None)
+        if request_id in self._slot_requests:
+            self._slot_requests.discard(request_id)
+            self._task_slots.release()
+        for task_id, rid in list(self._task_requests.items()):
+            if rid == request_id:
+                del self._task_requests[task_id]
+                break
+
+    async def _demux_loop(self):
+        """Read plugin stdout and route each frame to its request's queue."""
         try:
             while True:
-                try:
-                    message = await self._read_message()
-                    if message is None:
+                message = await self._read_message()
+                if message is None:
+                    if self.process is None or self.process.stdout is None \
+                            or self.process.stdout.at_eof():
+                        break
+                    if self.framing == FRAMING_BINARY:
+                        # A bad frame leaves the stream unsynchronised
+                        logger.error(f"Corrupt frame from plugin {self.plugin_info.name}")
                         break
+                    continue  # Malformed line; keep reading
 
-                    if message.get("method") == "heartbeat":
-                        self.record_heartbeat()
+                # Any frame proves the process is alive
+                self.record_heartbeat()
 
-                    yield message
-                    
-                    if message.get("result") and "status" in message.get("result", {}):
-                        break
-                        
-                except Exception as e:
-                    logger.error(f"Error receiving message from plugin: {e}")
-                    break
+                request_id = message.get("id")
+                if request_id is None or "method" in message:
+                    params = message.get("params") or {}
+                    request_id = self._task_requests.get(params.get("task_id"))
+
+                queue = self._pending.get(request_id)
+                if queue is not None:
+                    queue.put_nowait(message)
+                elif message.get("method") != "heartbeat":
+                    logger.debug(
+                        f"Dropping unroutable message from plugin {self.plugin_info.name}: "
+                        f"{message.get('method') or message.get('id')}"
+                    )
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Error receiving message from plugin: {e}")
         finally:
-            self._is_executing = False
-    
+            # Wake up every waiter; their streams end here
+            for queue in self._pending.values():
+                queue.put_nowait(None)
+
     async def ping(self) -> bool:
         """
         Ping the plugin to check if it's alive.
@@ -275,26 +416,31 @@ class PluginProcess:
         if not self.is_ready:
             return False
         
+        request_id = self._open_request()
         try:
             request = {
                 "jsonrpc": "2.0",
                 "method": "ping",
                 "params": {},
-                "id": 999
+                "id": request_id
             }
             
             await self._write_message(request)
             
             # Wait for response with timeout
-            response = await asyncio.wait_for(self._read_message(), timeout=5.0)
+            response = await asyncio.wait_for(
+                self._pending[request_id].get(), timeout=_PING_TIMEOUT
+            )
             
-            alive = response and response.get("result", {}).get("status") == "pong"
+            alive = bool(response) and response.get("result", {}).get("status") == "pong"
             if alive:
                 self.record_heartbeat()
             return alive
             
         except Exception:
             return False
+        finally:
+            self._close_request(request_id)
     
     async def _health_check_loop(self):
         """Periodically verify the plugin is alive. Only pings when idle."""
@@ -306,10 +452,9 @@ class PluginProcess:
                 if not self.is_alive:
                     break
 
-                # During task execution, rely on heartbeat messages from the
-                # plugin instead of sending a ping (which would conflict with
-                # the task message stream on stdout).
-                if self._is_executing:
+                # During task execution, rely on frames from the plugin
+                # instead of pinging: a busy plugin may answer pings late.
+                if self.in_flight:
                     if self._last_heartbeat and (
                         time.time() - self._last_heartbeat > self._heartbeat_timeout
                     ):
@@ -363,6 +508,14 @@ class PluginProcess:
                 pass
             self._health_check_task = None
 
+        if self._reader_task and not self._reader_task.done():
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except asyncio.CancelledError:
+                pass
+        self._reader_task = None
+
         if self.process:
             try:
                 if self.process.returncode is None:
@@ -377,7 +530,6 @@ class PluginProcess:
             self.process = None
         
         self.is_ready = False
-        self._is_executing = False
     
     async def _write_message(self, message: Dict[str, Any]):
         """Write JSON message to plugin stdin"""
@@ -388,8 +540,10 @@ class PluginProcess:
             )
         
         try:
-            json_str = json.dumps(message) + '\n'
-            self.process.stdin.write(json_str.encode())
+            if self.framing == FRAMING_BINARY:
+                self.process.stdin.writelines(encode_frame(message))
+            else:
+                self.process.stdin.write(encode_ndjson(message))
             await self.process.stdin.drain()
         except Exception as e:
             raise PluginExecutionError(
@@ -398,17 +552,20 @@ class PluginProcess:
             )
     
     async def _read_message(self) -> Optional[Dict[str, Any]]:
-        """Read JSON message from plugin stdout"""
+        """Read one message from plugin stdout (binary frame or NDJSON line)"""
         if not self.process or not self.process.stdout:
             return None
 
         async with self._read_lock:
             try:
+                if self.framing == FRAMING_BINARY:
+                    return await read_frame(self.process.stdout)
+
                 line = await self.process.stdout.readline()
                 if not line:
                     return None
 
-                return json.loads(line.decode().strip())
+                return decode_ndjson(line)
             except json.JSONDecodeError as e:
                 logger.error(f"Error parsing JSON from plugin: {e}")
                 return None
@@ -420,6 +577,178 @@ class PluginProcess:
         return f"PluginProcess({self.plugin_info.name}, ready={self.is_ready})"
 
 
+class PluginPool:
+    """
+    Pool of worker processes for one plugin.
+
+    ``acquire()`` dispatches to the healthy worker with the fewest
+    outstanding tasks. Workers are added lazily (up to ``pool_size``) when
+    every worker is at its concurrency cap. With ``warm_spares`` > 0, that
+    many extra processes are started ahead of time and idle until they
+    replace a dead/unhealthy worker or the pool grows, avoiding a cold start
+    (interpreter + plugin imports) on the dispatch path.
+
+    Sizes come from the ``execution`` section of plugin.yml
+    (``pool_size``, ``warm_spares``).
+    """
+
+    def __init__(self, plugin_info: ServerInfo):
+        self.plugin_info = plugin_info
+
+        exec_cfg = plugin_info.config.get("execution", {})
+        if not isinstance(exec_cfg, dict):
+            exec_cfg = {}
+        self.pool_size: int = max(1, int(exec_cfg.get("pool_size", _DEFAULT_POOL_SIZE)))
+        self.warm_spares: int = max(0, int(exec_cfg.get("warm_spares", _DEFAULT_WARM_SPARES)))
+
+        self.workers: List[PluginProcess] = []
+        self.spares: List[PluginProcess] = []
+        self._spawn_lock = asyncio.Lock()
+        self._spare_task: Optional[asyncio.Task] = None
+        self._stopping: Set[asyncio.Task] = set()
+        self._dispatched: int = 0
+        self._recycled: int = 0
+        self._cold_starts: int = 0
+
+    async def acquire(self) -> PluginProcess:
+        """
+        Pick the worker for the next task.
+
+        Returns:
+            A ready PluginProcess (the least loaded healthy worker)
+
+        Raises:
+            PluginExecutionError: If no worker could be started
+        """
+        self._recycle_unhealthy()
+
+        worker = self._least_loaded()
+        if worker is None or (
+            worker.load >= worker.max_concurrent_tasks and len(self.workers) < self.pool_size
+        ):
+            async with self._spawn_lock:
+                # Re-check: another caller may have added a worker meanwhile
+                self._recycle_unhealthy()
+                worker = self._least_loaded()
+                if worker is None or (
+                    worker.load >= worker.max_concurrent_tasks
+                    and len(self.workers) < self.pool_size
+                ):
+                    worker = await self._add_worker()
+
+        self._ensure_spares()
+        self._dispatched += 1
+        return worker
+
+    def _least_loaded(self) -> Optional[PluginProcess]:
+        """Healthy worker with the fewest outstanding tasks (oldest wins ties)."""
+        healthy = [w for w in self.workers if w.is_alive and w.is_healthy]
+        if not healthy:
+            return None
+        return min(healthy, key=lambda w: w.load)
+
+    def _recycle_unhealthy(self):
+        """Drop dead/unhealthy workers and idle spares (stopped in the background)."""
+        for group in (self.workers, self.spares):
+            for proc in [p for p in group if not (p.is_alive and p.is_healthy)]:
+                # A worker mid-restart keeps its tasks; only recycle idle ones
+                if group is self.workers and proc.load and proc.is_alive:
+                    continue
+                group.remove(proc)
+                self._recycled += 1
+                logger.warning(
+                    f"Recycling plugin {self.plugin_info.name} process "
+                    f"(alive={proc.is_alive}, healthy={proc.is_healthy})"
+                )
+                self._stop_in_background(proc)
+
+    def _stop_in_background(self, proc: PluginProcess):
+        """Stop a process without waiting; stop() awaits any still running."""
+        stop_task = asyncio.create_task(proc.stop())
+        self._stopping.add(stop_task)
+        stop_task.add_done_callback(self._stopping.discard)
+
+    async def _add_worker(self) -> PluginProcess:
+        """Promote a warm spare, or cold-start a new worker."""
+        while self.spares:
+            spare = self.spares.pop(0)
+            if spare.is_alive and spare.is_healthy:
+                self.workers.append(spare)
+                return spare
+            self._stop_in_background(spare)
+
+        worker = PluginProcess(self.plugin_info)
+        self._cold_starts += 1
+        await worker.start()
+        self.workers.append(worker)
+        return worker
+
+    def _ensure_spares(self):
+        """Top up warm spares in the background."""
+        if self.warm_spares <= 0 or len(self.spares) >= self.warm_spares:
+            return
+        if self._spare_task is None or self._spare_task.done():
+            self._spare_task = asyncio.create_task(self._fill_spares())
+
+    async def _fill_spares(self):
+        """Start processes until warm_spares are ready."""
+        while len(self.spares) < self.warm_spares:
+            spare = PluginProcess(self.plugin_info)
+            try:
+                await spare.start()
+            except PluginExecutionError as e:
+                logger.error(f"Failed to start warm spare for {self.plugin_info.name}: {e}")
+                return
+            self.spares.append(spare)
+
+    async def stop(self):
+        """Stop all workers and spares, including those being recycled."""
+        if self._spare_task and not self._spare_task.done():
+            self._spare_task.cancel()
+            try:
+                await self._spare_task
+            except asyncio.CancelledError:
+                pass
+        self._spare_task = None
+
+        procs = self.workers + self.spares
+        self.workers = []
+        self.spares = []
+        for proc in procs:
+            await proc.stop()
+        if self._stopping:
+            await asyncio.gather(*self._stopping, return_exceptions=True)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Pool status for observability."""
+        return {
+            "pool_size": self.pool_size,
+            "warm_spares": self.warm_spares,
+            "ready_spares": len(self.spares),
+            "dispatched": self._dispatched,
+            "cold_starts": self._cold_starts,
+            "recycled": self._recycled,
+            "workers": [
+                {
+                    "pid": w.pid,
+                    "load": w.load,
+                    "in_flight": w.in_flight,
+                    "max_concurrent_tasks": w.max_concurrent_tasks,
+                    "healthy": w.is_alive and w.is_healthy,
+                    "restarts": w._restart_count,
+                }
+                for w in self.workers
+            ],
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"PluginPool({self.plugin_info.name}, workers={len(self.workers)}, "
+            f"spares={len(self.spares)})"
+        )
+
+
 class PluginManager:
     """
     Manages multiple plugin processes.
@@ -438,7 +767,7 @@ class PluginManager:
             # Default to server/plugins directory
             self.plugins_dir = Path(__file__).parent
         
-        self.plugins: Dict[str, PluginProcess] = {}
+        self.plugins: Dict[str, PluginPool] = {}
         self.plugin_infos: Dict[str, ServerInfo] = {}
     
     def discover_plugins(self):
@@ -533,10 +862,11 @@ class PluginManager:
     
     async def get_plugin(self, plugin_name: str) -> PluginProcess:
         """
-        Get or start a plugin process.
+        Get a plugin worker process for the next task.
 
-        If the cached process has died or is unhealthy it is recycled
-        transparently before being returned.
+        Dispatches through the plugin's PluginPool: the least loaded healthy
+        worker is returned, dead or unhealthy workers are recycled
+        transparently, and warm spares replace them without a cold start.
         
         Args:
             plugin_name: Name of the plugin
@@ -545,32 +875,26 @@ class PluginManager:
             PluginProcess instance
         
         Raises:
-            PluginNotFoundError: If plugin not found
+            ServerNotFoundError: If plugin not found
             PluginExecutionError: If plugin fails to start
         """
-        if plugin_name in self.plugins:
-            plugin = self.plugins[plugin_name]
-            if plugin.is_alive and plugin.is_healthy:
-                return plugin
-            # Process died or is unhealthy — clean up and re-create.
-            logger.warning(
-                f"Plugin {plugin_name} is not healthy "
-                f"(alive={plugin.is_alive}, healthy={plugin.is_healthy}), "
-                "recycling"
-            )
-            await plugin.stop()
-            del self.plugins[plugin_name]
-        
-        if plugin_name not in self.plugin_infos:
-            raise PluginNotFoundError(plugin_name)
-        
-        plugin_info = self.plugin_infos[plugin_name]
-        
-        plugin = PluginProcess(plugin_info)
-        await plugin.start()
-        
-        self.plugins[plugin_name] = plugin
-        return plugin
+        pool = self.plugins.get(plugin_name)
+        if pool is None:
+            if plugin_name not in self.plugin_infos:
+                raise ServerNotFoundError(plugin_name)
+            pool = PluginPool(self.plugin_infos[plugin_name])
+            self.plugins[plugin_name] = pool
+
+        return await pool.acquire()
+
+    def get_pool_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get worker pool status for every started plugin.
+
+        Returns:
+            Mapping of plugin name to PluginPool.stats
+        """
+        return {name: pool.stats for name, pool in self.plugins.items()}
     
     async def stop_plugin(self, plugin_name: str):
         """
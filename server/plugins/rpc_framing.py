@@ -0,0 +1,75 @@
+"""
+Plugin JSON-RPC Framing
+
+Wire formats for messages between PluginProcess (service side) and
+BaseServerPlugin (plugin side):
+
+- ndjson (default / fallback): one ``json.dumps`` line per message.
+- binary (negotiated): length-prefixed frames::
+
+      >I  body length (bytes of UTF-8 JSON)
+      body JSON
+
+  The reader knows each frame's size up front, so large messages (long
+  prompts, big results) are read with one ``readexactly`` instead of being
+  scanned for a newline, and there is no line-length limit to hit.
+
+Messages are plain JSON in both formats. Resources and outputs travel as
+file paths (see ResourceProcessor), not as bytes, so there are no binary
+attachments.
+
+Negotiation: the service starts the plugin with FRAMING_ENV set to
+``binary``. A plugin that supports it adds ``"framing": "binary"`` to its
+``ready`` message (always sent as NDJSON) and both sides switch to binary
+framing for every later message. Plugins that don't answer stay on NDJSON.
+"""
+
+import json
+import struct
+import asyncio
+from typing import Any, Dict, List, Optional
+
+FRAMING_ENV = "FILMETO_RPC_FRAMING"
+FRAMING_NDJSON = "ndjson"
+FRAMING_BINARY = "binary"
+
+# StreamReader limit for NDJSON lines (default asyncio limit is 64 KiB)
+NDJSON_LINE_LIMIT = 256 * 1024 * 1024
+
+_PREFIX = struct.Struct(">I")
+
+
+def encode_frame(message: Dict[str, Any]) -> List[bytes]:
+    """
+    Encode a message as a binary frame.
+
+    Returns:
+        Buffers to write in order (length prefix, JSON body)
+    """
+    body = json.dumps(message).encode()
+    return [_PREFIX.pack(len(body)), body]
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+    """
+    Read one binary frame.
+
+    Returns:
+        Decoded message, or None on EOF
+    """
+    try:
+        prefix = await reader.readexactly(_PREFIX.size)
+    except asyncio.IncompleteReadError:
+        return None
+    (body_len,) = _PREFIX.unpack(prefix)
+    return json.loads(await reader.readexactly(body_len))
+
+
+def encode_ndjson(message: Dict[str, Any]) -> bytes:
+    """Encode a message as one NDJSON line."""
+    return (json.dumps(message) + "\n").encode()
+
+
+def decode_ndjson(line: bytes) -> Dict[str, Any]:
+    """Decode one NDJSON line produced by encode_ndjson."""
+    return json.loads(line)
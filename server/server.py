@@ -350,11 +350,11 @@ class Server:
             task.metadata["workspace_path"] = str(self.workspace_path)
             task.metadata["server_name"] = self.config.name
         
-        # Send task to plugin
-        await plugin.send_task(task)
+        # Send task to plugin (waits for a free concurrency slot)
+        request_id = await plugin.send_task(task)
         
-        # Receive and yield messages
-        async for message in plugin.receive_messages():
+        # Receive and yield messages routed to this request
+        async for message in plugin.receive_messages(request_id):
             yield message
     
     def __repr__(self) -> str:
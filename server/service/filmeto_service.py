@@ -22,6 +22,8 @@ from server.api.types import (
 )
 from server.api.resource_processor import ResourceProcessor
 from server.plugins.plugin_manager import PluginManager
+from server.service.result_cache import DEFAULT_MAX_BYTES, DEFAULT_TTL, ResultCache, is_deterministic
+from server.service.task_scheduler import DuplicateTaskError, TaskCancelledError, TaskScheduler
 from utils.logging_utils import TaskMetrics
 
 logger = structlog.get_logger(__name__)
@@ -60,53 +62,17 @@ class TaskStatusStore:
         return dict(entry)
 
 
-class TaskQueue:
-    """Semaphore-based concurrency limiter with observability."""
-
-    def __init__(self, max_concurrent: int = 5):
-        self._semaphore = asyncio.Semaphore(max_concurrent)
-        self._max_concurrent = max_concurrent
-        self._active_tasks: Dict[str, float] = {}
-        self._queued_count = 0
-        self._lock = asyncio.Lock()
-
-    async def acquire(self, task_id: str):
-        """Acquire a concurrency slot. Blocks if at capacity."""
-        async with self._lock:
-            self._queued_count += 1
-        try:
-            await self._semaphore.acquire()
-        finally:
-            async with self._lock:
-                self._queued_count -= 1
-                self._active_tasks[task_id] = time.time()
-
-    def release(self, task_id: str):
-        """Release a concurrency slot."""
-        self._active_tasks.pop(task_id, None)
-        self._semaphore.release()
-
-    @property
-    def info(self) -> dict:
-        return {
-            "max_concurrent": self._max_concurrent,
-            "active_count": len(self._active_tasks),
-            "queued_count": self._queued_count,
-            "active_task_ids": list(self._active_tasks.keys()),
-        }
-
-    @property
-    def is_at_capacity(self) -> bool:
-        return len(self._active_tasks) >= self._max_concurrent
-
-
 class FilmetoService:
     """
     Service layer managing plugin lifecycle and task execution.
     """
 
     def __init__(self, plugins_dir: str = None, cache_dir: str = None,
-                 workspace_path: str = None, max_concurrent_tasks: int = 5):
+                 workspace_path: str = None, max_concurrent_tasks: int = 5,
+                 ability_limits: Optional[Dict[str, int]] = None,
+                 server_limits: Optional[Dict[str, int]] = None,
+                 result_cache_max_bytes: int = DEFAULT_MAX_BYTES,
+                 result_cache_ttl: float = DEFAULT_TTL):
         """
         Initialize Filmeto service.
 
@@ -115,6 +81,10 @@ class FilmetoService:
             cache_dir: Directory for resource caching
             workspace_path: Path to workspace directory
             max_concurrent_tasks: Maximum number of tasks executing concurrently
+            ability_limits: Maximum concurrently executing tasks per ability name
+            server_limits: Maximum concurrently executing tasks per server name
+            result_cache_max_bytes: Maximum size of cached task outputs
+            result_cache_ttl: Seconds a cached task result stays valid
         """
         # Determine workspace path
         if workspace_path:
@@ -130,9 +100,18 @@ class FilmetoService:
         self.plugin_manager = PluginManager(plugins_dir)
         self.server_manager = ServerManager(str(self.workspace_path), self.plugin_manager)
         self.resource_processor = ResourceProcessor(cache_dir)
+        self.result_cache = ResultCache(
+            str(self.resource_processor.cache_dir / "results"),
+            max_bytes=result_cache_max_bytes,
+            ttl=result_cache_ttl,
+        )
         self.heartbeat_interval = 5  # seconds
         self._task_store = TaskStatusStore()
-        self._task_queue = TaskQueue(max_concurrent=max_concurrent_tasks)
+        self._task_queue = TaskScheduler(
+            max_concurrent=max_concurrent_tasks,
+            ability_limits=ability_limits,
+            server_limits=server_limits,
+        )
         self._background_tasks: Dict[str, asyncio.Task] = {}
 
         # Lazy initialization for selection service to avoid circular import
@@ -151,13 +130,93 @@ class FilmetoService:
 
     async def execute_task_stream(
         self,
-        task: FilmetoTask
+        task: FilmetoTask,
+        priority: int = 0
     ) -> AsyncIterator[Union[TaskProgress, TaskResult]]:
         """
         Execute task through appropriate server with streaming.
 
+        Seeded tasks go through the result cache: an identical task that
+        already succeeded returns its stored outputs, and identical tasks
+        submitted at the same time share one execution.
+
         Args:
             task: Task to execute
+            priority: Lower values get an execution slot first
+
+        Yields:
+            TaskProgress: Progress updates during execution
+            TaskResult: Final result (last item)
+        """
+        if not task.use_cache or not is_deterministic(task):
+            async for update in self._execute_task_stream(task, priority):
+                yield update
+            return
+
+        start_time = datetime.now()
+        if not task.server_name:
+            self._resolve_task_selection(task)
+        key = await self.result_cache.key_for(task)
+        cached = await self.result_cache.get(key)
+        leader = False
+        if cached is None:
+            leader = self.result_cache.begin(key)
+            if not leader:
+                self._task_store.set(task.task_id, "queued", priority=priority,
+                                     message="Waiting for an identical task...")
+                yield TaskProgress(
+                    task_id=task.task_id,
+                    type=ProgressType.STARTED,
+                    percent=0,
+                    message="Waiting for an identical task..."
+                )
+                cached = await self.result_cache.wait(key)
+                if cached is None:
+                    # The identical task failed; run this one
+                    leader = self.result_cache.begin(key)
+
+        if cached is not None:
+            yield self._cached_result(task, cached, start_time)
+            return
+
+        final_result = None
+        try:
+            async for update in self._execute_task_stream(task, priority):
+                if isinstance(update, TaskResult):
+                    final_result = update
+                yield update
+        finally:
+            if leader:
+                self.result_cache.finish(key, final_result)
+
+    def _cached_result(self, task: FilmetoTask, cached: TaskResult, start_time: datetime) -> TaskResult:
+        """Turn a cached result into the result of this task."""
+        cached.metadata = {**cached.metadata, "cache_hit": True, "cached_task_id": cached.task_id}
+        cached.task_id = task.task_id
+        cached.execution_time = (datetime.now() - start_time).total_seconds()
+        self._task_store.set(
+            task.task_id, cached.status,
+            percent=100,
+            output_files=cached.output_files,
+            error_message=cached.error_message,
+            execution_time=cached.execution_time,
+            cache_hit=True,
+        )
+        logger.bind(task_id=task.task_id, ability=task.ability.value,
+                    server=task.server_name).info("task_cache_hit", cached_task_id=cached.metadata["cached_task_id"])
+        return cached
+
+    async def _execute_task_stream(
+        self,
+        task: FilmetoTask,
+        priority: int = 0
+    ) -> AsyncIterator[Union[TaskProgress, TaskResult]]:
+        """
+        Execute task through appropriate server with streaming (no result cache).
+
+        Args:
+            task: Task to execute
+            priority: Lower values get an execution slot first
 
         Yields:
             TaskProgress: Progress updates during execution
@@ -189,13 +248,19 @@ class FilmetoService:
             self._task_store.set(task.task_id, "error", error_message=error_msg)
             log.warning("task_validation_failed", error=error_msg)
             raise ValidationError(error_msg, {"task_id": task.task_id})
+        if self._task_queue.is_waiting(task.task_id) or self._task_queue.is_running(task.task_id):
+            # The status entry belongs to the task already using this id
+            log.warning("task_id_in_use")
+            raise ValidationError(f"Task {task.task_id} is already queued or running",
+                                  {"task_id": task.task_id})
 
         log.info("task_accepted")
 
         # Wait for a concurrency slot
         if self._task_queue.is_at_capacity:
-            self._task_store.set(task.task_id, "queued", message="Waiting for available slot...")
-            log.info("task_queued")
+            self._task_store.set(task.task_id, "queued", priority=priority,
+                                 message="Waiting for available slot...")
+            log.info("task_queued", priority=priority)
             yield TaskProgress(
                 task_id=task.task_id,
                 type=ProgressType.STARTED,
@@ -203,7 +268,25 @@ class FilmetoService:
                 message="Queued, waiting for available slot..."
             )
 
-        await self._task_queue.acquire(task.task_id)
+        try:
+            await self._task_queue.acquire(
+                task.task_id, priority=priority,
+                ability=task.ability.value, server=task.server_name,
+            )
+        except DuplicateTaskError as e:
+            # Same id queued while this task was reporting its queued state
+            log.warning("task_id_in_use")
+            raise ValidationError(str(e), {"task_id": task.task_id})
+        except TaskCancelledError as e:
+            self._task_store.set(task.task_id, "cancelled", message=str(e))
+            log.info("task_cancelled")
+            yield TaskResult(
+                task_id=task.task_id,
+                status="cancelled",
+                error_message=str(e),
+                execution_time=(datetime.now() - start_time).total_seconds()
+            )
+            return
         metrics.mark("queue_wait")
         
         self._task_store.set(task.task_id, "running", percent=0, message="Starting...")
@@ -425,7 +508,7 @@ class FilmetoService:
 
         Args:
             task: Task to execute
-            priority: Lower values run first (unused for now, reserved for future priority queue)
+            priority: Lower values run first (FIFO within the same priority)
 
         Returns:
             task_id for status polling
@@ -435,11 +518,12 @@ class FilmetoService:
             self._task_store.set(task.task_id, "error", error_message=error_msg)
             raise ValidationError(error_msg, {"task_id": task.task_id})
 
-        self._task_store.set(task.task_id, "queued", message="Enqueued for background execution")
+        self._task_store.set(task.task_id, "queued", priority=priority,
+                             message="Enqueued for background execution")
 
         async def _run_background():
             try:
-                async for _ in self.execute_task_stream(task):
+                async for _ in self.execute_task_stream(task, priority):
                     pass
             except Exception as e:
                 logger.error(f"Background task {task.task_id} failed: {e}")
@@ -450,10 +534,32 @@ class FilmetoService:
         self._background_tasks[task.task_id] = bg_task
         return task.task_id
 
+    def cancel_task(self, task_id: str) -> bool:
+        """
+        Cancel a task that is still queued (running tasks are not interrupted).
+
+        Args:
+            task_id: Task identifier
+
+        Returns:
+            True if the task was queued and is now cancelled
+        """
+        if self._task_queue.cancel(task_id):
+            return True
+        # Enqueued in the background but not yet waiting for a slot
+        bg_task = self._background_tasks.get(task_id)
+        if bg_task is not None and not bg_task.done() and not self._task_queue.is_running(task_id):
+            bg_task.cancel()
+            self._task_store.set(task_id, "cancelled", message=f"Task {task_id} was cancelled while queued")
+            return True
+        return False
+
     def get_queue_info(self) -> dict:
-        """Return current queue and concurrency status."""
+        """Return current queue, concurrency, result cache and plugin worker pool status."""
         info = self._task_queue.info
         info["background_task_count"] = len(self._background_tasks)
+        info["result_cache"] = self.result_cache.stats()
+        info["plugin_pools"] = self.plugin_manager.get_pool_stats()
         return info
 
     async def get_task_status(self, task_id: str) -> dict:
@@ -464,11 +570,14 @@ class FilmetoService:
             task_id: Task identifier
             
         Returns:
-            Task status dictionary
+            Task status dictionary (with queue_position while waiting for a slot)
         """
         entry = self._task_store.get(task_id)
         if entry is None:
             return {"task_id": task_id, "status": "not_found"}
+        position = self._task_queue.position(task_id)
+        if position is not None:
+            entry["queue_position"] = position
         return entry
     
     def list_plugins(self) -> list:
@@ -579,5 +688,6 @@ class FilmetoService:
 
         await self.plugin_manager.stop_all_plugins()
         self.resource_processor.cleanup_cache()
+        await self.resource_processor.close()
 
 
@@ -0,0 +1,298 @@
+"""
+Result Cache
+
+Content-addressed cache of task results. Identical deterministic tasks (a
+retried storyboard, a re-run plan) return the stored outputs instead of
+running the model again:
+
+    key = sha256(ability, server, model, parameters, input resource hashes)
+
+- Only seeded tasks are cached (parameters["seed"] >= 0); without a seed the
+  same request is expected to produce a new result
+- Only successful results are stored; their output files are hard-linked
+  (or copied) into the cache so later cleanup of the originals does not break hits
+- Concurrent identical tasks are single-flighted: the first one runs, the
+  others wait for its result
+- Storage is bounded by total size and age; the least recently used results
+  are dropped first
+- Tasks opt out with FilmetoTask.use_cache = False
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from server.api.types import FilmetoTask, ResourceType, TaskResult
+
+logger = logging.getLogger(__name__)
+
+KEY_VERSION = 1
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 2 GB
+DEFAULT_TTL = 7 * 24 * 3600  # seconds
+RESULT_FILE = "result.json"
+MAX_FILE_HASHES = 4096  # Remembered input file digests
+_HASH_CHUNK = 1024 * 1024
+
+
+def is_deterministic(task: FilmetoTask) -> bool:
+    """Whether the task asks for a reproducible result (a fixed, non-negative seed)."""
+    seed = task.parameters.get("seed")
+    return isinstance(seed, int) and not isinstance(seed, bool) and seed >= 0
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class _CacheEntry:
+    size: int
+    created_at: float
+    last_access: float
+    result: dict
+
+
+class ResultCache:
+    """
+    On-disk cache of task results keyed by task content.
+
+    Usage:
+        key = await cache.key_for(task)
+        cached = await cache.get(key)
+        ...
+        if not cache.begin(key):       # an identical task is running
+            cached = await cache.wait(key)
+        cache.finish(key, result)      # stores successes, wakes waiters
+
+    get/put do file I/O and run on worker threads; begin/wait/finish must be
+    called on the event loop thread.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES, ttl: float = DEFAULT_TTL):
+        """
+        Args:
+            cache_dir: Directory holding one sub-directory per cached result
+            max_bytes: Maximum total size of cached output files
+            ttl: Seconds a result stays valid after it was stored
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, _CacheEntry] = {}
+        self._total_bytes = 0
+        self._file_hashes: Dict[Tuple[str, int, int], str] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stores: Set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+        self._load()
+
+    # Keys ---------------------------------------------------------------
+
+    async def key_for(self, task: FilmetoTask) -> str:
+        """Canonical hash of everything that determines the task's output."""
+        resources = await asyncio.to_thread(self._resource_digests, task)
+        payload = {
+            "v": KEY_VERSION,
+            "ability": task.ability.value,
+            "server": task.server_name,
+            "model": task.model_name,
+            "parameters": task.parameters,
+            "resources": resources,
+        }
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _resource_digests(self, task: FilmetoTask) -> List[str]:
+        digests = []
+        for resource in task.resources:
+            if resource.type == ResourceType.LOCAL_PATH:
+                digests.append(self._local_file_digest(resource.data))
+            else:
+                # Base64 data is its own content; a remote URL is assumed to be stable
+                digests.append(hashlib.sha256(resource.data.encode("utf-8")).hexdigest())
+        return digests
+
+    def _local_file_digest(self, path: str) -> str:
+        path = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return f"missing:{path}"
+        stamp = (path, st.st_mtime_ns, st.st_size)
+        digest = self._file_hashes.get(stamp)
+        if digest is None:
+            digest = _hash_file(path)
+            if len(self._file_hashes) >= MAX_FILE_HASHES:
+                self._file_hashes.clear()
+            self._file_hashes[stamp] = digest
+        return digest
+
+    # Storage ------------------------------------------------------------
+
+    async def get(self, key: str) -> Optional[TaskResult]:
+        """Stored result for a key, or None (expired or missing files count as a miss)."""
+        return await asyncio.to_thread(self._get, key)
+
+    def _get(self, key: str) -> Optional[TaskResult]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            valid = entry is not None and now - entry.created_at <= self.ttl
+            if valid:
+                valid = all(os.path.exists(p) for p in entry.result.get("output_files", []))
+            if not valid:
+                self.misses += 1
+                if entry is not None:
+                    self._remove(key)
+                return None
+            self.hits += 1
+            entry.last_access = now
+            result = json.loads(json.dumps(entry.result))
+        return TaskResult.from_dict(result)
+
+    async def put(self, key: str, result: TaskResult):
+        """Store a successful result (its output files are linked into the cache)."""
+        await asyncio.to_thread(self._put, key, result)
+
+    def _put(self, key: str, result: TaskResult):
+        if result.status != "success":
+            return
+        entry_dir = self.cache_dir / key
+        tmp_dir = self.cache_dir / f"{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            tmp_dir.mkdir(parents=True, exist_ok=True)
+            moved: Dict[str, str] = {}
+            size = 0
+            for i, src in enumerate(result.output_files):
+                dst = tmp_dir / f"{i}_{os.path.basename(src)}"
+                try:
+                    os.link(src, dst)
+                except OSError:
+                    shutil.copy2(src, dst)
+                moved[src] = str(entry_dir / dst.name)
+                size += dst.stat().st_size
+
+            data = result.to_dict()
+            data["output_files"] = [moved[p] for p in result.output_files]
+            for resource in data["output_resources"]:
+                resource["path"] = moved.get(resource["path"], resource["path"])
+            now = time.time()
+            data["metadata"] = {**data.get("metadata", {}), "cached_at": now}
+            with open(tmp_dir / RESULT_FILE, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, default=str)
+
+            with self._lock:
+                self._remove(key)
+                os.replace(tmp_dir, entry_dir)
+                self._entries[key] = _CacheEntry(size, now, now, data)
+                self._total_bytes += size
+                self._evict()
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Failed to cache result of task {result.task_id}: {e}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def _load(self):
+        """Index the results stored by earlier runs."""
+        for entry_dir in self.cache_dir.iterdir():
+            result_path = entry_dir / RESULT_FILE
+            if entry_dir.name.endswith(".tmp"):
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                continue
+            try:
+                with open(result_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                size = sum(os.path.getsize(p) for p in data.get("output_files", []))
+                created = data.get("metadata", {}).get("cached_at", result_path.stat().st_mtime)
+            except (OSError, ValueError):
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                continue
+            self._entries[entry_dir.name] = _CacheEntry(size, created, created, data)
+            self._total_bytes += size
+        with self._lock:
+            self._evict()
+
+    def _evict(self):
+        now = time.time()
+        for key in [k for k, e in self._entries.items() if now - e.created_at > self.ttl]:
+            self._remove(key)
+        if self._total_bytes <= self.max_bytes:
+            return
+        for key in sorted(self._entries, key=lambda k: self._entries[k].last_access):
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._remove(key)
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry.size
+        shutil.rmtree(self.cache_dir / key, ignore_errors=True)
+
+    # Single flight ------------------------------------------------------
+
+    def begin(self, key: str) -> bool:
+        """
+        Claim a key for execution.
+
+        Returns:
+            False if an identical task is already running (wait() for its result)
+        """
+        if key in self._inflight:
+            return False
+        self._inflight[key] = asyncio.get_running_loop().create_future()
+        return True
+
+    async def wait(self, key: str) -> Optional[TaskResult]:
+        """Result of the running identical task (None if it failed or is not running)."""
+        future = self._inflight.get(key)
+        if future is None:
+            return None
+        result = await asyncio.shield(future)
+        # Each waiter gets its own copy to turn into its result
+        return TaskResult.from_dict(result.to_dict()) if result is not None else None
+
+    def finish(self, key: str, result: Optional[TaskResult]):
+        """Hand the result to waiting identical tasks and store it if it succeeded."""
+        future = self._inflight.get(key)
+        if future is not None and not future.done():
+            future.set_result(result if result is not None and result.status == "success" else None)
+        if result is None or result.status != "success":
+            self._inflight.pop(key, None)
+            return
+
+        async def store():
+            try:
+                await self.put(key, result)
+            finally:
+                # Kept until stored, so identical tasks arriving meanwhile still share this run
+                self._inflight.pop(key, None)
+
+        store_task = asyncio.get_running_loop().create_task(store())
+        self._stores.add(store_task)
+        store_task.add_done_callback(self._stores.discard)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "inflight": len(self._inflight),
+            }
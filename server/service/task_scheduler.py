@@ -0,0 +1,209 @@
+"""
+Task Scheduler
+
+Priority admission of tasks to execution slots (replaces the plain semaphore
+in front of task execution).
+
+- Lower priority values run first; FIFO within a priority level
+- Waiting tasks age: every aging_interval seconds of waiting counts as one
+  priority level, so a long batch cannot starve low-priority work forever
+- Optional concurrency limits per ability and per server on top of the
+  global limit; a task blocked by its limit does not hold up tasks behind it
+- Queued tasks can be cancelled and report their queue position
+- Task ids are unique: acquiring an id that is already queued or running
+  raises DuplicateTaskError
+"""
+
+import asyncio
+import itertools
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_AGING_INTERVAL = 30.0  # seconds of waiting per priority level
+
+
+class TaskCancelledError(Exception):
+    """Raised by TaskScheduler.acquire when the queued task was cancelled."""
+
+    def __init__(self, task_id: str):
+        super().__init__(f"Task {task_id} was cancelled while queued")
+        self.task_id = task_id
+
+
+class DuplicateTaskError(Exception):
+    """Raised by TaskScheduler.acquire when the task id is already queued or running."""
+
+    def __init__(self, task_id: str):
+        super().__init__(f"Task {task_id} is already queued or running")
+        self.task_id = task_id
+
+
+@dataclass
+class _Entry:
+    task_id: str
+    priority: int
+    ability: Optional[str]
+    server: Optional[str]
+    seq: int
+    enqueued_at: float
+    future: Optional[asyncio.Future] = field(default=None, repr=False)
+    started_at: float = 0.0
+
+
+class TaskScheduler:
+    """
+    Priority queue of tasks waiting for an execution slot.
+
+    Usage:
+        await scheduler.acquire(task_id, priority=0, ability="text2image", server="comfy")
+        try:
+            ...
+        finally:
+            scheduler.release(task_id)
+
+    All methods must be called on the event loop thread.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 5,
+        ability_limits: Optional[Dict[str, int]] = None,
+        server_limits: Optional[Dict[str, int]] = None,
+        aging_interval: float = DEFAULT_AGING_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            max_concurrent: Maximum number of tasks running at once
+            ability_limits: Maximum running tasks per ability name
+            server_limits: Maximum running tasks per server name
+            aging_interval: Seconds of waiting that raise a task by one priority level
+                (0 disables aging)
+            clock: Time source (for tests)
+        """
+        self._max_concurrent = max_concurrent
+        self._ability_limits = dict(ability_limits or {})
+        self._server_limits = dict(server_limits or {})
+        self._aging_interval = aging_interval
+        self._clock = clock
+        self._seq = itertools.count()
+        self._waiting: Dict[str, _Entry] = {}
+        self._active: Dict[str, _Entry] = {}
+        self._active_by_ability: Counter = Counter()
+        self._active_by_server: Counter = Counter()
+
+    async def acquire(self, task_id: str, priority: int = 0,
+                      ability: Optional[str] = None, server: Optional[str] = None):
+        """
+        Wait for an execution slot.
+
+        Raises:
+            TaskCancelledError: The task was cancelled while queued
+            DuplicateTaskError: A task with this id is already queued or running
+        """
+        if task_id in self._waiting or task_id in self._active:
+            raise DuplicateTaskError(task_id)
+        entry = _Entry(task_id, priority, ability, server, next(self._seq), self._clock())
+        entry.future = asyncio.get_running_loop().create_future()
+        self._waiting[task_id] = entry
+        self._dispatch()
+        try:
+            await entry.future
+        except asyncio.CancelledError:
+            if task_id in self._active:
+                # Granted in the same tick the waiter was cancelled
+                self.release(task_id)
+            else:
+                self._waiting.pop(task_id, None)
+            raise
+
+    def release(self, task_id: str):
+        """Free the slot of a running task and start the next waiting tasks."""
+        entry = self._active.pop(task_id, None)
+        if entry is None:
+            return
+        self._active_by_ability[entry.ability] -= 1
+        self._active_by_server[entry.server] -= 1
+        self._dispatch()
+
+    def cancel(self, task_id: str) -> bool:
+        """
+        Remove a waiting task from the queue; its acquire raises TaskCancelledError.
+
+        Returns:
+            True if the task was waiting (running tasks are not affected)
+        """
+        entry = self._waiting.pop(task_id, None)
+        if entry is None:
+            return False
+        if not entry.future.done():
+            entry.future.set_exception(TaskCancelledError(task_id))
+        self._dispatch()
+        return True
+
+    def position(self, task_id: str) -> Optional[int]:
+        """1-based position of a waiting task in the queue, None if it is not waiting."""
+        if task_id not in self._waiting:
+            return None
+        return [e.task_id for e in self._ordered()].index(task_id) + 1
+
+    def is_waiting(self, task_id: str) -> bool:
+        return task_id in self._waiting
+
+    def is_running(self, task_id: str) -> bool:
+        return task_id in self._active
+
+    @property
+    def info(self) -> dict:
+        return {
+            "max_concurrent": self._max_concurrent,
+            "active_count": len(self._active),
+            "queued_count": len(self._waiting),
+            "active_task_ids": list(self._active.keys()),
+            "queued": [
+                {"task_id": e.task_id, "position": i + 1, "priority": e.priority,
+                 "effective_priority": self._effective_priority(e), "ability": e.ability,
+                 "server": e.server, "waiting_seconds": round(self._clock() - e.enqueued_at, 3)}
+                for i, e in enumerate(self._ordered())
+            ],
+            "ability_limits": dict(self._ability_limits),
+            "server_limits": dict(self._server_limits),
+        }
+
+    @property
+    def is_at_capacity(self) -> bool:
+        return len(self._active) >= self._max_concurrent
+
+    def _effective_priority(self, entry: _Entry) -> int:
+        if self._aging_interval <= 0:
+            return entry.priority
+        return entry.priority - int((self._clock() - entry.enqueued_at) / self._aging_interval)
+
+    def _ordered(self) -> List[_Entry]:
+        return sorted(self._waiting.values(), key=lambda e: (self._effective_priority(e), e.seq))
+
+    def _fits_limits(self, entry: _Entry) -> bool:
+        limit = self._ability_limits.get(entry.ability)
+        if limit is not None and self._active_by_ability[entry.ability] >= limit:
+            return False
+        limit = self._server_limits.get(entry.server)
+        if limit is not None and self._active_by_server[entry.server] >= limit:
+            return False
+        return True
+
+    def _dispatch(self):
+        """Start waiting tasks, best first, while slots are free."""
+        while self._waiting and not self.is_at_capacity:
+            entry = next((e for e in self._ordered() if self._fits_limits(e)), None)
+            if entry is None:
+                return
+            del self._waiting[entry.task_id]
+            if entry.future.done():
+                continue  # Waiter already gone
+            entry.started_at = self._clock()
+            self._active[entry.task_id] = entry
+            self._active_by_ability[entry.ability] += 1
+            self._active_by_server[entry.server] += 1
+            entry.future.set_result(None)
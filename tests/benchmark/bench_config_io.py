@@ -0,0 +1,116 @@
+"""
+Benchmark per-call latency of YAML/JSON config reads and writes.
+
+Compares the direct I/O path (libyaml when available, one synchronous call,
+atomic write) with the previous path: run_coroutine_blocking around an
+aiofiles read/write plus a to_thread parse/dump with the pure-Python
+SafeLoader/SafeDumper. Documents mimic a timeline item config, a task
+config and a project config with many items.
+
+Usage:
+    python tests/benchmark/bench_config_io.py [--repeat 200]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import aiofiles
+import yaml
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.async_file_io import YAML_LOADER, read_json, run_coroutine_blocking, to_thread, write_json
+from utils.yaml_utils import load_yaml, load_yaml_async, save_yaml
+
+
+def make_documents():
+    item = {
+        "layers": [{"id": i, "name": f"Layer {i}", "type": "image", "x": 0, "y": 0,
+                    "width": 1920, "height": 1080, "visible": True} for i in range(6)],
+        "prompt": "a quiet street at dawn, cinematic lighting",
+    }
+    task = {
+        "id": "task_0001", "tool": "text2image", "model": "comfy_ui", "status": "finished",
+        "params": {"prompt": "a quiet street at dawn " * 8, "seed": 1234, "steps": 30, "cfg": 7.5},
+        "outputs": [f"result_{i}.png" for i in range(4)],
+    }
+    project = {
+        "project_name": "demo", "timeline_index": 3,
+        "timeline_items": {str(i): {"duration": 2.5, "enabled": True} for i in range(200)},
+    }
+    return {"item (small)": item, "task (medium)": task, "project (200 items)": project}
+
+
+async def legacy_load_yaml_async(path):
+    async with aiofiles.open(path, "r", encoding="utf-8") as f:
+        content = await f.read()
+    return await to_thread(yaml.safe_load, content)
+
+
+async def legacy_save_yaml_async(path, data):
+    text = await to_thread(yaml.safe_dump, data, allow_unicode=True)
+    async with aiofiles.open(path, "w", encoding="utf-8") as f:
+        await f.write(text)
+
+
+async def legacy_load_json_async(path):
+    async with aiofiles.open(path, "r", encoding="utf-8") as f:
+        content = await f.read()
+    return await to_thread(json.loads, content)
+
+
+def timed(fn, repeat):
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"YAML loader: {YAML_LOADER.__name__}")
+    print(f"{'document':<22}{'operation':<14}{'legacy us':>11}{'direct us':>11}{'speedup':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, data in make_documents().items():
+            yml = Path(tmp) / "config.yml"
+            jsn = Path(tmp) / "config.json"
+            save_yaml(yml, data)
+            write_json(jsn, data)
+            rows = [
+                ("yaml load", lambda: run_coroutine_blocking(legacy_load_yaml_async(yml)), lambda: load_yaml(yml)),
+                ("yaml save", lambda: run_coroutine_blocking(legacy_save_yaml_async(yml, data)),
+                 lambda: save_yaml(yml, data)),
+                ("json load", lambda: run_coroutine_blocking(legacy_load_json_async(jsn)), lambda: read_json(jsn)),
+            ]
+            for operation, legacy_fn, direct_fn in rows:
+                legacy = timed(legacy_fn, args.repeat)
+                direct = timed(direct_fn, args.repeat)
+                print(f"{name:<22}{operation:<14}{legacy:>11.0f}{direct:>11.0f}{legacy / direct:>8.1f}x")
+
+            # Inside a running loop both paths offload; the new one takes one thread hop
+            async def load_in_loop():
+                started = time.perf_counter()
+                for _ in range(args.repeat):
+                    await legacy_load_yaml_async(yml)
+                legacy = time.perf_counter() - started
+                started = time.perf_counter()
+                for _ in range(args.repeat):
+                    await load_yaml_async(yml)
+                return legacy, time.perf_counter() - started
+
+            legacy, direct = asyncio.run(load_in_loop())
+            print(f"{name:<22}{'yaml async':<14}{legacy / args.repeat * 1e6:>11.0f}"
+                  f"{direct / args.repeat * 1e6:>11.0f}{legacy / direct:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
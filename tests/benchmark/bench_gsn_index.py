@@ -0,0 +1,121 @@
+"""
+Benchmark GSN queries over a large, heavily segmented history.
+
+Populates a history with --messages entries (default 100k) split into
+segments of Constants.MAX_MESSAGES (default 200 -> 500 segments), then times
+get_messages_after_gsn / get_messages_before_gsn at several depths using the
+GSN index, next to the previous scan-based strategies (decode the newest
+messages / walk segments newest-to-oldest decoding everything). Note the
+previous after_gsn strategy only looked at the newest three archives, so its
+results are incomplete for older GSNs; it is timed for reference only.
+
+Usage:
+    python tests/benchmark/bench_gsn_index.py [--messages N] [--segment-size S]
+"""
+import argparse
+import itertools
+import shutil
+import struct
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from agent.chat.history.agent_chat_storage import Constants, Durability
+from agent.chat.history.global_sequence_manager import EnhancedMessageLogHistory
+
+
+def legacy_after_gsn(history, last_seen_gsn, count):
+    """Previous strategy: decode count*2 latest messages + newest three archives."""
+    messages = [
+        m for m in history._history.get_latest_messages(count * 2)
+        if m.get('metadata', {}).get('gsn', 0) > last_seen_gsn
+    ]
+    if len(messages) < count:
+        remaining = count - len(messages)
+        for archive_dir in history._archives[:3]:
+            archive = history.storage.load_archive(archive_dir)
+            for m in archive.get_latest_messages(remaining):
+                if m.get('metadata', {}).get('gsn', 0) > last_seen_gsn:
+                    messages.append(m)
+    messages.sort(key=lambda m: m.get('metadata', {}).get('gsn', 0))
+    return messages[:count]
+
+
+def legacy_before_gsn(history, max_gsn, count):
+    """Previous strategy: walk segments newest-to-oldest decoding every entry."""
+    qualified = set()
+    for reader, _ in reversed(history.storage.get_segments()):
+        line_count = reader.get_line_count()
+        for end in range(line_count, 0, -500):
+            start = max(0, end - 500)
+            for m in reversed(reader.get_messages(start, end - start)):
+                if m.get('metadata', {}).get('gsn', 0) < max_gsn:
+                    qualified.add(m.get('message_id'))
+                if len(qualified) >= count:
+                    return qualified
+    return qualified
+
+
+def timed(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=100_000)
+    parser.add_argument("--segment-size", type=int, default=Constants.MAX_MESSAGES)
+    parser.add_argument("--count", type=int, default=50)
+    args = parser.parse_args()
+
+    Constants.MAX_MESSAGES = args.segment_size
+    tmpdir = tempfile.mkdtemp()
+    try:
+        history = EnhancedMessageLogHistory(tmpdir, "bench")
+        history.storage.durability = Durability.OS_BUFFERED
+        counter = itertools.count(1)
+
+        started = time.perf_counter()
+        for i in range(args.messages):
+            history.storage.append_message(
+                {"message_id": f"msg-{i // 3}", "metadata": {}, "content": [{"text": "x" * 120}]},
+                gsn_allocator=lambda: next(counter),
+            )
+        populate = time.perf_counter() - started
+        with open(history._gsn_manager.sequence_file_path, 'wb') as f:
+            f.write(struct.pack('<Q', args.messages))
+        history.invalidate_cache()
+
+        segments = len(history.storage.get_archived_directories()) + 1
+        print(f"{args.messages} messages in {segments} segments (populated in {populate:.1f}s)\n")
+        print(f"{'query':<34}{'indexed ms':>12}{'legacy ms':>12}")
+
+        for depth in (0.99, 0.5, 0.01):
+            gsn = int(args.messages * depth)
+            label = f"after_gsn (gsn at {depth:.0%})"
+            indexed = timed(lambda: history.get_messages_after_gsn(gsn, args.count))
+            legacy = timed(lambda: legacy_after_gsn(history, gsn, args.count))
+            print(f"{label:<34}{indexed:>12.2f}{legacy:>12.2f}")
+
+        for depth in (0.99, 0.5, 0.01):
+            gsn = max(2, int(args.messages * depth))
+            label = f"before_gsn (gsn at {depth:.0%})"
+            indexed = timed(lambda: history.get_messages_before_gsn(gsn, args.count))
+            legacy = timed(lambda: legacy_before_gsn(history, gsn, args.count), repeat=1)
+            print(f"{label:<34}{indexed:>12.2f}{legacy:>12.2f}")
+
+        history._history.close()
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == "__main__":
+    main()
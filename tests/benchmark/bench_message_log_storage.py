@@ -0,0 +1,112 @@
+"""
+Benchmark MessageLogStorage append throughput.
+
+Compares the legacy write path (open data.log twice + index.idx once and
+fsync both files for every message) against the group commit writer in
+each durability mode, for a single writer and for concurrent writers.
+
+Usage:
+    python tests/benchmark/bench_message_log_storage.py [--messages N] [--threads T]
+"""
+import argparse
+import json
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from agent.chat.history.agent_chat_storage import Constants, Durability, MessageLogStorage
+
+
+class LegacyAppender:
+    """Replica of the pre-group-commit append path, kept for comparison."""
+
+    def __init__(self, root: str):
+        current = Path(root) / Constants.CURRENT_DIR
+        current.mkdir(parents=True, exist_ok=True)
+        self.data_log_path = current / Constants.DATA_LOG
+        self.index_path = current / Constants.INDEX_FILE
+        self.data_log_path.write_bytes(b"")
+        self.index_path.write_bytes(b"")
+        self._write_lock = threading.Lock()
+
+    def append_message(self, message: dict) -> bool:
+        with self._write_lock:
+            line_bytes = (json.dumps(message, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+            with open(self.data_log_path, 'rb') as f:
+                offset = f.seek(0, os.SEEK_END)
+            with open(self.data_log_path, 'ab') as f:
+                f.write(line_bytes)
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self.index_path, 'ab') as f:
+                f.write(struct.pack('<Q', offset))
+                f.flush()
+                os.fsync(f.fileno())
+            return True
+
+
+def _make_message(i: int) -> dict:
+    return {
+        "message_id": f"msg-{i}",
+        "message_type": "thinking",
+        "sender_id": "director",
+        "metadata": {"gsn": i},
+        "content": [{"content_type": "thinking", "text": "x" * 200}],
+    }
+
+
+def run(storage, messages: int, threads: int) -> float:
+    """Append `messages` messages from `threads` threads, return appends/sec."""
+    per_thread = messages // threads
+
+    def writer(tid: int):
+        for i in range(per_thread):
+            storage.append_message(_make_message(tid * per_thread + i))
+
+    workers = [threading.Thread(target=writer, args=(t,)) for t in range(threads)]
+    started = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - started
+    return (per_thread * threads) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    # Keep archiving out of the measurement
+    Constants.MAX_MESSAGES = args.messages * 2
+
+    cases = [("legacy", None)] + [(mode, mode) for mode in Durability.ALL]
+    print(f"{'mode':<14}{'threads':>8}{'appends/s':>14}{'batches':>10}{'fsyncs':>10}")
+    for threads in (1, args.threads):
+        for name, durability in cases:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                if durability is None:
+                    storage = LegacyAppender(tmpdir)
+                else:
+                    storage = MessageLogStorage(tmpdir, durability=durability)
+                rate = run(storage, args.messages, threads)
+                if durability is None:
+                    batches, fsyncs = args.messages, args.messages * 2
+                else:
+                    stats = storage.get_write_stats()
+                    batches, fsyncs = stats["batches"], stats["fsyncs"]
+                    storage.close()
+                print(f"{name:<14}{threads:>8}{rate:>14.0f}{batches:>10}{fsyncs:>10}")
+
+
+if __name__ == "__main__":
+    main()
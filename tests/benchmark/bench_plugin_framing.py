@@ -0,0 +1,87 @@
+"""
+Benchmark plugin wire formats with large payloads.
+
+Sends one message carrying a --sizes text payload (default 1, 5, 10, 25,
+50 MB, e.g. a long LLM context) through a `cat` subprocess pipe, the same
+stdin/stdout path a plugin uses, and times encode + transfer + decode for:
+
+- ndjson: one JSON line, read with readline() (scans for the newline;
+  needs a raised StreamReader limit)
+- binary: length-prefixed JSON frame, read with readexactly()
+
+Usage:
+    python tests/benchmark/bench_plugin_framing.py [--sizes 1 5 10 25 50] [--repeat 3]
+"""
+import argparse
+import asyncio
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from server.plugins.rpc_framing import (
+    NDJSON_LINE_LIMIT,
+    decode_ndjson,
+    encode_frame,
+    encode_ndjson,
+    read_frame,
+)
+
+
+async def round_trip(proc, message, binary):
+    """Write one message into the pipe and read it back."""
+    started = time.perf_counter()
+    if binary:
+        proc.stdin.writelines(encode_frame(message))
+        drain = proc.stdin.drain()
+        decoded, _ = await asyncio.gather(read_frame(proc.stdout), drain)
+    else:
+        proc.stdin.write(encode_ndjson(message))
+        line, _ = await asyncio.gather(proc.stdout.readline(), proc.stdin.drain())
+        decoded = decode_ndjson(line)
+    elapsed = time.perf_counter() - started
+    assert len(decoded["params"]["data"]) == len(message["params"]["data"])
+    return elapsed
+
+
+async def run(sizes, repeat):
+    proc = await asyncio.create_subprocess_exec(
+        "cat",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        limit=NDJSON_LINE_LIMIT,
+    )
+    try:
+        print(f"{'payload':>10}{'ndjson ms':>12}{'MB/s':>9}{'binary ms':>12}{'MB/s':>9}{'speedup':>9}")
+        for size_mb in sizes:
+            line = "".join(random.choices(string.ascii_letters + " ", k=1023)) + "\n"
+            payload = line * size_mb * 1024
+            message = {"jsonrpc": "2.0", "method": "progress",
+                       "params": {"task_id": "bench", "data": payload}}
+            results = {}
+            for binary in (False, True):
+                results[binary] = min(
+                    [await round_trip(proc, message, binary) for _ in range(repeat)]
+                )
+            ndjson, binary = results[False], results[True]
+            print(f"{size_mb:>8} MB{ndjson * 1000:>12.1f}{size_mb / ndjson:>9.0f}"
+                  f"{binary * 1000:>12.1f}{size_mb / binary:>9.0f}{ndjson / binary:>8.1f}x")
+    finally:
+        proc.stdin.close()
+        await proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 5, 10, 25, 50])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,8 @@ Tests message log storage functionality including:
 - MessageLogStorage: Active log storage
 - MessageLogArchive: Archive reader
 - MessageLogHistory: Combined history manager
+- Durability: Group commit write modes
+- Segment rotation and manifest
 """
 
 import pytest
@@ -13,10 +15,12 @@ import os
 import json
 import struct
 import tempfile
+import threading
 from pathlib import Path
 from unittest.mock import Mock, patch
 from agent.chat.history.agent_chat_storage import (
     Constants,
+    Durability,
     MessageLogStorage,
     MessageLogArchive,
     MessageLogHistory,
@@ -30,10 +34,6 @@ class TestConstants:
         """Constants.MAX_MESSAGES should be 200."""
         assert Constants.MAX_MESSAGES == 200
 
-    def test_archive_threshold_value(self):
-        """Constants.ARCHIVE_THRESHOLD should be 100."""
-        assert Constants.ARCHIVE_THRESHOLD == 100
-
     def test_current_dir_value(self):
         """Constants.CURRENT_DIR should be 'current'."""
         assert Constants.CURRENT_DIR == "current"
@@ -113,6 +113,256 @@ class TestMessageLogStorageAppendMessage:
                 assert loaded["id"] == "msg1"
 
 
+class TestMessageLogStorageGroupCommit:
+    """Tests for MessageLogStorage group commit write path."""
+
+    @pytest.mark.parametrize("durability", Durability.ALL)
+    def test_durability_modes_round_trip(self, durability):
+        """Every durability mode persists messages readable by a fresh instance."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = MessageLogStorage(tmpdir, durability=durability)
+            for i in range(5):
+                assert storage.append_message({"id": str(i)}) is True
+            storage.close()
+
+            reopened = MessageLogStorage(tmpdir)
+            assert reopened.get_message_count() == 5
+            assert [m["id"] for m in reopened.get_messages(0, 5)] == ["0", "1", "2", "3", "4"]
+
+    def test_invalid_durability_raises(self):
+        """Unknown durability mode is rejected."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with pytest.raises(ValueError):
+                MessageLogStorage(tmpdir, durability="sometimes")
+
+    def test_concurrent_appends_are_batched(self):
+        """Concurrent appends all land in the log with consistent offsets."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = MessageLogStorage(tmpdir, flush_window=0.005)
+            n_threads, per_thread = 8, 10
+            results = []
+
+            def writer(tid):
+                for i in range(per_thread):
+                    results.append(storage.append_message({"id": f"{tid}-{i}"}))
+
+            threads = [threading.Thread(target=writer, args=(t,)) for t in range(n_threads)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+            assert all(results)
+            assert storage.get_message_count() == n_threads * per_thread
+            ids = {m["id"] for m in storage.get_messages(0, n_threads * per_thread)}
+            assert len(ids) == n_threads * per_thread
+
+            stats = storage.get_write_stats()
+            assert stats["appends"] == n_threads * per_thread
+            assert stats["batches"] < stats["appends"]
+            assert stats["max_batch_size"] > 1
+
+    def test_write_stats_track_fsyncs(self):
+        """fsyncs are only counted for durable modes."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            buffered = MessageLogStorage(os.path.join(tmpdir, "a"), durability=Durability.OS_BUFFERED)
+            durable = MessageLogStorage(os.path.join(tmpdir, "b"), durability=Durability.PER_MESSAGE)
+            for storage in (buffered, durable):
+                storage.append_message({"id": "1"})
+                storage.append_message({"id": "2"})
+
+            assert buffered.get_write_stats()["fsyncs"] == 0
+            assert durable.get_write_stats()["fsyncs"] == 4
+            assert durable.get_write_stats()["durability"] == Durability.PER_MESSAGE
+
+    @pytest.mark.parametrize("durability", [Durability.PER_MESSAGE, Durability.PER_WINDOW])
+    def test_gsns_follow_log_order_across_writers(self, durability):
+        """A writer allocating a GSN holds the directory lock until its line is written."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            writer_a = MessageLogStorage(tmpdir, durability=durability)
+            writer_b = MessageLogStorage(tmpdir, durability=durability)
+            counter = iter(range(1, 100))
+
+            def append_from_b():
+                writer_b.append_message({"id": "b"}, gsn_allocator=lambda: next(counter))
+
+            thread_b = threading.Thread(target=append_from_b)
+
+            def allocate_while_b_appends():
+                gsn = next(counter)
+                thread_b.start()
+                thread_b.join(timeout=0.3)
+                return gsn
+
+            assert writer_a.append_message({"id": "a"}, gsn_allocator=allocate_while_b_appends)
+            thread_b.join()
+
+            reader = MessageLogStorage(tmpdir)
+            assert [m["id"] for m in reader.get_messages(0, 2)] == ["a", "b"]
+            assert reader.get_gsns() == [1, 2]
+
+    def test_failed_gsn_allocation_only_fails_its_append(self):
+        """An allocator error fails that append; the rest of the batch is written."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = MessageLogStorage(tmpdir)
+
+            def broken_allocator():
+                raise OSError("counter unavailable")
+
+            assert storage.append_message({"id": "0"}, gsn_allocator=lambda: 1) is True
+            assert storage.append_message({"id": "1"}, gsn_allocator=broken_allocator) is False
+            assert storage.append_message({"id": "2"}, gsn_allocator=lambda: 2) is True
+            assert [m["id"] for m in storage.get_messages(0, 3)] == ["0", "2"]
+            assert storage.get_gsns() == [1, 2]
+
+    def test_append_after_archive_reopens_handles(self):
+        """Appends keep working after archiving replaces the current directory."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = MessageLogStorage(tmpdir)
+            for i in range(Constants.MAX_MESSAGES + 5):
+                assert storage.append_message({"id": str(i)}) is True
+
+            assert storage.get_archived_directories()
+            latest = storage.get_latest_messages(1)
+            assert latest[0]["id"] == str(Constants.MAX_MESSAGES + 4)
+
+
+class TestMessageLogStorageSegments:
+    """Tests for segment sealing and the segment manifest."""
+
+    @pytest.fixture(autouse=True)
+    def small_segments(self, monkeypatch):
+        monkeypatch.setattr(Constants, "MAX_MESSAGES", 10)
+
+    def test_seal_renames_current_without_rewrite(self):
+        """Reaching MAX_MESSAGES seals the active segment as-is."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = MessageLogStorage(tmpdir)
+            for i in range(10):
+                storage.append_message({"id": str(i)})
+            archives = storage.get_archived_directories()
+            assert len(archives) == 1
+            assert storage.get_message_count() == 0
+            data_inode = (archives[0] / Constants.DATA_LOG).stat().st_ino
+
+            storage.append_message({"id": "10"})
+            assert (archives[0] / Constants.DATA_LOG).stat().st_ino == data_inode
+            assert storage.get_total_count() == 11
+
+    def test_segments_have_fixed_size(self):
+        """Batches are split at segment boundaries."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = MessageLogStorage(tmpdir, durability=Durability.OS_BUFFERED)
+            with storage._write_lock:
+                storage._commit_batch([(b'{"id":%d}\n' % i, 0) for i in range(25)], sync=False)
+
+            counts = [reader.get_line_count() for reader, _ in storage.get_segments()]
+            assert counts == [10, 10, 5]
+
+    def test_manifest_lists_segments_in_order(self):
+        """Manifest records base positions and counts, oldest first."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = MessageLogStorage(tmpdir)
+            for i in range(35):
+                storage.append_message({"id": str(i)})
+
+            with open(storage.manifest_path) as f:
+                manifest = json.load(f)
+            assert [(s["base"], s["count"]) for s in manifest["segments"]] == [(0, 10), (10, 10), (20, 10)]
+
+    def test_manifest_reconciles_unlisted_directories(self):
+        """Directories missing from the manifest are recovered on open."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = MessageLogStorage(tmpdir)
+            for i in range(20):
+                storage.append_message({"id": str(i)})
+            storage.close()
+            storage.manifest_path.unlink()
+
+            reopened = MessageLogStorage(tmpdir)
+            assert reopened.get_sealed_count() == 20
+            assert reopened.manifest_path.exists()
+
+    def test_history_reads_across_segments(self):
+        """MessageLogHistory reads transparently across sealed segments."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            history = MessageLogHistory(tmpdir, "test_project")
+            for i in range(27):
+                history.append_message({"id": str(i)})
+
+            latest = history.get_latest_messages(15)
+            assert [m["id"] for m in latest] == [str(i) for i in range(26, 11, -1)]
+
+            ranged = history.get_messages_range(8, 14)
+            assert [m["id"] for m in ranged] == [str(i) for i in range(8, 22)]
+            assert history.get_total_count() == 27
+
+    def test_reader_instance_sees_new_segments(self):
+        """A second storage instance picks up segments sealed by the writer."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            writer = MessageLogStorage(tmpdir)
+            reader = MessageLogStorage(tmpdir)
+            for i in range(12):
+                writer.append_message({"id": str(i)})
+
+            assert len(reader.get_archived_directories()) == 1
+            assert reader.get_total_count() == 12
+
+    def test_two_writers_share_segments(self):
+        """Writers on one directory count each other's lines and never write into a sealed segment."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            writer_a = MessageLogStorage(tmpdir)
+            writer_b = MessageLogStorage(tmpdir)
+            for i in range(5):
+                writer_a.append_message({"id": f"a{i}"})
+            for i in range(4):
+                writer_b.append_message({"id": f"b{i}"})
+            writer_a.append_message({"id": "a5"})  # Tenth line: A seals
+            writer_b.append_message({"id": "b4"})
+            writer_b.append_message({"id": "b5"})
+
+            sealed = writer_a.get_archived_directories()[0]
+            assert MessageLogArchive(sealed).get_line_count() == 10
+            with open(sealed / Constants.DATA_LOG) as f:
+                assert len(f.readlines()) == 10
+
+            fresh = MessageLogStorage(tmpdir)
+            assert fresh.get_total_count() == 12
+            ids = [m["id"] for reader, _ in fresh.get_segments()
+                   for m in reader.get_messages(0, reader.get_line_count())]
+            assert ids == [f"a{i}" for i in range(5)] + [f"b{i}" for i in range(4)] + ["a5", "b4", "b5"]
+
+    def test_seal_and_manifest_update_hold_directory_lock(self):
+        """A writer filling a segment while another is sealing waits, so no segment is lost."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            writer_a = MessageLogStorage(tmpdir)
+            writer_b = MessageLogStorage(tmpdir)
+            for i in range(9):
+                writer_a.append_message({"id": f"a{i}"})
+
+            def fill_segment_from_b():
+                for i in range(10):
+                    writer_b.append_message({"id": f"b{i}"})
+
+            thread_b = threading.Thread(target=fill_segment_from_b)
+            save_manifest = writer_a._save_manifest
+
+            def save_while_b_writes():
+                # A has renamed current/ but not yet recorded it
+                thread_b.start()
+                thread_b.join(timeout=0.3)
+                save_manifest()
+
+            with patch.object(writer_a, "_save_manifest", side_effect=save_while_b_writes):
+                writer_a.append_message({"id": "a9"})
+            thread_b.join()
+
+            with open(writer_a.manifest_path) as f:
+                manifest = json.load(f)
+            assert [s["count"] for s in manifest["segments"]] == [10, 10]
+            assert MessageLogStorage(tmpdir).get_total_count() == 20
+
+
 class TestMessageLogStorageGetMessageCount:
     """Tests for MessageLogStorage.get_message_count method."""
 
@@ -1,20 +1,22 @@
 """
-Unit tests for GlobalSequenceManager.get_messages_before_gsn method.
+Unit tests for GlobalSequenceManager GSN queries.
 
-Tests the optimized single-pass strategy for loading historical messages.
+Tests GSN-indexed loading of historical and new messages.
 """
 
 import os
 import sys
 import tempfile
 import shutil
+import struct
 import unittest
 from pathlib import Path
-from unittest.mock import Mock, MagicMock, patch
+from unittest.mock import patch
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+from agent.chat.history.agent_chat_storage import Constants
 from agent.chat.history.global_sequence_manager import (
     GSNManager,
     EnhancedMessageLogHistory,
@@ -30,279 +32,157 @@ class TestGetMessagesBeforeGSN(unittest.TestCase):
         self.temp_dir = tempfile.mkdtemp()
         self.workspace_path = self.temp_dir
         self.project_name = "test_project"
+        self.history = EnhancedMessageLogHistory(self.workspace_path, self.project_name)
 
     def tearDown(self):
         """Clean up test fixtures."""
+        self.history.invalidate_cache()
+        self.history._history.close()
         if os.path.exists(self.temp_dir):
             shutil.rmtree(self.temp_dir)
 
-    def _create_message(self, message_id: str, gsn: int, content_type: str = "text") -> dict:
-        """Create a test message with given message_id and GSN."""
+    def _create_message(self, message_id: str, content_type: str = "text") -> dict:
+        """Create a test message with given message_id."""
         return {
             'message_id': message_id,
             'content': f'{content_type} content for {message_id}',
             'content_type': content_type,
-            'metadata': {'gsn': gsn}
+            'metadata': {}
         }
 
+    def _append(self, message_id: str, content_type: str = "text") -> int:
+        """Append a message and return its GSN."""
+        success, gsn = self.history.append_message(self._create_message(message_id, content_type))
+        self.assertTrue(success)
+        return gsn
+
     def test_empty_result_when_no_messages(self):
         """Test that empty list is returned when no messages exist."""
-        with patch.object(EnhancedMessageLogHistory, '__init__', return_value=None):
-            history = EnhancedMessageLogHistory.__new__(EnhancedMessageLogHistory)
-            history._history = Mock()
-            history._archives = []
-            history._gsn_manager = Mock()
-            history._gsn_manager.get_current_gsn.return_value = 0
-            history._history.get_latest_messages.return_value = []
-
-            result = history.get_messages_before_gsn(max_gsn=100, count=10)
-
-            self.assertEqual(result, [])
+        result = self.history.get_messages_before_gsn(max_gsn=100, count=10)
+        self.assertEqual(result, [])
 
     def test_fallback_when_max_gsn_zero_or_negative(self):
         """Test fallback to latest messages when max_gsn <= 0."""
-        with patch.object(EnhancedMessageLogHistory, '__init__', return_value=None):
-            history = EnhancedMessageLogHistory.__new__(EnhancedMessageLogHistory)
-            history._history = Mock()
-            history._archives = []
-            history._history.get_latest_messages.return_value = ['msg1', 'msg2']
-
-            # Test max_gsn = 0
-            result = history.get_messages_before_gsn(max_gsn=0, count=10)
-            self.assertEqual(result, ['msg1', 'msg2'])
+        self._append('msg-001')
+        self._append('msg-002')
 
-            # Test max_gsn = -1
-            result = history.get_messages_before_gsn(max_gsn=-1, count=10)
-            self.assertEqual(result, ['msg1', 'msg2'])
+        for max_gsn in (0, -1):
+            result = self.history.get_messages_before_gsn(max_gsn=max_gsn, count=10)
+            self.assertEqual([m['message_id'] for m in result], ['msg-002', 'msg-001'])
 
     def test_single_message_multiple_entries(self):
         """Test that all entries for a single message_id are returned."""
-        with patch.object(EnhancedMessageLogHistory, '__init__', return_value=None):
-            history = EnhancedMessageLogHistory.__new__(EnhancedMessageLogHistory)
-            history._history = Mock()
-            history._archives = []
-            history._gsn_manager = Mock()
-            history._gsn_manager.get_current_gsn.return_value = 100
-
-            # Simulate a single message with multiple entries (streaming updates)
-            mock_messages = [
-                self._create_message('msg-001', 10, 'thinking'),
-                self._create_message('msg-001', 11, 'tool_call'),
-                self._create_message('msg-001', 12, 'llm_output'),
-                self._create_message('msg-001', 13, 'skill'),
-                self._create_message('msg-002', 50, 'text'),  # This should be excluded
-            ]
-            history._history.get_latest_messages.return_value = mock_messages
-
-            result = history.get_messages_before_gsn(max_gsn=20, count=10)
-
-            # Should return all 4 entries for msg-001, but not msg-002
-            self.assertEqual(len(result), 4)
-            for entry in result:
-                self.assertEqual(entry['message_id'], 'msg-001')
+        for content_type in ('thinking', 'tool_call', 'llm_output', 'skill'):
+            self._append('msg-001', content_type)
+        boundary = self._append('msg-002')
+
+        result = self.history.get_messages_before_gsn(max_gsn=boundary, count=10)
+
+        self.assertEqual(len(result), 4)
+        for entry in result:
+            self.assertEqual(entry['message_id'], 'msg-001')
+
+    def test_includes_later_entries_of_selected_messages(self):
+        """Entries at or after max_gsn are returned for message_ids selected before it."""
+        self._append('msg-001', 'thinking')
+        boundary = self._append('msg-002', 'text')
+        self._append('msg-001', 'llm_output')
+
+        result = self.history.get_messages_before_gsn(max_gsn=boundary, count=10)
+
+        self.assertEqual([e['content_type'] for e in result], ['thinking', 'llm_output'])
 
     def test_respects_count_limit_for_unique_message_ids(self):
         """Test that count limits unique message_ids, not total entries."""
-        with patch.object(EnhancedMessageLogHistory, '__init__', return_value=None):
-            history = EnhancedMessageLogHistory.__new__(EnhancedMessageLogHistory)
-            history._history = Mock()
-            history._archives = []
-            history._gsn_manager = Mock()
-            history._gsn_manager.get_current_gsn.return_value = 100
-
-            # Create 3 messages, each with multiple entries
-            mock_messages = [
-                self._create_message('msg-001', 10, 'text'),
-                self._create_message('msg-001', 11, 'tool'),
-                self._create_message('msg-002', 20, 'text'),
-                self._create_message('msg-002', 21, 'tool'),
-                self._create_message('msg-003', 30, 'text'),
-                self._create_message('msg-003', 31, 'tool'),
-            ]
-            history._history.get_latest_messages.return_value = mock_messages
-
-            # Request only 2 unique messages
-            result = history.get_messages_before_gsn(max_gsn=50, count=2)
-
-            # Should return 4 entries (2 messages * 2 entries each)
-            unique_ids = set(e['message_id'] for e in result)
-            self.assertLessEqual(len(unique_ids), 2)
+        for message_id in ('msg-001', 'msg-002', 'msg-003'):
+            self._append(message_id, 'text')
+            self._append(message_id, 'tool')
+        boundary = self.history.get_current_gsn() + 1
+
+        result = self.history.get_messages_before_gsn(max_gsn=boundary, count=2)
+
+        unique_ids = set(e['message_id'] for e in result)
+        self.assertEqual(unique_ids, {'msg-002', 'msg-003'})
+        self.assertEqual(len(result), 4)
 
     def test_sorted_by_gsn_ascending(self):
         """Test that results are sorted by GSN in ascending order."""
-        with patch.object(EnhancedMessageLogHistory, '__init__', return_value=None):
-            history = EnhancedMessageLogHistory.__new__(EnhancedMessageLogHistory)
-            history._history = Mock()
-            history._archives = []
-            history._gsn_manager = Mock()
-            history._gsn_manager.get_current_gsn.return_value = 100
-
-            # Messages in non-sequential order
-            mock_messages = [
-                self._create_message('msg-003', 30, 'text'),
-                self._create_message('msg-001', 10, 'text'),
-                self._create_message('msg-002', 20, 'text'),
-            ]
-            history._history.get_latest_messages.return_value = mock_messages
-
-            result = history.get_messages_before_gsn(max_gsn=50, count=10)
-
-            # Verify ascending order
-            gsns = [e['metadata']['gsn'] for e in result]
-            self.assertEqual(gsns, sorted(gsns))
+        for message_id in ('msg-003', 'msg-001', 'msg-002'):
+            self._append(message_id)
+        boundary = self.history.get_current_gsn() + 1
+
+        result = self.history.get_messages_before_gsn(max_gsn=boundary, count=10)
+
+        gsns = [e['metadata']['gsn'] for e in result]
+        self.assertEqual(gsns, sorted(gsns))
+        self.assertEqual(len(gsns), 3)
 
     def test_excludes_messages_with_gsn_equal_or_greater(self):
         """Test that messages with GSN >= max_gsn are excluded."""
-        with patch.object(EnhancedMessageLogHistory, '__init__', return_value=None):
-            history = EnhancedMessageLogHistory.__new__(EnhancedMessageLogHistory)
-            history._history = Mock()
-            history._archives = []
-            history._gsn_manager = Mock()
-            history._gsn_manager.get_current_gsn.return_value = 100
-
-            mock_messages = [
-                self._create_message('msg-001', 10, 'text'),   # < 50, included
-                self._create_message('msg-002', 49, 'text'),   # < 50, included
-                self._create_message('msg-003', 50, 'text'),   # = 50, excluded
-                self._create_message('msg-004', 51, 'text'),   # > 50, excluded
-            ]
-            history._history.get_latest_messages.return_value = mock_messages
-
-            result = history.get_messages_before_gsn(max_gsn=50, count=10)
-
-            unique_ids = set(e['message_id'] for e in result)
-            self.assertIn('msg-001', unique_ids)
-            self.assertIn('msg-002', unique_ids)
-            self.assertNotIn('msg-003', unique_ids)
-            self.assertNotIn('msg-004', unique_ids)
-
-    def test_deduplication_by_gsn(self):
-        """Test that duplicate entries with same GSN are removed."""
-        with patch.object(EnhancedMessageLogHistory, '__init__', return_value=None):
-            history = EnhancedMessageLogHistory.__new__(EnhancedMessageLogHistory)
-            history._history = Mock()
-            history._archives = []
-            history._gsn_manager = Mock()
-            history._gsn_manager.get_current_gsn.return_value = 100
-
-            # Same message appears twice with same GSN (should be deduplicated)
-            mock_messages = [
-                self._create_message('msg-001', 10, 'text'),
-                self._create_message('msg-001', 10, 'text'),  # Duplicate GSN
-                self._create_message('msg-001', 11, 'text'),  # Different GSN
-            ]
-            history._history.get_latest_messages.return_value = mock_messages
-
-            result = history.get_messages_before_gsn(max_gsn=50, count=10)
-
-            # Should only have 2 entries (GSN 10 and 11)
-            self.assertEqual(len(result), 2)
-
-    def test_handles_archive_loading(self):
-        """Test that archives are processed correctly."""
-        with patch.object(EnhancedMessageLogHistory, '__init__', return_value=None):
-            history = EnhancedMessageLogHistory.__new__(EnhancedMessageLogHistory)
-            history._history = Mock()
-            history._gsn_manager = Mock()
-            history._gsn_manager.get_current_gsn.return_value = 100
-
-            # Setup mock archive
-            mock_archive = Mock()
-            mock_archive.get_line_count.return_value = 2
-            mock_archive.get_messages.return_value = [
-                self._create_message('archive-msg-001', 5, 'text'),
-                self._create_message('archive-msg-001', 6, 'tool'),
-            ]
-
-            history._history.storage.load_archive.return_value = mock_archive
-            history._archives = [Path('/fake/archive1')]
-
-            # Active log is empty
-            history._history.get_latest_messages.return_value = []
-
-            result = history.get_messages_before_gsn(max_gsn=50, count=10)
-
-            self.assertEqual(len(result), 2)
-            for entry in result:
-                self.assertEqual(entry['message_id'], 'archive-msg-001')
-
-    def test_chunked_archive_loading_from_end(self):
-        """Test that large archives are loaded in chunks from the end."""
-        with patch.object(EnhancedMessageLogHistory, '__init__', return_value=None):
-            history = EnhancedMessageLogHistory.__new__(EnhancedMessageLogHistory)
-            history._history = Mock()
-            history._gsn_manager = Mock()
-            history._gsn_manager.get_current_gsn.return_value = 100
-
-            # Setup large archive (1000 entries)
-            mock_archive = Mock()
-            mock_archive.get_line_count.return_value = 1000
-
-            # Track calls to get_messages
-            call_history = []
-            def track_get_messages(start, count):
-                call_history.append((start, count))
-                # Return messages with GSN based on position
-                return [
-                    self._create_message(f'msg-{start}-{i}', start + i + 1, 'text')
-                    for i in range(count)
-                ]
-            mock_archive.get_messages.side_effect = track_get_messages
-
-            history._history.storage.load_archive.return_value = mock_archive
-            history._archives = [Path('/fake/archive1')]
-            history._history.get_latest_messages.return_value = []
-
-            result = history.get_messages_before_gsn(max_gsn=10000, count=100)
-
-            # Verify chunked loading was used from end
-            # First call should be from the end: start=500, count=500 (for 1000 entries)
-            self.assertGreater(mock_archive.get_messages.call_count, 0)
-
-            # Verify first call is from end of archive
-            first_call_start, first_call_count = call_history[0]
-            # Should start from position 500 (1000 - 500 = 500)
-            self.assertEqual(first_call_start, 500)
-            self.assertEqual(first_call_count, 500)
-
-    def test_early_termination_when_enough_qualified(self):
-        """Test that archive loading stops early when enough qualified IDs are found."""
-        with patch.object(EnhancedMessageLogHistory, '__init__', return_value=None):
-            history = EnhancedMessageLogHistory.__new__(EnhancedMessageLogHistory)
-            history._history = Mock()
-            history._gsn_manager = Mock()
-            history._gsn_manager.get_current_gsn.return_value = 100
-
-            # Setup two archives
-            mock_archive1 = Mock()
-            mock_archive1.get_line_count.return_value = 100
-            mock_archive1.get_messages.return_value = [
-                self._create_message(f'archive1-msg-{i}', 50 + i, 'text')
-                for i in range(100)
-            ]
-
-            mock_archive2 = Mock()
-            mock_archive2.get_line_count.return_value = 100
-            mock_archive2.get_messages.return_value = [
-                self._create_message(f'archive2-msg-{i}', 150 + i, 'text')
-                for i in range(100)
-            ]
-
-            def load_archive_side_effect(path):
-                if 'archive2' in str(path):
-                    return mock_archive2
-                return mock_archive1
-
-            history._history.storage.load_archive.side_effect = load_archive_side_effect
-            history._archives = [Path('/fake/archive1'), Path('/fake/archive2')]
-            history._history.get_latest_messages.return_value = []
-
-            # Request only 5 messages
-            result = history.get_messages_before_gsn(max_gsn=200, count=5)
-
-            # Should have at most 5 unique message_ids
-            unique_ids = set(e['message_id'] for e in result)
-            self.assertLessEqual(len(unique_ids), 5)
+        self._append('msg-001')
+        self._append('msg-002')
+        boundary = self._append('msg-003')
+        self._append('msg-004')
+
+        result = self.history.get_messages_before_gsn(max_gsn=boundary, count=10)
+
+        unique_ids = set(e['message_id'] for e in result)
+        self.assertEqual(unique_ids, {'msg-001', 'msg-002'})
+
+    def test_reads_across_many_archives(self):
+        """GSN lookups are exact across any number of sealed segments."""
+        with patch.object(Constants, 'MAX_MESSAGES', 5):
+            gsns = [self._append(f'msg-{i:03d}') for i in range(60)]
+
+            self.assertGreaterEqual(len(self.history.storage.get_archived_directories()), 10)
+
+            result = self.history.get_messages_before_gsn(max_gsn=gsns[12], count=3)
+            self.assertEqual([e['message_id'] for e in result], ['msg-009', 'msg-010', 'msg-011'])
+
+            after = self.history.get_messages_after_gsn(gsns[3], count=4)
+            self.assertEqual([e['message_id'] for e in after], ['msg-004', 'msg-005', 'msg-006', 'msg-007'])
+
+
+class TestGetMessagesAfterGSN(unittest.TestCase):
+    """Test cases for get_messages_after_gsn method."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.history = EnhancedMessageLogHistory(self.temp_dir, "test_project")
+
+    def tearDown(self):
+        self.history._history.close()
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_returns_empty_when_up_to_date(self):
+        """No reads are needed when nothing newer than last_seen_gsn exists."""
+        _, gsn = self.history.append_message({'message_id': 'm1', 'metadata': {}})
+        self.assertEqual(self.history.get_messages_after_gsn(gsn), [])
+
+    def test_returns_messages_in_chronological_order(self):
+        """Messages newer than last_seen_gsn are returned oldest first."""
+        gsns = [self.history.append_message({'message_id': f'm{i}', 'metadata': {}})[1] for i in range(5)]
+
+        result = self.history.get_messages_after_gsn(gsns[1], count=2)
+
+        self.assertEqual([m['metadata']['gsn'] for m in result], gsns[2:4])
+
+    def test_gsn_index_rebuilt_for_legacy_segments(self):
+        """Segments written without gsn.idx are indexed from message metadata."""
+        with patch.object(Constants, 'MAX_MESSAGES', 4):
+            gsns = [self.history.append_message({'message_id': f'm{i}', 'metadata': {}})[1] for i in range(10)]
+        self.history._history.close()
+
+        root = self.history.history_root
+        for path in root.rglob(Constants.GSN_INDEX_FILE):
+            path.unlink()
+        (root / Constants.SEGMENT_MANIFEST).unlink()
+
+        reopened = EnhancedMessageLogHistory(self.temp_dir, "test_project")
+        result = reopened.get_messages_after_gsn(gsns[5], count=10)
+        self.assertEqual([m['metadata']['gsn'] for m in result], gsns[6:])
+        reopened._history.close()
 
 
 class TestGSNManager(unittest.TestCase):
@@ -340,6 +220,69 @@ class TestGSNManager(unittest.TestCase):
         manager.get_next_gsn()
         self.assertEqual(manager.get_current_gsn(), 2)
 
+    def test_allocation_leases_blocks(self):
+        """Test that one flock-protected lease serves a whole block of GSNs."""
+        manager = GSNManager(self.temp_dir, lease_size=4)
+
+        with patch.object(manager, '_lease_block', wraps=manager._lease_block) as lease:
+            gsns = [manager.get_next_gsn() for _ in range(9)]
+
+        self.assertEqual(gsns, list(range(1, 10)))
+        self.assertEqual(lease.call_count, 3)
+        self.assertEqual(manager._read_slot(GSNManager.HWM_OFFSET), 12)
+
+    def test_restart_skips_unused_lease(self):
+        """Test that GSNs stay unique after a restart abandons a lease."""
+        manager = GSNManager(self.temp_dir, lease_size=8)
+        manager.get_next_gsn()
+        manager.get_next_gsn()
+        manager.close()
+
+        restarted = GSNManager(self.temp_dir, lease_size=8)
+        self.assertEqual(restarted.get_current_gsn(), 2)
+        self.assertEqual(restarted.get_next_gsn(), 9)
+
+    def test_managers_sharing_counter_stay_unique_and_increasing(self):
+        """Test that a manager abandons its lease once another leases past it."""
+        first = GSNManager(self.temp_dir, lease_size=4)
+        second = GSNManager(self.temp_dir, lease_size=4)
+
+        gsns = []
+        for _ in range(6):
+            gsns.append(first.get_next_gsn())
+            gsns.append(second.get_next_gsn())
+
+        self.assertEqual(len(set(gsns)), len(gsns))
+        self.assertEqual(gsns, sorted(gsns))
+        self.assertEqual(first.get_current_gsn(), gsns[-1])
+
+    def test_allocation_error_raises(self):
+        """Test that a failed allocation raises instead of guessing a GSN."""
+        manager = GSNManager(self.temp_dir)
+        manager.get_next_gsn()
+
+        with patch.object(manager, '_read_slot', side_effect=ValueError("mmap closed")):
+            with self.assertRaises(ValueError):
+                manager.get_next_gsn()
+
+    def test_upgrades_legacy_counter_file(self):
+        """Test that an 8-byte legacy counter continues after its last GSN."""
+        with open(os.path.join(self.temp_dir, GSNManager.SEQUENCE_FILE), 'wb') as f:
+            f.write(struct.pack('<Q', 41))
+
+        manager = GSNManager(self.temp_dir)
+        self.assertEqual(manager.get_current_gsn(), 41)
+        self.assertEqual(manager.get_next_gsn(), 42)
+
+    def test_get_current_gsn_takes_no_file_lock(self):
+        """Test that polling the current GSN never calls flock."""
+        manager = GSNManager(self.temp_dir)
+        manager.get_next_gsn()
+
+        with patch('agent.chat.history.global_sequence_manager.fcntl.flock') as flock:
+            self.assertEqual(manager.get_current_gsn(), 1)
+        flock.assert_not_called()
+
     def test_singleton_per_history_root(self):
         """Test that GSNManager is singleton per history root."""
         manager1 = GSNManager.get_manager(self.temp_dir)
@@ -0,0 +1,128 @@
+"""
+Unit tests for HistoryChangeNotifier.
+
+Tests for:
+- agent/chat/history/history_change_notifier.py
+"""
+import threading
+
+import pytest
+
+from agent.chat.history.agent_chat_storage import MessageLogStorage
+from agent.chat.history.global_sequence_manager import GSNManager, get_enhanced_history
+from agent.chat.history.history_change_notifier import HistoryChangeNotifier, messages_appended
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Workspace path and project name backed by a temporary directory."""
+    return str(tmp_path), "demo"
+
+
+@pytest.fixture
+def received():
+    """Collect messages_appended emissions as (first_gsn, last_gsn) tuples."""
+    ranges = []
+    event = threading.Event()
+
+    def receiver(sender, workspace_path, project_name, first_gsn, last_gsn):
+        ranges.append((first_gsn, last_gsn))
+        event.set()
+
+    messages_appended.connect(receiver)
+    yield ranges, event
+    messages_appended.disconnect(receiver)
+
+
+def _append_from_other_writer(history_root, message_id, on_allocate=None):
+    """Append through separate storage/GSN instances, as another process would."""
+    storage = MessageLogStorage(str(history_root))
+    gsn_manager = GSNManager(str(history_root))
+
+    def allocate():
+        gsn = gsn_manager.get_next_gsn()
+        if on_allocate is not None:
+            on_allocate()
+        return gsn
+
+    try:
+        assert storage.append_message(
+            {"message_id": message_id, "metadata": {}},
+            gsn_allocator=allocate,
+        )
+    finally:
+        storage.close()
+        gsn_manager.close()
+
+
+class TestHistoryChangeNotifier:
+    """Tests for HistoryChangeNotifier"""
+
+    def test_get_notifier_is_singleton_per_project(self, project):
+        """Verify one notifier per workspace/project"""
+        assert HistoryChangeNotifier.get_notifier(*project) is HistoryChangeNotifier.get_notifier(*project)
+
+    def test_publish_emits_each_range_once(self, project, received):
+        """Verify publish only announces GSNs beyond the last published one"""
+        ranges, _ = received
+        notifier = HistoryChangeNotifier.get_notifier(*project)
+
+        assert notifier.publish(3)
+        assert not notifier.publish(2)
+        assert not notifier.publish(3)
+        assert notifier.publish(5)
+        assert ranges == [(1, 3), (4, 5)]
+
+    def test_check_for_changes_picks_up_other_writer(self, project, received):
+        """Verify a write through another storage instance is published and readable"""
+        ranges, _ = received
+        notifier = HistoryChangeNotifier.get_notifier(*project)
+        history = get_enhanced_history(*project)
+
+        assert not notifier.check_for_changes()
+        _append_from_other_writer(notifier.history_root, "msg-001")
+
+        assert notifier.check_for_changes()
+        assert ranges == [(1, 1)]
+        assert [m["message_id"] for m in history.get_messages_after_gsn(0)] == ["msg-001"]
+
+    def test_check_between_allocation_and_commit_publishes_nothing(self, project, received):
+        """Verify a GSN is only published once its line is written"""
+        ranges, _ = received
+        notifier = HistoryChangeNotifier.get_notifier(*project)
+        history = get_enhanced_history(*project)
+        checked = []
+
+        _append_from_other_writer(notifier.history_root, "msg-001",
+                                  on_allocate=lambda: checked.append(notifier.check_for_changes()))
+        assert checked == [False]
+        assert ranges == []
+
+        assert notifier.check_for_changes()
+        assert ranges == [(1, 1)]
+        assert [m["message_id"] for m in history.get_messages_after_gsn(0)] == ["msg-001"]
+
+    def test_watcher_publishes_cross_process_append(self, project, received):
+        """Verify the file watcher announces appends made by another writer"""
+        ranges, event = received
+        notifier = HistoryChangeNotifier.get_notifier(*project)
+        notifier.start_watching()
+        try:
+            _append_from_other_writer(notifier.history_root, "msg-001")
+            assert event.wait(timeout=5.0)
+        finally:
+            notifier.stop_watching()
+        assert ranges[-1][1] == 1
+
+    def test_watching_is_reference_counted(self, project):
+        """Verify the observer stops only when the last watcher releases it"""
+        notifier = HistoryChangeNotifier.get_notifier(*project)
+        notifier.start_watching()
+        notifier.start_watching()
+        observer = notifier._observer
+
+        notifier.stop_watching()
+        assert notifier._observer is observer
+        notifier.stop_watching()
+        assert notifier._observer is None
+        assert not observer.is_alive()
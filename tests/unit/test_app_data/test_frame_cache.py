@@ -0,0 +1,91 @@
+import threading
+import time
+from fractions import Fraction
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from app.data import frame_cache
+from app.data.frame_cache import ScrubFrameCache
+from utils.media_probe import MediaProbe
+
+WIDTH, HEIGHT, FRAMES, FPS = 64, 48, 30, 10.0
+
+
+@pytest.fixture
+def video(tmp_path: Path, monkeypatch) -> str:
+    path = str(tmp_path / "clip.mp4")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), FPS, (WIDTH, HEIGHT))
+    if not writer.isOpened():
+        pytest.skip("OpenCV build cannot write mp4v")
+    for i in range(FRAMES):
+        writer.write(np.full((HEIGHT, WIDTH, 3), 8 * i, dtype=np.uint8))
+    writer.release()
+    probe = MediaProbe(width=WIDTH, height=HEIGHT, duration=FRAMES / FPS,
+                       frame_rate=Fraction(int(FPS)), frame_count=FRAMES, keyframes=[0.0, 2.0])
+    monkeypatch.setattr(frame_cache, "get_media_probe", lambda path, keyframes=False: probe)
+    return path
+
+
+def _wait_for(condition, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for the decoder"
+        time.sleep(0.01)
+
+
+def test_frames_ahead_of_playhead_are_prefetched(video: str) -> None:
+    cache = ScrubFrameCache(video, max_size=(32, 32), ahead=8, behind=2)
+    cache.start()
+    try:
+        _wait_for(lambda: all(i in cache for i in range(9)))
+        frame = cache.get(5)
+        assert frame.shape == (24, 32, 3)
+        assert abs(int(frame.mean()) - 40) <= 4
+        assert 20 not in cache
+    finally:
+        cache.stop()
+    stats = cache.stats()
+    assert (stats.hits, stats.misses) == (1, 0)
+    assert stats.hit_rate == 1.0
+
+
+def test_random_jump_decodes_from_keyframe(video: str) -> None:
+    ready = {}
+    arrived = threading.Event()
+
+    def on_frame(index, frame):
+        ready[index] = frame
+        if index == 25:
+            arrived.set()
+
+    cache = ScrubFrameCache(video, ahead=2, behind=5, on_frame=on_frame)
+    cache.start()
+    try:
+        assert cache.get(25) is None
+        assert arrived.wait(10)
+        assert abs(int(cache.get(25).mean()) - 200) <= 4
+        _wait_for(lambda: all(i in cache for i in range(20, 28)))
+    finally:
+        cache.stop()
+    # One seek to the keyframe at frame 20, then frames 20..27 are read in order
+    assert all(i in ready for i in range(20, 28))
+    stats = cache.stats()
+    assert (stats.misses, stats.hits, stats.seeks) == (1, 1, 1)
+
+
+def test_memory_budget_keeps_frames_nearest_playhead(video: str) -> None:
+    frame_bytes = WIDTH * HEIGHT * 3
+    cache = ScrubFrameCache(video, max_bytes=4 * frame_bytes, ahead=10, behind=10)
+    cache.start()
+    try:
+        _wait_for(lambda: all(i in cache for i in range(4)))
+        cache.set_playhead(12)
+        _wait_for(lambda: all(i in cache for i in range(12, 16)))
+        stats = cache.stats()
+        assert stats.frames == 4 and stats.bytes <= 4 * frame_bytes
+        assert 0 not in cache
+    finally:
+        cache.stop()
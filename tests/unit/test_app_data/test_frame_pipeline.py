@@ -0,0 +1,70 @@
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from app.data.frame_pipeline import FramePipeline
+
+WIDTH, HEIGHT, FRAMES = 64, 48, 12
+
+# Stand-in for ffmpeg: store the raw bgr24 stream it is fed
+_RAW_SINK = "import shutil, sys; shutil.copyfileobj(sys.stdin.buffer, open(sys.argv[1], 'wb'))"
+
+
+@pytest.fixture
+def video(tmp_path: Path) -> str:
+    path = str(tmp_path / "base.mp4")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 8.0, (WIDTH, HEIGHT))
+    if not writer.isOpened():
+        pytest.skip("OpenCV build cannot write mp4v")
+    for i in range(FRAMES):
+        writer.write(np.full((HEIGHT, WIDTH, 3), 10 * i, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def _read_raw(path: Path) -> np.ndarray:
+    return np.fromfile(str(path), dtype=np.uint8).reshape(-1, HEIGHT, WIDTH, 3)
+
+
+def test_pipeline_composites_every_frame_in_order(video: str, tmp_path: Path) -> None:
+    raw = tmp_path / "out.raw"
+    pipeline = FramePipeline(video, str(tmp_path / "out.mp4"), WIDTH, HEIGHT, 8.0,
+                             workers=3, queue_size=2,
+                             encoder_cmd=[sys.executable, "-c", _RAW_SINK, str(raw)])
+    logo = np.zeros((8, 8, 4), dtype=np.uint8)
+    logo[:, :] = (0, 255, 0, 255)
+    pipeline.add_overlay(logo, 4, 4)
+    stamp = np.zeros((4, 4, 3), dtype=np.uint8)
+    pipeline.add_overlay(stamp, 6, 6)
+
+    assert pipeline.run() == FRAMES
+
+    frames = _read_raw(raw)
+    assert len(frames) == FRAMES
+    assert (frames[:, 4:12, 4:6] == (0, 255, 0)).all()
+    assert (frames[:, 6:10, 6:10] == 0).all()
+    # Untouched background keeps the per-frame brightness ramp (lossy codec)
+    backgrounds = frames[:, 30:, 30:].mean(axis=(1, 2, 3))
+    assert (np.diff(backgrounds) > 0).all()
+
+
+def test_pipeline_raises_when_encoder_fails(video: str, tmp_path: Path) -> None:
+    pipeline = FramePipeline(video, str(tmp_path / "out.mp4"), WIDTH, HEIGHT, 8.0,
+                             encoder_cmd=[sys.executable, "-c", "import sys; sys.exit(3)"])
+    pipeline.add_overlay(np.zeros((4, 4, 3), dtype=np.uint8), 0, 0)
+
+    with pytest.raises(RuntimeError):
+        pipeline.run()
+
+
+def test_pipeline_raises_when_video_unreadable(tmp_path: Path) -> None:
+    raw = tmp_path / "out.raw"
+    pipeline = FramePipeline(str(tmp_path / "missing.mp4"), str(tmp_path / "out.mp4"),
+                             WIDTH, HEIGHT, 8.0,
+                             encoder_cmd=[sys.executable, "-c", _RAW_SINK, str(raw)])
+
+    with pytest.raises(RuntimeError):
+        pipeline.run()
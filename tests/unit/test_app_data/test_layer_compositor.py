@@ -0,0 +1,121 @@
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from app.data.layer import Layer, LayerManager
+from app.data.layer_compositor import LayerCompositor, composite_over, prepare_layer
+
+
+def _reference_over(layers, width: int, height: int) -> np.ndarray:
+    """Straight-alpha "over" in float64 for full-canvas BGRA layers."""
+    color = np.zeros((height, width, 3))
+    alpha = np.zeros((height, width, 1))
+    for image in layers:
+        src = image[:, :, :3].astype(float)
+        a = image[:, :, 3:].astype(float) / 255.0
+        out_alpha = a + alpha * (1 - a)
+        safe = np.where(out_alpha > 0, out_alpha, 1)
+        color = (src * a + color * alpha * (1 - a)) / safe
+        alpha = out_alpha
+    return np.concatenate([color, alpha * 255], axis=2)
+
+
+def _random_layer(rng, width: int, height: int) -> np.ndarray:
+    image = rng.integers(0, 256, size=(height, width, 4), dtype=np.uint8)
+    image[:, :, 3] = rng.choice([0, 0, 64, 128, 200, 255], size=(height, width))
+    return image
+
+
+def test_compositor_matches_float_reference() -> None:
+    rng = np.random.default_rng(7)
+    layers = [_random_layer(rng, 40, 30) for _ in range(4)]
+
+    compositor = LayerCompositor(40, 30)
+    for image in layers:
+        compositor.add(image)
+    result = compositor.to_bgra().astype(int)
+    expected = _reference_over(layers, 40, 30)
+
+    assert np.abs(result[:, :, 3] - expected[:, :, 3]).max() <= 1
+    # Colour of barely visible pixels is quantised by premultiplication
+    visible = expected[:, :, 3] >= 64
+    assert np.abs(result[:, :, :3] - expected[:, :, :3])[visible].max() <= 3
+
+
+def test_prepare_layer_crops_to_visible_pixels() -> None:
+    image = np.zeros((100, 100, 4), dtype=np.uint8)
+    image[20:30, 40:45] = (10, 20, 30, 255)
+
+    layer = prepare_layer(image, 5, 5, 200, 200)
+    assert (layer.x, layer.y, layer.width, layer.height) == (45, 25, 5, 10)
+    assert layer.opaque
+
+    assert prepare_layer(np.zeros((10, 10, 4), dtype=np.uint8), 0, 0, 50, 50) is None
+    assert prepare_layer(image, 500, 0, 200, 200) is None
+
+
+def test_prepare_layer_clips_to_canvas() -> None:
+    image = np.full((10, 10, 4), 128, dtype=np.uint8)
+
+    layer = prepare_layer(image, -4, 6, 12, 12)
+    assert (layer.x, layer.y, layer.width, layer.height) == (0, 6, 6, 6)
+    assert not layer.opaque
+
+
+def test_composite_over_opaque_bgr_frame() -> None:
+    frame = np.full((8, 8, 3), 100, dtype=np.uint8)
+    overlay = np.zeros((4, 4, 4), dtype=np.uint8)
+    overlay[:, :2] = (200, 200, 200, 255)
+    overlay[:, 2:] = (0, 0, 0, 128)
+
+    composite_over(frame, prepare_layer(overlay, 2, 2, 8, 8))
+
+    assert (frame[2:6, 2:4] == 200).all()
+    assert (frame[2:6, 4:6] == 50).all()
+    assert (frame[:2] == 100).all() and (frame[:, 6:] == 100).all()
+
+
+def test_composite_visible_layers_writes_straight_alpha_png(tmp_path: Path) -> None:
+    bottom = np.zeros((20, 20, 4), dtype=np.uint8)
+    bottom[:, :] = (0, 0, 255, 255)
+    top = np.zeros((10, 10, 3), dtype=np.uint8)
+    top[:, :] = (255, 0, 0)
+    cv2.imwrite(str(tmp_path / "0.png"), bottom)
+    cv2.imwrite(str(tmp_path / "1.png"), top)
+
+    layers = [Layer(0, x=0, y=0), Layer(1, x=5, y=5), Layer(2, x=0, y=0)]
+    layers[2].visible = False
+    output = tmp_path / "out.png"
+    LayerManager().composite_visible_layers(
+        [(layers[0], str(tmp_path / "0.png")),
+         (layers[1], str(tmp_path / "1.png")),
+         (layers[2], str(tmp_path / "0.png"))],
+        str(output),
+        canvas_size=(30, 30),
+    )
+
+    result = cv2.imread(str(output), cv2.IMREAD_UNCHANGED)
+    assert tuple(result[0, 0]) == (0, 0, 255, 255)
+    assert tuple(result[10, 10]) == (255, 0, 0, 255)
+    assert tuple(result[25, 25]) == (0, 0, 0, 0)
+
+
+def test_to_tiles_covers_only_visible_pixels() -> None:
+    compositor = LayerCompositor(300, 200)
+    corner = np.zeros((10, 10, 4), dtype=np.uint8)
+    corner[:, :] = (1, 2, 3, 255)
+    compositor.add(corner, 0, 0)
+    compositor.add(corner, 290, 190)
+
+    tiles = compositor.to_tiles(tile_size=100)
+    assert [(t.x, t.y, t.width, t.height, t.opaque) for t in tiles] == [
+        (0, 0, 10, 10, True),
+        (290, 190, 10, 10, True),
+    ]
+
+    frame = np.zeros((200, 300, 3), dtype=np.uint8)
+    for tile in tiles:
+        composite_over(frame, tile)
+    assert (frame[:10, :10] == (1, 2, 3)).all() and (frame[190:, 290:] == (1, 2, 3)).all()
+    assert frame[10:190].sum() == 0
@@ -1,5 +1,10 @@
+import asyncio
 from pathlib import Path
 
+import pytest
+from blinker import signal
+
+from app.data import layer as layer_module
 from app.data.layer import Layer, LayerManager, LayerType
 
 
@@ -74,3 +79,25 @@ def test_get_valid_dimensions_prefers_project_resolution_without_layers(tmp_path
     manager = LayerManager()
     manager.load_layers(timeline_item)
     assert manager.get_valid_dimensions() == (1000, 2000)
+
+
+@pytest.mark.asyncio
+async def test_burst_of_layer_changes_composes_once(tmp_path: Path, monkeypatch) -> None:
+    timeline_item = _DummyTimelineItem(tmp_path)
+    timeline_item.set_config_value("layers", [{"id": 1, "type": "image", "width": 10, "height": 10}])
+    manager = LayerManager(layer_changed_signal=signal("layer_changed_debounce_test"))
+    manager.load_layers(timeline_item)
+    composed = []
+
+    async def fake_compose():
+        composed.append(True)
+
+    monkeypatch.setattr(layer_module, "COMPOSE_DEBOUNCE_SECONDS", 0.05)
+    monkeypatch.setattr(manager, "compose_layers", fake_compose)
+    for _ in range(5):
+        manager.save_layer(manager.get_layer(1))
+        await asyncio.sleep(0.01)
+    assert composed == []
+
+    await asyncio.sleep(0.15)
+    assert composed == [True]
@@ -1,6 +1,9 @@
+import os
 from pathlib import Path
 
+from app.data import resource as resource_module
 from app.data.resource import ResourceManager
+from utils.yaml_utils import load_yaml
 
 
 def test_add_get_search_and_delete_resource(tmp_path: Path) -> None:
@@ -52,3 +55,74 @@ def test_validate_index_reports_missing_and_orphaned_files(tmp_path: Path) -> No
     report = manager.validate_index()
     assert resource.name in report["missing_files"]
     assert "resources/others/orphan.bin" in report["orphaned_files"]
+
+
+def _sources(tmp_path: Path, count: int) -> list:
+    sources = []
+    for i in range(count):
+        source = tmp_path / f"shot_{i}.png"
+        source.write_bytes(b"fake%d" % i)
+        sources.append(str(source))
+    return sources
+
+
+def test_changes_are_journaled_and_replayed(tmp_path: Path) -> None:
+    manager = ResourceManager(str(tmp_path))
+    a, b = (manager.add_resource(path) for path in _sources(tmp_path, 2))
+    assert manager.update_metadata(a.name, {"prompt": "dawn"})
+    assert manager.delete_resource(b.name)
+
+    assert manager.journal.records == 4
+    assert load_yaml(manager.index_file) == {"resources": []}
+
+    reloaded = ResourceManager(str(tmp_path))
+    assert [r.name for r in reloaded.get_all()] == [a.name]
+    assert reloaded.get_by_id(a.resource_id).metadata["prompt"] == "dawn"
+    assert reloaded.get_by_id(b.resource_id) is None
+
+
+def test_torn_journal_tail_is_dropped(tmp_path: Path) -> None:
+    manager = ResourceManager(str(tmp_path))
+    resource = manager.add_resource(_sources(tmp_path, 1)[0])
+    with open(manager.journal.path, "a", encoding="utf-8") as f:
+        f.write('{"op": "delete", "na')
+
+    reloaded = ResourceManager(str(tmp_path))
+    assert reloaded.get_by_name(resource.name) is not None
+    assert reloaded.journal.records == 1
+    assert Path(reloaded.journal.path).read_text(encoding="utf-8").endswith("}\n")
+
+
+def test_journal_is_compacted_into_snapshot(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(resource_module, "COMPACT_MIN_RECORDS", 3)
+    manager = ResourceManager(str(tmp_path))
+    for path in _sources(tmp_path, 3):
+        manager.add_resource(path)
+
+    assert manager.journal.records == 0
+    assert not os.path.exists(manager.journal.path)
+    assert len(load_yaml(manager.index_file)["resources"]) == 3
+
+    # A journal replayed over a snapshot that already has its changes is harmless
+    manager.journal.append([{"op": "add", "resource": r.to_dict()} for r in manager.get_all()])
+    assert len(ResourceManager(str(tmp_path)).get_all()) == 3
+
+
+def test_add_resources_in_bulk(tmp_path: Path) -> None:
+    manager = ResourceManager(str(tmp_path))
+    sources = _sources(tmp_path, 5)
+    sources.insert(2, str(tmp_path / "missing.png"))
+    sources.append(sources[0])
+
+    resources = manager.add_resources(sources, source_type="ai_generated", additional_metadata={"task": "t1"})
+    assert resources[2] is None
+    added = [r for r in resources if r is not None]
+    assert len(added) == 6
+    assert len({r.name for r in added}) == 6
+    assert resources[-1].name == "shot_0_1.png"
+    assert all((tmp_path / r.file_path).exists() for r in added)
+    assert manager.journal.records == 6
+
+    reloaded = ResourceManager(str(tmp_path))
+    assert {r.name for r in reloaded.get_by_source("ai_generated", "")} == {r.name for r in added}
+    assert reloaded.get_by_name("shot_3.png").metadata["task"] == "t1"
@@ -39,3 +39,17 @@ async def test_load_all_tasks_async_loads_numeric_dirs_only(tmp_path):
     assert set(manager.tasks.keys()) == {"0", "1"}
     assert manager.get_task_by_id("0") is not None
     assert len(manager.get_all_tasks()) == 2
+
+
+@pytest.mark.asyncio
+async def test_tasks_page_through_index_without_full_load(tmp_path):
+    shot = SimpleNamespace(scene_id="scene_1", shot_id="shot_2")
+    manager = ShotTaskManager(shot=shot, shot_dir=str(tmp_path), executor=SimpleNamespace())
+    for prompt in ("one", "two", "three"):
+        await manager.create_task({"tool": "text2image", "prompt": prompt})
+
+    reopened = ShotTaskManager(shot=shot, shot_dir=str(tmp_path), executor=SimpleNamespace())
+
+    assert reopened.get_task_count() == 3
+    assert [t.options["prompt"] for t in reopened.get_all_tasks(0, 2)] == ["three", "two"]
+    assert set(reopened.tasks) == {"2", "1"}
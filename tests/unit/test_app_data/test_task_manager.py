@@ -1,6 +1,11 @@
 from pathlib import Path
+from types import SimpleNamespace
 
-from app.data.task import Task, TaskProgress, TaskResult
+import pytest
+
+import app.data.task as task_module
+from app.data.task import ProjectTaskManager, Task, TaskProgress, TaskResult, TimelineItemTaskManager
+from app.data.task_index import COMPACT_SLACK, TASK_INDEX_NAME, TaskIndex, task_index_entry
 from utils.yaml_utils import save_yaml
 
 
@@ -70,3 +75,108 @@ def test_task_progress_persists_and_notifies(tmp_path: Path) -> None:
     assert task.options["percent"] == 55
     assert task.options["logs"] == "running"
     assert manager.progress_events == [(55, "running")]
+
+
+class _DummyTimelineItem:
+    def __init__(self):
+        self.config = {}
+        self.timeline = SimpleNamespace(project=SimpleNamespace(task_manager=None))
+
+    def get_config_value(self, key):
+        return self.config.get(key)
+
+    def set_config_value(self, key, value):
+        self.config[key] = value
+
+
+@pytest.mark.asyncio
+async def test_task_pages_read_index_and_only_page_configs(tmp_path: Path, monkeypatch) -> None:
+    manager = TimelineItemTaskManager(_DummyTimelineItem(), str(tmp_path / "tasks"))
+    for i in range(5):
+        await manager.create_task({"tool": "text2image", "prompt": str(i)}, None)
+
+    reopened = TimelineItemTaskManager(manager.timeline_item, manager.tasks_path)
+    reads = []
+    real_read = task_module.read_task_options
+    monkeypatch.setattr(task_module, "read_task_options", lambda path: reads.append(path) or real_read(path))
+
+    assert reopened.get_task_count() == 5
+    assert reopened.get_task_ids() == ["4", "3", "2", "1", "0"]
+    page = reopened.get_all_tasks(1, 2)
+    assert [task.task_id for task in page] == ["3", "2"]
+    assert [task.options["prompt"] for task in page] == ["3", "2"]
+    assert len(reads) == 2
+    assert reopened.get_task_by_id("2") is page[1]
+    assert reopened.get_task_by_id("9") is None
+
+
+@pytest.mark.asyncio
+async def test_task_index_records_status_and_results(tmp_path: Path) -> None:
+    manager = TimelineItemTaskManager(_DummyTimelineItem(), str(tmp_path / "tasks"))
+    task = await manager.create_task({"tool": "text2image"}, None)
+    task.options.update(status="success", image_resource_path="resources/images/a.png")
+    manager.record_task(task)
+
+    entry = TaskIndex(manager.tasks_path).get(task.task_id)
+    assert entry["status"] == "success"
+    assert entry["image"] == "resources/images/a.png"
+    assert entry["tool"] == "text2image"
+    assert entry["created"] == task.options["created_at"]
+
+
+@pytest.mark.asyncio
+async def test_task_index_records_failed_executions(tmp_path: Path) -> None:
+    manager = TimelineItemTaskManager(_DummyTimelineItem(), str(tmp_path / "tasks"))
+    project_tm = ProjectTaskManager(project=None)
+
+    async def broken_tool(task):
+        if task.tool == "broken":
+            raise RuntimeError("server unreachable")
+
+    async def silent_tool(task):
+        if task.tool == "silent":
+            TaskProgress(task).on_progress(100, "model returned an error")
+
+    async def working_tool(task):
+        if task.tool == "working":
+            task.status = task.options["status"] = "success"
+            manager.record_task(task)
+
+    for tool in (broken_tool, silent_tool, working_tool):
+        project_tm.connect_task_execute(tool)
+    tasks = [await manager.create_task({"tool": tool}, project_tm) for tool in ("broken", "silent", "working")]
+    for task in tasks:
+        await project_tm._on_execute_task(task)
+
+    index = TaskIndex(manager.tasks_path)
+    assert [index.get(task.task_id)["status"] for task in tasks] == ["failed", "failed", "success"]
+    assert [task.log for task in tasks[:2]] == ["server unreachable", "model returned an error"]
+    reloaded = TimelineItemTaskManager(manager.timeline_item, manager.tasks_path).get_task_by_id(tasks[0].task_id)
+    assert reloaded.status == "failed"
+
+
+def test_task_index_is_rebuilt_from_task_dirs(tmp_path: Path) -> None:
+    for i in range(3):
+        (tmp_path / str(i)).mkdir()
+        save_yaml(tmp_path / str(i) / "config.yml", {"tool": "image2video", "status": "success"})
+    (tmp_path / "misc").mkdir()
+
+    index = TaskIndex(str(tmp_path))
+
+    assert index.ids() == ["2", "1", "0"]
+    assert index.get("1")["tool"] == "image2video"
+    assert (tmp_path / TASK_INDEX_NAME).exists()
+
+
+def test_task_index_drops_torn_tail_and_compacts(tmp_path: Path) -> None:
+    index = TaskIndex(str(tmp_path))
+    for i in range(COMPACT_SLACK + 10):
+        index.record(task_index_entry("0", {"percent": i}))
+    assert index._journal.records <= COMPACT_SLACK + 1
+
+    with open(tmp_path / TASK_INDEX_NAME, "ab") as f:
+        f.write(b'{"id": "1", "sta')
+    reopened = TaskIndex(str(tmp_path))
+    assert reopened.ids() == ["0"]
+    reopened.record(task_index_entry("1", {}))
+    assert TaskIndex(str(tmp_path)).ids() == ["1", "0"]
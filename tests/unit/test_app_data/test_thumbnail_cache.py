@@ -0,0 +1,72 @@
+import os
+from pathlib import Path
+
+from PySide6.QtGui import QColor, QImage
+
+from app.data.thumbnail_cache import CARD, PANEL, ThumbnailCache, get_thumbnail_cache, read_scaled_image
+
+
+def _write_image(path: Path, width: int, height: int, color: str = "red") -> str:
+    image = QImage(width, height, QImage.Format.Format_RGB32)
+    image.fill(QColor(color))
+    assert image.save(str(path))
+    return str(path)
+
+
+def test_read_scaled_image_fits_or_covers_box(tmp_path: Path) -> None:
+    source = _write_image(tmp_path / "wide.png", 1000, 500)
+
+    fit = read_scaled_image(source, 100, 100)
+    assert (fit.width(), fit.height()) == (100, 50)
+
+    cover = read_scaled_image(source, 100, 100, cover=True)
+    assert (cover.width(), cover.height()) == (200, 100)
+
+    small = read_scaled_image(_write_image(tmp_path / "small.png", 20, 10), 100, 100)
+    assert (small.width(), small.height()) == (20, 10)
+
+
+def test_thumbnail_is_generated_once_per_size(tmp_path: Path) -> None:
+    source = _write_image(tmp_path / "image.png", 720, 1280)
+    cache = ThumbnailCache(str(tmp_path / "thumbs"))
+
+    card = cache.load(source, CARD)
+    assert (card.width(), card.height()) == (180, 320)
+    panel = cache.load(source, PANEL)
+    assert max(panel.width(), panel.height()) == 360
+
+    card_path = cache.thumbnail_path(source, CARD)
+    assert os.path.exists(card_path) and os.path.exists(cache.thumbnail_path(source, PANEL))
+    stored_at = os.stat(card_path).st_mtime_ns
+    assert not cache.load(source, CARD).isNull()
+    assert os.stat(card_path).st_mtime_ns == stored_at
+
+
+def test_edited_source_replaces_stale_thumbnail(tmp_path: Path) -> None:
+    source = tmp_path / "image.png"
+    _write_image(source, 720, 1280, "red")
+    cache = ThumbnailCache(str(tmp_path / "thumbs"))
+    cache.load(str(source), CARD)
+    old_path = cache.thumbnail_path(str(source), CARD)
+
+    _write_image(source, 360, 640, "blue")
+    os.utime(source, ns=(os.stat(source).st_atime_ns, os.stat(source).st_mtime_ns + 10 ** 9))
+    thumb = cache.load(str(source), CARD)
+
+    assert QColor(thumb.pixel(5, 5)).blue() > 200
+    assert not os.path.exists(old_path)
+    assert len(os.listdir(tmp_path / "thumbs" / CARD.name)) == 1
+
+
+def test_invalidate_and_missing_source(tmp_path: Path) -> None:
+    source = _write_image(tmp_path / "image.png", 64, 64)
+    cache = get_thumbnail_cache(str(tmp_path))
+    assert cache is get_thumbnail_cache(str(tmp_path))
+
+    cache.load(source, CARD)
+    cache.load(source, PANEL)
+    cache.invalidate(source)
+    assert not os.path.exists(cache.thumbnail_path(source, CARD))
+    assert not os.path.exists(cache.thumbnail_path(source, PANEL))
+
+    assert cache.load(str(tmp_path / "missing.png"), CARD).isNull()
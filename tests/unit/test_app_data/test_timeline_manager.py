@@ -1,6 +1,8 @@
+import os
 from pathlib import Path
 
 from app.data.timeline import Timeline, TimelineItem
+from utils.yaml_utils import load_yaml
 
 
 class _DummyProject:
@@ -84,8 +86,85 @@ def test_timeline_delete_and_move_item_update_index(tmp_path: Path) -> None:
     assert timeline.delete_item(2)
     assert timeline.get_item_count() == 2
     assert project.get_timeline_index() == 1
-    assert (root / "2").exists()  # former index 3 shifted to 2
+    assert not (root / "2").exists()
+    assert timeline.get_item(2).item_id == "3"  # former index 3 shifted to 2, directory unchanged
 
     # now move item 2 -> 1
     assert timeline.move_item(2, 1)
     assert project.get_timeline_index() == 2  # moved around selected item tracking rule
+
+
+def test_numeric_layout_is_migrated_to_manifest(tmp_path: Path) -> None:
+    root = _make_timeline_root(tmp_path, 3)
+    (root / "10").mkdir()
+    project = _DummyProject()
+    project.config["timeline_item_durations"] = {"1": 2.5, "10": 4.0}
+    timeline = Timeline(workspace=None, project=project, timelinePath=str(root))
+
+    assert timeline.get_item_count() == 4
+    assert [timeline.get_item_id(i) for i in range(1, 5)] == ["1", "2", "3", "10"]
+    assert timeline.get_item_duration(1) == 2.5
+    assert timeline.get_item_duration(4) == 4.0
+    assert not timeline.has_item_duration(2)
+    manifest = load_yaml(root / Timeline.MANIFEST_NAME)
+    assert manifest["items"][0] == {"id": "1", "duration": 2.5}
+
+
+def test_move_and_delete_rewrite_manifest_only(tmp_path: Path) -> None:
+    root = _make_timeline_root(tmp_path, 4)
+    project = _DummyProject()
+    project.update_config("timeline_size", 4)
+    timeline = Timeline(workspace=None, project=project, timelinePath=str(root))
+    timeline.set_item_duration(1, 3.0)
+    first = timeline.get_item(1)
+    first.set_prompt("first")
+
+    assert timeline.move_item(1, 3)
+    assert first.index == 3
+    assert timeline.get_item(3) is first
+    assert first.get_item_path() == str(root / "1")
+    assert timeline.get_item_duration(3) == 3.0
+
+    assert timeline.delete_item(2)
+    assert first.index == 2
+    assert sorted(p.name for p in root.iterdir() if p.is_dir()) == ["1", "2", "4"]
+
+    reloaded = Timeline(workspace=None, project=project, timelinePath=str(root))
+    assert [reloaded.get_item_id(i) for i in range(1, 4)] == ["2", "1", "4"]
+    assert reloaded.get_item(2).get_prompt() == "first"
+    assert reloaded.get_item_duration(2) == 3.0
+    assert reloaded.get_item(4) is None
+
+
+def test_insert_item_uses_new_stable_id(tmp_path: Path, monkeypatch) -> None:
+    root = _make_timeline_root(tmp_path, 2)
+    project = _DummyProject()
+    project.update_config("timeline_index", 2)
+    timeline = Timeline(workspace=None, project=project, timelinePath=str(root))
+    monkeypatch.setattr(timeline, "add_image", lambda index: None)
+    second = timeline.get_item(2)
+
+    assert timeline.insert_item(1) == 1
+    new_id = timeline.get_item_id(1)
+    assert new_id not in ("1", "2") and (root / new_id).is_dir()
+    assert second.index == 3
+    assert project.get_timeline_index() == 3
+    assert timeline.add_item() == 4
+
+
+def test_item_content_is_cached_until_invalidated(tmp_path: Path, monkeypatch) -> None:
+    root = _make_timeline_root(tmp_path, 2)
+    project = _DummyProject()
+    timeline = Timeline(workspace=None, project=project, timelinePath=str(root))
+    (root / "1" / "image.png").write_bytes(b"x")
+    assert [item.index for item in timeline.get_items()] == [1]
+
+    calls = []
+    real_exists = os.path.exists
+    monkeypatch.setattr(os.path, "exists", lambda path: calls.append(path) or real_exists(path))
+    (root / "2" / "video.mp4").write_bytes(b"x")
+    assert [item.index for item in timeline.get_items()] == [1]
+    assert calls == []
+
+    timeline.timeline_changed.send(timeline, timeline_item=timeline.get_item(2))
+    assert [item.index for item in timeline.get_items()] == [1, 2]
@@ -0,0 +1,134 @@
+"""
+Unit tests for app/ui/canvas/video_layer_decoder.py
+
+Tests the shared video layer decoding service including:
+- Frames decoded and scaled on worker threads
+- Shared playback clock and dropping of late frames
+- Pausing decoding for inactive streams
+"""
+
+import time
+from fractions import Fraction
+
+import cv2
+import numpy as np
+import pytest
+
+# app.ui.canvas imports the preview overlay, which needs a working QtMultimedia backend
+pytest.importorskip("PySide6.QtMultimedia", exc_type=ImportError)
+
+from app.ui.canvas import video_layer_decoder
+from app.ui.canvas.video_layer_decoder import VideoLayerDecoder
+from utils.media_probe import MediaProbe
+
+WIDTH, HEIGHT, FRAMES, FPS = 64, 48, 40, 10.0
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def video(tmp_path, monkeypatch):
+    path = str(tmp_path / "layer.mp4")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), FPS, (WIDTH, HEIGHT))
+    if not writer.isOpened():
+        pytest.skip("OpenCV build cannot write mp4v")
+    for i in range(FRAMES):
+        writer.write(np.full((HEIGHT, WIDTH, 3), 6 * i, dtype=np.uint8))
+    writer.release()
+    probe = MediaProbe(width=WIDTH, height=HEIGHT, duration=FRAMES / FPS,
+                       frame_rate=Fraction(int(FPS)), frame_count=FRAMES)
+    monkeypatch.setattr(video_layer_decoder, "get_media_probe", lambda path: probe)
+    return path
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def decoder(clock):
+    decoder = VideoLayerDecoder(workers=2, clock=clock)
+    yield decoder
+    decoder.shutdown()
+
+
+def _wait_until(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for the decoder"
+        time.sleep(0.01)
+
+
+def _brightness(image):
+    return image.pixelColor(image.width() // 2, image.height() // 2).red()
+
+
+class TestDecoding:
+    """Tests for background decoding and the shared clock."""
+
+    def test_frames_are_prescaled_off_the_gui_thread(self, video, decoder):
+        """Frames arrive as QImages already fitted to the widget box."""
+        shown = []
+        stream = decoder.register(video, 32, 32, shown.append)
+        _wait_until(lambda: stream.buffered() == stream.queue_size)
+
+        decoder.tick()
+        assert len(shown) == 1
+        assert (shown[0].width(), shown[0].height()) == (32, 24)
+        assert stream.shown_index == 0
+
+    def test_late_frames_are_dropped(self, video, decoder, clock):
+        """When the clock runs ahead, stale frames are skipped, not shown in turn."""
+        shown = []
+        stream = decoder.register(video, WIDTH, HEIGHT, shown.append)
+        _wait_until(lambda: stream.buffered() == stream.queue_size)
+
+        clock.now = 2.0  # Frame 20 is due
+        decoder.tick()
+        assert stream.dropped >= stream.queue_size - 1
+        _wait_until(lambda: stream.buffered() > 0)
+        decoder.tick()
+        assert stream.shown_index == 20
+        assert abs(_brightness(shown[-1]) - 120) <= 4
+
+    def test_streams_follow_one_clock(self, video, decoder, clock):
+        """Two layers show the same frame for the same clock position."""
+        a = decoder.register(video, WIDTH, HEIGHT, lambda image: None)
+        b = decoder.register(video, WIDTH, HEIGHT, lambda image: None)
+        _wait_until(lambda: a.buffered() and b.buffered())
+
+        clock.now = 0.15
+        _wait_until(lambda: a.buffered() == a.queue_size and b.buffered() == b.queue_size)
+        decoder.tick()
+        assert a.shown_index == b.shown_index == 1
+
+
+class TestActivation:
+    """Tests for set_active and unregister."""
+
+    def test_inactive_stream_is_not_decoded(self, video, decoder):
+        shown = []
+        stream = decoder.register(video, WIDTH, HEIGHT, shown.append, active=False)
+        decoder.tick()
+        time.sleep(0.1)
+        assert stream.decoded == 0 and not shown
+
+        decoder.set_active(stream, True)
+        _wait_until(lambda: stream.decoded > 0)
+        decoder.set_active(stream, False)
+        assert stream.buffered() == 0
+
+    def test_unregister_releases_stream(self, video, decoder):
+        stream = decoder.register(video, WIDTH, HEIGHT, lambda image: None)
+        _wait_until(lambda: stream.decoded > 0)
+        decoder.unregister(stream)
+        _wait_until(lambda: stream._cap is None)
+        decoder.tick()
+        assert stream.buffered() == 0
@@ -6,6 +6,7 @@ Tests plugin manager functionality including:
 - ServerInfo: Server metadata dataclass
 - abilities_from_plugin_yml: Parse abilities from config
 - PluginProcess: Plugin process management
+- PluginPool: Worker pool dispatch and warm spares
 - PluginManager: Plugin discovery and management
 """
 
@@ -19,6 +20,7 @@ from server.plugins.plugin_manager import (
     ServerInfo,
     abilities_from_plugin_yml,
     PluginProcess,
+    PluginPool,
     PluginManager,
     PluginExecutionError,
 )
@@ -370,4 +372,275 @@ class TestPluginManagerStopAllPlugins:
 
         mock_plugin1.stop.assert_called_once()
         mock_plugin2.stop.assert_called_once()
-        assert manager.plugins == {}
\ No newline at end of file
+        assert manager.plugins == {}
+
+class _FakeStdin:
+    """Collects JSON-RPC requests written by PluginProcess."""
+
+    def __init__(self):
+        self.requests = []
+
+    def write(self, data: bytes):
+        import json
+        self.requests.append(json.loads(data.decode()))
+
+    async def drain(self):
+        pass
+
+
+def _make_running_process(max_concurrent_tasks: int = 4) -> PluginProcess:
+    """Create a ready PluginProcess wired to in-memory stdin/stdout."""
+    server_info = Mock()
+    server_info.name = "fake"
+    server_info.config = {"execution": {"max_concurrent_tasks": max_concurrent_tasks}}
+    process = PluginProcess(server_info)
+
+    fake = Mock()
+    fake.returncode = None
+    fake.stdin = _FakeStdin()
+    fake.stdout = asyncio.StreamReader()
+    process.process = fake
+    process.is_ready = True
+    process._reader_task = asyncio.create_task(process._demux_loop())
+    return process
+
+
+def _feed(process: PluginProcess, message: dict):
+    import json
+    process.process.stdout.feed_data((json.dumps(message) + "\n").encode())
+
+
+def _task(task_id: str):
+    task = Mock()
+    task.task_id = task_id
+    task.to_dict.return_value = {"task_id": task_id}
+    return task
+
+
+async def _collect(process: PluginProcess, request_id: int) -> list:
+    return [m async for m in process.receive_messages(request_id)]
+
+
+class TestPluginProcessMultiplexing:
+    """Tests for request-id multiplexing over one plugin process."""
+
+    def test_max_concurrent_tasks_from_execution_config(self):
+        """max_concurrent_tasks is read from the execution section."""
+        server_info = Mock()
+        server_info.config = {"execution": {"max_concurrent_tasks": 8}}
+        assert PluginProcess(server_info).max_concurrent_tasks == 8
+
+    @pytest.mark.asyncio
+    async def test_interleaved_frames_routed_per_request(self):
+        """Progress and results of concurrent tasks reach their own streams."""
+        process = _make_running_process()
+        rid_a = await process.send_task(_task("a"))
+        rid_b = await process.send_task(_task("b"))
+        assert rid_a != rid_b
+        assert [r["id"] for r in process.process.stdin.requests] == [rid_a, rid_b]
+
+        collect_a = asyncio.create_task(_collect(process, rid_a))
+        collect_b = asyncio.create_task(_collect(process, rid_b))
+        _feed(process, {"method": "progress", "params": {"task_id": "b", "percent": 10}})
+        _feed(process, {"method": "progress", "params": {"task_id": "a", "percent": 50}})
+        _feed(process, {"result": {"task_id": "b", "status": "success"}, "id": rid_b})
+        _feed(process, {"method": "heartbeat", "params": {"type": "idle"}})
+        _feed(process, {"result": {"task_id": "a", "status": "success"}, "id": rid_a})
+
+        messages_a, messages_b = await asyncio.wait_for(
+            asyncio.gather(collect_a, collect_b), timeout=2.0
+        )
+        assert [m.get("params", m.get("result"))["task_id"] for m in messages_a] == ["a", "a"]
+        assert [m.get("params", m.get("result"))["task_id"] for m in messages_b] == ["b", "b"]
+        assert process.in_flight == 0
+        await process.stop()
+
+    @pytest.mark.asyncio
+    async def test_concurrency_cap_blocks_until_a_task_finishes(self):
+        """send_task waits for a free slot once the cap is reached."""
+        process = _make_running_process(max_concurrent_tasks=1)
+        rid_a = await process.send_task(_task("a"))
+
+        pending_send = asyncio.create_task(process.send_task(_task("b")))
+        await asyncio.sleep(0.05)
+        assert not pending_send.done()
+
+        _feed(process, {"result": {"task_id": "a", "status": "success"}, "id": rid_a})
+        await asyncio.wait_for(_collect(process, rid_a), timeout=2.0)
+        rid_b = await asyncio.wait_for(pending_send, timeout=2.0)
+        assert process.process.stdin.requests[-1]["id"] == rid_b
+        await process.stop()
+
+    @pytest.mark.asyncio
+    async def test_eof_ends_all_streams(self):
+        """Plugin exit terminates every pending stream and frees its slot."""
+        process = _make_running_process()
+        rid = await process.send_task(_task("a"))
+
+        process.process.stdout.feed_eof()
+        assert await asyncio.wait_for(_collect(process, rid), timeout=2.0) == []
+        assert process.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_ping_answered_while_task_in_flight(self):
+        """Ping responses are routed by id, not mixed into task streams."""
+        process = _make_running_process()
+        await process.send_task(_task("a"))
+
+        ping = asyncio.create_task(process.ping())
+        await asyncio.sleep(0)
+        ping_id = process.process.stdin.requests[-1]["id"]
+        _feed(process, {"result": {"status": "pong"}, "id": ping_id})
+
+        assert await asyncio.wait_for(ping, timeout=2.0) is True
+        assert process.in_flight == 1
+        await process.stop()
+
+    @pytest.mark.asyncio
+    async def test_duplicate_task_ids_each_release_their_slot(self):
+        """Two in-flight requests for one task_id (a retry) both give back their slot."""
+        process = _make_running_process(max_concurrent_tasks=2)
+        rid_first = await process.send_task(_task("a"))
+        rid_retry = await process.send_task(_task("a"))
+        assert process.in_flight == 2
+
+        _feed(process, {"result": {"task_id": "a", "status": "error"}, "id": rid_first})
+        await asyncio.wait_for(_collect(process, rid_first), timeout=2.0)
+        _feed(process, {"result": {"task_id": "a", "status": "success"}, "id": rid_retry})
+        await asyncio.wait_for(_collect(process, rid_retry), timeout=2.0)
+
+        assert process.in_flight == 0
+        # Both slots are free again
+        await asyncio.wait_for(asyncio.gather(
+            process.send_task(_task("b")), process.send_task(_task("c"))), timeout=2.0)
+        await process.stop()
+
+
+class _FakeWorker:
+    """Stand-in for PluginProcess that starts instantly."""
+
+    started = 0
+
+    def __init__(self, plugin_info):
+        self.plugin_info = plugin_info
+        self.max_concurrent_tasks = 2
+        self.load = 0
+        self.in_flight = 0
+        self.pid = None
+        self.is_alive = False
+        self.is_healthy = False
+        self._restart_count = 0
+
+    async def start(self):
+        _FakeWorker.started += 1
+        self.is_alive = self.is_healthy = True
+
+    async def stop(self):
+        self.is_alive = self.is_healthy = False
+
+
+def _make_pool(**execution) -> PluginPool:
+    server_info = Mock()
+    server_info.name = "fake"
+    server_info.config = {"execution": execution}
+    return PluginPool(server_info)
+
+
+class TestPluginPool:
+    """Tests for PluginPool dispatch."""
+
+    @pytest.fixture(autouse=True)
+    def fake_workers(self):
+        _FakeWorker.started = 0
+        with patch("server.plugins.plugin_manager.PluginProcess", _FakeWorker):
+            yield
+
+    def test_pool_config_defaults_to_single_worker(self):
+        """Without pool settings the pool behaves like one process."""
+        pool = _make_pool()
+        assert pool.pool_size == 1
+        assert pool.warm_spares == 0
+
+    @pytest.mark.asyncio
+    async def test_dispatches_to_least_loaded_worker(self):
+        """acquire returns the healthy worker with the fewest outstanding tasks."""
+        pool = _make_pool(pool_size=3)
+        first = await pool.acquire()
+        first.load = 1
+        second = _FakeWorker(pool.plugin_info)
+        await second.start()
+        pool.workers.append(second)
+
+        assert await pool.acquire() is second
+        second.load = 2
+        assert await pool.acquire() is first
+
+    @pytest.mark.asyncio
+    async def test_grows_only_when_workers_are_saturated(self):
+        """A new worker starts once every worker is at its cap, up to pool_size."""
+        pool = _make_pool(pool_size=2)
+        first = await pool.acquire()
+        assert await pool.acquire() is first
+
+        first.load = first.max_concurrent_tasks
+        second = await pool.acquire()
+        assert second is not first
+        second.load = second.max_concurrent_tasks
+
+        assert await pool.acquire() in (first, second)
+        assert len(pool.workers) == 2
+
+    @pytest.mark.asyncio
+    async def test_warm_spare_replaces_dead_worker(self):
+        """A dead worker is recycled and a warm spare takes its place."""
+        pool = _make_pool(warm_spares=1)
+        worker = await pool.acquire()
+        await pool._spare_task
+        assert len(pool.spares) == 1
+        spare = pool.spares[0]
+
+        worker.is_alive = False
+        assert await pool.acquire() is spare
+        assert pool.stats["recycled"] == 1
+        assert pool.stats["cold_starts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stop_waits_for_recycled_workers(self):
+        """Background stops of recycled workers are tracked and awaited on shutdown."""
+        manager = PluginManager()
+        pool = _make_pool()
+        manager.plugins = {"fake": pool}
+        worker = await pool.acquire()
+        release = asyncio.Event()
+        stopped = []
+
+        async def slow_stop():
+            await release.wait()
+            stopped.append(worker)
+
+        worker.stop = slow_stop
+        worker.is_alive = False
+        await pool.acquire()
+        assert len(pool._stopping) == 1
+
+        shutdown = asyncio.create_task(manager.stop_all_plugins())
+        await asyncio.sleep(0)
+        assert not shutdown.done()
+        release.set()
+        await shutdown
+        assert stopped == [worker]
+        assert not pool._stopping
+
+    @pytest.mark.asyncio
+    async def test_manager_get_plugin_uses_pool(self):
+        """PluginManager.get_plugin dispatches through a per-plugin pool."""
+        manager = PluginManager()
+        server_info = Mock()
+        server_info.config = {}
+        manager.plugin_infos = {"fake": server_info}
+
+        worker = await manager.get_plugin("fake")
+        assert await manager.get_plugin("fake") is worker
+        stats = manager.get_pool_stats()
+        assert stats["fake"]["dispatched"] == 2
+        assert len(stats["fake"]["workers"]) == 1
@@ -0,0 +1,193 @@
+"""
+Unit tests for remote downloads in server/api/resource_processor.py
+"""
+import asyncio
+import base64
+import gc
+import os
+import warnings
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from server.api.resource_processor import ResourceProcessor, ResourceProcessingError
+from server.api.types import ResourceInput, ResourceType
+
+PAYLOAD = bytes(range(256)) * 400  # 100KB
+
+
+class FileServer:
+    """Local HTTP server serving PAYLOAD with ETag and Range support."""
+
+    def __init__(self):
+        self.requests = []
+        self.range_headers = []
+        self.release = asyncio.Event()
+        self.release.set()
+        self.cut_after = None  # Drop the connection after this many bytes
+        self.runner = None
+        self.base_url = None
+
+    async def handle(self, request):
+        self.requests.append(request.path)
+        self.range_headers.append(request.headers.get("Range"))
+        await self.release.wait()
+        if request.path == "/missing":
+            return web.Response(status=404)
+
+        start = 0
+        status = 200
+        range_header = request.headers.get("Range")
+        if range_header and request.headers.get("If-Range") == '"v1"':
+            start = int(range_header.split("=")[1].rstrip("-"))
+            status = 206
+        body = PAYLOAD[start:]
+
+        response = web.StreamResponse(status=status, headers={"ETag": '"v1"'})
+        response.content_length = len(body)
+        await response.prepare(request)
+        if self.cut_after is not None:
+            await response.write(body[:self.cut_after])
+            request.transport.close()
+            return response
+        await response.write(body)
+        await response.write_eof()
+        return response
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/{name}", self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = self.runner.addresses[0][:2]
+        self.base_url = f"http://{host}:{port}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+@pytest_asyncio.fixture
+async def server():
+    file_server = FileServer()
+    await file_server.start()
+    yield file_server
+    file_server.release.set()
+    await file_server.stop()
+
+
+@pytest_asyncio.fixture
+async def processor(tmp_path):
+    resource_processor = ResourceProcessor(cache_dir=str(tmp_path / "cache"))
+    yield resource_processor
+    await resource_processor.close()
+
+
+def _remote(url):
+    return ResourceInput(ResourceType.REMOTE_URL, url, "image/png")
+
+
+class TestRemoteDownload:
+    """Tests for shared, atomic and resumable downloads"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_download(self, server, processor):
+        server.release.clear()
+        pending = [asyncio.create_task(processor.process_resource(_remote(f"{server.base_url}/a")))
+                   for _ in range(3)]
+        await asyncio.sleep(0.1)
+        cache_file = next(processor.cache_dir.iterdir(), None)
+        assert cache_file is None or cache_file.name.endswith(".part")  # Nothing final yet
+        server.release.set()
+
+        paths = await asyncio.gather(*pending)
+        assert len(set(paths)) == 1
+        assert server.requests == ["/a"]
+        assert open(paths[0], "rb").read() == PAYLOAD
+        assert [p.name for p in processor.cache_dir.iterdir()] == [os.path.basename(paths[0])]
+
+        # Cached afterwards; the pooled session is reused
+        session = processor._session
+        await processor.process_resource(_remote(f"{server.base_url}/a"))
+        await processor.process_resource(_remote(f"{server.base_url}/b"))
+        assert server.requests == ["/a", "/b"]
+        assert processor._session is session
+
+    @pytest.mark.asyncio
+    async def test_interrupted_download_resumes(self, server, processor):
+        server.cut_after = 30000
+        with pytest.raises(ResourceProcessingError):
+            await processor.process_resource(_remote(f"{server.base_url}/a"))
+        part_files = list(processor.cache_dir.glob("*.part"))
+        assert len(part_files) == 1
+        assert part_files[0].stat().st_size == 30000
+
+        server.cut_after = None
+        path = await processor.process_resource(_remote(f"{server.base_url}/a"))
+        assert server.range_headers[-1] == "bytes=30000-"
+        assert open(path, "rb").read() == PAYLOAD
+        assert not list(processor.cache_dir.glob("*.part*"))
+
+    @pytest.mark.asyncio
+    async def test_http_error_leaves_nothing_behind(self, server, processor):
+        with pytest.raises(ResourceProcessingError):
+            await processor.process_resource(_remote(f"{server.base_url}/missing"))
+        assert list(processor.cache_dir.iterdir()) == []
+
+
+class TestDownloadSession:
+    """Tests for the shared session across event loops"""
+
+    def test_new_event_loop_replaces_and_closes_session(self, tmp_path):
+        processor = ResourceProcessor(cache_dir=str(tmp_path / "cache"))
+
+        async def download(name):
+            file_server = FileServer()
+            await file_server.start()
+            try:
+                await processor.process_resource(_remote(f"{file_server.base_url}/{name}"))
+                return processor._session
+            finally:
+                await file_server.stop()
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            first = asyncio.run(download("a"))
+            second = asyncio.run(download("b"))
+            assert first.closed
+            assert second is not first and not second.closed
+            asyncio.run(processor.close())
+            assert second.closed
+            del first, second
+            gc.collect()
+        assert not [w for w in caught if "Unclosed" in str(w.message)]
+
+
+class TestCacheEviction:
+    """Tests for size-bounded cache eviction"""
+
+    def test_least_recently_used_files_go_first(self, tmp_path):
+        processor = ResourceProcessor(cache_dir=str(tmp_path), config={"max_cache_bytes": 250})
+        for i, name in enumerate(["old.png", "used.png", "new.png"]):
+            path = tmp_path / name
+            path.write_bytes(b"x" * 100)
+            os.utime(path, (1000 + i, 1000 + i))
+        processor._touch(tmp_path / "old.png")  # Cache hit makes it recent
+        (tmp_path / "results").mkdir()  # Sub-directories are not touched
+
+        assert processor.evict_to_size() == 1
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["new.png", "old.png", "results"]
+        assert processor.evict_to_size() == 0
+
+    @pytest.mark.asyncio
+    async def test_base64_write_evicts(self, tmp_path):
+        processor = ResourceProcessor(cache_dir=str(tmp_path), config={"max_cache_bytes": 150})
+        old = tmp_path / "old.png"
+        old.write_bytes(b"x" * 100)
+        os.utime(old, (1000, 1000))
+
+        data = base64.b64encode(b"y" * 100).decode()
+        path = await processor.process_resource(ResourceInput(ResourceType.BASE64, data, "image/png"))
+        assert [p.name for p in tmp_path.iterdir()] == [os.path.basename(path)]
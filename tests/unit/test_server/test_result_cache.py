@@ -0,0 +1,156 @@
+"""
+Unit tests for the task result cache in server/service/result_cache.py
+"""
+import asyncio
+import os
+import time
+
+import pytest
+
+from server.api.types import Ability, FilmetoTask, ResourceInput, ResourceType, TaskResult
+from server.service.filmeto_service import FilmetoService, TaskStatusStore
+from server.service.result_cache import ResultCache, is_deterministic
+from server.service.task_scheduler import TaskScheduler
+
+
+def _task(seed=7, **parameters):
+    return FilmetoTask(
+        ability=Ability.TEXT2IMAGE,
+        server_name="local",
+        model_name="m1",
+        parameters={"prompt": "a sunset", "seed": seed, **parameters},
+    )
+
+
+def _result(tmp_path, task_id="t1", status="success"):
+    output = tmp_path / f"{task_id}.png"
+    output.write_bytes(b"png" * 100)
+    return TaskResult(task_id=task_id, status=status, output_files=[str(output)])
+
+
+class TestResultCacheKeys:
+    """Tests for cache keys and determinism"""
+
+    @pytest.mark.asyncio
+    async def test_key_ignores_task_id_and_parameter_order(self, tmp_path):
+        cache = ResultCache(str(tmp_path / "cache"))
+        a = _task(width=512, height=512)
+        b = _task(height=512, width=512)
+        assert a.task_id != b.task_id
+        assert await cache.key_for(a) == await cache.key_for(b)
+        assert await cache.key_for(a) != await cache.key_for(_task(seed=8))
+
+    @pytest.mark.asyncio
+    async def test_key_follows_input_file_content(self, tmp_path):
+        cache = ResultCache(str(tmp_path / "cache"))
+        image = tmp_path / "in.png"
+        image.write_bytes(b"one")
+        task = _task()
+        task.resources = [ResourceInput(ResourceType.LOCAL_PATH, str(image), "image/png")]
+        first = await cache.key_for(task)
+
+        image.write_bytes(b"two")
+        os.utime(image, ns=(time.time_ns() + 10**9,) * 2)
+        assert await cache.key_for(task) != first
+
+    def test_only_seeded_tasks_are_deterministic(self):
+        assert is_deterministic(_task(seed=0))
+        assert not is_deterministic(_task(seed=-1))
+        assert not is_deterministic(_task(seed=None))
+        assert not is_deterministic(_task(seed=True))
+
+
+class TestResultCacheStorage:
+    """Tests for storing, expiring and evicting results"""
+
+    @pytest.mark.asyncio
+    async def test_put_get_survives_removed_output_and_restart(self, tmp_path):
+        cache = ResultCache(str(tmp_path / "cache"))
+        result = _result(tmp_path)
+        await cache.put("k", result)
+        os.remove(result.output_files[0])
+
+        hit = await ResultCache(str(tmp_path / "cache")).get("k")
+        assert hit.status == "success"
+        assert open(hit.output_files[0], "rb").read() == b"png" * 100
+
+    @pytest.mark.asyncio
+    async def test_failures_are_not_stored(self, tmp_path):
+        cache = ResultCache(str(tmp_path / "cache"))
+        await cache.put("k", _result(tmp_path, status="error"))
+        assert await cache.get("k") is None
+
+    @pytest.mark.asyncio
+    async def test_ttl_and_size_bounds(self, tmp_path):
+        cache = ResultCache(str(tmp_path / "cache"), max_bytes=500)
+        await cache.put("a", _result(tmp_path, "a"))
+        await cache.put("b", _result(tmp_path, "b"))
+        assert await cache.get("a") is None  # 300 + 300 bytes > 500: oldest dropped
+        assert await cache.get("b") is not None
+
+        cache.ttl = 0
+        await asyncio.sleep(0.01)
+        assert await cache.get("b") is None
+        assert cache.stats()["entries"] == 0
+
+
+def _service(tmp_path):
+    service = FilmetoService.__new__(FilmetoService)
+    service.result_cache = ResultCache(str(tmp_path / "cache"))
+    service._task_store = TaskStatusStore()
+    service._task_queue = TaskScheduler()
+    return service
+
+
+class TestServiceResultCache:
+    """Tests for the result cache in FilmetoService.execute_task_stream"""
+
+    @pytest.mark.asyncio
+    async def test_identical_tasks_share_one_execution(self, tmp_path):
+        service = _service(tmp_path)
+        runs = []
+        release = asyncio.Event()
+
+        async def execute(task, priority=0):
+            runs.append(task.task_id)
+            await release.wait()
+            yield _result(tmp_path, task.task_id)
+
+        service._execute_task_stream = execute
+
+        async def collect(task):
+            return [update async for update in service.execute_task_stream(task)][-1]
+
+        first, second = _task(), _task()
+        pending = [asyncio.create_task(collect(first)), asyncio.create_task(collect(second))]
+        await asyncio.sleep(0.05)
+        release.set()
+        results = await asyncio.gather(*pending)
+
+        assert runs == [first.task_id]
+        assert results[1].task_id == second.task_id
+        assert results[1].metadata["cache_hit"] is True
+
+        # Stored: a later identical task does not run at all
+        await asyncio.sleep(0.05)
+        third = await collect(_task())
+        assert runs == [first.task_id]
+        assert third.metadata["cached_task_id"] == first.task_id
+        assert (await service.get_task_status(third.task_id))["cache_hit"] is True
+
+    @pytest.mark.asyncio
+    async def test_opt_out_and_unseeded_tasks_always_run(self, tmp_path):
+        service = _service(tmp_path)
+        runs = []
+
+        async def execute(task, priority=0):
+            runs.append(task.task_id)
+            yield _result(tmp_path, task.task_id)
+
+        service._execute_task_stream = execute
+        opted_out = _task()
+        opted_out.use_cache = False
+        for task in (_task(seed=-1), _task(seed=-1), opted_out):
+            async for _ in service.execute_task_stream(task):
+                pass
+        assert len(runs) == 3
@@ -0,0 +1,150 @@
+"""
+Unit tests for server/plugins/rpc_framing.py
+
+Tests plugin wire formats including:
+- Binary frames: length-prefixed JSON round trip
+- NDJSON fallback
+- PluginProcess: reading and writing once binary framing is negotiated
+"""
+
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+from server.plugins.plugin_manager import PluginProcess
+from server.plugins.rpc_framing import (
+    FRAMING_BINARY,
+    decode_ndjson,
+    encode_frame,
+    encode_ndjson,
+    read_frame,
+)
+
+
+def _reader_with(*chunks: bytes) -> asyncio.StreamReader:
+    reader = asyncio.StreamReader()
+    for chunk in chunks:
+        reader.feed_data(chunk)
+    reader.feed_eof()
+    return reader
+
+
+class TestBinaryFrames:
+    """Tests for encode_frame / read_frame."""
+
+    @pytest.mark.asyncio
+    async def test_round_trip(self):
+        """JSON messages survive a frame round trip."""
+        message = {"jsonrpc": "2.0", "id": 3, "result": {"status": "success", "files": ["a.png"]}}
+        reader = _reader_with(*encode_frame(message))
+
+        assert await read_frame(reader) == message
+        assert await read_frame(reader) is None
+
+    @pytest.mark.asyncio
+    async def test_large_message_beyond_stream_limit(self):
+        """Frames are read by length, so the StreamReader line limit does not apply."""
+        message = {"params": {"prompt": "line\n" * 100_000}}
+        reader = asyncio.StreamReader(limit=1024)
+        for buffer in encode_frame(message):
+            reader.feed_data(buffer)
+        reader.feed_eof()
+
+        assert await read_frame(reader) == message
+
+    @pytest.mark.asyncio
+    async def test_consecutive_frames(self):
+        """Frames are self-delimiting on a shared stream."""
+        first, second = {"id": 1, "text": "a" * 1000}, {"id": 2}
+        reader = _reader_with(*encode_frame(first), *encode_frame(second))
+
+        assert await read_frame(reader) == first
+        assert await read_frame(reader) == second
+
+    @pytest.mark.asyncio
+    async def test_truncated_frame_raises(self):
+        """A frame cut off mid-body is an error, not a clean EOF."""
+        data = b"".join(encode_frame({"text": "abcdef"}))
+        with pytest.raises(asyncio.IncompleteReadError):
+            await read_frame(_reader_with(data[:-2]))
+
+    @pytest.mark.asyncio
+    async def test_user_data_is_not_reinterpreted(self):
+        """Dicts that look like encoding markers reach the plugin unchanged."""
+        message = {"params": {"data": {"$base64": "aGk="}, "ref": {"$attachment": 0}}}
+        assert await read_frame(_reader_with(*encode_frame(message))) == message
+
+
+class TestNdjson:
+    """Tests for the NDJSON fallback codec."""
+
+    def test_round_trip_on_one_line(self):
+        """Messages, including embedded newlines, are encoded on one line."""
+        message = {"id": 1, "result": {"text": "a\nb", "data": {"$base64": "aGk="}}}
+        line = encode_ndjson(message)
+
+        assert line.endswith(b"\n") and line.count(b"\n") == 1
+        assert decode_ndjson(line) == message
+
+
+class _FakeBinaryStdin:
+    """Collects frames written by PluginProcess."""
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def writelines(self, buffers):
+        for buffer in buffers:
+            self.data += buffer
+
+    async def drain(self):
+        pass
+
+
+class TestPluginProcessBinaryFraming:
+    """Tests for PluginProcess after binary framing is negotiated."""
+
+    @pytest.mark.asyncio
+    async def test_task_exchange_over_binary_frames(self):
+        """Requests are written as frames and frame responses reach the stream."""
+        server_info = Mock()
+        server_info.name = "fake"
+        server_info.config = {}
+        process = PluginProcess(server_info)
+        process.framing = FRAMING_BINARY
+
+        fake = Mock()
+        fake.returncode = None
+        fake.stdin = _FakeBinaryStdin()
+        fake.stdout = asyncio.StreamReader()
+        process.process = fake
+        process.is_ready = True
+        process._reader_task = asyncio.create_task(process._demux_loop())
+
+        task = Mock()
+        task.task_id = "a"
+        task.to_dict.return_value = {"task_id": "a"}
+        request_id = await process.send_task(task)
+
+        request = await read_frame(_reader_with(bytes(fake.stdin.data)))
+        assert request["id"] == request_id
+        assert request["method"] == "execute_task"
+
+        payload = "partial output\n" * 1024
+        for frame in (
+            {"method": "progress", "params": {"task_id": "a", "data": {"text": payload}}},
+            {"result": {"task_id": "a", "status": "success"}, "id": request_id},
+        ):
+            fake.stdout.feed_data(b"".join(encode_frame(frame)))
+
+        messages = await asyncio.wait_for(
+            _collect(process, request_id), timeout=2.0
+        )
+        assert messages[0]["params"]["data"]["text"] == payload
+        assert messages[1]["result"]["status"] == "success"
+        await process.stop()
+
+
+async def _collect(process: PluginProcess, request_id: int) -> list:
+    return [m async for m in process.receive_messages(request_id)]
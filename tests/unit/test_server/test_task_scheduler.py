@@ -0,0 +1,164 @@
+"""
+Unit tests for the task scheduler in server/service/task_scheduler.py
+"""
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from server.service.task_scheduler import DuplicateTaskError, TaskCancelledError, TaskScheduler
+
+_waiters = []
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+async def _start(scheduler, started, task_id, **kwargs):
+    """Queue a task and return the asyncio task waiting for its slot."""
+    async def run():
+        await scheduler.acquire(task_id, **kwargs)
+        started.append(task_id)
+
+    task = asyncio.create_task(run())
+    _waiters.append(task)
+    await asyncio.sleep(0)
+    return task
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def cancel_waiters():
+    """Cancel tasks a test leaves waiting for a slot."""
+    yield
+    for task in _waiters:
+        task.cancel()
+    await asyncio.gather(*_waiters, return_exceptions=True)
+    _waiters.clear()
+
+
+class TestTaskSchedulerOrder:
+    """Tests for priority, FIFO and aging"""
+
+    @pytest.mark.asyncio
+    async def test_priority_then_fifo(self):
+        """Verify a high-priority task overtakes a queued batch"""
+        scheduler = TaskScheduler(max_concurrent=1, aging_interval=0)
+        started = []
+        await _start(scheduler, started, "running")
+        for i in range(3):
+            await _start(scheduler, started, f"batch{i}", priority=10)
+        await _start(scheduler, started, "urgent", priority=0)
+
+        assert scheduler.position("urgent") == 1
+        assert scheduler.position("batch0") == 2
+        for task_id in ["running", "urgent", "batch0", "batch1"]:
+            scheduler.release(task_id)
+            await asyncio.sleep(0)
+        assert started == ["running", "urgent", "batch0", "batch1", "batch2"]
+
+    @pytest.mark.asyncio
+    async def test_aging_prevents_starvation(self):
+        """Verify a long-waiting low-priority task moves ahead of newer high-priority ones"""
+        clock = FakeClock()
+        scheduler = TaskScheduler(max_concurrent=1, aging_interval=10, clock=clock)
+        started = []
+        await _start(scheduler, started, "running")
+        await _start(scheduler, started, "old", priority=5)
+        clock.now = 60.0
+        await _start(scheduler, started, "new", priority=0)
+
+        assert scheduler.position("old") == 1
+        scheduler.release("running")
+        await asyncio.sleep(0)
+        assert started == ["running", "old"]
+
+
+class TestTaskSchedulerLimits:
+    """Tests for per-ability and per-server limits"""
+
+    @pytest.mark.asyncio
+    async def test_blocked_task_does_not_hold_up_others(self):
+        """Verify a task at its ability limit lets other abilities pass"""
+        scheduler = TaskScheduler(max_concurrent=3, ability_limits={"text2video": 1})
+        started = []
+        await _start(scheduler, started, "video1", ability="text2video")
+        await _start(scheduler, started, "video2", ability="text2video")
+        await _start(scheduler, started, "image1", ability="text2image", server="a")
+
+        assert started == ["video1", "image1"]
+        assert scheduler.is_waiting("video2")
+        scheduler.release("video1")
+        await asyncio.sleep(0)
+        assert started[-1] == "video2"
+
+    @pytest.mark.asyncio
+    async def test_server_limit(self):
+        scheduler = TaskScheduler(max_concurrent=5, server_limits={"comfy": 1})
+        started = []
+        await _start(scheduler, started, "a", server="comfy")
+        await _start(scheduler, started, "b", server="comfy")
+        await _start(scheduler, started, "c", server="bailian")
+
+        assert started == ["a", "c"]
+        assert scheduler.info["queued"][0]["task_id"] == "b"
+
+
+class TestTaskSchedulerCancel:
+    """Tests for cancelling queued tasks"""
+
+    @pytest.mark.asyncio
+    async def test_cancel_queued_task(self):
+        scheduler = TaskScheduler(max_concurrent=1)
+        started = []
+        await _start(scheduler, started, "running")
+        waiter = await _start(scheduler, started, "queued")
+
+        assert scheduler.cancel("queued") is True
+        with pytest.raises(TaskCancelledError):
+            await waiter
+        assert scheduler.cancel("running") is False
+        assert scheduler.info["queued_count"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        """Verify cancelling the waiting coroutine frees its place and slot"""
+        scheduler = TaskScheduler(max_concurrent=1)
+        started = []
+        await _start(scheduler, started, "running")
+        waiter = await _start(scheduler, started, "queued")
+        await _start(scheduler, started, "next")
+
+        waiter.cancel()
+        await asyncio.sleep(0)
+        scheduler.release("running")
+        await asyncio.sleep(0)
+        assert started == ["running", "next"]
+
+
+class TestTaskSchedulerDuplicates:
+    """Tests for task ids that are already queued or running"""
+
+    @pytest.mark.asyncio
+    async def test_duplicate_id_is_rejected(self):
+        """Verify a second acquire of a queued or running id fails without touching the first"""
+        scheduler = TaskScheduler(max_concurrent=1, ability_limits={"text2image": 1})
+        started = []
+        await _start(scheduler, started, "running", ability="text2image")
+        waiter = await _start(scheduler, started, "queued")
+
+        for task_id in ("running", "queued"):
+            with pytest.raises(DuplicateTaskError):
+                await scheduler.acquire(task_id, ability="text2image")
+        assert scheduler.position("queued") == 1
+
+        scheduler.release("running")
+        await waiter
+        assert started == ["running", "queued"]
+        scheduler.release("queued")
+        await _start(scheduler, started, "next", ability="text2image")
+        assert started[-1] == "next"
@@ -0,0 +1,129 @@
+"""
+Unit tests for utils/document_cache.py
+
+Tests the parsed document cache including:
+- Hits for unchanged files and reloads when a file changes
+- Write-through after save_yaml
+- LRU eviction by entry count and size
+- Copies handed out so callers cannot corrupt the cache
+"""
+
+import os
+
+import pytest
+
+from utils import document_cache
+from utils.document_cache import DocumentCache
+from utils.md_with_meta_utils import get_metadata, write_md_with_meta
+from utils.yaml_utils import load_yaml_cached, read_yaml, save_yaml
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = DocumentCache()
+    monkeypatch.setattr(document_cache, "_cache", cache)
+    return cache
+
+
+class CountingLoader:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, path):
+        self.calls += 1
+        with open(path, encoding="utf-8") as f:
+            return {"text": f.read()}
+
+
+class TestValidation:
+    """Tests for get() against changing files."""
+
+    def test_unchanged_file_is_loaded_once(self, tmp_path, cache):
+        path = tmp_path / "a.txt"
+        path.write_text("one", encoding="utf-8")
+        load = CountingLoader()
+
+        assert cache.get(path, load) == {"text": "one"}
+        assert cache.get(path, load) == {"text": "one"}
+        assert load.calls == 1
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+
+    def test_changed_file_is_reloaded(self, tmp_path, cache):
+        path = tmp_path / "a.txt"
+        path.write_text("one", encoding="utf-8")
+        load = CountingLoader()
+        cache.get(path, load)
+
+        path.write_text("two!", encoding="utf-8")
+        assert cache.get(path, load) == {"text": "two!"}
+
+        # Same size, same mtime: told apart by the inode of the replaced file
+        mtime = os.stat(path).st_mtime_ns
+        tmp = tmp_path / "a.tmp"
+        tmp.write_text("six!", encoding="utf-8")
+        os.utime(tmp, ns=(mtime, mtime))
+        os.replace(tmp, path)
+        assert cache.get(path, load) == {"text": "six!"}
+        assert load.calls == 3
+
+    def test_returns_copies(self, tmp_path, cache):
+        path = tmp_path / "a.txt"
+        path.write_text("one", encoding="utf-8")
+        cache.get(path, CountingLoader())["text"] = "changed"
+        assert cache.get(path, CountingLoader())["text"] == "one"
+
+    def test_load_errors_are_not_cached(self, tmp_path, cache):
+        load = CountingLoader()
+        with pytest.raises(FileNotFoundError):
+            cache.get(tmp_path / "missing.txt", load)
+        assert cache.stats().entries == 0
+
+
+class TestEviction:
+    """Tests for the entry and size bounds."""
+
+    def test_least_recently_used_is_evicted(self, tmp_path):
+        cache = DocumentCache(max_entries=2)
+        load = CountingLoader()
+        paths = []
+        for name in ("a", "b", "c"):
+            paths.append(tmp_path / f"{name}.txt")
+            paths[-1].write_text(name, encoding="utf-8")
+        cache.get(paths[0], load)
+        cache.get(paths[1], load)
+        cache.get(paths[0], load)  # b is now the least recently used
+        cache.get(paths[2], load)
+
+        assert cache.stats().evictions == 1
+        cache.get(paths[0], load)
+        assert load.calls == 3
+        cache.get(paths[1], load)
+        assert load.calls == 4
+
+    def test_size_bound(self, tmp_path):
+        cache = DocumentCache(max_bytes=10)
+        for name in ("a", "b", "c"):
+            path = tmp_path / f"{name}.txt"
+            path.write_text(name * 4, encoding="utf-8")
+            cache.get(path, CountingLoader())
+        stats = cache.stats()
+        assert (stats.entries, stats.bytes) == (2, 8)
+
+
+class TestIntegration:
+    """Tests for the YAML and markdown helpers built on the cache."""
+
+    def test_save_yaml_writes_through(self, tmp_path, cache):
+        path = tmp_path / "config.yml"
+        save_yaml(path, {"a": 1})
+        assert load_yaml_cached(path) == {"a": 1}
+        assert cache.stats().hits == 1
+        assert read_yaml(path) == {"a": 1}
+
+    def test_markdown_metadata_is_invalidated_on_write(self, tmp_path, cache):
+        path = tmp_path / "scene.md"
+        write_md_with_meta(path, {"title": "One"}, "body")
+        assert get_metadata(path) == {"title": "One"}
+        write_md_with_meta(path, {"title": "Two"}, "body")
+        assert get_metadata(path) == {"title": "Two"}
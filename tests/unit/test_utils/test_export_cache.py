@@ -0,0 +1,97 @@
+"""
+Unit tests for utils/export_cache.py
+
+Tests the export segment cache including:
+- content_hash: Content hashing with (size, mtime) memo
+- segment_key: Keys depend on content and settings
+- get/put/trim: LRU storage and eviction
+- save/purge and the command line
+"""
+
+import os
+import time
+
+from utils.export_cache import ExportCache, main, project_cache_dir
+
+
+def _segment(tmp_path, name: str, size: int) -> str:
+    path = tmp_path / name
+    path.write_bytes(b"s" * size)
+    return str(path)
+
+
+class TestKeys:
+    """Tests for content_hash and segment_key."""
+
+    def test_content_hash_follows_content(self, tmp_path):
+        cache = ExportCache(str(tmp_path / "cache"))
+        a, b = tmp_path / "a.mp4", tmp_path / "b.mp4"
+        a.write_bytes(b"same")
+        b.write_bytes(b"same")
+        assert cache.content_hash(str(a)) == cache.content_hash(str(b))
+
+        a.write_bytes(b"edited")
+        os.utime(a, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+        assert cache.content_hash(str(a)) != cache.content_hash(str(b))
+
+    def test_segment_key_includes_settings(self):
+        key = ExportCache.segment_key("abc", (False, "2.000", "1280x720"))
+        assert key == ExportCache.segment_key("abc", (False, "2.000", "1280x720"))
+        assert key != ExportCache.segment_key("abc", (False, "3.000", "1280x720"))
+        assert key != ExportCache.segment_key("abd", (False, "2.000", "1280x720"))
+
+
+class TestSegments:
+    """Tests for segment storage and LRU eviction."""
+
+    def test_put_moves_segment_into_cache(self, tmp_path):
+        cache = ExportCache(str(tmp_path / "cache"))
+        source = _segment(tmp_path, "seg.mp4", 10)
+
+        path = cache.put("k1", source)
+        assert not os.path.exists(source)
+        assert cache.get("k1") == path and os.path.exists(path)
+        assert cache.get("missing") is None
+        assert len(cache) == 1 and cache.total_bytes() == 10
+
+    def test_trim_evicts_least_recently_used(self, tmp_path):
+        cache = ExportCache(str(tmp_path / "cache"), max_bytes=25)
+        for key in ("old", "mid", "new"):
+            cache.put(key, _segment(tmp_path, f"{key}.mp4", 10))
+            time.sleep(0.01)
+        cache.get("old")  # Touch: "mid" is now the least recently used
+
+        assert cache.trim() == 10
+        assert cache.get("mid") is None
+        assert cache.get("old") and cache.get("new")
+
+    def test_trim_keeps_pinned_segments(self, tmp_path):
+        cache = ExportCache(str(tmp_path / "cache"), max_bytes=5)
+        cache.put("a", _segment(tmp_path, "a.mp4", 10))
+        cache.put("b", _segment(tmp_path, "b.mp4", 10))
+
+        cache.trim(keep=["a", "b"])
+        assert len(cache) == 2
+
+    def test_index_survives_reload(self, tmp_path):
+        cache = ExportCache(str(tmp_path / "cache"))
+        path = cache.put("k1", _segment(tmp_path, "seg.mp4", 10))
+        cache.save()
+
+        assert ExportCache(str(tmp_path / "cache")).get("k1") == path
+
+
+class TestPurge:
+    """Tests for purge and the command line."""
+
+    def test_purge_command_empties_project_cache(self, tmp_path, capsys):
+        cache = ExportCache.for_project(str(tmp_path))
+        cache.put("k1", _segment(tmp_path, "seg.mp4", 10))
+        cache.save()
+
+        assert main(["stats", str(tmp_path)]) == 0
+        assert "1 segments" in capsys.readouterr().out
+
+        assert main(["purge", str(tmp_path)]) == 0
+        assert not os.path.exists(project_cache_dir(str(tmp_path)))
+        assert len(ExportCache.for_project(str(tmp_path))) == 0
@@ -0,0 +1,199 @@
+"""
+Unit tests for utils/export_utils.py
+
+Tests the timeline export engine including:
+- choose_profile: Export profile from the dominant footage
+- can_stream_copy: Stream-copy eligibility
+- build_normalize_command: Per-clip normalise command
+- export_clips: Probe / normalise / concat orchestration
+"""
+
+import subprocess
+from fractions import Fraction
+from unittest.mock import patch
+
+import pytest
+
+from utils.export_cache import ExportCache
+from utils.export_utils import (
+    ExportClip,
+    ExportProfile,
+    MediaProbe,
+    build_normalize_command,
+    can_stream_copy,
+    choose_profile,
+    export_clips,
+)
+
+
+def _h264(width=1280, height=720, fps=24, duration=5.0, audio=False) -> MediaProbe:
+    probe = MediaProbe(width=width, height=height, duration=duration, video_codec="h264",
+                       pix_fmt="yuv420p", frame_rate=Fraction(fps), timescale=12288)
+    if audio:
+        probe.audio_streams = 1
+        probe.audio_codec = "aac"
+        probe.sample_rate = 48000
+        probe.channels = 2
+    return probe
+
+
+class TestChooseProfile:
+    """Tests for choose_profile."""
+
+    def test_dominant_footage_wins(self):
+        """The parameters covering the most footage become the profile."""
+        clips = [ExportClip("a.mp4", 2.0), ExportClip("b.mp4", 10.0), ExportClip("c.png", 30.0)]
+        probes = [_h264(640, 480, 30), _h264(1280, 720, 24, audio=True), MediaProbe(4000, 3000)]
+
+        profile = choose_profile(clips, probes, fps=30)
+        assert (profile.width, profile.height, profile.frame_rate) == (1280, 720, 24)
+        assert profile.has_audio
+        assert (profile.sample_rate, profile.channels) == (48000, 2)
+
+    def test_images_only_uses_even_image_size_and_fps(self):
+        """Without footage the first image sets the size and fps comes from settings."""
+        profile = choose_profile([ExportClip("a.png", 1.0)], [MediaProbe(721, 1281)], fps=25)
+        assert (profile.width, profile.height, profile.frame_rate) == (720, 1280, 25)
+        assert not profile.has_audio
+
+
+class TestCanStreamCopy:
+    """Tests for can_stream_copy."""
+
+    profile = ExportProfile(1280, 720, Fraction(24), timescale=12288)
+
+    def test_matching_clip_is_copied(self):
+        assert can_stream_copy(ExportClip("a.mp4", 5.0), _h264(), self.profile)
+
+    def test_mismatches_are_normalised(self):
+        clip = ExportClip("a.mp4", 5.0)
+        assert not can_stream_copy(clip, _h264(fps=30), self.profile)
+        assert not can_stream_copy(clip, _h264(width=1920, height=1080), self.profile)
+        assert not can_stream_copy(clip, _h264(audio=True), self.profile)
+        assert not can_stream_copy(ExportClip("a.mp4", 3.0), _h264(), self.profile)
+        assert not can_stream_copy(ExportClip("a.png", 5.0), _h264(), self.profile)
+        assert not can_stream_copy(clip, None, self.profile)
+
+
+class TestBuildNormalizeCommand:
+    """Tests for build_normalize_command."""
+
+    def test_image_becomes_still_clip_with_silence(self):
+        """Images loop for their duration; a silent track matches the profile's audio."""
+        profile = ExportProfile(1280, 720, Fraction(24), timescale=12288, has_audio=True)
+        cmd = build_normalize_command(ExportClip("/m/a.png", 2.5), MediaProbe(800, 600),
+                                      profile, "/tmp/seg.mp4", threads=2)
+
+        assert cmd[cmd.index("-loop") + 1] == "1"
+        assert "anullsrc=r=44100:cl=stereo" in cmd
+        assert cmd[cmd.index("-t") + 1] == "2.500"
+        assert "scale=1280:720:force_original_aspect_ratio=decrease" in cmd[cmd.index("-vf") + 1]
+        assert cmd[cmd.index("-video_track_timescale") + 1] == "12288"
+        assert cmd[-1] == "/tmp/seg.mp4"
+
+    def test_short_video_is_held_on_last_frame(self):
+        """A clip shorter than its timeline duration is padded with its last frame."""
+        profile = ExportProfile(1280, 720, Fraction(24))
+        cmd = build_normalize_command(ExportClip("/m/a.mp4", 6.0), _h264(duration=5.0),
+                                      profile, "/tmp/seg.mp4")
+        assert "tpad=stop_mode=clone:stop_duration=1.000" in cmd[cmd.index("-vf") + 1]
+
+
+class TestExportClips:
+    """Tests for export_clips orchestration."""
+
+    @pytest.mark.asyncio
+    @patch("utils.export_utils.check_ffmpeg", return_value=False)
+    async def test_returns_false_without_ffmpeg(self, mock_check, tmp_path):
+        assert await export_clips([ExportClip(str(tmp_path / "a.mp4"), 1.0)],
+                                  tmp_path / "out.mp4") is False
+
+    @pytest.mark.asyncio
+    @patch("utils.export_utils.check_ffmpeg", return_value=True)
+    async def test_copies_matching_clips_and_encodes_the_rest(self, mock_check, tmp_path):
+        """Matching clips go to the concat list as-is; others are normalised first."""
+        copyable, other, image = (tmp_path / "a.mp4", tmp_path / "b.mov", tmp_path / "c.png")
+        for path in (copyable, other, image):
+            path.write_bytes(b"x")
+        probes = {str(copyable): _h264(), str(other): _h264(fps=30, duration=2.0),
+                  str(image): MediaProbe(640, 480)}
+        commands, concat_lists = [], []
+
+        async def fake_run(cmd):
+            commands.append(cmd)
+            if "concat" in cmd:
+                concat_lists.append(open(cmd[cmd.index("-i") + 1]).read())
+            return subprocess.CompletedProcess(cmd, 0, b"", b"")
+
+        async def fake_probe(path):
+            return probes[str(path)]
+
+        messages = []
+        with patch("utils.export_utils.run_command", side_effect=fake_run), \
+                patch("utils.export_utils.probe_media", side_effect=fake_probe):
+            ok = await export_clips(
+                [ExportClip(str(copyable), 5.0), ExportClip(str(other), 2.0), ExportClip(str(image), 1.5)],
+                tmp_path / "out.mp4", jobs=2,
+                progress=lambda percent, message: messages.append((percent, message)),
+            )
+
+        assert ok is True
+        encoded = [c for c in commands if "concat" not in c]
+        assert sorted(c[c.index("-i") + 1] for c in encoded) == sorted([str(other), str(image)])
+        lines = concat_lists[0].splitlines()
+        assert lines[0] == f"file '{copyable}'"
+        assert lines[1].endswith("segment_0001.mp4'") and lines[2].endswith("segment_0002.mp4'")
+        assert messages[-1][0] == 100
+        assert any("1 stream-copied" in m for _, m in messages)
+        assert not list(tmp_path.glob(".export_*"))
+
+    @pytest.mark.asyncio
+    @patch("utils.export_utils.check_ffmpeg", return_value=True)
+    async def test_failed_segment_fails_export(self, mock_check, tmp_path):
+        """A failing normalise job fails the export without running concat."""
+        image = tmp_path / "a.png"
+        image.write_bytes(b"x")
+        commands = []
+
+        async def fake_run(cmd):
+            commands.append(cmd)
+            return subprocess.CompletedProcess(cmd, 1, b"", b"boom")
+
+        async def fake_probe(path):
+            return MediaProbe(640, 480)
+
+        with patch("utils.export_utils.run_command", side_effect=fake_run), \
+                patch("utils.export_utils.probe_media", side_effect=fake_probe):
+            assert await export_clips([ExportClip(str(image), 1.0)], tmp_path / "out.mp4") is False
+        assert all("concat" not in c for c in commands)
+
+    @pytest.mark.asyncio
+    @patch("utils.export_utils.check_ffmpeg", return_value=True)
+    async def test_cached_segments_are_reused(self, mock_check, tmp_path):
+        """A second export only encodes the clip whose content changed."""
+        first, second = tmp_path / "a.png", tmp_path / "b.png"
+        first.write_bytes(b"first")
+        second.write_bytes(b"second")
+        clips = [ExportClip(str(first), 1.0), ExportClip(str(second), 1.0)]
+        cache = ExportCache(str(tmp_path / "cache"))
+        encoded = []
+
+        async def fake_run(cmd):
+            if "concat" not in cmd:
+                encoded.append(cmd[cmd.index("-i") + 1])
+                open(cmd[-1], "wb").write(b"segment")
+            return subprocess.CompletedProcess(cmd, 0, b"", b"")
+
+        async def fake_probe(path):
+            return MediaProbe(640, 480)
+
+        with patch("utils.export_utils.run_command", side_effect=fake_run), \
+                patch("utils.export_utils.probe_media", side_effect=fake_probe):
+            assert await export_clips(clips, tmp_path / "out.mp4", cache=cache)
+            assert sorted(encoded) == sorted([str(first), str(second)])
+
+            encoded.clear()
+            second.write_bytes(b"second, edited")
+            assert await export_clips(clips, tmp_path / "out.mp4",
+                                      cache=ExportCache(str(tmp_path / "cache")))
+        assert encoded == [str(second)]
@@ -0,0 +1,43 @@
+"""
+Unit tests for utils/img_utils.py
+
+Tests the image file helpers including:
+- save_png_atomic: Fast PNG writes that replace the file atomically
+"""
+
+import os
+
+from PySide6.QtGui import QColor, QImage
+
+from utils.img_utils import save_png_atomic
+
+
+def _image(color: str) -> QImage:
+    image = QImage(32, 16, QImage.Format.Format_ARGB32)
+    image.fill(QColor(color))
+    return image
+
+
+class TestSavePngAtomic:
+    """Tests for save_png_atomic."""
+
+    def test_writes_readable_png(self, tmp_path):
+        path = str(tmp_path / "layer.png")
+        assert save_png_atomic(_image("red"), path)
+
+        loaded = QImage(path)
+        assert (loaded.width(), loaded.height()) == (32, 16)
+        assert QColor(loaded.pixel(3, 3)).red() == 255
+        assert os.listdir(tmp_path) == ["layer.png"]
+
+    def test_replaces_existing_file(self, tmp_path):
+        path = str(tmp_path / "layer.png")
+        save_png_atomic(_image("red"), path)
+        assert save_png_atomic(_image("blue"), path)
+        assert QColor(QImage(path).pixel(3, 3)).blue() == 255
+
+    def test_failure_keeps_previous_file(self, tmp_path):
+        """A failed write leaves no temporary file behind."""
+        path = str(tmp_path / "missing_dir" / "layer.png")
+        assert not save_png_atomic(_image("red"), path)
+        assert not os.path.exists(tmp_path / "missing_dir")
@@ -0,0 +1,179 @@
+"""
+Unit tests for utils/media_probe.py
+
+Tests the shared media probe service including:
+- _parse_ffprobe: Stream parameters from ffprobe JSON
+- MediaProbeCache: (path, size, mtime) keyed cache, persistence, keyframes
+- probe_media_batch / probe_directory: Concurrent batch probing
+- OpenCV fallback when ffprobe is unavailable
+"""
+
+import os
+from fractions import Fraction
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+import pytest
+
+from utils import media_probe
+from utils.media_probe import (
+    MediaProbe,
+    MediaProbeCache,
+    _parse_ffprobe,
+    probe_directory,
+    probe_media_batch,
+)
+
+
+@pytest.fixture
+def probe_cache(tmp_path, monkeypatch):
+    """Fresh process-wide cache stored under tmp_path."""
+    cache = MediaProbeCache(str(tmp_path / "probe.json"))
+    monkeypatch.setattr(media_probe, "_cache", cache)
+    return cache
+
+
+def _fake_probe(path):
+    return MediaProbe(width=64, height=48, duration=2.0, frame_rate=Fraction(24), frame_count=48)
+
+
+class TestParseFfprobe:
+    """Tests for _parse_ffprobe."""
+
+    def test_parses_video_and_audio_streams(self):
+        """Video and audio parameters are read from the first streams."""
+        probe = _parse_ffprobe({
+            "streams": [
+                {"codec_type": "video", "codec_name": "h264", "width": 1920, "height": 1080,
+                 "pix_fmt": "yuv420p", "r_frame_rate": "30000/1001", "time_base": "1/30000",
+                 "nb_frames": "120"},
+                {"codec_type": "audio", "codec_name": "aac", "sample_rate": "44100", "channels": 2},
+            ],
+            "format": {"duration": "4.004"},
+        })
+        assert (probe.width, probe.height, probe.duration) == (1920, 1080, 4.004)
+        assert probe.frame_rate == Fraction(30000, 1001)
+        assert probe.timescale == 30000
+        assert probe.frame_count == 120
+        assert (probe.audio_streams, probe.sample_rate, probe.channels) == (1, 44100, 2)
+
+    def test_frame_count_from_duration_when_not_reported(self):
+        probe = _parse_ffprobe({
+            "streams": [{"codec_type": "video", "width": 8, "height": 8, "r_frame_rate": "25/1"}],
+            "format": {"duration": "2.0"},
+        })
+        assert probe.frame_count == 50
+
+    def test_returns_none_without_video(self):
+        """Audio-only media has no probe."""
+        assert _parse_ffprobe({"streams": [{"codec_type": "audio"}]}) is None
+
+
+class TestMediaProbeCache:
+    """Tests for MediaProbeCache."""
+
+    def test_probes_once_until_file_changes(self, tmp_path):
+        video = tmp_path / "a.mp4"
+        video.write_bytes(b"v1")
+        cache = MediaProbeCache(str(tmp_path / "probe.json"))
+
+        with patch("utils.media_probe._probe_uncached", side_effect=_fake_probe) as probe:
+            assert cache.get(video).frame_count == 48
+            assert cache.get(str(video)).fps == 24.0
+            assert probe.call_count == 1
+
+            video.write_bytes(b"version 2")
+            cache.get(video)
+            assert probe.call_count == 2
+
+    def test_cache_persists_across_instances(self, tmp_path):
+        video = tmp_path / "a.mp4"
+        video.write_bytes(b"v1")
+        with patch("utils.media_probe._probe_uncached", side_effect=_fake_probe):
+            cache = MediaProbeCache(str(tmp_path / "probe.json"))
+            cache.get(video)
+            cache.save()
+
+        with patch("utils.media_probe._probe_uncached") as probe:
+            restored = MediaProbeCache(str(tmp_path / "probe.json")).get(video)
+        probe.assert_not_called()
+        assert restored == _fake_probe(video)
+
+    def test_single_probes_share_one_delayed_save(self, tmp_path):
+        videos = [tmp_path / f"{i}.mp4" for i in range(20)]
+        for video in videos:
+            video.write_bytes(b"v1")
+        cache_path = tmp_path / "probe.json"
+        cache = MediaProbeCache(str(cache_path), save_delay=0.5)
+
+        with patch("utils.media_probe._probe_uncached", side_effect=_fake_probe), \
+                patch("utils.media_probe.os.replace", wraps=os.replace) as replace:
+            for video in videos:
+                cache.get(video)
+            assert not cache_path.exists()
+            cache._save_timer.join(timeout=2.0)
+
+        assert replace.call_count == 1
+        with patch("utils.media_probe._probe_uncached") as probe:
+            MediaProbeCache(str(cache_path)).get_many(videos)
+        probe.assert_not_called()
+
+    def test_keyframes_are_computed_on_demand(self, tmp_path):
+        video = tmp_path / "a.mp4"
+        video.write_bytes(b"v1")
+        cache = MediaProbeCache(str(tmp_path / "probe.json"))
+
+        with patch("utils.media_probe._probe_uncached", side_effect=_fake_probe), \
+                patch("utils.media_probe._read_keyframes", return_value=[0.0, 1.0]) as keyframes:
+            assert cache.get(video).keyframes is None
+            assert cache.get(video, keyframes=True).keyframes == [0.0, 1.0]
+            assert cache.get(video, keyframes=True).keyframes == [0.0, 1.0]
+        assert keyframes.call_count == 1
+
+    def test_missing_file_is_not_cached(self, tmp_path):
+        cache = MediaProbeCache(str(tmp_path / "probe.json"))
+        assert cache.get(tmp_path / "missing.mp4") is None
+        assert not (tmp_path / "probe.json").exists()
+
+    def test_opencv_fallback_without_ffprobe(self, tmp_path):
+        path = str(tmp_path / "clip.mp4")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 10.0, (32, 24))
+        if not writer.isOpened():
+            pytest.skip("OpenCV build cannot write mp4v")
+        for _ in range(5):
+            writer.write(np.zeros((24, 32, 3), dtype=np.uint8))
+        writer.release()
+
+        with patch("utils.media_probe._ffprobe_available", False):
+            probe = MediaProbeCache(str(tmp_path / "probe.json")).get(path)
+        assert (probe.width, probe.height, probe.frame_count) == (32, 24, 5)
+        assert probe.fps == 10.0
+        assert probe.duration == pytest.approx(0.5)
+
+
+class TestBatchProbe:
+    """Tests for probe_media_batch and probe_directory."""
+
+    @pytest.mark.asyncio
+    async def test_directory_probe_covers_media_files(self, tmp_path, probe_cache):
+        for name in ("a.mp4", "b.MOV", "c.png", "notes.txt"):
+            (tmp_path / name).write_bytes(name.encode())
+
+        with patch("utils.media_probe._probe_uncached", side_effect=_fake_probe):
+            results = await probe_directory(tmp_path)
+
+        assert sorted(os.path.basename(p) for p in results) == ["a.mp4", "b.MOV", "c.png"]
+        assert all(p.frame_count == 48 for p in results.values())
+        assert (tmp_path / "probe.json").exists()
+
+    @pytest.mark.asyncio
+    async def test_batch_keeps_failures_as_none(self, tmp_path, probe_cache):
+        good = tmp_path / "a.mp4"
+        good.write_bytes(b"x")
+
+        with patch("utils.media_probe._probe_uncached", side_effect=_fake_probe):
+            results = await probe_media_batch([good, tmp_path / "missing.mp4"], concurrency=2)
+
+        assert results[str(good)].width == 64
+        assert results[str(tmp_path / "missing.mp4")] is None
@@ -0,0 +1,130 @@
+"""
+Unit tests for utils/yaml_utils.py and the direct I/O path of utils/async_file_io.py
+
+Tests the config file helpers including:
+- load_yaml / save_yaml: Synchronous round trips without an event loop
+- Atomic writes that leave no temp files and keep the old file on failure
+- Async helpers inside a running loop
+"""
+
+import asyncio
+import os
+
+import pytest
+import yaml
+
+from utils import async_file_io
+from utils.yaml_utils import (
+    AsyncFileNotFoundError,
+    AsyncFileParseError,
+    atomic_write_text,
+    load_json_async,
+    load_yaml,
+    load_yaml_async,
+    read_json,
+    read_yaml,
+    save_json_async,
+    save_yaml,
+    save_yaml_async,
+    write_json,
+)
+
+DOC = {"layers": [{"id": 1, "name": "背景", "visible": True}], "ratio": 1.5, "prompt": None}
+
+
+class TestSyncYaml:
+    """Tests for load_yaml / save_yaml and read_yaml."""
+
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / "config.yml"
+        save_yaml(path, DOC)
+        assert load_yaml(path) == DOC
+        assert "背景" in path.read_text(encoding="utf-8")
+
+    def test_uses_libyaml_when_available(self):
+        if yaml.__with_libyaml__:
+            assert async_file_io.YAML_LOADER is yaml.CSafeLoader
+            assert async_file_io.YAML_DUMPER is yaml.CSafeDumper
+        else:
+            assert async_file_io.YAML_LOADER is yaml.SafeLoader
+
+    def test_safe_loader_rejects_python_tags(self, tmp_path):
+        path = tmp_path / "bad.yml"
+        path.write_text("value: !!python/object/apply:os.getcwd []\n", encoding="utf-8")
+        assert load_yaml(path) is None
+        with pytest.raises(AsyncFileParseError):
+            read_yaml(path)
+
+    def test_missing_file(self, tmp_path):
+        assert load_yaml(tmp_path / "missing.yml") is None
+        with pytest.raises(AsyncFileNotFoundError):
+            read_yaml(tmp_path / "missing.yml")
+
+    def test_works_inside_running_loop(self, tmp_path):
+        path = tmp_path / "config.yml"
+
+        async def inside_loop():
+            save_yaml(path, DOC)
+            return load_yaml(path)
+
+        assert asyncio.run(inside_loop()) == DOC
+
+
+class TestAtomicWrite:
+    """Tests for atomic_write_text and the writers built on it."""
+
+    def test_replaces_without_temp_files(self, tmp_path):
+        path = tmp_path / "config.yml"
+        save_yaml(path, {"a": 1})
+        save_yaml(path, {"a": 2})
+        assert load_yaml(path) == {"a": 2}
+        assert os.listdir(tmp_path) == ["config.yml"]
+
+    def test_failed_write_keeps_previous_content(self, tmp_path, monkeypatch):
+        path = tmp_path / "config.yml"
+        save_yaml(path, {"a": 1})
+
+        def fail_replace(src, dst):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(async_file_io.os, "replace", fail_replace)
+        with pytest.raises(OSError):
+            atomic_write_text(path, "a: 2\n")
+        save_yaml(path, {"a": 3})  # Logged, not raised
+        assert load_yaml(path) == {"a": 1}
+        assert os.listdir(tmp_path) == ["config.yml"]
+
+    def test_missing_directory(self, tmp_path):
+        save_yaml(tmp_path / "missing" / "config.yml", DOC)
+        assert not (tmp_path / "missing").exists()
+
+
+class TestJson:
+    """Tests for read_json / write_json."""
+
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / "index.json"
+        write_json(path, DOC)
+        assert read_json(path) == DOC
+
+    def test_invalid_json(self, tmp_path):
+        path = tmp_path / "index.json"
+        path.write_text("{", encoding="utf-8")
+        with pytest.raises(AsyncFileParseError):
+            read_json(path)
+
+
+class TestAsyncHelpers:
+    """Tests for the async wrappers."""
+
+    @pytest.mark.asyncio
+    async def test_yaml_and_json_round_trip(self, tmp_path):
+        await save_yaml_async(tmp_path / "config.yml", DOC)
+        await save_json_async(tmp_path / "index.json", DOC)
+        assert await load_yaml_async(tmp_path / "config.yml") == DOC
+        assert await load_json_async(tmp_path / "index.json") == DOC
+
+    @pytest.mark.asyncio
+    async def test_missing_file_raises(self, tmp_path):
+        with pytest.raises(AsyncFileNotFoundError):
+            await load_yaml_async(tmp_path / "missing.yml")
@@ -1,8 +1,14 @@
 """
 Async file I/O helpers for YAML/JSON and small directory scans.
 
-File reads use aiofiles; parsing/dumping runs in a worker thread so the event
-loop stays responsive for large documents when used with qasync/Qt.
+Each document is read and parsed (or dumped and written) by one synchronous
+call: the async helpers run it in a single worker-thread hop so the event
+loop stays responsive when used with qasync/Qt, and sync callers already off
+the GUI thread call read_yaml / write_yaml directly.
+
+- YAML uses the libyaml C loader/dumper when PyYAML was built with it
+- Writes go to a temp file in the same directory and replace the target, so
+  readers never see a half-written config
 """
 
 from __future__ import annotations
@@ -13,15 +19,21 @@ import json
 import logging
 import os
 import shutil
+import threading
 from collections.abc import Sequence
 from pathlib import Path
 from typing import Any, Awaitable, Callable, Coroutine, List, Optional, TypeVar
 
-import aiofiles
 import yaml
 
+from utils.document_cache import get_document_cache
+
 logger = logging.getLogger(__name__)
 
+# libyaml is several times faster than the pure-Python implementation
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
 T = TypeVar("T")
 R = TypeVar("R")
 
@@ -79,20 +91,47 @@ def run_coroutine_blocking(coro: Coroutine[Any, Any, T]) -> T:
 run_async_safely = run_coroutine_blocking
 
 
-def _yaml_dumps(data: Any) -> str:
-    import io
+def yaml_loads(text: str) -> Any:
+    return yaml.load(text, Loader=YAML_LOADER)
 
-    buf = io.StringIO()
-    yaml.safe_dump(data, buf, allow_unicode=True)
-    return buf.getvalue()
 
+def yaml_dumps(data: Any) -> str:
+    return yaml.dump(data, Dumper=YAML_DUMPER, allow_unicode=True)
 
-async def load_yaml_async(path: str | Path) -> Any:
+
+def atomic_write_text(path: str | Path, text: str) -> None:
+    """Write text to a temp file next to ``path`` and rename it over ``path``.
+
+    Raises:
+        FileNotFoundError: The parent directory does not exist
+        OSError: The write failed; ``path`` is left untouched
+    """
+    path = str(path)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def read_yaml(path: str | Path) -> Any:
+    """Read and parse a YAML file on the calling thread.
+
+    Raises:
+        AsyncFileNotFoundError: The file does not exist
+        AsyncFileParseError: The content is not valid YAML
+    """
     path = Path(path)
     try:
-        async with aiofiles.open(path, "r", encoding="utf-8") as f:
-            content = await f.read()
-        return await to_thread(yaml.safe_load, content)
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read()
+        return yaml_loads(content)
     except FileNotFoundError:
         logger.error("file not exists: %s", path)
         raise AsyncFileNotFoundError(path) from None
@@ -101,12 +140,17 @@ async def load_yaml_async(path: str | Path) -> Any:
         raise AsyncFileParseError(f"{path}: {e}") from e
 
 
-async def save_yaml_async(path: str | Path, data: Any) -> None:
+def write_yaml(path: str | Path, data: Any) -> None:
+    """Dump and atomically write a YAML file on the calling thread.
+
+    Raises:
+        AsyncFileNotFoundError: The parent directory does not exist
+        AsyncFileWriteError: Serialization or the write failed
+    """
     path = Path(path)
     try:
-        text = await to_thread(_yaml_dumps, data)
-        async with aiofiles.open(path, "w", encoding="utf-8") as f:
-            await f.write(text)
+        atomic_write_text(path, yaml_dumps(data))
+        get_document_cache().put(path, data, "yaml")
     except FileNotFoundError:
         logger.error("file not exists: %s", path)
         raise AsyncFileNotFoundError(path) from None
@@ -118,12 +162,26 @@ async def save_yaml_async(path: str | Path, data: Any) -> None:
         raise AsyncFileWriteError(str(e)) from e
 
 
-async def load_json_async(path: str | Path) -> Any:
+def read_yaml_cached(path: str | Path) -> Any:
+    """Like read_yaml, but parses again only when the file changed (see utils.document_cache).
+
+    The result is a private copy the caller may mutate.
+    """
+    return get_document_cache().get(path, read_yaml, "yaml")
+
+
+def read_json(path: str | Path) -> Any:
+    """Read and parse a JSON file on the calling thread.
+
+    Raises:
+        AsyncFileNotFoundError: The file does not exist
+        AsyncFileParseError: The content is not valid JSON
+    """
     path = Path(path)
     try:
-        async with aiofiles.open(path, "r", encoding="utf-8") as f:
-            content = await f.read()
-        return await to_thread(json.loads, content)
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read()
+        return json.loads(content)
     except FileNotFoundError:
         logger.error("file not exists: %s", path)
         raise AsyncFileNotFoundError(path) from None
@@ -132,23 +190,38 @@ async def load_json_async(path: str | Path) -> Any:
         raise AsyncFileParseError(f"{path}: {e}") from e
 
 
-async def save_json_async(
-    path: str | Path, data: Any, *, indent: int = 2, ensure_ascii: bool = False
-) -> None:
-    path = Path(path)
-
-    def _dumps(text: Any) -> str:
-        return json.dumps(text, indent=indent, ensure_ascii=ensure_ascii)
+def write_json(path: str | Path, data: Any, *, indent: int = 2, ensure_ascii: bool = False) -> None:
+    """Dump and atomically write a JSON file on the calling thread.
 
+    Raises:
+        AsyncFileWriteError: The write failed
+    """
+    text = json.dumps(data, indent=indent, ensure_ascii=ensure_ascii)
     try:
-        text = await to_thread(_dumps, data)
-        async with aiofiles.open(path, "w", encoding="utf-8") as f:
-            await f.write(text)
+        atomic_write_text(path, text)
     except OSError as e:
         logger.error("JSON save error: %s", e)
         raise AsyncFileWriteError(str(e)) from e
 
 
+async def load_yaml_async(path: str | Path) -> Any:
+    return await to_thread(read_yaml, path)
+
+
+async def save_yaml_async(path: str | Path, data: Any) -> None:
+    await to_thread(write_yaml, path, data)
+
+
+async def load_json_async(path: str | Path) -> Any:
+    return await to_thread(read_json, path)
+
+
+async def save_json_async(
+    path: str | Path, data: Any, *, indent: int = 2, ensure_ascii: bool = False
+) -> None:
+    await to_thread(write_json, path, data, indent=indent, ensure_ascii=ensure_ascii)
+
+
 async def glob_paths(directory: str | Path, pattern: str) -> List[Path]:
     """Non-blocking glob; directory scan runs in a worker thread."""
     directory = Path(directory)
@@ -0,0 +1,151 @@
+"""
+In-memory cache of parsed config documents (YAML files, markdown frontmatter).
+
+Navigating a large timeline or scene list reads the same small files over and
+over; this cache keeps the parsed result per file and only parses again when
+the file changed:
+
+    get(path, load) --> os.stat --> (mtime_ns, size, inode) unchanged? --> copy of cached value
+                                                            changed?   --> load(path), cache it
+
+- Writers call put() after saving (write-through), so the next read is a hit
+- Values are deep-copied in and out, so callers may mutate what they get
+- Memory is bounded by entry count and total file size; the least recently
+  used documents are dropped first
+- Files are told apart by kind ("yaml", "md") as one path could be read both ways
+"""
+import copy
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+@dataclass
+class DocumentCacheStats:
+    """Counters of a DocumentCache."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def _stamp(path: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    # The inode changes on every atomic replace, even within one mtime tick
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+class DocumentCache:
+    """
+    Parsed documents keyed by (kind, path), validated against the file on every get.
+
+    Thread-safe; loading runs outside the lock.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max(1, max_bytes)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Tuple[int, int, int], Any]]" = OrderedDict()
+        self._stats = DocumentCacheStats()
+        self._lock = threading.Lock()
+
+    def get(self, path: Union[str, Path], load: Callable[[str], Any], kind: str = "yaml") -> Any:
+        """
+        Parsed content of a file, loading it only if it changed since it was cached.
+
+        Args:
+            path: File path
+            load: Reads and parses the file; its exceptions propagate and
+                nothing is cached
+            kind: Name of the format load parses
+
+        Returns:
+            A copy of the cached value
+        """
+        path = os.path.abspath(str(path))
+        key = (kind, path)
+        stamp = _stamp(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and stamp is not None and entry[0] == stamp:
+                self._entries.move_to_end(key)
+                self._stats.hits += 1
+                return copy.deepcopy(entry[1])
+            self._stats.misses += 1
+
+        value = load(path)
+        if stamp is not None:
+            # Stamped before reading: if the file changed meanwhile, the next get reloads
+            self._store(key, stamp, copy.deepcopy(value))
+        return value
+
+    def put(self, path: Union[str, Path], value: Any, kind: str = "yaml"):
+        """Cache what was just written to a file (call after the write)."""
+        path = os.path.abspath(str(path))
+        stamp = _stamp(path)
+        if stamp is None:
+            self.invalidate(path, kind)
+            return
+        self._store((kind, path), stamp, copy.deepcopy(value))
+
+    def invalidate(self, path: Union[str, Path], kind: Optional[str] = None):
+        """Drop a file from the cache (of one kind, or all kinds)."""
+        path = os.path.abspath(str(path))
+        with self._lock:
+            for key in [k for k in self._entries if k[1] == path and (kind is None or k[0] == kind)]:
+                self._stats.bytes -= self._entries.pop(key)[0][1]
+            self._stats.entries = len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._stats.entries = self._stats.bytes = 0
+
+    def stats(self) -> DocumentCacheStats:
+        with self._lock:
+            return DocumentCacheStats(**vars(self._stats))
+
+    def _store(self, key: Tuple[str, str], stamp: Tuple[int, int, int], value: Any):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._stats.bytes -= old[0][1]
+            self._entries[key] = (stamp, value)
+            self._stats.bytes += stamp[1]
+            while len(self._entries) > 1 and (len(self._entries) > self.max_entries
+                                              or self._stats.bytes > self.max_bytes):
+                _, (old_stamp, _) = self._entries.popitem(last=False)
+                self._stats.bytes -= old_stamp[1]
+                self._stats.evictions += 1
+            self._stats.entries = len(self._entries)
+
+
+_cache: Optional[DocumentCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_document_cache() -> DocumentCache:
+    """Process-wide document cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = DocumentCache()
+        return _cache
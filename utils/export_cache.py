@@ -0,0 +1,217 @@
+"""
+Per-project cache of normalised export segments.
+
+A segment produced by the export engine depends only on the source media
+and the export profile, so it is stored under a key built from:
+
+    (media content hash, timeline duration, frame rate, resolution, codec settings)
+
+Re-exporting a timeline after editing one item then re-encodes only that
+item; every other segment is reused and the export is a single concat.
+
+Layout (``<project>/cache/export``)::
+
+    index.json          # {"segments": {key: {...}}, "hashes": {path: {...}}}
+    <key>.mp4           # normalised segments
+
+Content hashes are remembered per (path, size, mtime) so unchanged files
+are not re-read. The cache is trimmed to ``max_bytes`` by evicting the
+least recently used segments.
+
+Command line::
+
+    python -m utils.export_cache stats <project_path>
+    python -m utils.export_cache purge <project_path>
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from typing import Dict, Iterable, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+CACHE_SUBDIR = os.path.join("cache", "export")
+INDEX_FILE = "index.json"
+DEFAULT_MAX_BYTES = 4 * 1024 ** 3
+_HASH_CHUNK = 1024 * 1024
+
+
+def project_cache_dir(project_path: str) -> str:
+    """Export cache directory of a project."""
+    return os.path.join(project_path, CACHE_SUBDIR)
+
+
+class ExportCache:
+    """
+    LRU store of normalised segments keyed by content and export settings.
+
+    Not thread-safe; one export uses it at a time.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._index_path = os.path.join(cache_dir, INDEX_FILE)
+        self._segments: Dict[str, dict] = {}
+        self._hashes: Dict[str, dict] = {}
+        self._load()
+
+    @classmethod
+    def for_project(cls, project_path: str, max_bytes: int = DEFAULT_MAX_BYTES) -> "ExportCache":
+        return cls(project_cache_dir(project_path), max_bytes)
+
+    # -- keys ----------------------------------------------------------------
+
+    def content_hash(self, path: str) -> str:
+        """BLAKE2b of the file content, reused while size and mtime are unchanged."""
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        known = self._hashes.get(path)
+        if known and known["size"] == st.st_size and known["mtime_ns"] == st.st_mtime_ns:
+            return known["hash"]
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+                digest.update(chunk)
+        value = digest.hexdigest()
+        self._hashes[path] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": value}
+        return value
+
+    @staticmethod
+    def segment_key(content_hash: str, settings: Iterable) -> str:
+        """Cache key of a segment: content hash plus every setting it was encoded with."""
+        material = json.dumps([content_hash, *map(str, settings)])
+        return hashlib.blake2b(material.encode("utf-8"), digest_size=16).hexdigest()
+
+    # -- segments ------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[str]:
+        """Path of a cached segment (marking it recently used), or None."""
+        entry = self._segments.get(key)
+        if entry is None:
+            return None
+        path = self._segment_path(key)
+        if not os.path.exists(path):
+            del self._segments[key]
+            return None
+        entry["used"] = time.time()
+        return path
+
+    def put(self, key: str, segment_path: str) -> str:
+        """
+        Move a freshly encoded segment into the cache.
+
+        Returns:
+            Path of the cached segment
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._segment_path(key)
+        shutil.move(segment_path, path)
+        self._segments[key] = {"size": os.path.getsize(path), "used": time.time()}
+        return path
+
+    def __len__(self) -> int:
+        return len(self._segments)
+
+    def total_bytes(self) -> int:
+        return sum(entry["size"] for entry in self._segments.values())
+
+    def trim(self, keep: Sequence[str] = ()) -> int:
+        """
+        Evict least recently used segments until the cache fits max_bytes.
+
+        Args:
+            keep: Keys never evicted (segments of the export in progress)
+
+        Returns:
+            Number of bytes freed
+        """
+        keep = set(keep)
+        total = self.total_bytes()
+        freed = 0
+        for key in sorted(self._segments, key=lambda k: self._segments[k]["used"]):
+            if total <= self.max_bytes:
+                break
+            if key in keep:
+                continue
+            size = self._segments.pop(key)["size"]
+            self._remove(self._segment_path(key))
+            total -= size
+            freed += size
+        if freed:
+            logger.info(f"Evicted {freed} bytes from export cache {self.cache_dir}")
+        return freed
+
+    def purge(self) -> int:
+        """Delete every cached segment. Returns the number of bytes freed."""
+        freed = self.total_bytes()
+        self._segments.clear()
+        self._hashes.clear()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        return freed
+
+    def save(self):
+        """Persist the index."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Forget hashes of files that no longer exist
+        self._hashes = {p: h for p, h in self._hashes.items() if os.path.exists(p)}
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"segments": self._segments, "hashes": self._hashes}, f)
+        os.replace(tmp_path, self._index_path)
+
+    # -- internal ------------------------------------------------------------
+
+    def _segment_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.mp4")
+
+    def _load(self):
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._segments = dict(data.get("segments", {}))
+            self._hashes = dict(data.get("hashes", {}))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable export cache index {self._index_path}: {e}")
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="export_cache",
+        description="Inspect or purge a project's timeline export cache.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("stats", "purge"):
+        cmd = sub.add_parser(name)
+        cmd.add_argument("project_path", help="Project directory")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = _build_parser().parse_args(argv)
+    cache = ExportCache.for_project(args.project_path)
+    if args.command == "purge":
+        print(f"Purged {cache.purge() / 1024 ** 2:.1f} MiB from {cache.cache_dir}")
+    else:
+        print(f"{len(cache)} segments, {cache.total_bytes() / 1024 ** 2:.1f} MiB "
+              f"in {cache.cache_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
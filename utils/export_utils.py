@@ -0,0 +1,359 @@
+"""
+Timeline export engine.
+
+Exports an ordered list of clips (videos and still images, each with the
+duration it occupies on the timeline) to a single video:
+
+1. Probe: every clip is probed once through the shared media probe cache
+   (utils.media_probe)
+2. Plan: the export profile (resolution, frame rate, audio layout) is the
+   one shared by most of the video footage; clips that already match it
+   exactly are stream-copied, everything else is normalised to it
+3. Normalise: mismatched clips and images are encoded to the profile by
+   parallel ffmpeg processes, bounded by the number of cores
+4. Concat: one concat-demuxer pass with ``-c copy`` over all segments
+
+With an ExportCache (see utils.export_cache), normalised segments are
+reused across exports as long as the media content and export settings
+are unchanged.
+
+Progress and per-stage timings are reported through a callback.
+"""
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from fractions import Fraction
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple, Union
+
+from utils.ffmpeg_utils import check_ffmpeg, run_command
+from utils.media_probe import IMAGE_EXTENSIONS, MediaProbe, probe_media
+
+if TYPE_CHECKING:
+    from utils.export_cache import ExportCache
+
+logger = logging.getLogger(__name__)
+
+# Encoder settings for normalised segments
+VIDEO_CODEC = "h264"
+PIX_FMT = "yuv420p"
+AUDIO_CODEC = "aac"
+DEFAULT_SAMPLE_RATE = 44100
+DEFAULT_CHANNELS = 2
+X264_PRESET = "veryfast"
+X264_CRF = "18"
+
+# Progress share of each stage (percent at which the stage ends)
+_PROBE_END = 10
+_NORMALIZE_END = 90
+
+ProgressCallback = Callable[[int, str], None]
+
+
+@dataclass
+class ExportClip:
+    """One timeline item to export."""
+    path: str
+    duration: float  # Seconds on the timeline; <= 0 means the media's own length
+
+    @property
+    def is_image(self) -> bool:
+        return self.path.lower().endswith(IMAGE_EXTENSIONS)
+
+
+@dataclass(frozen=True)
+class ExportProfile:
+    """Target stream parameters every segment must share for concat -c copy."""
+    width: int
+    height: int
+    frame_rate: Fraction
+    timescale: Optional[int] = None
+    has_audio: bool = False
+    sample_rate: int = DEFAULT_SAMPLE_RATE
+    channels: int = DEFAULT_CHANNELS
+
+
+def choose_profile(clips: List[ExportClip], probes: List[Optional[MediaProbe]],
+                   fps: int) -> ExportProfile:
+    """
+    Pick the export profile: the parameters shared by most video footage.
+
+    Args:
+        clips: Clips in timeline order
+        probes: Probe result for each clip
+        fps: Frame rate to use when there is no video footage
+
+    Returns:
+        ExportProfile
+    """
+    footage: Dict[tuple, float] = defaultdict(float)
+    has_audio = False
+    for clip, probe in zip(clips, probes):
+        if probe is None or clip.is_image or not probe.frame_rate:
+            continue
+        key = (probe.width, probe.height, probe.frame_rate, probe.timescale)
+        footage[key] += clip.duration if clip.duration > 0 else probe.duration
+        has_audio = has_audio or probe.audio_streams > 0
+
+    if footage:
+        width, height, frame_rate, timescale = max(footage, key=footage.get)
+        # Audio parameters of the dominant footage, so its clips stay copyable
+        audio_source = next(
+            (p for c, p in zip(clips, probes)
+             if p is not None and not c.is_image and p.audio_streams
+             and (p.width, p.height, p.frame_rate, p.timescale) == (width, height, frame_rate, timescale)),
+            None,
+        )
+        return ExportProfile(
+            width=width, height=height, frame_rate=frame_rate, timescale=timescale,
+            has_audio=has_audio,
+            sample_rate=(audio_source.sample_rate if audio_source and audio_source.sample_rate
+                         else DEFAULT_SAMPLE_RATE),
+            channels=(audio_source.channels if audio_source and audio_source.channels
+                      else DEFAULT_CHANNELS),
+        )
+
+    # Images only: size of the first image, rounded down to even for yuv420p
+    first = next((p for p in probes if p is not None), None)
+    width, height = (first.width, first.height) if first else (1920, 1080)
+    return ExportProfile(width=max(2, width - width % 2), height=max(2, height - height % 2),
+                         frame_rate=Fraction(fps))
+
+
+def clip_duration(clip: ExportClip, probe: Optional[MediaProbe]) -> float:
+    """Seconds the clip occupies in the export."""
+    if clip.duration > 0:
+        return clip.duration
+    if not clip.is_image and probe is not None and probe.duration > 0:
+        return probe.duration
+    return 1.0
+
+
+def can_stream_copy(clip: ExportClip, probe: Optional[MediaProbe], profile: ExportProfile) -> bool:
+    """
+    Whether a clip can go into the concat unchanged.
+
+    Requires identical codec, pixel format, size, frame rate, time base and
+    audio layout, and a length within one frame of its timeline duration.
+    """
+    if clip.is_image or probe is None:
+        return False
+    if (probe.video_codec != VIDEO_CODEC or probe.pix_fmt != PIX_FMT
+            or probe.video_streams != 1
+            or (probe.width, probe.height) != (profile.width, profile.height)
+            or probe.frame_rate != profile.frame_rate
+            or probe.timescale != profile.timescale):
+        return False
+    if profile.has_audio:
+        if (probe.audio_streams != 1 or probe.audio_codec != AUDIO_CODEC
+                or probe.sample_rate != profile.sample_rate or probe.channels != profile.channels):
+            return False
+    elif probe.audio_streams:
+        return False
+    return abs(probe.duration - clip_duration(clip, probe)) <= 1 / profile.frame_rate
+
+
+def build_normalize_command(clip: ExportClip, probe: Optional[MediaProbe], profile: ExportProfile,
+                            output_path: str, threads: int = 0) -> List[str]:
+    """
+    ffmpeg command encoding one clip to the export profile.
+
+    Videos are scaled/padded to the profile size, cut to or held (last frame)
+    to the timeline duration; images become a still clip of that duration.
+    A silent track is added when the profile has audio and the clip has none.
+    """
+    duration = clip_duration(clip, probe)
+    fps = profile.frame_rate
+    cmd = ['ffmpeg', '-v', 'error']
+    if clip.is_image:
+        cmd += ['-loop', '1', '-framerate', str(fps)]
+    cmd += ['-i', clip.path]
+
+    clip_audio = not clip.is_image and probe is not None and probe.audio_streams > 0
+    if profile.has_audio and not clip_audio:
+        cmd += ['-f', 'lavfi', '-i',
+                f'anullsrc=r={profile.sample_rate}:cl={"mono" if profile.channels == 1 else "stereo"}']
+
+    filters = [
+        f'scale={profile.width}:{profile.height}:force_original_aspect_ratio=decrease',
+        f'pad={profile.width}:{profile.height}:(ow-iw)/2:(oh-ih)/2',
+        'setsar=1',
+        f'fps={fps}',
+        f'format={PIX_FMT}',
+    ]
+    if not clip.is_image and probe is not None and probe.duration and probe.duration < duration:
+        filters.append(f'tpad=stop_mode=clone:stop_duration={duration - probe.duration:.3f}')
+
+    cmd += ['-vf', ','.join(filters), '-map', '0:v:0']
+    if profile.has_audio:
+        cmd += ['-map', '0:a:0' if clip_audio else '1:a:0',
+                '-c:a', AUDIO_CODEC, '-ar', str(profile.sample_rate), '-ac', str(profile.channels)]
+    cmd += ['-c:v', 'libx264', '-preset', X264_PRESET, '-crf', X264_CRF, '-pix_fmt', PIX_FMT]
+    if threads:
+        cmd += ['-threads', str(threads)]
+    if profile.timescale:
+        cmd += ['-video_track_timescale', str(profile.timescale)]
+    cmd += ['-t', f'{duration:.3f}', '-y', output_path]
+    return cmd
+
+
+def segment_settings(clip: ExportClip, probe: Optional[MediaProbe], profile: ExportProfile) -> tuple:
+    """Everything besides the media content that determines a normalised segment."""
+    return (clip.is_image, f"{clip_duration(clip, probe):.3f}", profile,
+            VIDEO_CODEC, PIX_FMT, AUDIO_CODEC, X264_PRESET, X264_CRF)
+
+
+def _concat_line(path: str) -> str:
+    escaped = os.path.abspath(path).replace("'", "'\\''")
+    return f"file '{escaped}'\n"
+
+
+def default_jobs() -> int:
+    """Parallel normalise jobs: half the cores (x264 is multi-threaded itself)."""
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+async def export_clips(clips: List[ExportClip], output_path: Union[str, Path], fps: int = 30,
+                       progress: Optional[ProgressCallback] = None,
+                       check_cancelled: Optional[Callable[[], None]] = None,
+                       jobs: Optional[int] = None,
+                       cache: Optional["ExportCache"] = None) -> bool:
+    """
+    Export clips, in order, to one video.
+
+    Args:
+        clips: Clips in timeline order
+        output_path: Output mp4 path
+        fps: Frame rate when the timeline has no video footage
+        progress: Called with (percent, message) after each stage step
+        check_cancelled: Called between steps; may raise to abort
+        jobs: Parallel normalise jobs (default: default_jobs())
+        cache: Reuse and store normalised segments (trimmed and saved at the end)
+
+    Returns:
+        bool: True if the export succeeds, False otherwise
+    """
+    if not check_ffmpeg():
+        logger.error("FFmpeg is not available. Please install it first.")
+        return False
+    clips = [c for c in clips if os.path.exists(c.path)]
+    if not clips:
+        logger.error("No existing media to export.")
+        return False
+
+    report = progress or (lambda percent, message: None)
+    check = check_cancelled or (lambda: None)
+    jobs = jobs or default_jobs()
+    threads = max(1, (os.cpu_count() or 1) // jobs)
+    output_path = str(output_path)
+    work_dir = tempfile.mkdtemp(prefix=".export_", dir=os.path.dirname(os.path.abspath(output_path)))
+    cache_keys: List[str] = []
+
+    try:
+        # 1. Probe
+        started = time.perf_counter()
+        probe_slots = asyncio.Semaphore(max(jobs, 4))
+
+        async def probe(clip: ExportClip) -> Optional[MediaProbe]:
+            async with probe_slots:
+                return await probe_media(clip.path)
+
+        probes = await asyncio.gather(*(probe(c) for c in clips))
+        profile = choose_profile(clips, probes, fps)
+        check()
+        report(_PROBE_END, f"Probed {len(clips)} clips in {time.perf_counter() - started:.1f}s "
+                           f"({profile.width}x{profile.height} @ {float(profile.frame_rate):.3g} fps)")
+
+        # 2. Plan + 3. Normalise
+        started = time.perf_counter()
+        segments: List[str] = []
+        to_encode: List[Tuple[int, Optional[str], List[str]]] = []
+        copied = reused = 0
+        for i, (clip, probe) in enumerate(zip(clips, probes)):
+            if can_stream_copy(clip, probe, profile):
+                segments.append(clip.path)
+                copied += 1
+                continue
+            key = None
+            if cache is not None:
+                content_hash = await asyncio.to_thread(cache.content_hash, clip.path)
+                key = cache.segment_key(content_hash, segment_settings(clip, probe, profile))
+                cached = cache.get(key)
+                if cached:
+                    cache_keys.append(key)
+                    segments.append(cached)
+                    reused += 1
+                    continue
+            segment = os.path.join(work_dir, f"segment_{i:04d}.mp4")
+            segments.append(segment)
+            to_encode.append((i, key, build_normalize_command(clip, probe, profile, segment, threads)))
+        check()
+
+        encode_slots = asyncio.Semaphore(jobs)
+        done = 0
+
+        async def encode(index: int, key: Optional[str], cmd: List[str]) -> bool:
+            nonlocal done
+            async with encode_slots:
+                check()
+                result = await run_command(cmd)
+            if result.returncode != 0:
+                logger.error(f"Error normalising {cmd[cmd.index('-i') + 1]}: {result.stderr.decode()}")
+                return False
+            if key is not None:
+                segments[index] = cache.put(key, segments[index])
+                cache_keys.append(key)
+            done += 1
+            percent = _PROBE_END + (_NORMALIZE_END - _PROBE_END) * done // max(1, len(to_encode))
+            report(percent, f"Encoded {done}/{len(to_encode)} segments "
+                            f"({time.perf_counter() - started:.1f}s, {copied} stream-copied, {reused} cached)")
+            return True
+
+        tasks = [asyncio.ensure_future(encode(*job)) for job in to_encode]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        if not all(results):
+            return False
+        check()
+        report(_NORMALIZE_END, f"Prepared {len(segments)} segments in {time.perf_counter() - started:.1f}s "
+                               f"({len(to_encode)} encoded, {copied} stream-copied, {reused} cached)")
+
+        # 4. Concat
+        started = time.perf_counter()
+        list_path = os.path.join(work_dir, "concat.txt")
+        with open(list_path, "w", encoding="utf-8") as f:
+            f.writelines(_concat_line(s) for s in segments)
+        cmd = [
+            'ffmpeg', '-v', 'error',
+            '-f', 'concat',
+            '-safe', '0',
+            '-i', list_path,
+            '-c', 'copy',
+            '-movflags', '+faststart',
+            '-y',
+            output_path
+        ]
+        result = await run_command(cmd)
+        if result.returncode != 0:
+            logger.error(f"Error concatenating segments: {result.stderr.decode()}")
+            return False
+        report(100, f"Concatenated in {time.perf_counter() - started:.1f}s")
+        logger.info(f"Exported {len(clips)} clips to {output_path}")
+        return True
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        if cache is not None:
+            try:
+                cache.trim(keep=cache_keys)
+                cache.save()
+            except OSError as e:
+                logger.warning(f"Failed to update export cache {cache.cache_dir}: {e}")
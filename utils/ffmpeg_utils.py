@@ -173,7 +173,7 @@ async def extract_first_frame(video_path: Union[str, Path], output_path: Union[s
 async def extract_last_frame(video_path: Union[str, Path], output_path: Union[str, Path]) -> bool:
     """
     Extract the last frame of a video and save it as an image.
-    This implementation uses a two-pass approach to get the duration first.
+    The duration comes from the shared media probe cache (utils.media_probe).
     
     Args:
         video_path: Path to the input video file
@@ -186,26 +186,16 @@ async def extract_last_frame(video_path: Union[str, Path], output_path: Union[st
         logger.error("FFmpeg is not available. Please install it first.")
         return False
         
+    from utils.media_probe import probe_media
+
     try:
-        # First, try to get the duration of the video using ffprobe
-        cmd_duration = [
-            'ffprobe',
-            '-v', 'quiet',
-            '-print_format', 'csv=p=0',
-            '-show_entries', 'format=duration',
-            str(video_path)
-        ]
-        
         try:
-            result_duration = await run_command(cmd_duration)
-            duration_extraction_success = result_duration.returncode == 0
+            probe = await probe_media(video_path)
         except Exception:
-            # If ffprobe is not available or fails, set flag to False
-            result_duration = None
-            duration_extraction_success = False
+            probe = None
         
-        if not duration_extraction_success:
-            logger.warning("ffprobe not available or failed, using alternative approach with -sseof")
+        if probe is None or probe.duration <= 0:
+            logger.warning("Video duration unknown, using alternative approach with -sseof")
             # Try alternative approach: go to the end of the video and extract a frame
             cmd = [
                 'ffmpeg',
@@ -217,30 +207,15 @@ async def extract_last_frame(video_path: Union[str, Path], output_path: Union[st
                 str(output_path)
             ]
         else:
-            # Parse duration to get the last frame
-            duration_str = result_duration.stdout.decode().strip()
-            try:
-                duration = float(duration_str)
-                # Use the exact duration to seek to the end
-                cmd = [
-                    'ffmpeg',
-                    '-ss', str(max(0, duration - 0.1)),  # seek to very end (minus small buffer)
-                    '-i', str(video_path),
-                    '-vframes:v', '1',
-                    '-y',
-                    str(output_path)
-                ]
-            except ValueError:
-                # If parsing fails, use the alternative approach
-                cmd = [
-                    'ffmpeg',
-                    '-sseof', '-1',  # seek to 1 second before the end
-                    '-i', str(video_path),
-                    '-vframes:v', '1',
-                    '-update', '1',
-                    '-y',
-                    str(output_path)
-                ]
+            # Use the exact duration to seek to the end
+            cmd = [
+                'ffmpeg',
+                '-ss', str(max(0, probe.duration - 0.1)),  # seek to very end (minus small buffer)
+                '-i', str(video_path),
+                '-vframes:v', '1',
+                '-y',
+                str(output_path)
+            ]
         
         result = await run_command(cmd)
         
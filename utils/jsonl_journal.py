@@ -0,0 +1,111 @@
+"""
+Append-only JSON-lines files.
+
+One JSON object per line, appended with a single write. A crash mid-append
+leaves at most one torn last line, which replay() cuts off so that later
+appends start on a clean line. rewrite() replaces the whole file atomically
+(used to compact a journal into its current state).
+"""
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+
+class JsonlJournal:
+    """
+    JSON-lines journal file.
+
+    Usage:
+        journal = JsonlJournal(path)
+        for record in journal.replay(): ...
+        journal.append([{"op": "add", ...}])
+        journal.rewrite(current_records)   # compaction
+        journal.reset()
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.records = 0  # Records in the file (valid after replay)
+        self._lock = threading.Lock()
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def append(self, records: Iterable[Dict[str, Any]]):
+        """Append records in one write (raises OSError on failure)."""
+        lines = [json.dumps(record, ensure_ascii=False) for record in records]
+        if not lines:
+            return
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+        with self._lock:
+            with open(self.path, "ab") as f:
+                f.write(data)
+            self.records += len(lines)
+
+    def replay(self) -> List[Dict[str, Any]]:
+        """
+        Read all complete records.
+
+        A torn or corrupt tail is cut off the file so that later appends
+        start on a clean line.
+        """
+        records: List[Dict[str, Any]] = []
+        with self._lock:
+            try:
+                with open(self.path, "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                self.records = 0
+                return records
+
+            good_end = 0
+            for line in data.splitlines(keepends=True):
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if isinstance(record, dict):
+                    records.append(record)
+                good_end += len(line)
+
+            if good_end < len(data):
+                logger.warning(f"Dropping {len(data) - good_end} bytes of incomplete journal {self.path}")
+                try:
+                    with open(self.path, "r+b") as f:
+                        f.truncate(good_end)
+                except OSError as e:
+                    logger.error(f"Failed to repair journal {self.path}: {e}")
+            self.records = len(records)
+        return records
+
+    def rewrite(self, records: Iterable[Dict[str, Any]]):
+        """Replace the journal with the given records (raises OSError on failure)."""
+        lines = [json.dumps(record, ensure_ascii=False) + "\n" for record in records]
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with self._lock:
+            try:
+                with open(tmp_path, "wb") as f:
+                    f.write("".join(lines).encode("utf-8"))
+                os.replace(tmp_path, self.path)
+            except OSError:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                raise
+            self.records = len(lines)
+
+    def reset(self):
+        """Delete the journal."""
+        with self._lock:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            self.records = 0
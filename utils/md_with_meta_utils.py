@@ -4,6 +4,9 @@ Utilities for handling markdown files with metadata (frontmatter).
 This module provides functions for reading and writing markdown files
 that contain YAML metadata enclosed between --- markers at the beginning
 of the file.
+
+get_metadata and get_content go through the document cache, so unchanged
+files are not read and parsed again.
 """
 
 import yaml
@@ -11,6 +14,8 @@ import os
 from pathlib import Path
 from typing import Dict, Any, Optional, Union
 
+from utils.document_cache import get_document_cache
+
 
 def parse_frontmatter(content: str) -> tuple[Dict[str, Any], str]:
     """
@@ -74,6 +79,7 @@ def write_md_with_meta(file_path: Union[str, Path], metadata: Dict[str, Any], co
     # Write the content to the file
     with open(file_path, 'w', encoding='utf-8') as f:
         f.write(full_content)
+    get_document_cache().invalidate(file_path, "md")
 
 
 def update_md_with_meta(file_path: Union[str, Path], metadata_updates: Dict[str, Any], content: Optional[str] = None) -> bool:
@@ -108,6 +114,19 @@ def update_md_with_meta(file_path: Union[str, Path], metadata_updates: Dict[str,
         return False
 
 
+def read_md_with_meta_cached(file_path: Union[str, Path]) -> tuple[Dict[str, Any], str]:
+    """
+    Like read_md_with_meta, but parses the file again only when it changed.
+
+    Args:
+        file_path: Path to the markdown file
+
+    Returns:
+        A tuple containing (metadata_dict, content)
+    """
+    return get_document_cache().get(file_path, read_md_with_meta, "md")
+
+
 def get_metadata(file_path: Union[str, Path]) -> Dict[str, Any]:
     """
     Get only the metadata from a markdown file with frontmatter.
@@ -118,7 +137,7 @@ def get_metadata(file_path: Union[str, Path]) -> Dict[str, Any]:
     Returns:
         Dictionary containing the metadata
     """
-    metadata, _ = read_md_with_meta(file_path)
+    metadata, _ = read_md_with_meta_cached(file_path)
     return metadata
 
 
@@ -132,5 +151,5 @@ def get_content(file_path: Union[str, Path]) -> str:
     Returns:
         The content without frontmatter
     """
-    _, content = read_md_with_meta(file_path)
+    _, content = read_md_with_meta_cached(file_path)
     return content
\ No newline at end of file
@@ -0,0 +1,406 @@
+"""
+Shared media probe service with an on-disk cache.
+
+Every place that needs video metadata (resources, timeline durations,
+preview, layer composition, export) goes through this module instead of
+opening its own cv2.VideoCapture or spawning its own ffprobe:
+
+    probe = get_media_probe(path)            # sync (cached)
+    probe = await probe_media(path)          # async
+    probes = await probe_media_batch(paths)  # concurrent ffprobe calls
+    probes = await probe_directory(path)
+
+Results are keyed by (absolute path, size, mtime) and persisted as JSON
+(``<workspace>/cache/media_probe.json``), so a file is probed once until
+it changes. Single-file probes rewrite the file at most once per
+SAVE_DELAY seconds (and at exit); batch probes save once when done.
+ffprobe is used when available, OpenCV otherwise. The keyframe index is
+computed on demand (``keyframes=True``) and cached with the rest of the
+probe.
+"""
+import asyncio
+import atexit
+import json
+import logging
+import os
+import subprocess
+import threading
+from dataclasses import asdict, dataclass, fields
+from fractions import Fraction
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+CACHE_ENV = "FILMETO_MEDIA_PROBE_CACHE"
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp")
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".avi", ".mkv", ".webm", ".m4v", ".flv", ".wmv")
+SAVE_DELAY = 2.0  # Seconds to coalesce single-file probes before rewriting the cache file
+
+
+@dataclass
+class MediaProbe:
+    """Stream parameters of a media file."""
+    width: int
+    height: int
+    duration: float = 0.0
+    video_codec: Optional[str] = None
+    pix_fmt: Optional[str] = None
+    frame_rate: Optional[Fraction] = None
+    timescale: Optional[int] = None
+    video_streams: int = 1
+    audio_streams: int = 0
+    audio_codec: Optional[str] = None
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+    frame_count: int = 0
+    keyframes: Optional[List[float]] = None  # Keyframe timestamps; None until requested
+
+    @property
+    def fps(self) -> float:
+        return float(self.frame_rate) if self.frame_rate else 0.0
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["frame_rate"] = str(self.frame_rate) if self.frame_rate else None
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MediaProbe":
+        known = {f.name for f in fields(cls)}
+        values = {k: v for k, v in data.items() if k in known}
+        values["frame_rate"] = _parse_rate(values.get("frame_rate"))
+        return cls(**values)
+
+
+def _parse_rate(value: Optional[str]) -> Optional[Fraction]:
+    try:
+        rate = Fraction(value)
+    except (TypeError, ValueError, ZeroDivisionError):
+        return None
+    return rate if rate > 0 else None
+
+
+def _parse_ffprobe(data: dict) -> Optional[MediaProbe]:
+    streams = data.get("streams", [])
+    video = [s for s in streams if s.get("codec_type") == "video"]
+    audio = [s for s in streams if s.get("codec_type") == "audio"]
+    if not video:
+        return None
+    v = video[0]
+    time_base = _parse_rate(v.get("time_base"))
+    duration = float(data.get("format", {}).get("duration") or v.get("duration") or 0)
+    frame_rate = _parse_rate(v.get("r_frame_rate"))
+    nb_frames = v.get("nb_frames")
+    probe = MediaProbe(
+        width=int(v.get("width", 0)),
+        height=int(v.get("height", 0)),
+        duration=duration,
+        video_codec=v.get("codec_name"),
+        pix_fmt=v.get("pix_fmt"),
+        frame_rate=frame_rate,
+        timescale=time_base.denominator if time_base and time_base.numerator == 1 else None,
+        video_streams=len(video),
+        audio_streams=len(audio),
+        frame_count=(int(nb_frames) if str(nb_frames or "").isdigit()
+                     else round(duration * frame_rate) if frame_rate else 0),
+    )
+    if audio:
+        a = audio[0]
+        probe.audio_codec = a.get("codec_name")
+        probe.sample_rate = int(a["sample_rate"]) if a.get("sample_rate") else None
+        probe.channels = a.get("channels")
+    return probe
+
+
+def _probe_with_opencv(path: str) -> Optional[MediaProbe]:
+    """Fallback probe without ffprobe: dimensions, frame rate and length only."""
+    try:
+        import cv2
+    except ImportError:
+        return None
+    if path.lower().endswith(IMAGE_EXTENSIONS):
+        image = cv2.imread(path)
+        if image is None:
+            return None
+        return MediaProbe(width=image.shape[1], height=image.shape[0], frame_count=1)
+    cap = cv2.VideoCapture(path)
+    try:
+        if not cap.isOpened():
+            return None
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        return MediaProbe(
+            width=int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            height=int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            duration=frames / fps if fps > 0 else 0.0,
+            frame_rate=Fraction(fps).limit_denominator(1001) if fps > 0 else None,
+            frame_count=max(0, frames),
+        )
+    finally:
+        cap.release()
+
+
+_ffprobe_available: Optional[bool] = None
+
+
+def _has_ffprobe() -> bool:
+    global _ffprobe_available
+    if _ffprobe_available is None:
+        from utils.ffmpeg_utils import check_ffprobe
+        _ffprobe_available = check_ffprobe()
+    return _ffprobe_available
+
+
+def _run_ffprobe(args: List[str]) -> Optional[str]:
+    try:
+        result = subprocess.run(['ffprobe', '-v', 'error', *args],
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
+    except OSError as e:
+        logger.warning(f"ffprobe failed: {e}")
+        return None
+    if result.returncode != 0:
+        logger.warning(f"ffprobe failed for {args[-1]}: {result.stderr.decode(errors='replace')}")
+        return None
+    return result.stdout.decode(errors="replace")
+
+
+def _probe_uncached(path: str) -> Optional[MediaProbe]:
+    if _has_ffprobe():
+        output = _run_ffprobe(['-print_format', 'json', '-show_streams', '-show_format', path])
+        if output is not None:
+            try:
+                return _parse_ffprobe(json.loads(output or "{}"))
+            except ValueError as e:
+                logger.warning(f"Unreadable ffprobe output for {path}: {e}")
+    return _probe_with_opencv(path)
+
+
+def _read_keyframes(path: str) -> List[float]:
+    """Timestamps of the first video stream's keyframes (empty without ffprobe)."""
+    if not _has_ffprobe():
+        return []
+    output = _run_ffprobe(['-select_streams', 'v:0', '-skip_frame', 'nokey',
+                           '-show_entries', 'frame=pts_time', '-of', 'csv=p=0', path])
+    keyframes = []
+    for line in (output or "").splitlines():
+        try:
+            keyframes.append(float(line.strip().rstrip(",")))
+        except ValueError:
+            continue
+    return keyframes
+
+
+def default_cache_path() -> str:
+    """Location of the on-disk probe cache."""
+    override = os.environ.get(CACHE_ENV)
+    if override:
+        return override
+    from utils.path_utils import get_workspace_path
+    return str(get_workspace_path() / "cache" / "media_probe.json")
+
+
+class MediaProbeCache:
+    """
+    Probe results keyed by (path, size, mtime), persisted to a JSON file.
+
+    Thread-safe; the blocking probe runs outside the lock so several files
+    can be probed at once. get() does not rewrite the file on every miss:
+    it schedules one save save_delay seconds after the first change.
+    """
+
+    def __init__(self, cache_path: Optional[str] = None, save_delay: float = SAVE_DELAY):
+        self.cache_path = cache_path or default_cache_path()
+        self.save_delay = save_delay
+        self._entries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._dirty = False
+        self._save_lock = threading.Lock()
+        self._save_timer: Optional[threading.Timer] = None
+
+    def get(self, path: Union[str, Path], keyframes: bool = False) -> Optional[MediaProbe]:
+        """
+        Probe a media file, using the cache when the file is unchanged.
+
+        Args:
+            path: Media file path
+            keyframes: Also build the keyframe index
+
+        Returns:
+            MediaProbe, or None if the file is missing or has no video stream
+        """
+        probe = self._probe(path, keyframes)
+        self._schedule_save()
+        return probe
+
+    def get_many(self, paths: Iterable[Union[str, Path]],
+                 keyframes: bool = False) -> Dict[str, Optional[MediaProbe]]:
+        """Probe several files, saving the cache once at the end."""
+        results = {str(p): self._probe(p, keyframes) for p in paths}
+        self.save()
+        return results
+
+    def invalidate(self, path: Union[str, Path]):
+        with self._lock:
+            self._ensure_loaded()
+            if self._entries.pop(os.path.abspath(str(path)), None) is not None:
+                self._dirty = True
+
+    def clear(self):
+        with self._lock:
+            self._cancel_save_timer()
+            self._entries.clear()
+            self._loaded = True
+            self._dirty = False
+        try:
+            os.remove(self.cache_path)
+        except FileNotFoundError:
+            pass
+
+    def save(self):
+        """Persist the cache if it changed (atomic replace)."""
+        with self._save_lock:
+            with self._lock:
+                self._cancel_save_timer()
+                if not self._dirty:
+                    return
+                data = json.dumps(self._entries)
+                self._dirty = False
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+                tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(data)
+                os.replace(tmp_path, self.cache_path)
+            except OSError as e:
+                logger.warning(f"Failed to save media probe cache {self.cache_path}: {e}")
+
+    # -- internal ----------------------------------------------------------
+
+    def _schedule_save(self):
+        """Save once after save_delay, unless a save is already pending."""
+        with self._lock:
+            if not self._dirty or self._save_timer is not None:
+                return
+            self._save_timer = threading.Timer(self.save_delay, self.save)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _cancel_save_timer(self):
+        """
+        Drop a pending delayed save.
+
+        Note: This method should only be called while holding _lock.
+        """
+        if self._save_timer is not None:
+            self._save_timer.cancel()
+            self._save_timer = None
+
+    def _probe(self, path: Union[str, Path], keyframes: bool) -> Optional[MediaProbe]:
+        path = os.path.abspath(str(path))
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        stamp = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._entries.get(path)
+        if entry and entry["size"] == stamp["size"] and entry["mtime_ns"] == stamp["mtime_ns"]:
+            probe = MediaProbe.from_dict(entry["probe"]) if entry["probe"] else None
+            if probe is None or not keyframes or probe.keyframes is not None:
+                return probe
+        else:
+            probe = _probe_uncached(path)
+
+        if probe is not None and keyframes and probe.keyframes is None:
+            probe.keyframes = _read_keyframes(path)
+        with self._lock:
+            self._entries[path] = {**stamp, "probe": probe.to_dict() if probe else None}
+            self._dirty = True
+        return probe
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            if isinstance(entries, dict):
+                self._entries = entries
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable media probe cache {self.cache_path}: {e}")
+
+
+_cache: Optional[MediaProbeCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_media_probe_cache() -> MediaProbeCache:
+    """Process-wide probe cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = MediaProbeCache()
+            atexit.register(_cache.save)  # Flush a pending delayed save
+        return _cache
+
+
+def get_media_probe(path: Union[str, Path], keyframes: bool = False) -> Optional[MediaProbe]:
+    """Probe a media file (blocking, cached). See MediaProbeCache.get."""
+    return get_media_probe_cache().get(path, keyframes)
+
+
+async def probe_media(path: Union[str, Path], keyframes: bool = False) -> Optional[MediaProbe]:
+    """
+    Probe a video or image file without blocking the event loop.
+
+    Args:
+        path: Media file path
+        keyframes: Also build the keyframe index
+
+    Returns:
+        MediaProbe, or None if the file has no readable video stream
+    """
+    return await asyncio.to_thread(get_media_probe, path, keyframes)
+
+
+async def probe_media_batch(paths: Iterable[Union[str, Path]], keyframes: bool = False,
+                            concurrency: Optional[int] = None) -> Dict[str, Optional[MediaProbe]]:
+    """
+    Probe many files concurrently (cache misses run ffprobe in parallel).
+
+    Args:
+        paths: Media file paths
+        keyframes: Also build keyframe indexes
+        concurrency: Parallel probes (default: twice the core count)
+
+    Returns:
+        Dict mapping each path (as given, str) to its probe or None
+    """
+    cache = get_media_probe_cache()
+    paths = [str(p) for p in paths]
+    slots = asyncio.Semaphore(concurrency or 2 * (os.cpu_count() or 2))
+
+    async def probe(path: str) -> Optional[MediaProbe]:
+        async with slots:
+            return await asyncio.to_thread(cache._probe, path, keyframes)
+
+    probes = await asyncio.gather(*(probe(p) for p in paths))
+    await asyncio.to_thread(cache.save)
+    return dict(zip(paths, probes))
+
+
+async def probe_directory(directory: Union[str, Path], recursive: bool = False,
+                          keyframes: bool = False) -> Dict[str, Optional[MediaProbe]]:
+    """Probe every video and image file in a directory. See probe_media_batch."""
+    root = Path(directory)
+    candidates = root.rglob("*") if recursive else root.glob("*")
+    paths = [p for p in candidates
+             if p.is_file() and p.suffix.lower() in VIDEO_EXTENSIONS + IMAGE_EXTENSIONS]
+    return await probe_media_batch(sorted(paths), keyframes=keyframes)
@@ -114,43 +114,31 @@ def extract_first_frame_opencv(video_path: Union[str, Path], output_path: Union[
 
 def get_video_duration(video_path: Union[str, Path]) -> Optional[float]:
     """
-    Get the duration of a video file in seconds using OpenCV.
-    
+    Get the duration of a video file in seconds.
+
+    Goes through the shared media probe cache (utils.media_probe), so a
+    file is only opened again after it changes.
+
     Args:
         video_path: Path to the input video file
         
     Returns:
         float: Duration in seconds if successful, None if failed
     """
+    from utils.media_probe import get_media_probe
+
     try:
-        import cv2
-    except ImportError:
-        logger.error("OpenCV (cv2) is not installed. Please install it using 'pip install opencv-python'")
-        return None
-    
-    try:
-        # Open the video
-        cap = cv2.VideoCapture(str(video_path))
-        if cap.isOpened():
-            # Get video properties
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            
-            if fps > 0 and frame_count > 0:
-                # Calculate duration
-                duration = frame_count / fps
-                cap.release()
-                logger.info(f"Video duration: {duration}s (frames: {frame_count}, fps: {fps})")
-                return duration
-            else:
-                logger.error("Could not get FPS or frame count from video")
-        else:
-            logger.error("Failed to open video file with OpenCV")
-        
-        cap.release()
+        probe = get_media_probe(video_path)
     except Exception as e:
         logger.error(f"Exception occurred while getting video duration: {e}", exc_info=True)
+        return None
 
+    if probe is None:
+        logger.error(f"Failed to probe video file: {video_path}")
+        return None
+    if probe.duration > 0:
+        return probe.duration
+    logger.error("Could not get FPS or frame count from video")
     return None
 
 
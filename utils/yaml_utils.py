@@ -7,28 +7,41 @@ from utils.async_file_io import (
     AsyncFileNotFoundError,
     AsyncFileParseError,
     AsyncFileWriteError,
+    atomic_write_text,
     glob_paths,
     list_dir_names,
     load_files_parallel,
     load_json_async,
     load_yaml_async,
     path_exists,
+    read_json,
+    read_yaml,
+    read_yaml_cached,
     run_coroutine_blocking,
     save_json_async,
     save_yaml_async,
     shutil_copy2,
     to_thread,
+    write_json,
+    write_yaml,
 )
 
 logger = logging.getLogger(__name__)
 
 __all__ = (
     "load_yaml",
+    "load_yaml_cached",
     "save_yaml",
     "load_yaml_async",
     "save_yaml_async",
     "load_json_async",
     "save_json_async",
+    "read_yaml",
+    "read_yaml_cached",
+    "write_yaml",
+    "read_json",
+    "write_json",
+    "atomic_write_text",
     "AsyncFileIoError",
     "AsyncFileNotFoundError",
     "AsyncFileParseError",
@@ -44,9 +57,21 @@ __all__ = (
 
 
 def load_yaml(path):
-    """Load YAML via async I/O (thread offload when a loop is already running)."""
+    """Load YAML directly on the calling thread (no event loop or thread hop)."""
     try:
-        return run_coroutine_blocking(load_yaml_async(path))
+        return read_yaml(path)
+    except AsyncFileNotFoundError:
+        logger.error("file not exists")
+        return None
+    except AsyncFileParseError as e:
+        logger.error("YAML error: %s", e)
+        return None
+
+
+def load_yaml_cached(path):
+    """Load YAML through the document cache: unchanged files are not parsed again."""
+    try:
+        return read_yaml_cached(path)
     except AsyncFileNotFoundError:
         logger.error("file not exists")
         return None
@@ -56,8 +81,8 @@ def load_yaml(path):
 
 
 def save_yaml(path, data: Any) -> None:
-    """Persist YAML via async I/O (thread offload when a loop is already running)."""
+    """Persist YAML atomically on the calling thread (no event loop or thread hop)."""
     try:
-        run_coroutine_blocking(save_yaml_async(path, data))
+        write_yaml(path, data)
     except (AsyncFileNotFoundError, AsyncFileParseError, AsyncFileWriteError) as e:
         logger.error("YAML save error: %s", e)